@@ -0,0 +1,73 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import asyncio
+from datetime import datetime
+import logging
+
+import database
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Keeps time of the last request in memory. The time is saved in the database by a background task at most once
+    per flush_interval seconds, and only if it has changed since it was saved last time.
+    """
+
+    def __init__(self, last_request_datetime: datetime, flush_interval: float):
+        """
+        :param last_request_datetime: time of the last request already saved in the database
+        :param flush_interval: how often (in seconds) the time of the last request is saved in the database
+        """
+        self.flush_interval = flush_interval
+        self.last_request_datetime = last_request_datetime
+        self._flushed_datetime = last_request_datetime
+        self._flush_task = None
+
+    def record_request(self):
+        self.last_request_datetime = datetime.utcnow()
+
+    async def flush(self):
+        last_request_datetime = self.last_request_datetime
+        if last_request_datetime == self._flushed_datetime:
+            return
+        # sqlite3 blocks, so the database is updated outside of the event loop
+        await asyncio.get_event_loop().run_in_executor(None, database.update_timestamp, last_request_datetime)
+        self._flushed_datetime = last_request_datetime
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Failed to save time of the last request.')
+
+    def start(self):
+        self._flush_task = asyncio.ensure_future(self._flush_periodically())
+
+    async def stop(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
@@ -38,9 +38,9 @@ def init_db():
         c.close()
 
 
-def update_timestamp():
+def update_timestamp(timestamp: datetime = None):
     c = sqlite3.connect(DATABASE_FILENAME)
-    current_datetime = datetime.utcnow().strftime(DATETIME_STRING_FORMAT)
+    current_datetime = (timestamp or datetime.utcnow()).strftime(DATETIME_STRING_FORMAT)
     c.execute(f"UPDATE main SET datetimestamp='{current_datetime}'")
     c.commit()
     c.close()
@@ -14,64 +14,136 @@
 # limitations under the License.
 #
 
+
+import asyncio
 import json
 import logging
 
-from flask import Flask, Response, request
-import requests
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector, hdrs, web
+from yarl import URL
 
+from activity import ActivityTracker
 import database
 from models import InactivityResponse
+from runs import RUNS_API_PORT, create_runs_app, get_run_links
 
-app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TENSORBOARD_ADDRESS = 'http://127.0.0.1:6006/'
+
+PROXY_PORT = 80
+
+# TensorBoard's UI sends dozens of requests at once, all of them share a pool of kept-alive connections
+UPSTREAM_CONNECTIONS_LIMIT = 64
+
+# size of chunks of response bodies passed from TensorBoard to a client
+CHUNK_SIZE = 64 * 1024
+
+# how often (in seconds) time of the last request is saved in the database
+ACTIVITY_FLUSH_INTERVAL = 5
+
+# headers describing a single connection, they can't be forwarded
+HOP_BY_HOP_HEADERS = {hdrs.CONNECTION, hdrs.KEEP_ALIVE, hdrs.PROXY_AUTHENTICATE, hdrs.PROXY_AUTHORIZATION, hdrs.TE,
+                      hdrs.TRAILER, hdrs.TRANSFER_ENCODING, hdrs.UPGRADE}
+
+
+def _filter_headers(headers, excluded_headers=()) -> dict:
+    excluded_headers = {header.lower() for header in HOP_BY_HOP_HEADERS.union(excluded_headers)}
+    return {key: value for key, value in headers.items() if key.lower() not in excluded_headers}
+
+
+async def proxy(request: web.Request) -> web.StreamResponse:
+    request.app['activity_tracker'].record_request()
+
+    # path and query are passed to TensorBoard exactly as they were received
+    url = URL(request.app['tensorboard_address'].rstrip('/') + request.raw_path, encoded=True)
+    headers = _filter_headers(request.headers, excluded_headers={hdrs.HOST})
+    data = request.content if request.body_exists else None
 
-redirect_to = 'http://127.0.0.1:{}/'.format('6006')
+    try:
+        upstream = await request.app['upstream_session'].request(request.method, url, data=data, headers=headers,
+                                                                 allow_redirects=False)
+    except ClientError:
+        logger.exception(f'Failed to pass request to {url}.')
+        raise web.HTTPBadGateway()
 
+    try:
+        response = web.StreamResponse(status=upstream.status, reason=upstream.reason,
+                                      headers=_filter_headers(upstream.headers))
+        await response.prepare(request)
+        # body is passed to a client chunk by chunk, as soon as it comes from TensorBoard
+        async for chunk in upstream.content.iter_chunked(CHUNK_SIZE):
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+    finally:
+        upstream.release()
 
-database.init_db()
 
+async def inactivity(request: web.Request) -> web.Response:
+    # served from memory - tensorboard-service asks all proxies for it every few seconds
+    response = InactivityResponse(last_request_datetime=request.app['activity_tracker'].last_request_datetime)
+    return web.Response(text=json.dumps(response.to_dict()), content_type='application/json')
 
-@app.route('/', defaults={'url': ''})
-@app.route('/<path:url>')
-def proxy(url):
-    new_url = url
-    if request.query_string:
-        new_url = new_url + '?' + request.query_string.decode('utf-8')
 
-    headers = dict(request.headers)
+async def healthz(request: web.Request) -> web.Response:
+    try:
+        async with request.app['upstream_session'].get(request.app['tensorboard_address']) as upstream:
+            return web.Response(status=upstream.status)
+    except ClientError:
+        logger.exception('TensorBoard is not available.')
+        raise web.HTTPBadGateway()
 
-    final_url = str(redirect_to + new_url)
 
-    resp = requests.request(request.method,
-                            final_url,
-                            data=request.get_data(),
-                            headers=headers,
-                            cookies=request.cookies
-                            )
+async def start_background_tasks(app: web.Application):
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, database.init_db)
+    last_request_datetime = await loop.run_in_executor(None, database.get_timestamp)
 
-    flask_resp = Response(response=resp.content, content_type=resp.headers['Content-Type'])
+    # responses of TensorBoard are passed to clients as they are, so they aren't decompressed
+    app['upstream_session'] = ClientSession(connector=TCPConnector(limit=UPSTREAM_CONNECTIONS_LIMIT),
+                                            timeout=ClientTimeout(total=None), auto_decompress=False)
+    app['activity_tracker'] = ActivityTracker(last_request_datetime=last_request_datetime,
+                                              flush_interval=app['activity_flush_interval'])
+    app['activity_tracker'].start()
 
-    flask_resp.status_code = resp.status_code
 
-    for cookie_key, cookie_value in resp.cookies.items():
-        flask_resp.set_cookie(cookie_key, value=cookie_value)
+async def stop_background_tasks(app: web.Application):
+    await app['activity_tracker'].stop()
+    await app['upstream_session'].close()
 
-    database.update_timestamp()
 
-    return flask_resp
+async def start_runs_api(app: web.Application):
+    # logdir of a shared TensorBoard is managed by tensorboard-service through a separate port
+    run_links = get_run_links()
+    if run_links is None:
+        return
+    app['runs_api_runner'] = web.AppRunner(create_runs_app(run_links, activity_tracker=app['activity_tracker']))
+    await app['runs_api_runner'].setup()
+    await web.TCPSite(app['runs_api_runner'], port=RUNS_API_PORT).start()
 
 
-@app.route('/inactivity')
-def inactivity():
-    timestamp = database.get_timestamp()
-    response = InactivityResponse(last_request_datetime=timestamp)
-    return Response(response=json.dumps(response.to_dict()), content_type='application/json')
+async def stop_runs_api(app: web.Application):
+    if 'runs_api_runner' in app:
+        await app['runs_api_runner'].cleanup()
 
 
-@app.route('/healthz')
-def healthz():
-    resp = requests.get(redirect_to)
-    flask_response = Response()
-    flask_response.status_code = resp.status_code
-    return flask_response
+def create_app(tensorboard_address: str = TENSORBOARD_ADDRESS,
+               activity_flush_interval: float = ACTIVITY_FLUSH_INTERVAL) -> web.Application:
+    app = web.Application()
+    app['tensorboard_address'] = tensorboard_address
+    app['activity_flush_interval'] = activity_flush_interval
+    app.on_startup.append(start_background_tasks)
+    app.on_cleanup.append(stop_background_tasks)
+    app.router.add_get('/inactivity', inactivity)
+    app.router.add_get('/healthz', healthz)
+    app.router.add_route('*', '/{url:.*}', proxy)
+    return app
+
+
+if __name__ == '__main__':
+    proxy_app = create_app()
+    proxy_app.on_startup.append(start_runs_api)
+    proxy_app.on_cleanup.append(stop_runs_api)
+    web.run_app(proxy_app, port=PROXY_PORT, access_log=None)
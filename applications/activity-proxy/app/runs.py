@@ -0,0 +1,181 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import json
+import logging
+import os
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+from activity import ActivityTracker
+
+logger = logging.getLogger(__name__)
+
+# runs shown by TensorBoard of a shared instance are symbolic links placed in this directory, so they can be changed
+# without restarting TensorBoard - it discovers new runs in its logdir by itself
+RUNS_DIR_ENV = 'TENSORBOARD_RUNS_DIR'
+# directory with outputs of all runs, as seen by TensorBoard
+OUTPUT_DIR_ENV = 'TENSORBOARD_OUTPUT_DIR'
+# runs attached when the proxy starts, JSON list of {"owner": ..., "name": ...} objects
+INITIAL_RUNS_ENV = 'TENSORBOARD_RUNS'
+
+# port of an API managing attached runs, it isn't exposed by tensorboard's service
+RUNS_API_PORT = 8081
+
+# runs added to a shared TensorBoard are detached when nobody has requested them for this time
+DEFAULT_RUN_TTL_SECONDS = 1800
+
+
+class InvalidRunError(Exception):
+    pass
+
+
+def _validate_path_part(value: str):
+    if not value or '/' in value or value.startswith('.'):
+        raise InvalidRunError(f'invalid run owner or name: {value}')
+
+
+def _validate_runs(runs: Iterable[Tuple[str, str]]):
+    for owner, name in runs:
+        _validate_path_part(owner)
+        _validate_path_part(name)
+
+
+class RunLinks:
+    """
+    Symbolic links to outputs of runs, placed in TensorBoard's logdir as <owner>/<run name>.
+    """
+
+    def __init__(self, runs_dir: str, output_dir: str):
+        self.runs_dir = runs_dir
+        self.output_dir = output_dir
+        # (owner, name) -> monotonic time of the last request of an attached run
+        self._requested: Dict[Tuple[str, str], float] = {}
+
+    def list(self) -> List[Tuple[str, str]]:
+        runs = []
+        for owner in sorted(os.listdir(self.runs_dir)):
+            owner_dir = os.path.join(self.runs_dir, owner)
+            if os.path.isdir(owner_dir):
+                runs.extend((owner, name) for name in sorted(os.listdir(owner_dir)))
+        return runs
+
+    def attach(self, runs: List[Tuple[str, str]]):
+        """
+        Makes given runs the only runs placed in TensorBoard's logdir. Links of runs which are already attached
+        are left untouched, so TensorBoard doesn't load them again.
+        :param runs: list of (owner, name) tuples
+        """
+        _validate_runs(runs)
+
+        now = monotonic()
+        self._requested = {run: now for run in runs}
+        self._link(set(runs))
+
+    def add(self, runs: List[Tuple[str, str]], ttl_seconds: float = DEFAULT_RUN_TTL_SECONDS):
+        """
+        Places given runs in TensorBoard's logdir next to runs which are already attached, so users viewing
+        different runs at the same time don't replace each other's runs. Attached runs which haven't been requested
+        for ttl_seconds are detached.
+        :param runs: list of (owner, name) tuples
+        :param ttl_seconds: time after which a run which isn't requested again is detached
+        """
+        _validate_runs(runs)
+
+        now = monotonic()
+        for run in runs:
+            self._requested[run] = now
+        self._requested = {run: requested for run, requested in self._requested.items()
+                           if now - requested <= ttl_seconds}
+        self._link(set(self._requested))
+
+    def _link(self, requested_runs: Set[Tuple[str, str]]):
+        attached_runs = set(self.list())
+
+        for owner, name in attached_runs - requested_runs:
+            os.remove(os.path.join(self.runs_dir, owner, name))
+            owner_dir = os.path.join(self.runs_dir, owner)
+            if not os.listdir(owner_dir):
+                os.rmdir(owner_dir)
+
+        for owner, name in requested_runs - attached_runs:
+            os.makedirs(os.path.join(self.runs_dir, owner), exist_ok=True)
+            os.symlink(os.path.join(self.output_dir, owner, name), os.path.join(self.runs_dir, owner, name))
+
+        logger.info(f'Attached runs: {sorted(requested_runs)}, detached runs: {sorted(attached_runs - requested_runs)}')
+
+
+def _runs_response(run_links: RunLinks) -> web.Response:
+    run_names = [{'owner': owner, 'name': name} for owner, name in run_links.list()]
+    return web.Response(text=json.dumps({'runNames': run_names}), content_type='application/json')
+
+
+async def get_runs(request: web.Request) -> web.Response:
+    return _runs_response(request.app['run_links'])
+
+
+def _record_activity(request: web.Request):
+    # a TensorBoard which has waited for runs in the pool of idle TensorBoards is used since now
+    if request.app['activity_tracker']:
+        request.app['activity_tracker'].record_request()
+
+
+async def put_runs(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+        runs = [(run['owner'], run['name']) for run in body['runNames']]
+        request.app['run_links'].attach(runs)
+    except (ValueError, KeyError, TypeError, InvalidRunError) as ex:
+        raise web.HTTPBadRequest(text=str(ex))
+    _record_activity(request)
+    return _runs_response(request.app['run_links'])
+
+
+async def post_runs(request: web.Request) -> web.Response:
+    try:
+        body = await request.json()
+        runs = [(run['owner'], run['name']) for run in body['runNames']]
+        request.app['run_links'].add(runs, ttl_seconds=float(body.get('ttlSeconds', DEFAULT_RUN_TTL_SECONDS)))
+    except (ValueError, KeyError, TypeError, InvalidRunError) as ex:
+        raise web.HTTPBadRequest(text=str(ex))
+    _record_activity(request)
+    return _runs_response(request.app['run_links'])
+
+
+def create_runs_app(run_links: RunLinks, activity_tracker: ActivityTracker = None) -> web.Application:
+    app = web.Application()
+    app['run_links'] = run_links
+    app['activity_tracker'] = activity_tracker
+    app.router.add_get('/runs', get_runs)
+    app.router.add_put('/runs', put_runs)
+    app.router.add_post('/runs', post_runs)
+    return app
+
+
+def get_run_links() -> Optional[RunLinks]:
+    """
+    Returns run links configured with environment variables, None if TensorBoard isn't shared.
+    """
+    runs_dir = os.getenv(RUNS_DIR_ENV)
+    if not runs_dir:
+        return None
+    run_links = RunLinks(runs_dir=runs_dir, output_dir=os.environ[OUTPUT_DIR_ENV])
+    initial_runs = json.loads(os.getenv(INITIAL_RUNS_ENV, '[]'))
+    run_links.attach([(run['owner'], run['name']) for run in initial_runs])
+    return run_links
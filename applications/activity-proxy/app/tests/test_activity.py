@@ -0,0 +1,70 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import asyncio
+from datetime import datetime
+
+from activity import ActivityTracker
+import database
+
+FAKE_TIMESTAMP = datetime(2018, 7, 26, 12, 19, 34)
+
+
+async def test_flush(mocker):
+    update_timestamp_mock = mocker.patch('database.update_timestamp')
+    activity_tracker = ActivityTracker(last_request_datetime=FAKE_TIMESTAMP, flush_interval=60)
+
+    activity_tracker.record_request()
+    await activity_tracker.flush()
+
+    update_timestamp_mock.assert_called_once_with(activity_tracker.last_request_datetime)
+
+
+async def test_flush_not_changed(mocker):
+    update_timestamp_mock = mocker.patch('database.update_timestamp')
+    activity_tracker = ActivityTracker(last_request_datetime=FAKE_TIMESTAMP, flush_interval=60)
+
+    await activity_tracker.flush()
+
+    assert update_timestamp_mock.call_count == 0
+
+
+async def test_flush_periodically(mocker):
+    update_timestamp_mock = mocker.patch('database.update_timestamp')
+    activity_tracker = ActivityTracker(last_request_datetime=FAKE_TIMESTAMP, flush_interval=0.01)
+    activity_tracker.start()
+
+    for _ in range(3):
+        activity_tracker.record_request()
+        await asyncio.sleep(0.05)
+    await activity_tracker.stop()
+
+    assert update_timestamp_mock.call_count == 3
+
+
+async def test_flush_error_does_not_stop_flushing(mocker):
+    update_timestamp_mock = mocker.patch('database.update_timestamp', side_effect=[RuntimeError, None])
+    activity_tracker = ActivityTracker(last_request_datetime=FAKE_TIMESTAMP, flush_interval=0.01)
+    activity_tracker.start()
+
+    activity_tracker.record_request()
+    await asyncio.sleep(0.05)
+    await activity_tracker.stop()
+
+    assert update_timestamp_mock.call_count == 2
+    # noinspection PyUnresolvedReferences
+    database.update_timestamp.assert_called_with(activity_tracker.last_request_datetime)
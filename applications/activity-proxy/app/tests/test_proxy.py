@@ -14,63 +14,113 @@
 # limitations under the License.
 #
 
+
 from datetime import datetime
 from http import HTTPStatus
 import json
-from unittest.mock import MagicMock
 
-from flask.testing import FlaskClient
+from aiohttp import web
+from aiohttp.test_utils import unused_port
 import pytest
 
 import database
+from proxy import create_app
+
+FAKE_TIMESTAMP = datetime(2018, 7, 26, 12, 19, 34, 867831)
+
+LARGE_BODY = b'x' * (1024 * 1024)
+
+
+async def fake_tensorboard_handler(request: web.Request) -> web.Response:
+    if request.path == '/large':
+        return web.Response(body=LARGE_BODY)
+    if request.path == '/echo':
+        return web.Response(body=await request.read(), headers={'X-Raw-Path': request.raw_path})
+    return web.Response(text='hello world!', content_type='text/html', headers={'Set-Cookie': 'session=abc'})
 
 
 @pytest.fixture
-def flask_client(mocker):
+def database_mock(mocker):
     mocker.patch('database.init_db')
-    from proxy import app
-    client = app.test_client()
-    yield client
+    mocker.patch('database.get_timestamp', return_value=FAKE_TIMESTAMP)
+    mocker.patch('database.update_timestamp')
+
+
+@pytest.fixture
+async def tensorboard_server(aiohttp_server):
+    app = web.Application()
+    app.router.add_route('*', '/{url:.*}', fake_tensorboard_handler)
+    return await aiohttp_server(app)
+
+
+@pytest.fixture
+async def proxy_client(database_mock, aiohttp_client, tensorboard_server):
+    return await aiohttp_client(create_app(tensorboard_address=str(tensorboard_server.make_url('/')),
+                                           activity_flush_interval=0.01))
 
 
 @pytest.mark.parametrize('url', ['/', '/random/url'])
-# noinspection PyShadowingNames
-def test_proxy(mocker, flask_client: FlaskClient, url):
-    fake_upstream_response = 'hello world!'
-    fake_upstream_response_status_code = HTTPStatus.OK
-    mocker.patch('requests.request').return_value = MagicMock(content=fake_upstream_response.encode('utf-8'),
-                                                              headers={'Content-Type': 'text/html'},
-                                                              status_code=fake_upstream_response_status_code.value)
-    mocker.patch('database.update_timestamp')
+async def test_proxy(proxy_client, url):
+    response = await proxy_client.get(url)
 
-    response = flask_client.get(url)
+    assert await response.text() == 'hello world!'
+    assert response.status == HTTPStatus.OK
+    assert response.headers['Content-Type'].startswith('text/html')
+    assert response.cookies['session'].value == 'abc'
 
-    response_body = response.data.decode('utf-8')
 
-    assert response_body == 'hello world!'
-    assert response.status_code == HTTPStatus.OK
-    # noinspection PyUnresolvedReferences
-    assert database.update_timestamp.call_count == 1
+async def test_proxy_large_response(proxy_client):
+    response = await proxy_client.get('/large')
 
+    assert await response.read() == LARGE_BODY
 
-def test_inactivity(mocker, flask_client: FlaskClient):
-    fake_timestamp = datetime(2018, 7, 26, 12, 19, 34, 867831)
-    mocker.patch('database.get_timestamp').return_value = fake_timestamp
-    response = flask_client.get('/inactivity')
 
-    response_body = response.data.decode('utf-8')
-    response_json = json.loads(response_body)
+async def test_proxy_request_body_and_query(proxy_client):
+    response = await proxy_client.post('/echo?run=a%26b&tag=loss', data=b'request body')
 
-    assert response_json['lastRequestDatetime'] == fake_timestamp.isoformat()
-    assert response.status_code == HTTPStatus.OK
+    assert await response.read() == b'request body'
+    assert response.headers['X-Raw-Path'] == '/echo?run=a%26b&tag=loss'
+
+
+async def test_proxy_records_activity(proxy_client):
+    await proxy_client.get('/')
+
+    activity_tracker = proxy_client.server.app['activity_tracker']
+    assert activity_tracker.last_request_datetime > FAKE_TIMESTAMP
+    await activity_tracker.flush()
+    database.update_timestamp.assert_called_with(activity_tracker.last_request_datetime)
+
+
+async def test_proxy_tensorboard_not_available(database_mock, aiohttp_client):
+    client = await aiohttp_client(create_app(tensorboard_address=f'http://127.0.0.1:{unused_port()}/'))
+
+    response = await client.get('/')
+
+    assert response.status == HTTPStatus.BAD_GATEWAY
+
+
+async def test_inactivity(proxy_client):
+    response = await proxy_client.get('/inactivity')
+
+    response_json = json.loads(await response.text())
+
+    assert response_json['lastRequestDatetime'] == FAKE_TIMESTAMP.isoformat()
+    assert response.status == HTTPStatus.OK
     # noinspection PyUnresolvedReferences
     assert database.get_timestamp.call_count == 1
 
 
-def test_healthz(mocker, flask_client: FlaskClient):
-    fake_upstream_response_status_code = HTTPStatus.OK
-    mocker.patch('requests.get').return_value = MagicMock(status_code=fake_upstream_response_status_code.value)
+async def test_inactivity_after_request(proxy_client):
+    await proxy_client.get('/')
+
+    response = await proxy_client.get('/inactivity')
+
+    response_json = json.loads(await response.text())
+    last_request_datetime = proxy_client.server.app['activity_tracker'].last_request_datetime
+    assert response_json['lastRequestDatetime'] == last_request_datetime.isoformat()
+
 
-    response = flask_client.get('/healthz')
+async def test_healthz(proxy_client):
+    response = await proxy_client.get('/healthz')
 
-    assert response.status_code == fake_upstream_response_status_code
+    assert response.status == HTTPStatus.OK
@@ -0,0 +1,158 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from datetime import datetime
+from http import HTTPStatus
+import json
+import os
+
+import pytest
+
+from activity import ActivityTracker
+from runs import RunLinks, InvalidRunError, create_runs_app, get_run_links
+
+
+@pytest.fixture
+def run_links(tmpdir) -> RunLinks:
+    return RunLinks(runs_dir=tmpdir.mkdir('runs').strpath, output_dir='/mnt/output')
+
+
+def test_attach(run_links: RunLinks):
+    run_links.attach([('alice', 'run-1'), ('bob', 'run-2')])
+
+    assert run_links.list() == [('alice', 'run-1'), ('bob', 'run-2')]
+    assert os.readlink(os.path.join(run_links.runs_dir, 'alice', 'run-1')) == '/mnt/output/alice/run-1'
+
+
+def test_attach_detaches_other_runs(run_links: RunLinks):
+    run_links.attach([('alice', 'run-1'), ('bob', 'run-2')])
+    link_stat = os.lstat(os.path.join(run_links.runs_dir, 'alice', 'run-1'))
+
+    run_links.attach([('alice', 'run-1'), ('alice', 'run-3')])
+
+    assert run_links.list() == [('alice', 'run-1'), ('alice', 'run-3')]
+    assert not os.path.exists(os.path.join(run_links.runs_dir, 'bob'))
+    # already attached run isn't touched
+    assert os.lstat(os.path.join(run_links.runs_dir, 'alice', 'run-1')).st_ino == link_stat.st_ino
+
+
+@pytest.mark.parametrize('run', [('alice', '../run'), ('..', 'run'), ('alice', 'a/b'), ('', 'run')])
+def test_attach_invalid_run(run_links: RunLinks, run):
+    with pytest.raises(InvalidRunError):
+        run_links.attach([run])
+
+    assert run_links.list() == []
+
+
+def test_get_run_links(monkeypatch, tmpdir):
+    monkeypatch.setenv('TENSORBOARD_RUNS_DIR', tmpdir.strpath)
+    monkeypatch.setenv('TENSORBOARD_OUTPUT_DIR', '/mnt/output')
+    monkeypatch.setenv('TENSORBOARD_RUNS', json.dumps([{'owner': 'alice', 'name': 'run-1'}]))
+
+    run_links = get_run_links()
+
+    assert run_links.list() == [('alice', 'run-1')]
+
+
+def test_get_run_links_not_shared(monkeypatch):
+    monkeypatch.delenv('TENSORBOARD_RUNS_DIR', raising=False)
+
+    assert get_run_links() is None
+
+
+async def test_runs_api(aiohttp_client, run_links: RunLinks):
+    client = await aiohttp_client(create_runs_app(run_links))
+
+    response = await client.put('/runs', json={'runNames': [{'owner': 'alice', 'name': 'run-1'}]})
+
+    assert response.status == HTTPStatus.OK
+    assert json.loads(await response.text()) == {'runNames': [{'owner': 'alice', 'name': 'run-1'}]}
+    response = await client.get('/runs')
+    assert json.loads(await response.text()) == {'runNames': [{'owner': 'alice', 'name': 'run-1'}]}
+
+
+@pytest.mark.parametrize('body', [{'runNames': [{'owner': 'alice'}]}, {'runNames': [{'owner': '..', 'name': 'x'}]},
+                                  {}])
+async def test_runs_api_bad_request(aiohttp_client, run_links: RunLinks, body):
+    client = await aiohttp_client(create_runs_app(run_links))
+
+    response = await client.put('/runs', json=body)
+
+    assert response.status == HTTPStatus.BAD_REQUEST
+
+
+async def test_runs_api_records_activity(aiohttp_client, run_links: RunLinks):
+    activity_tracker = ActivityTracker(last_request_datetime=datetime(2019, 1, 1), flush_interval=5)
+    client = await aiohttp_client(create_runs_app(run_links, activity_tracker=activity_tracker))
+
+    response = await client.put('/runs', json={'runNames': [{'owner': 'alice', 'name': 'run-1'}]})
+
+    assert response.status == HTTPStatus.OK
+    assert activity_tracker.last_request_datetime > datetime(2019, 1, 1)
+
+
+def test_add_keeps_other_runs(run_links: RunLinks):
+    run_links.attach([('alice', 'run-1')])
+
+    run_links.add([('bob', 'run-2')])
+
+    assert run_links.list() == [('alice', 'run-1'), ('bob', 'run-2')]
+
+
+def test_add_detaches_expired_runs(mocker, run_links: RunLinks):
+    monotonic_mock = mocker.patch('runs.monotonic', return_value=100.0)
+    run_links.add([('alice', 'run-1'), ('bob', 'run-2')], ttl_seconds=60)
+    monotonic_mock.return_value = 130.0
+    run_links.add([('bob', 'run-2')], ttl_seconds=60)
+
+    monotonic_mock.return_value = 170.0
+    run_links.add([('carl', 'run-3')], ttl_seconds=60)
+
+    # run-1 hasn't been requested for 70 seconds, run-2 for 40 seconds
+    assert run_links.list() == [('bob', 'run-2'), ('carl', 'run-3')]
+    assert not os.path.exists(os.path.join(run_links.runs_dir, 'alice'))
+
+
+def test_add_invalid_run(run_links: RunLinks):
+    run_links.add([('alice', 'run-1')])
+
+    with pytest.raises(InvalidRunError):
+        run_links.add([('bob', 'run-2'), ('..', 'run')])
+
+    assert run_links.list() == [('alice', 'run-1')]
+
+
+async def test_runs_api_add(aiohttp_client, run_links: RunLinks):
+    run_links.attach([('alice', 'run-1')])
+    client = await aiohttp_client(create_runs_app(run_links))
+
+    response = await client.post('/runs', json={'runNames': [{'owner': 'bob', 'name': 'run-2'}], 'ttlSeconds': 600})
+
+    assert response.status == HTTPStatus.OK
+    assert json.loads(await response.text()) == {'runNames': [{'owner': 'alice', 'name': 'run-1'},
+                                                              {'owner': 'bob', 'name': 'run-2'}]}
+
+
+@pytest.mark.parametrize('body', [{'runNames': [{'owner': 'alice'}]},
+                                  {'runNames': [{'owner': 'alice', 'name': 'run'}], 'ttlSeconds': 'never'}])
+async def test_runs_api_add_bad_request(aiohttp_client, run_links: RunLinks, body):
+    client = await aiohttp_client(create_runs_app(run_links))
+
+    response = await client.post('/runs', json=body)
+
+    assert response.status == HTTPStatus.BAD_REQUEST
+    assert run_links.list() == []
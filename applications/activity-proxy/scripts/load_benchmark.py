@@ -0,0 +1,195 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""
+Load benchmark of activity proxy. It starts a fake TensorBoard serving small and large responses, the proxy from
+this repository in front of it and sends requests to the proxy from many concurrent clients, like TensorBoard's UI
+does. Latency percentiles and throughput are printed for each proxy.
+
+Other proxies (e.g. a previous version of activity proxy) can be benchmarked with --target option. They should
+forward requests to the fake TensorBoard, which listens on port 6006 by default - like a real TensorBoard
+in a tensorboard pod.
+"""
+
+import argparse
+import asyncio
+from http import HTTPStatus
+import json
+from multiprocessing import Process
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.test_utils import unused_port
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app')
+
+SMALL_RESPONSE_PATH = '/data/runs'
+LARGE_RESPONSE_PATH = '/data/plugin/scalars/scalars'
+
+
+def run_fake_tensorboard(port: int, large_response_size: int, response_delay: float):
+    small_body = json.dumps(['run-{}'.format(i) for i in range(50)]).encode('utf-8')
+    large_body = b'x' * large_response_size
+
+    async def handler(request: web.Request) -> web.Response:
+        if response_delay:
+            await asyncio.sleep(response_delay)
+        body = large_body if request.path == LARGE_RESPONSE_PATH else small_body
+        return web.Response(body=body, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/{url:.*}', handler)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, access_log=None)
+
+
+def start_proxy(tensorboard_port: int, work_dir: str) -> (subprocess.Popen, str):
+    port = unused_port()
+    code = ('from aiohttp import web; import proxy; '
+            f'web.run_app(proxy.create_app(tensorboard_address="http://127.0.0.1:{tensorboard_port}/"), '
+            f'host="127.0.0.1", port={port}, print=None, access_log=None)')
+    # proxy's database is created in a working directory
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=work_dir, env=dict(os.environ, PYTHONPATH=APP_DIR))
+    return process, f'http://127.0.0.1:{port}'
+
+
+async def wait_until_available(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url) as response:
+                    if response.status == HTTPStatus.OK:
+                        return
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'{url} is not available.')
+            await asyncio.sleep(0.1)
+
+
+async def run_load(url: str, paths: List[str], requests_count: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    transferred_bytes = 0
+    errors = 0
+    next_request = iter(range(requests_count))
+
+    async def client(session: ClientSession):
+        nonlocal transferred_bytes, errors
+        for i in next_request:
+            start = time.perf_counter()
+            try:
+                async with session.get(url + paths[i % len(paths)]) as response:
+                    body = await response.read()
+                    if response.status != HTTPStatus.OK:
+                        errors += 1
+                        continue
+            except OSError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            transferred_bytes += len(body)
+
+    # each simulated client (browser) keeps its own connection
+    async with ClientSession(connector=TCPConnector(limit=concurrency)) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*[client(session) for _ in range(concurrency)])
+        duration = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    return {
+        'requests': requests_count,
+        'errors': errors,
+        'duration_s': round(duration, 2),
+        'throughput_rps': round(len(latencies) / duration, 1),
+        'throughput_mbps': round(transferred_bytes / duration / 1024 / 1024, 1),
+        'latency_mean_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        'latency_p50_ms': percentile(0.5),
+        'latency_p95_ms': percentile(0.95),
+        'latency_p99_ms': percentile(0.99),
+    }
+
+
+async def benchmark(targets: Dict[str, str], paths: List[str], requests_count: int, concurrency: int) -> Dict:
+    results = {}
+    for name, url in targets.items():
+        await wait_until_available(url + '/healthz')
+        # warm up connections and caches of a proxy
+        await run_load(url, paths, requests_count=concurrency, concurrency=concurrency)
+        results[name] = await run_load(url, paths, requests_count=requests_count, concurrency=concurrency)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load benchmark of activity proxy.')
+    parser.add_argument('--requests', type=int, default=2000, help='Number of requests sent to each proxy.')
+    parser.add_argument('--concurrency', type=int, default=32, help='Number of concurrent clients.')
+    parser.add_argument('--large-response-size', type=int, default=2 * 1024 * 1024,
+                        help='Size of large responses of fake TensorBoard in bytes.')
+    parser.add_argument('--large-responses-ratio', type=float, default=0.1,
+                        help='Ratio of requests for large responses.')
+    parser.add_argument('--response-delay', type=float, default=0.0,
+                        help='Time (in seconds) after which fake TensorBoard responds.')
+    parser.add_argument('--tensorboard-port', type=int, default=6006, help='Port of fake TensorBoard.')
+    parser.add_argument('--target', action='append', default=[], metavar='NAME=URL',
+                        help='Additional proxy to benchmark, it can be given many times.')
+    parser.add_argument('--output', help='Path to a JSON file where results should be saved.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    large_requests = round(100 * args.large_responses_ratio)
+    paths = [LARGE_RESPONSE_PATH] * large_requests + [SMALL_RESPONSE_PATH] * (100 - large_requests)
+
+    tensorboard = Process(target=run_fake_tensorboard, daemon=True,
+                          args=(args.tensorboard_port, args.large_response_size, args.response_delay))
+    tensorboard.start()
+    with tempfile.TemporaryDirectory() as work_dir:
+        proxy, proxy_url = start_proxy(args.tensorboard_port, work_dir)
+        try:
+            targets = {'activity-proxy': proxy_url}
+            targets.update(target.split('=', 1) for target in args.target)
+            loop = asyncio.get_event_loop()
+            results = loop.run_until_complete(benchmark(targets, paths, args.requests, args.concurrency))
+        finally:
+            proxy.terminate()
+            proxy.wait()
+            tensorboard.terminate()
+
+    print(f'{"proxy":<20} {"req/s":>8} {"MB/s":>8} {"mean [ms]":>10} {"p50 [ms]":>9} {"p95 [ms]":>9} '
+          f'{"p99 [ms]":>9} {"errors":>7}')
+    for name, r in results.items():
+        print(f'{name:<20} {r["throughput_rps"]:>8} {r["throughput_mbps"]:>8} {r["latency_mean_ms"]:>10} '
+              f'{r["latency_p50_ms"]:>9} {r["latency_p95_ms"]:>9} {r["latency_p99_ms"]:>9} {r["errors"]:>7}')
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2
+
+# batches are sent as single gRPC messages, whose default maximal size is 4 MiB
+DEFAULT_MAX_BATCH_BYTES = 3 * 1024 * 1024
+
+
+def get_batch_signature(request: predict_pb2.PredictRequest) -> Optional[Tuple]:
+    """
+    :return: signature of a request, requests with equal signatures can be stacked into one batch; None if
+     the request can't be batched - it has no inputs or its inputs don't share the first (batch) dimension
+    """
+    if not request.inputs:
+        return None
+
+    batch_sizes = set()
+    inputs = []
+    for key, tensor in sorted(request.inputs.items()):
+        dims = [dim.size for dim in tensor.tensor_shape.dim]
+        if not dims or tensor.tensor_shape.unknown_rank:
+            return None
+        batch_sizes.add(dims[0])
+        inputs.append((key, tensor.dtype, tuple(dims[1:])))
+
+    if len(batch_sizes) != 1:
+        return None
+
+    return request.model_spec.SerializeToString(), tuple(inputs)
+
+
+def get_batch_size(request: predict_pb2.PredictRequest) -> int:
+    return next(iter(request.inputs.values())).tensor_shape.dim[0].size
+
+
+def stack_requests(requests: List[predict_pb2.PredictRequest]) -> predict_pb2.PredictRequest:
+    """
+    Stacks inputs of requests with equal batch signatures along their first dimension.
+    """
+    batch = predict_pb2.PredictRequest()
+    batch.model_spec.CopyFrom(requests[0].model_spec)
+    for key in requests[0].inputs:
+        stacked = np.concatenate([tf.make_ndarray(request.inputs[key]) for request in requests])
+        batch.inputs[key].CopyFrom(tf.make_tensor_proto(stacked))
+    return batch
+
+
+def split_response(response_bytes: bytes, batch_sizes: List[int]) -> List[bytes]:
+    """
+    Splits outputs of a batch back into responses for stacked requests.
+    :param response_bytes: serialized response for a batch
+    :param batch_sizes: sizes of the first dimension of inputs of stacked requests
+    :return: serialized responses, one for each of stacked requests
+    """
+    response = predict_pb2.PredictResponse()
+    response.ParseFromString(response_bytes)
+
+    outputs = {key: tf.make_ndarray(tensor) for key, tensor in response.outputs.items()}
+    for key, output in outputs.items():
+        if output.ndim == 0 or output.shape[0] != sum(batch_sizes):
+            raise ValueError(f"output {key} of shape {output.shape} doesn't have a batch dimension of size "
+                             f"{sum(batch_sizes)}, the model can't be used with batches - set batch size to 1")
+
+    responses = []
+    offsets = np.cumsum([0] + batch_sizes)
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        part = predict_pb2.PredictResponse()
+        part.model_spec.CopyFrom(response.model_spec)
+        for key, output in outputs.items():
+            part.outputs[key].CopyFrom(tf.make_tensor_proto(output[start:end]))
+        responses.append(part.SerializeToString())
+    return responses
+
+
+def _pass_result(source: Future, target: Future):
+    if source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class MicroBatcher:
+    """
+    Stacks inputs of consecutive compatible requests into one request, sent when it has max_batch_size requests,
+    when the next request would exceed max_batch_bytes or is incompatible, or when flush() is called.
+    Outputs of a batch are split back, so each submitted request gets its own response.
+    """
+
+    def __init__(self, submit: Callable[[predict_pb2.PredictRequest], Future], max_batch_size: int = 1,
+                 max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES):
+        """
+        :param submit: function sending a request, returning future of a serialized response
+        """
+        self._submit = submit
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self._requests: List[predict_pb2.PredictRequest] = []
+        self._results: List[Future] = []
+        self._signature = None
+        self._bytes = 0
+
+    def submit(self, request: predict_pb2.PredictRequest) -> Future:
+        signature = get_batch_signature(request) if self.max_batch_size > 1 else None
+        request_bytes = request.ByteSize()
+
+        if self._requests and (signature is None or signature != self._signature or
+                               self._bytes + request_bytes > self.max_batch_bytes):
+            self.flush()
+
+        result = Future()
+        self._requests.append(request)
+        self._results.append(result)
+        self._signature = signature
+        self._bytes += request_bytes
+
+        if signature is None or len(self._requests) >= self.max_batch_size:
+            self.flush()
+        return result
+
+    def flush(self):
+        if not self._requests:
+            return
+        requests, results = self._requests, self._results
+        self._requests, self._results, self._signature, self._bytes = [], [], None, 0
+
+        if len(requests) == 1:
+            self._submit(requests[0]).add_done_callback(lambda done: _pass_result(done, results[0]))
+            return
+
+        batch_sizes = [get_batch_size(request) for request in requests]
+        self._submit(stack_requests(requests)).add_done_callback(
+            lambda done: self._split(done, batch_sizes, results))
+
+    @staticmethod
+    def _split(batch_result: Future, batch_sizes: List[int], results: List[Future]):
+        try:
+            responses = split_response(batch_result.result(), batch_sizes)
+        except Exception as ex:
+            for result in results:
+                result.set_exception(ex)
+            return
+        for result, response in zip(results, responses):
+            result.set_result(response)
@@ -15,33 +15,43 @@
 #
 
 import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
+from itertools import chain, islice
 import logging
 import os
+from queue import Full, Queue
+import random
 from time import sleep
-from threading import Thread
-from typing import Optional
-import pickle
+from threading import BoundedSemaphore, Thread, Timer
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
 
-from retry.api import retry_call
 import tensorflow as tf
 
+from batching import DEFAULT_MAX_BATCH_BYTES, MicroBatcher
 from experiment_metrics.api import publish
 import grpc
-from kubernetes import config, client
+from results import ResultsWriter
+from shards import ShardCheckpoint, get_replica_shards, get_shard
 from tensorflow_serving.apis import predict_pb2, prediction_service_pb2_grpc
 
 PROGRESS_METRIC_KEY = 'progress'
 
-API_GROUP_NAME = 'aggregator.aipg.intel.com'
-RUN_PLURAL = 'runs'
-RUN_VERSION = 'v1'
+PREDICT_TIMEOUT = 30.0
 
-LABEL_KEY = "label"
-RESULT_KEY = "result"
+# number of Predict requests sent to the server and waiting for a response at the same time
+DEFAULT_MAX_IN_FLIGHT_REQUESTS = 8
+
+# files whose requests have been sent, waiting to be written in order in which they are processed
+FILES_QUEUE_SIZE = 16
+
+RETRY_TRIES = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
 
 progress = 0
 max_progress = 1
+shard_checkpoints: List[ShardCheckpoint] = []
 stop_thread = False
 
 log_level_env_var = os.getenv('LOG_LEVEL')
@@ -66,79 +76,243 @@ k8s_rest_logger = logging.getLogger('kubernetes.client.rest')
 k8s_rest_logger.setLevel(logging.INFO)
 
 
-def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path: str, related_run_name: str,
-                       input_format: str):
-    detected_files = []
-
-    for root, _, files in os.walk(input_dir_path):
-        for name in files:
-            detected_files.append(os.path.join(root, name))
+def get_retry_delay(attempt: int) -> float:
+    """
+    :param attempt: number of the failed attempt, starting from 0
+    :return: time in seconds to wait before the next attempt - exponential backoff with full jitter, so requests
+     which failed at the same time (e.g. when the server restarted) aren't retried at the same time
+    """
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+class PredictionPipeline:
+    """
+    Sends Predict requests without waiting for responses to previous ones, keeping at most max_in_flight requests
+    sent at once. Failed requests are retried after a delay, without stopping other requests.
+    """
+
+    def __init__(self, stub: prediction_service_pb2_grpc.PredictionServiceStub,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT_REQUESTS, tries: int = RETRY_TRIES,
+                 timeout: float = PREDICT_TIMEOUT):
+        self.stub = stub
+        self.tries = tries
+        self.timeout = timeout
+        self._in_flight = BoundedSemaphore(max_in_flight)
+
+    def submit(self, request: predict_pb2.PredictRequest) -> Future:
+        """
+        Sends a request, blocks while max_in_flight requests are waiting for responses.
+        :return: future of a serialized PredictResponse
+        """
+        self._in_flight.acquire()
+        result = Future()
+        self._send(request, result, attempt=0)
+        return result
+
+    def _send(self, request: predict_pb2.PredictRequest, result: Future, attempt: int):
+        try:
+            call = self.stub.Predict.future(request, timeout=self.timeout)
+        except Exception as ex:
+            self._finish(result, exception=ex)
+            return
+        call.add_done_callback(lambda done_call: self._on_done(done_call, request, result, attempt))
+
+    def _on_done(self, call, request: predict_pb2.PredictRequest, result: Future, attempt: int):
+        exception = call.exception()
+        if exception is None:
+            self._finish(result, response=call.result().SerializeToString())
+        elif attempt + 1 < self.tries:
+            delay = get_retry_delay(attempt)
+            logging.warning(f"prediction failed, retrying in {delay:.1f} s: {exception}")
+            timer = Timer(delay, self._send, args=(request, result, attempt + 1))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._finish(result, exception=exception)
 
-    detected_files.sort()
+    def _finish(self, result: Future, response: bytes = None, exception: Exception = None):
+        self._in_flight.release()
+        if exception is not None:
+            result.set_exception(exception)
+        else:
+            result.set_result(response)
+
+
+class FileJob(NamedTuple):
+    data_file: str
+    # futures of serialized responses with labels of tf-record examples they were made for, put while requests are
+    # sent - None is put after the last one, an exception if reading of the file fails
+    results: Queue
+
+
+def read_tf_record_labels(records: Iterable[tf.train.Example],
+                          data_file: str) -> Iterator[Tuple[tf.train.Example, str]]:
+    """
+    :return: examples with their labels - unlabeled examples are labeled with the name of the file, and a number of
+     the example if the file contains more than one example
+    """
+    records = iter(records)
+    first_records = list(islice(records, 2))
+    single_record = len(first_records) == 1
+    filename, _ = os.path.splitext(data_file)
+
+    id = 0
+    for example in chain(first_records, records):
+        label = example.features.feature['label'].bytes_list.value[0].decode('utf_8') \
+            if example.features.feature.get('label') else None
+
+        if not label:
+            label = data_file
+            if not single_record:
+                label = build_label_from_filename(data_file, id)
+                id += 1
+
+        yield example, label
+
+
+def parse_tf_records(data_file: str) -> Iterator[tf.train.Example]:
+    for string_record in tf.compat.v1.io.tf_record_iterator(path=data_file):
+        example = tf.train.Example()
+        example.ParseFromString(string_record)
+        yield example
+
+
+def read_requests(files: List[str], input_format: str, batcher: MicroBatcher, jobs: Queue):
+    """
+    Reader stage - sends requests for all given files and puts a job of each file in jobs queue, in order of files.
+    A job of a tf-record file is put before its requests are sent, so its results may be written while next requests
+    of the file are sent. None is put after the last job, an exception is put instead of a job if reading of a file
+    fails.
+    """
+    def put_job(job: FileJob):
+        try:
+            jobs.put_nowait(job)
+        except Full:
+            # writer might be waiting for a response to a request kept in a batch, so it's sent before waiting
+            batcher.flush()
+            jobs.put(job)
+
+    job = None
+    try:
+        for data_file in files:
+            logging.debug(f"processing file: {data_file}")
+            job = FileJob(data_file=data_file, results=Queue())
 
-    channel = grpc.insecure_channel(server_address)
-    stub = prediction_service_pb2_grpc.PredictionServiceStub(channel)
+            if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+                put_job(job)
 
-    global max_progress
-    global progress
-    max_progress = len(detected_files)
+                for example, label in read_tf_record_labels(parse_tf_records(data_file), data_file):
+                    request = parse_request(input=example.features.feature['data_pb'].bytes_list.value[0])
+                    job.results.put((label, batcher.submit(request)))
+            else:
+                with open(data_file, mode='rb') as fi:
+                    request = parse_request(input=fi.read(), filename=data_file)
 
-    reverted_progress = try_revert_progress(related_run_name)
-    if reverted_progress:
-        logging.debug(f"new progress for processing: {progress}")
-        progress = reverted_progress
-    else:
-        logging.debug("no progress reverted")
+                job.results.put((None, batcher.submit(request)))
+                put_job(job)
 
-    files_to_process = detected_files[progress:]
+            job.results.put(None)
+            job = None
 
-    for data_file in files_to_process:
-        logging.debug(f"processing file: {data_file}")
+        batcher.flush()
+    except Exception as ex:
+        if job is not None:
+            # writer may be already waiting for results of the file
+            job.results.put(ex)
+        jobs.put(ex)
+        return
 
-        if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
-            record_iterator = tf.python_io.tf_record_iterator(path=data_file)
+    jobs.put(None)
 
-            id = 0
-            # if tf-record input format is chosen, results are stored in Python list containing dictionary items
-            # each item contains label (key - label) and binary object (key - result)
-            output_list = []
 
-            filename, _ = os.path.splitext(data_file)
+def get_job_results(job: FileJob) -> Iterator[Tuple[str, bytes]]:
+    for item in iter(job.results.get, None):
+        if isinstance(item, Exception):
+            raise item
+        label, result = item
+        yield label, result.result()
 
-            for string_record in record_iterator:
-                example = tf.train.Example()
-                example.ParseFromString(string_record)
 
-                label = example.features.feature['label'].bytes_list.value[0].decode('utf_8') \
-                    if example.features.feature.get('label') else None
+def write_results(jobs: Queue, input_format: str, output_dir_path: str, checkpoint: ShardCheckpoint, completed: int):
+    """
+    Writer stage - writes results of files in order in which they are processed and saves the checkpoint of a shard
+    after each file, so it always means a number of written files.
+    """
+    for job in iter(jobs.get, None):
+        if isinstance(job, Exception):
+            raise job
 
-                if not label:
-                    label = data_file
-                    if len(record_iterator) > 1:
-                        label = "{}_{}".format(filename, id)
-                        id += 1
+        if input_format == APPLICABLE_FORMATS.TF_RECORD.value:
+            # results of a tf-record file are appended to its results file as they arrive, in order of examples
+            output_filename = "{}.result".format(job.data_file)
 
-                binary_result = make_prediction(input=example.features.feature['data_pb'].bytes_list.value[0],
-                                                stub=stub)
+            with ResultsWriter(f'{output_dir_path}/{os.path.basename(output_filename)}') as writer:
+                for label, result in get_job_results(job):
+                    writer.write(label=label, result=result)
+        else:
+            for _, result in get_job_results(job):
+                write_prediction(result=result, output_filename=job.data_file, output_dir_path=output_dir_path)
+
+        completed += 1
+        checkpoint.save(completed)
+        logging.info(f'shard {checkpoint.shard_index} progress: {completed}')
+
+
+def process_shard(files: List[str], checkpoint: ShardCheckpoint, pipeline: PredictionPipeline, input_format: str,
+                  output_dir_path: str, batch_size: int, max_batch_bytes: int):
+    completed = checkpoint.load()
+    logging.info(f'processing shard {checkpoint.shard_index}: {len(files)} files, {completed} already processed')
+
+    # inputs of up to batch_size consecutive requests are sent to the server as one request
+    batcher = MicroBatcher(submit=pipeline.submit, max_batch_size=batch_size, max_batch_bytes=max_batch_bytes)
+    jobs = Queue(maxsize=FILES_QUEUE_SIZE)
+    # requests of next files are sent while responses for previous ones are awaited and written
+    reader = Thread(target=read_requests, args=(files[completed:], input_format, batcher, jobs), daemon=True)
+    reader.start()
+
+    write_results(jobs=jobs, input_format=input_format, output_dir_path=output_dir_path, checkpoint=checkpoint,
+                  completed=completed)
+
+
+def do_batch_inference(server_address: str, input_dir_path: str, output_dir_path: str, input_format: str,
+                       max_in_flight: int = DEFAULT_MAX_IN_FLIGHT_REQUESTS, batch_size: int = 1,
+                       max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES, shards: int = 1,
+                       shard_indexes: List[int] = None):
+    """
+    :param shards: number of parts of the sorted list of input files, each of them is processed independently
+    :param shard_indexes: shards processed by this process, concurrently - all shards by default
+    :param max_in_flight: maximum number of requests of a shard sent at once
+    """
+    detected_files = []
 
-                output_list.append({LABEL_KEY: label, RESULT_KEY: binary_result})
+    for root, _, files in os.walk(input_dir_path):
+        for name in files:
+            detected_files.append(os.path.join(root, name))
 
-            output_filename = "{}.result".format(data_file)
+    detected_files.sort()
 
-            with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
-                pickle.dump(obj=output_list, file=fi, protocol=pickle.HIGHEST_PROTOCOL)
+    channel = grpc.insecure_channel(server_address)
+    stub = prediction_service_pb2_grpc.PredictionServiceStub(channel)
 
-        else:
-            with open(data_file, mode='rb') as fi:
-                pb_bytes = fi.read()
+    global max_progress
+    global shard_checkpoints
+    max_progress = len(detected_files)
+    shard_checkpoints = [ShardCheckpoint(output_dir_path=output_dir_path, shard_index=shard_index, shards=shards)
+                         for shard_index in range(shards)]
 
-                make_prediction(input=pb_bytes,
-                                stub=stub,
-                                output_filename=data_file,
-                                output_dir_path=output_dir_path)
+    shard_indexes = shard_indexes if shard_indexes is not None else range(shards)
 
-        progress += 1
-        logging.info(f'progress: {progress}/{max_progress}')
+    # shards share the connection, but each of them keeps its own max_in_flight requests sent to the server,
+    # so the load of the server grows with the number of shards processed at once
+    with ThreadPoolExecutor(max_workers=max(len(shard_indexes), 1)) as executor:
+        futures = [executor.submit(process_shard, files=get_shard(detected_files, shard_index, shards),
+                                   checkpoint=shard_checkpoints[shard_index],
+                                   pipeline=PredictionPipeline(stub=stub, max_in_flight=max_in_flight),
+                                   input_format=input_format, output_dir_path=output_dir_path,
+                                   batch_size=batch_size, max_batch_bytes=max_batch_bytes)
+                   for shard_index in shard_indexes]
+        for future in futures:
+            future.result()
 
 
 def build_label_from_filename(filename: str, id: int):
@@ -147,79 +321,51 @@ def build_label_from_filename(filename: str, id: int):
     return "{}_{}".format(name, id)
 
 
-def make_prediction(input: bytes, stub: prediction_service_pb2_grpc.PredictionServiceStub,
-                    output_filename: str = None, output_dir_path: str = None):
+def parse_request(input: bytes, filename: str = None) -> predict_pb2.PredictRequest:
     request = predict_pb2.PredictRequest()
     try:
         request.ParseFromString(input)
     except Exception as ex:
-        raise RuntimeError(f"failed to parse {output_filename}") from ex
+        raise RuntimeError(f"failed to parse {filename}") from ex
+    return request
 
-    # actual call without retry:
-    # result = stub.Predict(request, timeout=30.0)  # timeout 30 seconds
-    result = retry_call(stub.Predict, fargs=[request], fkwargs={"timeout": 30.0}, tries=5, delay=30)
 
-    result_pb_serialized: bytes = result.SerializeToString()
+def write_prediction(result: bytes, output_filename: str, output_dir_path: str):
+    with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
+        fi.write(result)
 
-    if output_filename:
-        with open(f'{output_dir_path}/{os.path.basename(output_filename)}', mode='wb') as fi:
-            fi.write(result_pb_serialized)
 
-    return result_pb_serialized
+def publish_current_progress(progress_percent: float) -> float:
+    """
+    :param progress_percent: last published progress
+    :return: current progress, it's published if it differs from the last published one
+    """
+    global progress
+    # shards processed by other pods are counted too, checkpoints of all shards are in the shared output directory
+    progress = sum(checkpoint.load() for checkpoint in shard_checkpoints)
+    new_progress_percent = progress/max_progress * 100 if max_progress else 100
+    logging.debug(f"new_progress_percent: %.1f" % new_progress_percent)
+    if new_progress_percent != progress_percent:
+        metrics = {
+            PROGRESS_METRIC_KEY: str("%.1f" % new_progress_percent)
+        }
+        logging.debug("publishing metrics ...")
+        # progress isn't a series of a training, and replicas would share a file of its series in the output folder
+        publish(metrics, series=False)
+
+    return new_progress_percent
 
 
 def publish_progress():
     logging.debug("starting publish_progress ...")
     progress_percent = 0
     while progress_percent != 100 and not stop_thread:
-        new_progress_percent = progress/max_progress * 100 if max_progress else 100
-        logging.debug(f"new_progress_percent: %.1f" % new_progress_percent)
-        if new_progress_percent != progress_percent:
-            progress_percent = new_progress_percent
-
-            metrics = {
-                PROGRESS_METRIC_KEY: str("%.1f" % progress_percent)
-            }
-            logging.debug("publishing metrics ...")
-            publish(metrics)
-
+        progress_percent = publish_current_progress(progress_percent)
         sleep(1)
 
+    # a pod may finish its shards before other pods, its last progress is published when it stops
+    publish_current_progress(progress_percent)
 
-def try_revert_progress(run_name: str) -> Optional[int]:
-    logging.debug("trying to revert progress...")
-    config.load_incluster_config()
-
-    with open("/var/run/secrets/kubernetes.io/serviceaccount/namespace", mode='r') as file:
-        my_current_namespace = file.read()
-
-    if not my_current_namespace:
-        raise RuntimeError(f"error reading my current namespace {str(my_current_namespace)}")
-
-    runs_custom_obj_client = client.CustomObjectsApi()
-
-    try:
-        run = runs_custom_obj_client.get_namespaced_custom_object(group=API_GROUP_NAME, version=RUN_VERSION,
-                                                                  plural=RUN_PLURAL, namespace=my_current_namespace,
-                                                                  name=run_name)
-    except Exception:
-        logging.exception("error when contacting to kubernetes API")
-        return None
-
-    try:
-        saved_progress: str = run['spec']['metrics']['progress']
-    except KeyError:
-        logging.debug(f"no progress metric detected")
-        return None
-
-    logging.debug(f"progress reverted! progress from metrics: {saved_progress}")
-    saved_progress: float = float(saved_progress)
-
-    real_progress = saved_progress/100 * max_progress if max_progress else 100
-
-    progress = int(real_progress)
-    return progress
-    
 
 def main():
     related_run_name = os.getenv('RUN_NAME')
@@ -230,6 +376,13 @@ def main():
     parser.add_argument('--input_dir_path', type=str)
     parser.add_argument('--output_dir_path', type=str)
     parser.add_argument('--input_format', type=str)
+    parser.add_argument('--max_in_flight_requests', type=int, default=DEFAULT_MAX_IN_FLIGHT_REQUESTS)
+    parser.add_argument('--batch_size', type=int, default=1)
+    parser.add_argument('--max_batch_bytes', type=int, default=DEFAULT_MAX_BATCH_BYTES)
+    parser.add_argument('--shards', type=int, help='number of shards, number of replicas by default')
+    # shards are divided between pods of a batch inference, each of them processes its shards concurrently
+    parser.add_argument('--replicas', type=int, default=os.getenv('REPLICAS', '1'))
+    parser.add_argument('--replica_index', type=int, default=os.getenv('REPLICA_INDEX', '0'))
 
     args = parser.parse_args()
 
@@ -239,6 +392,7 @@ def main():
     input_dir_path = args.input_dir_path
     output_dir_path = args.output_dir_path if args.output_dir_path else '/mnt/output/experiment'
     input_format = args.input_format
+    shards = args.shards or args.replicas
 
     if not os.path.isdir(input_dir_path) or len(os.listdir(input_dir_path)) == 0:
         raise RuntimeError(f"input directory: '{input_dir_path}' does not exist or is empty!")
@@ -246,16 +400,20 @@ def main():
     progress_thread = Thread(target=publish_progress)
     progress_thread.start()
 
+    global stop_thread
     try:
         do_batch_inference(server_address=os.getenv('TENSORFLOW_MODEL_SERVER_SVC_NAME', ''),
                            input_dir_path=input_dir_path,
                            output_dir_path=output_dir_path,
-                           related_run_name=related_run_name,
-                           input_format=input_format)
-    except Exception:
-        global stop_thread
+                           input_format=input_format,
+                           max_in_flight=args.max_in_flight_requests,
+                           batch_size=args.batch_size,
+                           max_batch_bytes=args.max_batch_bytes,
+                           shards=shards,
+                           shard_indexes=get_replica_shards(shards=shards, replicas=args.replicas,
+                                                            replica_index=args.replica_index))
+    finally:
         stop_thread = True
-        raise
 
 
 if __name__ == '__main__':
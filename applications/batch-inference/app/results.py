@@ -0,0 +1,178 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""
+Results of a tf-record input file are stored in an append-only file of frames, one frame per record:
+
+    header:  MAGIC, VERSION (1 byte)
+    frame:   label length (uint32), result length (uint64), CRC32 of label and result (uint32), label (UTF-8), result
+    footer:  index entries - label length (uint32), label, frame offset (uint64) - for all frames,
+             followed by index offset (uint64), number of entries (uint32) and INDEX_MAGIC
+
+Each result is a serialized PredictResponse. Frames are written as results arrive, the footer is written when
+all of them have been written. The footer allows reading a result by label without reading other results, a file
+without the footer (e.g. of an interrupted batch inference) can still be read frame by frame.
+"""
+
+import os
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+MAGIC = b'NRES'
+VERSION = 1
+INDEX_MAGIC = b'NIDX'
+
+HEADER = struct.Struct('<4sB')
+FRAME_HEADER = struct.Struct('<IQI')
+INDEX_ENTRY_HEADER = struct.Struct('<I')
+INDEX_ENTRY_OFFSET = struct.Struct('<Q')
+FOOTER = struct.Struct('<QI4s')
+
+
+class InvalidResultsFileError(Exception):
+    pass
+
+
+class ResultsWriter:
+    def __init__(self, path: str):
+        self._file = open(path, mode='wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._index: List[Tuple[bytes, int]] = []
+
+    def write(self, label: str, result: bytes):
+        label_bytes = label.encode('utf-8')
+        self._index.append((label_bytes, self._file.tell()))
+        crc = zlib.crc32(result, zlib.crc32(label_bytes))
+        self._file.write(FRAME_HEADER.pack(len(label_bytes), len(result), crc))
+        self._file.write(label_bytes)
+        self._file.write(result)
+        # a result is passed to the system at once, so it's available to readers and isn't lost if the process dies
+        self._file.flush()
+
+    def close(self):
+        index_offset = self._file.tell()
+        for label_bytes, offset in self._index:
+            self._file.write(INDEX_ENTRY_HEADER.pack(len(label_bytes)))
+            self._file.write(label_bytes)
+            self._file.write(INDEX_ENTRY_OFFSET.pack(offset))
+        self._file.write(FOOTER.pack(index_offset, len(self._index), INDEX_MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> 'ResultsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+class ResultsReader:
+    """
+    Reads results by label - a label used for many records refers to all of their results, in order of records.
+    """
+
+    def __init__(self, path: str):
+        self._file: BinaryIO = open(path, mode='rb')
+        header = self._file.read(HEADER.size)
+        if len(header) != HEADER.size or HEADER.unpack(header) != (MAGIC, VERSION):
+            self._file.close()
+            raise InvalidResultsFileError(f'{path} is not a batch inference results file')
+        self.complete = True
+        self._index = self._read_index()
+        if self._index is None:
+            self.complete = False
+            self._index = self._scan_frames()
+
+    def _read_index(self) -> Optional[Dict[str, List[int]]]:
+        file_size = self._file.seek(0, os.SEEK_END)
+        if file_size < HEADER.size + FOOTER.size:
+            return None
+        self._file.seek(file_size - FOOTER.size)
+        index_offset, count, index_magic = FOOTER.unpack(self._file.read(FOOTER.size))
+        if index_magic != INDEX_MAGIC or not HEADER.size <= index_offset <= file_size - FOOTER.size:
+            return None
+
+        self._file.seek(index_offset)
+        index: Dict[str, List[int]] = {}
+        for _ in range(count):
+            label_length, = INDEX_ENTRY_HEADER.unpack(self._file.read(INDEX_ENTRY_HEADER.size))
+            label = self._file.read(label_length).decode('utf-8')
+            offset, = INDEX_ENTRY_OFFSET.unpack(self._file.read(INDEX_ENTRY_OFFSET.size))
+            index.setdefault(label, []).append(offset)
+        return index
+
+    def _read_frame(self, offset: int) -> Optional[Tuple[str, bytes]]:
+        self._file.seek(offset)
+        frame_header = self._file.read(FRAME_HEADER.size)
+        if len(frame_header) != FRAME_HEADER.size:
+            return None
+        label_length, result_length, crc = FRAME_HEADER.unpack(frame_header)
+        label_bytes = self._file.read(label_length)
+        result = self._file.read(result_length)
+        if len(label_bytes) != label_length or len(result) != result_length or \
+                zlib.crc32(result, zlib.crc32(label_bytes)) != crc:
+            return None
+        return label_bytes.decode('utf-8'), result
+
+    def _scan_frames(self) -> Dict[str, List[int]]:
+        # the last frame of an incomplete file may be partially written, frames are read until the first broken one
+        index: Dict[str, List[int]] = {}
+        offset = HEADER.size
+        while True:
+            frame = self._read_frame(offset)
+            if frame is None:
+                return index
+            label, result = frame
+            index.setdefault(label, []).append(offset)
+            offset = self._file.tell()
+
+    def labels(self) -> List[str]:
+        return list(self._index)
+
+    def get_all(self, label: str) -> List[bytes]:
+        results = []
+        for offset in self._index[label]:
+            frame = self._read_frame(offset)
+            if frame is None:
+                raise InvalidResultsFileError(f'result of {label} is broken')
+            results.append(frame[1])
+        return results
+
+    def get(self, label: str) -> bytes:
+        """
+        :return: serialized PredictResponse - the first of results of the label
+        """
+        return self.get_all(label)[0]
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes]]:
+        for offset in sorted(offset for offsets in self._index.values() for offset in offsets):
+            frame = self._read_frame(offset)
+            if frame is None:
+                raise InvalidResultsFileError(f'result at {offset} is broken')
+            yield frame
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> 'ResultsReader':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import json
+import os
+from typing import List
+
+CHECKPOINTS_DIR = '.checkpoints'
+
+
+def get_shard(files: List[str], shard_index: int, shards: int) -> List[str]:
+    """
+    :param files: sorted list of all files of a dataset
+    :return: files of a shard - shards are contiguous parts of the list of nearly equal size
+    """
+    return files[len(files) * shard_index // shards:len(files) * (shard_index + 1) // shards]
+
+
+def get_replica_shards(shards: int, replicas: int, replica_index: int) -> List[int]:
+    return list(range(replica_index, shards, replicas))
+
+
+class ShardCheckpoint:
+    """
+    Number of files of a shard, counted from its beginning, whose results have been written. It's saved in the output
+    directory, so processing of the shard is resumed exactly after the last written file, also by another pod.
+    """
+
+    def __init__(self, output_dir_path: str, shard_index: int, shards: int):
+        self.shard_index = shard_index
+        self.shards = shards
+        # checkpoints of a different number of shards don't describe the same files, so they aren't used
+        self.path = os.path.join(output_dir_path, CHECKPOINTS_DIR, f'shard-{shard_index}-of-{shards}.json')
+
+    def load(self) -> int:
+        try:
+            with open(self.path) as checkpoint_file:
+                return json.load(checkpoint_file)['completed']
+        except FileNotFoundError:
+            return 0
+
+    def save(self, completed: int):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, mode='w') as checkpoint_file:
+            json.dump({'shard': self.shard_index, 'shards': self.shards, 'completed': completed}, checkpoint_file)
+        # a checkpoint is replaced atomically, it's never read partially written
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2
+
+from batching import MicroBatcher, get_batch_signature, split_response, stack_requests
+
+
+def create_request(data: np.ndarray, model_name: str = 'fake-model') -> predict_pb2.PredictRequest:
+    request = predict_pb2.PredictRequest()
+    request.model_spec.name = model_name
+    request.inputs['images'].CopyFrom(tf.make_tensor_proto(data))
+    return request
+
+
+def create_response(output: np.ndarray) -> bytes:
+    response = predict_pb2.PredictResponse()
+    response.model_spec.name = 'fake-model'
+    response.outputs['scores'].CopyFrom(tf.make_tensor_proto(output))
+    return response.SerializeToString()
+
+
+def get_scores(response_bytes: bytes) -> np.ndarray:
+    response = predict_pb2.PredictResponse()
+    response.ParseFromString(response_bytes)
+    return tf.make_ndarray(response.outputs['scores'])
+
+
+def fake_model_submit(requests: list):
+    # the model returns a sum of each row of its input
+    def submit(request: predict_pb2.PredictRequest) -> Future:
+        requests.append(request)
+        result = Future()
+        data = tf.make_ndarray(request.inputs['images'])
+        result.set_result(create_response(data.reshape(data.shape[0], -1).sum(axis=1)))
+        return result
+    return submit
+
+
+def test_get_batch_signature():
+    assert get_batch_signature(create_request(np.zeros((1, 2, 2)))) == \
+        get_batch_signature(create_request(np.ones((3, 2, 2))))
+    assert get_batch_signature(create_request(np.zeros((1, 2, 2)))) != \
+        get_batch_signature(create_request(np.zeros((1, 2, 3))))
+    assert get_batch_signature(create_request(np.zeros((1, 2)))) != \
+        get_batch_signature(create_request(np.zeros((1, 2)), model_name='other-model'))
+    assert get_batch_signature(create_request(np.float32(1.0))) is None
+
+
+def test_stack_requests():
+    batch = stack_requests([create_request(np.zeros((1, 2))), create_request(np.ones((2, 2)))])
+
+    np.testing.assert_array_equal(tf.make_ndarray(batch.inputs['images']), [[0, 0], [1, 1], [1, 1]])
+    assert batch.model_spec.name == 'fake-model'
+
+
+def test_split_response():
+    responses = split_response(create_response(np.array([1, 2, 3])), batch_sizes=[1, 2])
+
+    np.testing.assert_array_equal(get_scores(responses[0]), [1])
+    np.testing.assert_array_equal(get_scores(responses[1]), [2, 3])
+
+
+def test_split_response_without_batch_dimension():
+    with pytest.raises(ValueError):
+        split_response(create_response(np.array([1, 2])), batch_sizes=[1, 2])
+
+
+def test_micro_batcher():
+    sent_requests = []
+    batcher = MicroBatcher(submit=fake_model_submit(sent_requests), max_batch_size=3)
+
+    results = [batcher.submit(create_request(np.full((1, 2), i))) for i in range(5)]
+    batcher.flush()
+
+    assert len(sent_requests) == 2
+    assert [get_scores(result.result()).tolist() for result in results] == [[0], [2], [4], [6], [8]]
+
+
+def test_micro_batcher_incompatible_requests():
+    sent_requests = []
+    batcher = MicroBatcher(submit=fake_model_submit(sent_requests), max_batch_size=10)
+
+    results = [batcher.submit(create_request(np.ones((1, 2)))), batcher.submit(create_request(np.ones((1, 3)))),
+               batcher.submit(create_request(np.ones((1, 3))))]
+    batcher.flush()
+
+    assert len(sent_requests) == 2
+    assert [get_scores(result.result()).tolist() for result in results] == [[2], [3], [3]]
+
+
+def test_micro_batcher_max_bytes():
+    sent_requests = []
+    request = create_request(np.ones((1, 100), dtype=np.float32))
+    batcher = MicroBatcher(submit=fake_model_submit(sent_requests), max_batch_size=10,
+                           max_batch_bytes=2 * request.ByteSize())
+
+    for _ in range(4):
+        batcher.submit(request)
+    batcher.flush()
+
+    assert len(sent_requests) == 2
+
+
+def test_micro_batcher_failed_batch():
+    failed = Future()
+    failed.set_exception(RuntimeError('prediction failed'))
+    batcher = MicroBatcher(submit=lambda request: failed, max_batch_size=2)
+
+    results = [batcher.submit(create_request(np.ones((1, 2)))) for _ in range(2)]
+
+    for result in results:
+        with pytest.raises(RuntimeError):
+            result.result()
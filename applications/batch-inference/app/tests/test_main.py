@@ -14,37 +14,145 @@
 # limitations under the License.
 #
 
+import os
+
 import main
+from results import ResultsReader
+from shards import ShardCheckpoint
 
 from grpc._channel import _Rendezvous
+import numpy as np
 import pytest
+import tensorflow as tf
+from tensorflow_serving.apis import predict_pb2
+
+
+class FakeCall:
+    def __init__(self, result=None, exception=None):
+        self._result = result
+        self._exception = exception
+
+    def exception(self):
+        return self._exception
+
+    def result(self):
+        return self._result
 
+    def add_done_callback(self, callback):
+        callback(self)
 
-def test_make_prediction_retrying(mocker):
-    mocker.patch('builtins.open')
-    mocker.patch('tensorflow_serving.apis.predict_pb2.PredictRequest')
+
+def create_stub_mock(mocker, calls):
     predict_stub_mock = mocker.MagicMock()
+    predict_stub_mock.Predict.future.side_effect = calls
+    return predict_stub_mock
+
+
+def test_prediction_pipeline_retrying(mocker):
+    mocker.patch.object(main, 'get_retry_delay').return_value = 0
     grpc_exception = _Rendezvous(mocker.MagicMock(), None, None, mocker.MagicMock())
+    predict_stub_mock = create_stub_mock(mocker, [FakeCall(exception=grpc_exception),
+                                                  FakeCall(exception=grpc_exception),
+                                                  FakeCall(result=mocker.MagicMock(
+                                                      SerializeToString=lambda: b'result'))])
+    pipeline = main.PredictionPipeline(stub=predict_stub_mock)
 
-    mocker.patch.object(predict_stub_mock, 'Predict').side_effect = [grpc_exception,
-                                                                     grpc_exception,
-                                                                     mocker.MagicMock(
-                                                                         SerializeToString=lambda: b'result')]
-    result = main.make_prediction(b'', predict_stub_mock)
+    result = pipeline.submit(mocker.MagicMock())
 
-    assert result == b'result'
+    assert result.result(timeout=5) == b'result'
+    assert predict_stub_mock.Predict.future.call_count == 3
 
 
-def test_make_prediction_too_much_retrying(mocker):
-    mocker.patch('builtins.open')
-    mocker.patch('tensorflow_serving.apis.predict_pb2.PredictRequest')
-    predict_stub_mock = mocker.MagicMock()
+def test_prediction_pipeline_too_much_retrying(mocker):
+    mocker.patch.object(main, 'get_retry_delay').return_value = 0
     grpc_exception = _Rendezvous(mocker.MagicMock(), None, None, mocker.MagicMock())
+    predict_stub_mock = create_stub_mock(mocker, [FakeCall(exception=grpc_exception)] * main.RETRY_TRIES)
+    pipeline = main.PredictionPipeline(stub=predict_stub_mock)
 
-    mocker.patch.object(predict_stub_mock, 'Predict').side_effect = grpc_exception
+    result = pipeline.submit(mocker.MagicMock())
 
     with pytest.raises(_Rendezvous):
-        main.make_prediction(b'', predict_stub_mock)
+        result.result(timeout=5)
+    # a slot of a failed request is released
+    assert pipeline._in_flight.acquire(blocking=False)
+
+
+def test_prediction_pipeline_max_in_flight(mocker):
+    pending_call = mocker.MagicMock()
+    predict_stub_mock = create_stub_mock(mocker, [pending_call, pending_call])
+    pipeline = main.PredictionPipeline(stub=predict_stub_mock, max_in_flight=2)
+
+    pipeline.submit(mocker.MagicMock())
+    pipeline.submit(mocker.MagicMock())
+
+    assert not pipeline._in_flight.acquire(blocking=False)
+
+
+@pytest.mark.parametrize('attempt', [0, 1, 3, 10])
+def test_get_retry_delay(attempt):
+    delay = main.get_retry_delay(attempt)
+
+    assert 0 <= delay <= min(main.RETRY_MAX_DELAY, main.RETRY_BASE_DELAY * 2 ** attempt)
+
+
+def test_parse_request_invalid():
+    with pytest.raises(RuntimeError):
+        main.parse_request(b'invalid', filename='fake-file')
+
+
+def test_do_batch_inference(mocker, tmpdir):
+    input_dir = tmpdir.mkdir('input')
+    output_dir = tmpdir.mkdir('output')
+    for name in ('b.pb', 'a.pb', 'c.pb'):
+        input_dir.join(name).write_binary(b'')
+    ShardCheckpoint(output_dir_path=output_dir.strpath, shard_index=0, shards=1).save(completed=1)
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub').return_value = \
+        create_stub_mock(mocker, [FakeCall(result=mocker.MagicMock(SerializeToString=lambda: b'result'))] * 2)
+    mocker.patch.object(main.grpc, 'insecure_channel')
+
+    main.do_batch_inference(server_address='fake-address', input_dir_path=input_dir.strpath,
+                            output_dir_path=output_dir.strpath, input_format=None)
+
+    # the first file was processed before the checkpoint was saved
+    assert sorted(os.listdir(output_dir.strpath)) == ['.checkpoints', 'b.pb', 'c.pb']
+    assert output_dir.join('c.pb').read_binary() == b'result'
+    assert ShardCheckpoint(output_dir_path=output_dir.strpath, shard_index=0, shards=1).load() == 3
+
+
+def test_do_batch_inference_shards(mocker, tmpdir):
+    input_dir = tmpdir.mkdir('input')
+    output_dir = tmpdir.mkdir('output')
+    for i in range(5):
+        input_dir.join(f'{i}.pb').write_binary(b'')
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub').return_value = \
+        create_stub_mock(mocker, [FakeCall(result=mocker.MagicMock(SerializeToString=lambda: b'result'))] * 3)
+    mocker.patch.object(main.grpc, 'insecure_channel')
+
+    # the second of two replicas processes shards 1 and 3
+    main.do_batch_inference(server_address='fake-address', input_dir_path=input_dir.strpath,
+                            output_dir_path=output_dir.strpath, input_format=None, shards=4, shard_indexes=[1, 3])
+
+    assert sorted(os.listdir(output_dir.strpath)) == ['.checkpoints', '1.pb', '3.pb', '4.pb']
+    assert [checkpoint.load() for checkpoint in main.shard_checkpoints] == [0, 1, 0, 2]
+
+
+def test_do_batch_inference_shards_in_flight(mocker, tmpdir):
+    input_dir = tmpdir.mkdir('input')
+    for i in range(4):
+        input_dir.join(f'{i}.pb').write_binary(b'')
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub')
+    mocker.patch.object(main.grpc, 'insecure_channel')
+    pipeline_mock = mocker.patch.object(main, 'PredictionPipeline')
+    process_shard_mock = mocker.patch.object(main, 'process_shard')
+
+    main.do_batch_inference(server_address='fake-address', input_dir_path=input_dir.strpath,
+                            output_dir_path=tmpdir.mkdir('output').strpath, input_format=None, max_in_flight=4,
+                            shards=2)
+
+    # each shard has its own window of requests sent at once
+    assert pipeline_mock.call_count == 2
+    assert all(call[1]['max_in_flight'] == 4 for call in pipeline_mock.call_args_list)
+    assert process_shard_mock.call_count == 2
 
 
 def test_input_dir_does_not_exist(mocker):
@@ -64,3 +172,73 @@ def test_input_dir_is_empty(mocker):
 
     with pytest.raises(RuntimeError):
         main.main()
+
+
+def test_do_batch_inference_batched(mocker, tmpdir):
+    input_dir = tmpdir.mkdir('input')
+    output_dir = tmpdir.mkdir('output')
+    for i in range(5):
+        request = predict_pb2.PredictRequest()
+        request.inputs['images'].CopyFrom(tf.make_tensor_proto(np.full((1, 2), i, dtype=np.float32)))
+        input_dir.join(f'{i}.pb').write_binary(request.SerializeToString())
+
+    def fake_predict(request, timeout):
+        response = predict_pb2.PredictResponse()
+        response.outputs['scores'].CopyFrom(tf.make_tensor_proto(tf.make_ndarray(request.inputs['images']).sum(1)))
+        return FakeCall(result=response)
+
+    stub_mock = create_stub_mock(mocker, fake_predict)
+    # writer waits for a file whose request is kept in a batch, while reader waits for a place in the queue
+    mocker.patch.object(main, 'FILES_QUEUE_SIZE', 1)
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub').return_value = stub_mock
+    mocker.patch.object(main.grpc, 'insecure_channel')
+
+    main.do_batch_inference(server_address='fake-address', input_dir_path=input_dir.strpath,
+                            output_dir_path=output_dir.strpath, input_format=None, batch_size=4)
+
+    assert stub_mock.Predict.future.call_count < 5
+    for i in range(5):
+        response = predict_pb2.PredictResponse()
+        response.ParseFromString(output_dir.join(f'{i}.pb').read_binary())
+        assert tf.make_ndarray(response.outputs['scores']).tolist() == [2 * i]
+
+
+def write_tf_record(path, labels):
+    with tf.io.TFRecordWriter(path) as writer:
+        for i, label in enumerate(labels):
+            request = predict_pb2.PredictRequest()
+            request.inputs['images'].CopyFrom(tf.make_tensor_proto(np.full((1, 2), i, dtype=np.float32)))
+            feature = {'data_pb': tf.train.Feature(bytes_list=tf.train.BytesList(value=[request.SerializeToString()]))}
+            if label:
+                feature['label'] = tf.train.Feature(bytes_list=tf.train.BytesList(value=[label.encode('utf_8')]))
+            writer.write(tf.train.Example(features=tf.train.Features(feature=feature)).SerializeToString())
+
+
+def test_do_batch_inference_tf_record(mocker, tmpdir):
+    input_dir = tmpdir.mkdir('input')
+    output_dir = tmpdir.mkdir('output')
+    write_tf_record(input_dir.join('many.tfrecord').strpath, ['first', None, None])
+    write_tf_record(input_dir.join('single.tfrecord').strpath, [None])
+
+    def fake_predict(request, timeout):
+        response = predict_pb2.PredictResponse()
+        response.outputs['scores'].CopyFrom(request.inputs['images'])
+        return FakeCall(result=response)
+
+    mocker.patch.object(main.prediction_service_pb2_grpc, 'PredictionServiceStub').return_value = \
+        create_stub_mock(mocker, fake_predict)
+    mocker.patch.object(main.grpc, 'insecure_channel')
+
+    main.do_batch_inference(server_address='fake-address', input_dir_path=input_dir.strpath,
+                            output_dir_path=output_dir.strpath, input_format='tf-record')
+
+    many_name = input_dir.join('many').strpath
+    with ResultsReader(output_dir.join('many.tfrecord.result').strpath) as reader:
+        assert reader.complete
+        assert reader.labels() == ['first', f'{many_name}_0', f'{many_name}_1']
+        response = predict_pb2.PredictResponse()
+        response.ParseFromString(reader.get(f'{many_name}_1'))
+        assert tf.make_ndarray(response.outputs['scores']).tolist() == [[2, 2]]
+
+    with ResultsReader(output_dir.join('single.tfrecord.result').strpath) as reader:
+        assert reader.labels() == [input_dir.join('single.tfrecord').strpath]
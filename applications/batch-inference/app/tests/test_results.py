@@ -0,0 +1,65 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import pytest
+
+from results import InvalidResultsFileError, ResultsReader, ResultsWriter
+
+
+def write_results(path, results):
+    with ResultsWriter(path) as writer:
+        for label, result in results:
+            writer.write(label=label, result=result)
+
+
+def test_read_results_by_label(tmpdir):
+    path = tmpdir.join('data.tfrecord.result').strpath
+    write_results(path, [('a', b'result-a'), ('b', b''), ('a', b'result-a-2'), ('żółw', b'result-c')])
+
+    with ResultsReader(path) as reader:
+        assert reader.complete
+        assert reader.labels() == ['a', 'b', 'żółw']
+        assert reader.get('żółw') == b'result-c'
+        assert reader.get('b') == b''
+        assert reader.get_all('a') == [b'result-a', b'result-a-2']
+        assert list(reader) == [('a', b'result-a'), ('b', b''), ('a', b'result-a-2'), ('żółw', b'result-c')]
+        with pytest.raises(KeyError):
+            reader.get('unknown')
+
+
+def test_read_results_without_index(tmpdir):
+    path = tmpdir.join('data.tfrecord.result').strpath
+    writer = ResultsWriter(path)
+    writer.write(label='a', result=b'result-a')
+    writer.write(label='b', result=b'result-b')
+
+    # results written so far are available before the file is complete, the last one is written partially
+    with open(path, mode='rb') as fi:
+        tmpdir.join('partial.result').write_binary(fi.read()[:-3])
+    writer.close()
+
+    with ResultsReader(tmpdir.join('partial.result').strpath) as reader:
+        assert not reader.complete
+        assert list(reader) == [('a', b'result-a')]
+
+
+def test_read_invalid_results_file(tmpdir):
+    path = tmpdir.join('data.tfrecord.result')
+    path.write_binary(b'invalid')
+
+    with pytest.raises(InvalidResultsFileError):
+        ResultsReader(path.strpath)
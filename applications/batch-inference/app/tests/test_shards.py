@@ -0,0 +1,50 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import os
+
+import pytest
+
+from shards import ShardCheckpoint, get_replica_shards, get_shard
+
+
+@pytest.mark.parametrize('files_count,shards', [(10, 1), (10, 3), (2, 4), (0, 2)])
+def test_get_shard(files_count, shards):
+    files = [f'file-{i}' for i in range(files_count)]
+
+    shard_files = [get_shard(files, shard_index, shards) for shard_index in range(shards)]
+
+    assert [file for files_of_shard in shard_files for file in files_of_shard] == files
+    assert max(map(len, shard_files)) - min(map(len, shard_files)) <= 1
+
+
+def test_get_replica_shards():
+    assert get_replica_shards(shards=5, replicas=2, replica_index=0) == [0, 2, 4]
+    assert get_replica_shards(shards=5, replicas=2, replica_index=1) == [1, 3]
+
+
+def test_shard_checkpoint(tmpdir):
+    checkpoint = ShardCheckpoint(output_dir_path=tmpdir.strpath, shard_index=1, shards=2)
+
+    assert checkpoint.load() == 0
+
+    checkpoint.save(completed=3)
+    checkpoint.save(completed=4)
+
+    assert checkpoint.load() == 4
+    assert os.listdir(os.path.dirname(checkpoint.path)) == ['shard-1-of-2.json']
+    assert ShardCheckpoint(output_dir_path=tmpdir.strpath, shard_index=1, shards=3).load() == 0
@@ -138,6 +138,9 @@ endif
 metrics-lib:
 	@. $(ACTIVATE); cd experiment_metrics && python setup.py sdist
 
+import-time-benchmark: $(DEV_VIRTUALENV_MARK)
+	@. $(ACTIVATE); LANG=en_US.UTF-8 LC_ALL=en_US.UTF-8 python scripts/import_time_benchmark.py
+
 style: $(DEV_VIRTUALENV_MARK)
 	@. $(ACTIVATE); flake8 draft/ util/ commands/ main.py
 
@@ -115,6 +115,9 @@ class VerifyCmdTexts:
     VERSION_CHECKING_MSG = "Checking version of {dependency_name}. Installed version: ({installed_version}). " \
                            "Supported version {supported_versions_sign} {expected_version}."
     DEPENDENCY_VERIFICATION_SUCCESS_MSG = "{dependency_name} verified successfully."
+    DEPENDENCY_VERIFICATION_TIME_MSG = "{dependency_name} verified successfully ({check_time})."
+    CHECK_TIME_MSG = "{duration:.2f} s"
+    CACHED_CHECK_TIME_MSG = "cached"
     INVALID_VERSION_WARNING_MSG = "Warning: the installed version of {dependency_name} ({installed_version}) is " \
                                   "not supported, supported version {supported_versions_sign} " \
                                   "{expected_version}"
@@ -126,6 +129,7 @@ class VerifyCmdTexts:
     CHECKING_CONNECTION_TO_CLUSTER_MSG = "Checking connection to the cluster..."
     CHECKING_OS_MSG = "Checking operating system..."
     VERIFYING_DEPENDENCY_MSG = "Verifying {dependency_name} ..."
+    VERIFYING_DEPENDENCIES_MSG = "Verifying dependencies ..."
     CHECKING_PORT_FORWARDING_FROM_CLUSTER_MSG = "Checking port forwarding from cluster..."
     WRONG_REQUIREMENTS_SETTINGS = "- {pack_name}"
     VERIFYING_RESOURCES_CORRECTNESS = "Verifying packs resources' correctness ..."
@@ -306,6 +310,54 @@ class PredictStreamCmdTexts:
     INFERENCE_OTHER_ERROR_MSG = "Failed to perform inference. Reason: {exception}"
     INFERENCE_ERROR_RESPONSE_MSG = "\n Response: {response_text}"
     WAITING_FOR_RESPONSE_MSG = "Waiting for prediction instance response..."
+    HELP_ND = "If given, data file is in NDJSON format - each line of the file is a request streamed to prediction " \
+              "instance. Requests are also streamed from all files of a directory given as data."
+    HELP_C = "Number of requests sent to prediction instance at once, when many requests are streamed."
+    HELP_B = "Number of consecutive requests joined into one request (their 'instances' or 'examples' lists), when " \
+             "many requests are streamed."
+    HELP_O = "Path to a file in which responses are stored in NDJSON format, in order of requests. If not given, " \
+             "responses are displayed."
+    STREAM_STATS_MSG = "Requests: {requests}, sent requests: {sent_requests}, errors: {errors}, " \
+                       "time: {elapsed:.2f} s, throughput: {throughput:.1f} requests/s"
+    STREAM_LATENCY_MSG = "\nLatency of sent requests (ms): {percentiles}, max: {max:.1f}"
+    STREAM_ERRORS_MSG = "{errors} requests failed."
+
+
+class PredictBenchmarkCmdTexts:
+    SHORT_HELP = "Measures latency and throughput of a prediction instance."
+    HELP = """
+    Measures latency and throughput of a running prediction instance. Requests from a given corpus are sent
+    to the instance repeatedly, at a target rate (-q option) or by a number of concurrent clients (-c option),
+    for a given time.
+    """
+    HELP_N = "Name of prediction session."
+    HELP_D = "Path to a corpus of requests - a JSON file, an NDJSON file (with -nd option) or a directory of JSON " \
+             "files for REST protocol, a serialized PredictRequest file or a directory of such files (e.g. created " \
+             "by mnist_converter_pb.py) for gRPC protocol."
+    HELP_P = "Protocol of requests. REST requests are sent through the Kubernetes API server, gRPC requests through " \
+             "port forwarding and require grpcio and tensorflow-serving-api packages."
+    HELP_ND = "If given, data file is in NDJSON format - each line of the file is a request."
+    HELP_C = "Number of concurrent clients, each of them sends a request after it gets a response to the previous " \
+             "one. Default is 8, cannot be used along with -q option."
+    HELP_Q = "Target number of requests sent per second, regardless of responses."
+    HELP_T = "Duration of a benchmark in seconds. Default is 30."
+    HELP_M = "Method verb used in REST requests. Predict verb is used by default."
+    HELP_O = "Path to a file in which a report of a benchmark is saved in JSON format, with a latency histogram."
+    CONCURRENCY_AND_QPS_ERROR_MSG = "Only one of -c and -q options can be given."
+    INVALID_QPS_ERROR_MSG = "Target number of requests per second must be greater than 0."
+    INSTANCE_NOT_EXISTS_ERROR_MSG = "Prediction instance {name} does not exist."
+    INSTANCE_NOT_RUNNING_ERROR_MSG = "Prediction instance {name} is not in {running_code} state."
+    INSTANCE_GET_FAIL_ERROR_MSG = "Failed to get prediction instance {name}."
+    DATA_LOAD_ERROR_MSG = "Failed to load requests from {data}."
+    GRPC_MISSING_ERROR_MSG = "gRPC protocol requires grpcio and tensorflow-serving-api packages to be installed."
+    BENCHMARK_STARTED_MSG = "Benchmarking {name} for {duration} s, load: {load}..."
+    BENCHMARK_ERROR_MSG = "Failed to benchmark prediction instance."
+    REPORT_SAVED_MSG = "Report saved in {output}."
+    REQUESTS_ROW = "Requests"
+    ERRORS_ROW = "Errors"
+    OFFERED_QPS_ROW = "Sent requests/s"
+    THROUGHPUT_ROW = "Successful responses/s"
+    LATENCY_ROW = "Latency {key} (ms)"
 
 
 class PredictCancelCmdTexts:
@@ -600,6 +652,30 @@ class ExperimentCancelCmdTexts:
     PURGING_LOGS_PROGRESS_MSG = 'Purging experiment {run_name} logs...'
 
 
+class ExperimentMetricsCmdTexts:
+    SHORT_HELP = "Displays series of metrics of given experiments."
+    HELP = """
+    Displays series of numeric metrics of given experiments - number of values, the last, minimal and maximal value of
+    each metric - so they can be compared.
+
+    EXPERIMENT_NAME - Experiment's name, more than one name can be given.
+    """
+    HELP_K = "Name of a displayed metric, can be given more than once. If not given, all metrics are displayed."
+    HELP_D = "Path to a locally mounted output folder of experiments (output/ or output-shared/ folder - see 'nctl " \
+             "mount'). If given, all values of metrics are read from the folder, otherwise only their summaries " \
+             "stored by the platform are used."
+    HELP_P = "If given, values of metrics are displayed too, step by step. Without -d option only some of them are " \
+             "available."
+    HELP_U = "Name of a user to who belongs viewed experiment. If not given, only experiments of a current " \
+             "user are displayed."
+    NOT_FOUND_ERROR_MSG = "Experiment \"{experiment_name}\" not found."
+    NO_SERIES_MSG = "No series of numeric metrics found."
+    OTHER_ERROR_MSG = "Failed to get metrics of experiments."
+    TABLE_HEADERS = ["Experiment", "Metric", "Values", "Last step", "Last", "Min", "Max"]
+    POINTS_HEADER = "\nMetric {key}:"
+    POINTS_STEP_HEADER = "Step"
+
+
 class ExperimentViewCmdTexts:
     SHORT_HELP = "Displays details given experiment/s name."
     HELP = """
@@ -956,6 +1032,8 @@ class TemplateListCmdTexts:
                                  "Check, if the file zoo-repository.config exists in the nctl folder."
     GETTING_LIST_OF_TEMPLATES_MSG = "Getting templates list ..."
     CHECKING_PRESENCE_OF_TEMPLATE_MSG = "Checking for presence of a template ..."
+    TEMPLATE_CHECKSUM_MISMATCH = "Checksum of a downloaded package of {template_name} template doesn't match " \
+                                 "the checksum given in the repository's index."
 
 
 class TemplateCopyCmdTexts:
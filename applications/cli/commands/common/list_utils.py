@@ -24,7 +24,7 @@ from tabulate import tabulate
 
 from cli_text_consts import CmdsCommonTexts as Texts
 from platform_resources.experiment import Experiment, ExperimentStatus
-from platform_resources.run import RunKinds, Run, RunStatus
+from platform_resources.run import RunKinds, Run, RunStatus, get_names_of_experiments_with_runs
 from util.config import TBLT_TABLE_FORMAT
 from util.exceptions import InvalidRegularExpressionError
 from util.k8s.k8s_info import get_kubectl_current_context_namespace
@@ -71,16 +71,14 @@ def list_unitialized_experiments_in_cli(verbosity_lvl: int, all_users: bool,
     try:
         namespace = None if all_users else get_kubectl_current_context_namespace()
 
-        creating_experiments = Experiment.list(namespace=namespace,
-                                               state=ExperimentStatus.CREATING,
-                                               run_kinds_filter=listed_runs_kinds,
-                                               name_filter=name)
-        runs = Run.list(namespace=namespace, name_filter=name, run_kinds_filter=listed_runs_kinds)
+        creating_experiments = list(Experiment.iterate(namespace=namespace,
+                                                       state=ExperimentStatus.CREATING,
+                                                       run_kinds_filter=listed_runs_kinds,
+                                                       name_filter=name))
 
-        # Get Experiments without associated Runs
-        names_of_experiment_with_runs = set()
-        for run in runs:
-            names_of_experiment_with_runs.add(run.experiment_name)
+        # Get Experiments without associated Runs - runs are checked only for experiments in CREATING state
+        names_of_experiment_with_runs = get_names_of_experiments_with_runs(
+            [experiment.name for experiment in creating_experiments], namespace=namespace)
 
         uninitialized_experiments = [experiment for experiment in creating_experiments
                                      if experiment.name not in names_of_experiment_with_runs]
@@ -121,7 +119,8 @@ def list_runs_in_cli(verbosity_lvl: int, all_users: bool, name: str,
         # List experiments command is actually listing Run resources instead of Experiment resources with one
         # exception - if run is initialized - nctl displays data of an experiment instead of data of a run
         runs = replace_initializing_runs(
-            Run.list(namespace=namespace, state_list=[status], name_filter=name, run_kinds_filter=listed_runs_kinds))
+            Run.list(namespace=namespace, state_list=[status], name_filter=name, run_kinds_filter=listed_runs_kinds,
+                     brief=brief))
         runs_representations = [run.cli_representation for run in runs]
         if brief:
             runs_table_data = [
@@ -64,10 +64,10 @@ TEST_LIST_HEADERS = ["Name", "Parameters", "Metrics", "Submission date", "Owner"
 
 
 def test_list_unitialized_experiments_in_cli_success(mocker, capsys):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.get_names_of_experiments_with_runs")
+    api_list_runs_mock.return_value = {"test-experiment"}
 
-    api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list")
+    api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.iterate")
     api_list_experiments_mock.return_value = TEST_NONINITIALIZED_EXPERIMENTS
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
@@ -86,10 +86,10 @@ def test_list_unitialized_experiments_in_cli_success(mocker, capsys):
 
 
 def test_list_unitialized_experiments_in_cli_one_row(mocker, capsys):
-    api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
-    api_list_runs_mock.return_value = TEST_RUNS
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.get_names_of_experiments_with_runs")
+    api_list_runs_mock.return_value = {"test-experiment"}
 
-    api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.list")
+    api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.iterate")
     api_list_experiments_mock.return_value = TEST_NONINITIALIZED_EXPERIMENTS
 
     get_namespace_mock = mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace")
@@ -107,6 +107,26 @@ def test_list_unitialized_experiments_in_cli_one_row(mocker, capsys):
     assert api_list_experiments_mock.call_count == 1, "Experiments weren't retrieved"
 
 
+def test_list_unitialized_experiments_in_cli_with_runs(mocker, capsys):
+    api_list_runs_mock = mocker.patch("commands.common.list_utils.get_names_of_experiments_with_runs")
+    api_list_runs_mock.return_value = {"noninit-test-experiment"}
+
+    api_list_experiments_mock = mocker.patch("commands.common.list_utils.Experiment.iterate")
+    api_list_experiments_mock.return_value = iter(TEST_NONINITIALIZED_EXPERIMENTS)
+
+    mocker.patch("commands.common.list_utils.get_kubectl_current_context_namespace", return_value="submitter")
+
+    list_utils.list_unitialized_experiments_in_cli(verbosity_lvl=0, all_users=False, name="", listed_runs_kinds=[],
+                                                   headers=TEST_LIST_HEADERS, brief=False)
+
+    captured = capsys.readouterr()
+
+    assert "noninit-test-experiment" not in captured.out
+    assert "noninit2-test-experiment" in captured.out
+    api_list_runs_mock.assert_called_once_with(["noninit-test-experiment", "noninit2-test-experiment"],
+                                               namespace="submitter")
+
+
 def test_list_experiments_success(mocker):
     api_list_runs_mock = mocker.patch("commands.common.list_utils.Run.list")
     api_list_runs_mock.return_value = TEST_RUNS
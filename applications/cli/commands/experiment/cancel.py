@@ -293,8 +293,8 @@ def purge_experiment(exp_name: str, runs_to_purge: List[Run],
 
         if cancel_whole_experiment:
             # Delete associated workflows
-            experiment_associated_workflows = [wf for wf in ArgoWorkflow.list(namespace=namespace)
-                                               if wf.labels.get('experimentName') == experiment.name]
+            experiment_associated_workflows = ArgoWorkflow.iterate(namespace=namespace,
+                                                                   label_selector=f'experimentName={experiment.name}')
             for wf in experiment_associated_workflows:
                 wf.delete()
 
@@ -15,7 +15,6 @@
 #
 
 from collections import namedtuple
-from distutils.dir_util import copy_tree
 import itertools
 import os
 import psutil
@@ -42,7 +41,7 @@ import platform_resources.experiment as experiments_model
 from platform_resources.run import Run, RunStatus, RunKinds
 
 from platform_resources.workflow import ExperimentImageBuildWorkflow, ArgoWorkflow
-from util.filesystem import get_total_directory_size_in_bytes
+from util.filesystem import copy_directory_content, read_ignore_patterns, scan_directory
 from util.config import EXPERIMENTS_DIR_NAME, FOLDER_DIR_NAME, Config, TBLT_TABLE_FORMAT
 from util.helm import delete_helm_release
 from util.k8s.kubectl import delete_k8s_object
@@ -155,7 +154,8 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
     :param experiment_name: name of an experiment used to create a folder
                             with content of an experiment
     :param file_location: location of a training script
-    :param folder_location: location of a folder with additional data
+    :param folder_location: location of a folder with additional data, files matching patterns from
+                            its .nctlignore file are not copied
     :param show_folder_size_warning: if True, a warning will be shown if script folder size exceeds
      value in max_folder_size_in_bytes param
     :param max_folder_size_in_bytes: maximum script folder size,
@@ -194,7 +194,13 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
 
     # copy folder content
     if folder_location:
-        folder_size = get_total_directory_size_in_bytes(folder_location)
+        try:
+            # the same scan is used to check the folder's size and to copy it
+            folder_content = scan_directory(folder_location, ignore_patterns=read_ignore_patterns(folder_location))
+        except Exception:
+            log.exception("Create environment - scanning training folder error.")
+            raise SubmitExperimentError(message_prefix.format(reason=Texts.DIR_CANT_BE_COPIED_ERROR_TEXT))
+        folder_size = folder_content.total_size
         if show_folder_size_warning and folder_size >= max_folder_size_in_bytes:
             if spinner_to_hide:
                 spinner_to_hide.hide()
@@ -207,7 +213,7 @@ def create_environment(experiment_name: str, file_location: str = None, folder_l
             if spinner_to_hide:
                 spinner_to_hide.show()
         try:
-            copy_tree(folder_location, folder_path)
+            copy_directory_content(folder_location, folder_path, content=folder_content)
         except Exception:
             log.exception("Create environment - copying training folder error.")
             raise SubmitExperimentError(message_prefix.format(reason=Texts.DIR_CANT_BE_COPIED_ERROR_TEXT))
@@ -412,8 +418,9 @@ def submit_experiment(template: str, name: str = None, run_kind: RunKinds = RunK
             try:
                 run.state = RunStatus.QUEUED
                 with spinner(text=Texts.CREATING_RESOURCES_MSG.format(run_name=run.name)):
-                    # Add Run object with runKind label and pack params as annotations
-                    run.create(namespace=namespace, labels={'runKind': run_kind.value},
+                    # Add Run object with runKind and experimentName labels and pack params as annotations
+                    run.create(namespace=namespace, labels={'runKind': run_kind.value,
+                                                            'experimentName': experiment_name},
                                annotations={pack_param_name: pack_param_value
                                             for pack_param_name, pack_param_value in pack_params})
                     submitted_runs.append(run)
@@ -0,0 +1,138 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import os
+from sys import exit
+from typing import Dict, List, Optional, Tuple
+
+import click
+from tabulate import tabulate
+
+# files of series are read with the experiment_metrics library, which writes them
+from experiment_metrics.experiment_metrics.series import SERIES_DIR_NAME, list_series_keys, read_series
+from platform_resources.run import Run
+from util.aliascmd import AliasCmd
+from util.cli_state import common_options
+from util.config import TBLT_TABLE_FORMAT
+from util.k8s.k8s_info import get_kubectl_current_context_namespace
+from util.logger import initialize_logger
+from util.system import handle_error
+from cli_text_consts import ExperimentMetricsCmdTexts as Texts
+
+logger = initialize_logger(__name__)
+
+
+class MetricSeries:
+    def __init__(self, count: int, last_step: Optional[int], last: Optional[float], min: Optional[float],
+                 max: Optional[float], points: List[Tuple[int, float]]):
+        self.count = count
+        self.last_step = last_step
+        self.last = last
+        self.min = min
+        self.max = max
+        self.points = points
+
+    @classmethod
+    def from_summary(cls, summary: dict) -> 'MetricSeries':
+        return cls(count=summary.get('count', 0), last_step=summary.get('last-step'), last=summary.get('last'),
+                   min=summary.get('min'), max=summary.get('max'),
+                   points=[(step, value) for step, value in summary.get('points', [])])
+
+    @classmethod
+    def from_points(cls, points: List[Tuple[int, float]]) -> 'MetricSeries':
+        values = [value for _, value in points]
+        return cls(count=len(points), last_step=points[-1][0] if points else None,
+                   last=values[-1] if values else None, min=min(values, default=None),
+                   max=max(values, default=None), points=points)
+
+
+def read_experiment_series(data_dir: str, experiment_name: str) -> Dict[str, MetricSeries]:
+    series_dir = os.path.join(data_dir, experiment_name, SERIES_DIR_NAME)
+    if not os.path.isdir(series_dir):
+        return {}
+    return {key: MetricSeries.from_points([(step, value) for step, _, value in read_series(series_dir, key)])
+            for key in list_series_keys(series_dir)}
+
+
+def get_experiment_series(experiment_name: str, namespace: str) -> Optional[Dict[str, MetricSeries]]:
+    run = Run.get(name=experiment_name, namespace=namespace)
+    if not run:
+        return None
+    return {key: MetricSeries.from_summary(summary) for key, summary in (run.metrics_series or {}).items()}
+
+
+def points_table(series_of_experiments: Dict[str, MetricSeries]) -> List[list]:
+    """
+    :return: rows of values of experiments at each step, a value is empty if an experiment has no value at the step
+    """
+    values_at_steps = {name: dict(series.points) for name, series in series_of_experiments.items()}
+    steps = sorted({step for values in values_at_steps.values() for step in values})
+    return [[step] + [values_at_steps[name].get(step, '') for name in series_of_experiments] for step in steps]
+
+
+@click.command(help=Texts.HELP, short_help=Texts.SHORT_HELP, cls=AliasCmd, alias='m', options_metavar='[options]')
+@click.argument('experiment_names', metavar='EXPERIMENT_NAME', nargs=-1, required=True)
+@click.option('-k', '--key', 'keys', multiple=True, help=Texts.HELP_K)
+@click.option('-d', '--data-dir', type=click.Path(exists=True, file_okay=False), help=Texts.HELP_D)
+@click.option('-p', '--points', is_flag=True, help=Texts.HELP_P)
+@click.option('-u', '--username', help=Texts.HELP_U)
+@common_options()
+@click.pass_context
+def metrics(ctx: click.Context, experiment_names: Tuple[str, ...], keys: Tuple[str, ...], data_dir: str,
+            points: bool, username: str):
+    """
+    Displays series of metrics of experiments.
+    """
+    try:
+        series = {}
+        if data_dir:
+            # series are read from files, so the platform isn't asked about experiments
+            for experiment_name in experiment_names:
+                series[experiment_name] = read_experiment_series(data_dir, experiment_name)
+        else:
+            namespace = username if username else get_kubectl_current_context_namespace()
+            for experiment_name in experiment_names:
+                experiment_series = get_experiment_series(experiment_name, namespace)
+                if experiment_series is None:
+                    handle_error(user_msg=Texts.NOT_FOUND_ERROR_MSG.format(experiment_name=experiment_name))
+                    exit(2)
+                series[experiment_name] = experiment_series
+    except Exception:
+        handle_error(logger, Texts.OTHER_ERROR_MSG, Texts.OTHER_ERROR_MSG,
+                     add_verbosity_msg=ctx.obj.verbosity == 0)
+        exit(1)
+
+    displayed_keys = sorted(set(keys) if keys else {key for experiment_series in series.values()
+                                                    for key in experiment_series})
+    rows = [(experiment_name, key, metric.count, metric.last_step, metric.last, metric.min, metric.max)
+            for key in displayed_keys for experiment_name, experiment_series in series.items()
+            for metric in [experiment_series.get(key)] if metric]
+    if not rows:
+        click.echo(Texts.NO_SERIES_MSG)
+        return
+
+    click.echo(tabulate(rows, headers=Texts.TABLE_HEADERS, tablefmt=TBLT_TABLE_FORMAT))
+
+    if points:
+        for key in displayed_keys:
+            series_of_key = {experiment_name: experiment_series[key]
+                             for experiment_name, experiment_series in series.items() if key in experiment_series}
+            if not series_of_key:
+                continue
+            click.echo(Texts.POINTS_HEADER.format(key=key))
+            click.echo(tabulate(points_table(series_of_key), headers=[Texts.POINTS_STEP_HEADER, *series_of_key],
+                                tablefmt=TBLT_TABLE_FORMAT))
@@ -26,6 +26,7 @@ from commands.experiment.common import submit_experiment, values_range, \
     RunKinds, validate_pack_params_names, get_log_filename, validate_pack, prepare_experiment_environment
 
 from util.exceptions import SubmitExperimentError
+from util.filesystem import DirectoryContent
 import util.config
 from platform_resources.run import RunStatus, Run
 from cli_text_consts import ExperimentCommonTexts as Texts
@@ -89,7 +90,8 @@ def test_create_environment_success(config_mock, mocker):
     mocker.patch("os.chmod")
     sem_file_creation_mock = mocker.patch("commands.experiment.common.Path.touch")
     sh_copy_mock = mocker.patch("shutil.copy2")
-    sh_copytree_mock = mocker.patch("commands.experiment.common.copy_tree")
+    mocker.patch("commands.experiment.common.scan_directory", return_value=DirectoryContent(directories=[], files=[]))
+    sh_copytree_mock = mocker.patch("commands.experiment.common.copy_directory_content")
 
     experiment_path = create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, EXPERIMENT_FOLDER)
 
@@ -106,7 +108,7 @@ def test_create_environment_folder_size_warning(config_mock, mocker, tmpdir):
     mocker.patch("os.chmod")
     sem_file_creation_mock = mocker.patch("commands.experiment.common.Path.touch")
     mocker.patch("shutil.copy2")
-    mocker.patch("commands.experiment.common.copy_tree")
+    mocker.patch("commands.experiment.common.copy_directory_content")
     confirm_mock = mocker.patch('commands.experiment.common.click.confirm')
 
     sfl_size = 1024
@@ -123,11 +125,34 @@ def test_create_environment_folder_size_warning(config_mock, mocker, tmpdir):
     assert confirm_mock.call_count == 1
 
 
+def test_create_environment_folder_size_warning_ignored_files(config_mock, mocker, tmpdir):
+    mocker.patch("os.path.exists", side_effect=[False])
+    mocker.patch("os.makedirs")
+    mocker.patch("commands.experiment.common.Path.touch")
+    mocker.patch("shutil.copy2")
+    copy_mock = mocker.patch("commands.experiment.common.copy_directory_content")
+    confirm_mock = mocker.patch('commands.experiment.common.click.confirm')
+
+    sfl_size = 1024
+    script_folder_location = tmpdir.mkdir('sfl')
+    script_folder_location.join('.nctlignore').write('checkpoints\n')
+    sfl_file = script_folder_location.mkdir('checkpoints').join('file.bin')
+    with open(sfl_file, "wb") as f:
+        f.write(os.urandom(sfl_size))
+
+    create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, folder_location=script_folder_location,
+                       show_folder_size_warning=True, max_folder_size_in_bytes=sfl_size/2)
+
+    assert confirm_mock.call_count == 0
+    assert copy_mock.call_args[1]['content'].files[0][0] == '.nctlignore'
+    assert len(copy_mock.call_args[1]['content'].files) == 1
+
+
 def test_create_environment_makedir_error(config_mock, mocker):
     os_pexists_mock = mocker.patch("os.path.exists", side_effect=[False])
     mocker.patch("os.makedirs", side_effect=Exception("Test exception"))
     sh_copy_mock = mocker.patch("shutil.copy2")
-    copytree_mock = mocker.patch("commands.experiment.common.copy_tree")
+    copytree_mock = mocker.patch("commands.experiment.common.copy_directory_content")
 
     with pytest.raises(SubmitExperimentError):
         create_environment(EXPERIMENT_NAME, SCRIPT_LOCATION, EXPERIMENT_FOLDER)
@@ -154,7 +179,7 @@ def test_create_environment_copy_error(config_mock, mocker):
     os_pexists_mock = mocker.patch("os.path.exists", side_effect=[False])
     mocker.patch("os.makedirs")
     sh_copy_mock = mocker.patch("shutil.copy2", side_effect=Exception("Test exception"))
-    copytree_mock = mocker.patch("commands.experiment.common.copy_tree")
+    copytree_mock = mocker.patch("commands.experiment.common.copy_directory_content")
     mocker.patch("commands.experiment.common.Path.touch")
 
     with pytest.raises(SubmitExperimentError):
@@ -0,0 +1,86 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import struct
+
+from click.testing import CliRunner
+
+from commands.experiment import metrics
+from platform_resources.run import Run, RunStatus
+from cli_text_consts import ExperimentMetricsCmdTexts as Texts
+
+
+def create_run(name, metrics_series):
+    return Run(name=name, experiment_name=name, state=RunStatus.COMPLETE, metrics_series=metrics_series)
+
+
+TEST_RUNS = {
+    'exp-1': create_run('exp-1', {'loss': {'count': 100, 'min': 0.1, 'max': 2.0, 'last': 0.15, 'last-step': 99,
+                                           'points': [[0, 2.0], [64, 0.3]]},
+                                  'accuracy': {'count': 100, 'min': 0.1, 'max': 0.9, 'last': 0.9, 'last-step': 99,
+                                               'points': [[0, 0.1], [64, 0.8]]}}),
+    'exp-2': create_run('exp-2', {'loss': {'count': 50, 'min': 0.5, 'max': 1.5, 'last': 0.5, 'last-step': 49,
+                                           'points': [[0, 1.5], [32, 0.7]]}})
+}
+
+
+def test_metrics_from_summaries(mocker):
+    mocker.patch.object(metrics, 'get_kubectl_current_context_namespace', return_value='namespace')
+    get_mock = mocker.patch.object(metrics.Run, 'get', side_effect=lambda name, namespace: TEST_RUNS[name])
+
+    result = CliRunner().invoke(metrics.metrics, ['exp-1', 'exp-2', '-k', 'loss', '--points'])
+
+    assert result.exit_code == 0
+    assert get_mock.call_count == 2
+    assert 'accuracy' not in result.output
+    assert Texts.POINTS_HEADER.format(key='loss') in result.output
+    rows = [[cell.strip() for cell in line.split('|')[1:-1]] for line in result.output.splitlines()]
+    assert ['exp-2', 'loss', '50', '49', '0.5', '0.5', '1.5'] in rows
+    # values of both experiments are displayed at each step
+    assert ['32', '', '0.7'] in rows
+
+
+def test_metrics_experiment_not_found(mocker):
+    mocker.patch.object(metrics, 'get_kubectl_current_context_namespace', return_value='namespace')
+    mocker.patch.object(metrics.Run, 'get', return_value=None)
+
+    result = CliRunner().invoke(metrics.metrics, ['exp-3'])
+
+    assert result.exit_code == 2
+    assert Texts.NOT_FOUND_ERROR_MSG.format(experiment_name='exp-3') in result.output
+
+
+def test_metrics_from_data_dir(mocker, tmpdir):
+    get_mock = mocker.patch.object(metrics.Run, 'get')
+    series_dir = tmpdir.join('exp-1', metrics.SERIES_DIR_NAME).ensure(dir=True)
+    # the last point is written partially
+    series_dir.join('acc%2Ftop1.series').write_binary(b''.join(struct.pack('<qdd', step, 0.0, step / 10)
+                                                               for step in range(5)) + b'\x00' * 5)
+
+    result = CliRunner().invoke(metrics.metrics, ['exp-1', '--data-dir', tmpdir.strpath])
+
+    assert result.exit_code == 0
+    assert get_mock.call_count == 0
+    rows = [[cell.strip() for cell in line.split('|')[1:-1]] for line in result.output.splitlines()]
+    assert ['exp-1', 'acc/top1', '5', '4', '0.4', '0', '0.4'] in rows
+
+
+def test_metrics_no_series(mocker, tmpdir):
+    result = CliRunner().invoke(metrics.metrics, ['exp-1', '--data-dir', tmpdir.strpath])
+
+    assert result.exit_code == 0
+    assert Texts.NO_SERIES_MSG in result.output
@@ -91,7 +91,7 @@ TOP_USERS = [ResourceUsage(user_name="user_name", cpu_usage=2, mem_usage=1000)]
 event = MagicMock(spec=V1Event)
 event.message = "insufficient memory"
 event.reason = "insufficient memory"
-event.involved_object = V1ObjectReference(name="test-experiment")
+event.involved_object = V1ObjectReference(name="test")
 event.metadata = V1ObjectMeta(name="test-experiment")
 EVENTS = [event]
 
@@ -111,6 +111,8 @@ class ViewMocks:
         self.sum_mem_resources.return_value = "1Gi"
         self.get_experiment = mocker.patch('commands.experiment.view.Experiment.get')
         self.get_experiment.return_value = TEST_EXPERIMENT
+        self.get_pods_events = mocker.patch('commands.experiment.view.get_pods_events')
+        self.get_pods_events.return_value = {}
 
 
 @pytest.fixture
@@ -318,11 +320,43 @@ def test_displaying_pending_pod(prepare_mocks: ViewMocks, mocker):
     highest_usage_mock = mocker.patch("commands.experiment.view.get_highest_usage")
     highest_usage_mock.return_value = TOP_USERS, TOP_USERS
 
-    pod_events_mock = mocker.patch("commands.experiment.view.get_pod_events")
-    pod_events_mock.return_value = EVENTS
+    prepare_mocks.get_pods_events.return_value = {"test": EVENTS}
     runner = CliRunner()
     result = runner.invoke(view.view, [TEST_RUNS[0].name], catch_exceptions=False)
 
     assert "Experiment is in QUEUED state due to insufficient amount of memory." in result.output
     assert "Top CPU consumers: user_name" in result.output
     assert "Top memory consumers: user_name" in result.output
+
+
+def test_view_experiment_many_pods_events(prepare_mocks: ViewMocks):
+    pods = []
+    for i in range(10):
+        pod = MagicMock(spec=V1Pod)
+        pod.status = V1PodStatus(phase=PodStatus.RUNNING.value)
+        pod.metadata.name = f"pod-{i}"
+        pod.metadata.uid = f"uid-{i}"
+        pod.spec.containers = []
+        pods.append(pod)
+    pod_event = MagicMock(spec=V1Event)
+    pod_event.message = "pulling image"
+    pod_event.reason = "Pulling"
+    prepare_mocks.get_pods.return_value = pods
+    prepare_mocks.get_pods_events.return_value = {"pod-3": [pod_event]}
+
+    runner = CliRunner()
+    result = runner.invoke(view.view, [TEST_RUNS[0].name], catch_exceptions=False)
+
+    assert prepare_mocks.get_pods_events.call_count == 1
+    assert "Pulling" in result.output
+    assert result.exit_code == 0
+
+
+def test_view_experiment_events_failure(prepare_mocks: ViewMocks):
+    prepare_mocks.get_pods_events.side_effect = RuntimeError
+
+    runner = CliRunner()
+    result = runner.invoke(view.view, [TEST_RUNS[0].name], catch_exceptions=False)
+
+    assert TEST_RUNS[0].name in result.output
+    assert result.exit_code == 0
@@ -15,6 +15,7 @@
 #
 
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from sys import exit
 
 from tabulate import tabulate
@@ -28,7 +29,7 @@ from platform_resources.experiment import Experiment
 from util.aliascmd import AliasCmd
 from util.config import TBLT_TABLE_FORMAT
 from util.k8s.k8s_info import get_kubectl_current_context_namespace, get_namespaced_pods, sum_mem_resources,\
-    sum_cpu_resources, PodStatus, get_pod_events, add_bytes_to_unit
+    sum_cpu_resources, PodStatus, get_pods_events, add_bytes_to_unit
 from util.k8s.k8s_statistics import get_highest_usage
 from util.logger import initialize_logger
 from util.system import handle_error, format_timestamp_for_cli
@@ -57,6 +58,9 @@ POD_CONDITIONS_MAX_WIDTH = 30
 UID_MAX_WIDTH = 15
 CONTAINER_DETAILS_MAX_WIDTH = 50
 
+# run, experiment, pods and events of pods are fetched at the same time
+VIEW_FETCH_WORKERS = 4
+
 
 def container_status_to_msg(state) -> str:
     if not state:
@@ -161,29 +165,43 @@ def view(ctx: click.Context, experiment_name: str, tensorboard: bool,
         else:
             namespace = get_kubectl_current_context_namespace()
 
-        run = Run.get(name=experiment_name, namespace=namespace)
-        if not run or run.metadata.get('labels', {}).get('runKind') not in accepted_run_kinds:
-            handle_error(
-                user_msg=Texts.NOT_FOUND_ERROR_MSG.format(
-                    experiment_name=experiment_name))
-            exit(2)
-
-        experiment = Experiment.get(name=experiment_name, namespace=namespace)
-        if experiment:
-            run.template_version = experiment.template_version
-
-        click.echo(
-            tabulate(
-                [run.cli_representation],
-                headers=EXPERIMENTS_LIST_HEADERS,
-                tablefmt=TBLT_TABLE_FORMAT
+        with ThreadPoolExecutor(max_workers=VIEW_FETCH_WORKERS) as executor:
+            run_future = executor.submit(Run.get, name=experiment_name, namespace=namespace)
+            experiment_future = executor.submit(Experiment.get, name=experiment_name, namespace=namespace)
+            pods_future = executor.submit(get_namespaced_pods, label_selector="runName=" + experiment_name,
+                                          namespace=namespace)
+            # events of all pods are taken in one request instead of one request per pod
+            events_future = executor.submit(get_pods_events, namespace=namespace)
+
+            run = run_future.result()
+            if not run or run.metadata.get('labels', {}).get('runKind') not in accepted_run_kinds:
+                handle_error(
+                    user_msg=Texts.NOT_FOUND_ERROR_MSG.format(
+                        experiment_name=experiment_name))
+                exit(2)
+
+            experiment = experiment_future.result()
+            if experiment:
+                run.template_version = experiment.template_version
+
+            # details of a run are displayed while pods and their events are still being fetched
+            click.echo(
+                tabulate(
+                    [run.cli_representation],
+                    headers=EXPERIMENTS_LIST_HEADERS,
+                    tablefmt=TBLT_TABLE_FORMAT
+                )
             )
-        )
 
-        click.echo(Texts.PODS_PARTICIPATING_LIST_HEADER)
+            click.echo(Texts.PODS_PARTICIPATING_LIST_HEADER)
 
-        pods = get_namespaced_pods(
-            label_selector="runName=" + experiment_name, namespace=namespace)
+            pods = pods_future.result()
+            try:
+                pods_events = events_future.result()
+            except Exception:
+                # events only complete statuses of pods, so details of an experiment are displayed without them
+                logger.exception('Failed to get events of pods')
+                pods_events = {}
 
         tabular_output = []
         containers_resources = []
@@ -202,10 +220,7 @@ def view(ctx: click.Context, experiment_name: str, tensorboard: bool,
                         cond.type + ": " + cond.status,
                         width=POD_CONDITIONS_MAX_WIDTH) + msg + "\n"
             else:
-                pod_events = get_pod_events(
-                    namespace=namespace, name=pod.metadata.name)
-
-                for event in pod_events:
+                for event in pods_events.get(pod.metadata.name, []):
                     msg = "\n" if not event.reason else "\n reason: " + \
                                                         wrap_text(event.reason, width=POD_CONDITIONS_MAX_WIDTH)
                     msg = msg + ", \n message: " + wrap_text(event.message, width=POD_CONDITIONS_MAX_WIDTH) \
@@ -300,8 +315,7 @@ def view(ctx: click.Context, experiment_name: str, tensorboard: bool,
                 cpu = False
                 memory = False
                 for pod in pending_pods:
-                    events_list = get_pod_events(namespace=namespace, name=pod)
-                    for event in events_list:
+                    for event in pods_events.get(pod, []):
                         if "insufficient cpu" in event.message.lower():
                             cpu = True
                         elif "insufficient memory" in event.message.lower():
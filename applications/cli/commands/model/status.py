@@ -54,8 +54,8 @@ def status(ctx: click.Context, username: str):
         with spinner(text=Texts.LOAD_DATA_MSG):
             # filtering out workflows used to build images with training jobs
             workflows = [workflow.cli_representation for workflow in
-                         ArgoWorkflow.list(namespace=namespace,
-                                           label_selector="type!=build-workflow")]
+                         ArgoWorkflow.iterate(namespace=namespace,
+                                              label_selector="type!=build-workflow", brief=True)]
 
         click.echo(tabulate(workflows, headers=MODEL_HEADERS, tablefmt=TBLT_TABLE_FORMAT))
     except Exception:
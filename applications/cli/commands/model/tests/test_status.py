@@ -45,7 +45,7 @@ class ModelStatusMocks:
     def __init__(self, mocker):
         self.get_namespace = mocker.patch('commands.model.status.get_kubectl_current_context_namespace',
                                           return_value='fake-namespace')
-        self.list_workflow = mocker.patch('commands.model.status.ArgoWorkflow.list',
+        self.list_workflow = mocker.patch('commands.model.status.ArgoWorkflow.iterate',
                                           return_value=[MODEL])
 
 
@@ -0,0 +1,417 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import itertools
+import json
+import os
+from sys import exit
+from threading import BoundedSemaphore, Lock, Thread
+from time import perf_counter, sleep
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import click
+import requests
+from requests.adapters import HTTPAdapter
+from tabulate import tabulate
+
+from commands.predict.common import get_inference_instance_url, InferenceVerb
+from commands.predict.stream import read_stream_requests
+from platform_resources.run import RunStatus, Run
+from util.aliascmd import AliasCmd
+from util.cli_state import common_options
+from util.config import TBLT_TABLE_FORMAT
+from util.k8s.k8s_info import get_api_key, get_k8s_api, get_kubectl_current_context_namespace
+from util.k8s.kubectl import start_service_port_forwarding
+from util.logger import initialize_logger
+from util.system import handle_error
+from cli_text_consts import PredictBenchmarkCmdTexts as Texts
+
+logger = initialize_logger(__name__)
+
+REST_PROTOCOL = 'rest'
+GRPC_PROTOCOL = 'grpc'
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_DURATION = 30
+REQUEST_TIMEOUT = 30
+
+# requests sent at once when load is generated at a target rate - if the instance is slower, next requests are
+# dropped and counted as errors of this type, so memory of queued requests doesn't grow without limit
+MAX_OPEN_LOOP_IN_FLIGHT = 256
+DROPPED_REQUEST_ERROR = 'Dropped'
+
+GRPC_CONNECT_TIMEOUT = 30
+
+REPORTED_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in microseconds, in the spirit of HdrHistogram - a value is counted in a bucket whose
+    width is at most 2 / 2 ** significant_bits of the value, so percentiles are precise to about 0.1% with the
+    default 11 bits, and memory doesn't depend on the number of values.
+    """
+
+    def __init__(self, significant_bits: int = 11):
+        self.significant_bits = significant_bits
+        self.counts: Counter = Counter()
+        self.total_count = 0
+        self.total = 0
+        self.max = 0
+
+    def _get_bucket(self, value: int) -> Tuple[int, int]:
+        # buckets are (shift, value >> shift) pairs - they sort in order of values
+        shift = max(value.bit_length() - self.significant_bits, 0)
+        return shift, value >> shift
+
+    @staticmethod
+    def _get_bucket_value(bucket: Tuple[int, int]) -> int:
+        # the highest value counted in a bucket
+        shift, top = bucket
+        return ((top + 1) << shift) - 1
+
+    def record(self, latency: float):
+        value = max(int(latency * 1_000_000), 0)
+        self.counts[self._get_bucket(value)] += 1
+        self.total_count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def get_percentile(self, percentile: float) -> int:
+        if not self.total_count:
+            return 0
+        rank = max(percentile / 100 * self.total_count, 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._get_bucket_value(bucket), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.total_count if self.total_count else 0
+
+    def to_list(self) -> List[List[int]]:
+        """
+        :return: [highest value of a bucket, count] pairs of non-empty buckets, in order of values
+        """
+        return [[self._get_bucket_value(bucket), self.counts[bucket]] for bucket in sorted(self.counts)]
+
+
+class BenchmarkRecorder:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors: Counter = Counter()
+        self.sent = 0
+        self._lock = Lock()
+
+    def record(self, latency: float, error: str = None):
+        with self._lock:
+            self.sent += 1
+            if error:
+                self.errors[error] += 1
+            else:
+                self.histogram.record(latency)
+
+
+class RestSender:
+    def __init__(self, url: str, headers: Dict[str, str], max_connections: int):
+        self.url = url
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.verify = False  # nosec - request to k8s cluster
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=max_connections))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=max_connections))
+
+    def send(self, request: str) -> Optional[str]:
+        """
+        :return: error of a request, None if it succeeded
+        """
+        try:
+            response = self.session.post(self.url, data=request, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            return type(e).__name__
+        return None if response.ok else str(response.status_code)
+
+    def close(self):
+        self.session.close()
+
+
+class GrpcSender:
+    def __init__(self, address: str):
+        # gRPC client isn't a dependency of nctl, it has to be installed to benchmark over gRPC
+        import grpc
+        from tensorflow_serving.apis import prediction_service_pb2_grpc
+
+        self._grpc = grpc
+        self.channel = grpc.insecure_channel(address)
+        grpc.channel_ready_future(self.channel).result(timeout=GRPC_CONNECT_TIMEOUT)
+        self.stub = prediction_service_pb2_grpc.PredictionServiceStub(self.channel)
+
+    def send(self, request) -> Optional[str]:
+        try:
+            self.stub.Predict(request, timeout=REQUEST_TIMEOUT)
+        except self._grpc.RpcError as e:
+            return e.code().name
+        return None
+
+    def close(self):
+        self.channel.close()
+
+
+def read_rest_corpus(data: str, ndjson: bool) -> List[str]:
+    if ndjson or os.path.isdir(data):
+        return [json.dumps(request) for request in read_stream_requests(data)]
+    with open(data, 'r', encoding='utf-8') as data_file:
+        return [json.dumps(json.load(data_file))]
+
+
+def read_grpc_corpus(data: str, model_name: str) -> list:
+    """
+    :param data: PredictRequest file, or directory of them (e.g. created by mnist_converter_pb.py)
+    """
+    from tensorflow_serving.apis import predict_pb2
+
+    paths = [os.path.join(data, name) for name in sorted(os.listdir(data))] if os.path.isdir(data) else [data]
+    corpus = []
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        request = predict_pb2.PredictRequest()
+        with open(path, 'rb') as request_file:
+            request.ParseFromString(request_file.read())
+        if not request.model_spec.name:
+            request.model_spec.name = model_name
+        corpus.append(request)
+    return corpus
+
+
+def try_send(send: Callable, request) -> Optional[str]:
+    """
+    :return: error of a request, None if it succeeded - an unexpected exception is an error too, so it isn't lost
+     in a thread sending requests
+    """
+    try:
+        return send(request)
+    except Exception as e:
+        logger.debug('Failed to send a request.', exc_info=True)
+        return type(e).__name__
+
+
+def run_closed_loop(send: Callable, corpus: list, recorder: BenchmarkRecorder, concurrency: int, duration: float):
+    """
+    Each of concurrency threads sends the next request of the corpus as soon as it gets a response to the previous one.
+    """
+    requests_iterator = itertools.cycle(corpus)
+    iterator_lock = Lock()
+    deadline = perf_counter() + duration
+
+    def send_requests():
+        while perf_counter() < deadline:
+            with iterator_lock:
+                request = next(requests_iterator)
+            start = perf_counter()
+            error = try_send(send, request)
+            recorder.record(perf_counter() - start, error)
+
+    threads = [Thread(target=send_requests, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run_open_loop(send: Callable, corpus: list, recorder: BenchmarkRecorder, qps: float, duration: float):
+    """
+    Requests are sent at the target rate, regardless of responses. Latency of a request is measured from the time
+    it should have been sent, so a slow instance isn't measured only by requests it managed to accept.
+    A request is dropped when MAX_OPEN_LOOP_IN_FLIGHT requests wait for responses at its scheduled time.
+    """
+    in_flight = BoundedSemaphore(MAX_OPEN_LOOP_IN_FLIGHT)
+
+    def send_request(request, scheduled_time: float):
+        try:
+            error = try_send(send, request)
+            recorder.record(perf_counter() - scheduled_time, error)
+        finally:
+            in_flight.release()
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=MAX_OPEN_LOOP_IN_FLIGHT) as executor:
+        for i, request in enumerate(itertools.cycle(corpus)):
+            scheduled_time = start + i / qps
+            if scheduled_time - start >= duration:
+                break
+            delay = scheduled_time - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            # a request is submitted only when a thread is free to send it, so it isn't queued in the executor
+            if not in_flight.acquire(blocking=False):
+                recorder.record(0, DROPPED_REQUEST_ERROR)
+                continue
+            executor.submit(send_request, request, scheduled_time)
+
+
+def create_report(name: str, protocol: str, recorder: BenchmarkRecorder, elapsed: float, concurrency: int = None,
+                  qps: float = None) -> dict:
+    histogram = recorder.histogram
+    errors = sum(recorder.errors.values())
+    return {
+        'instance': name,
+        'protocol': protocol,
+        'date': datetime.now(timezone.utc).isoformat(),
+        'load': {'qps': qps} if qps else {'concurrency': concurrency},
+        'duration_s': round(elapsed, 3),
+        'requests': recorder.sent,
+        'errors': errors,
+        'error_rate': errors / recorder.sent if recorder.sent else 0,
+        'errors_by_type': dict(recorder.errors),
+        'offered_qps': recorder.sent / elapsed if elapsed else 0,
+        # rate of responses the instance managed to return successfully
+        'throughput_qps': histogram.total_count / elapsed if elapsed else 0,
+        'latency_ms': {
+            'mean': histogram.mean / 1000,
+            **{f'p{percentile}': histogram.get_percentile(percentile) / 1000 for percentile in REPORTED_PERCENTILES},
+            'max': histogram.max / 1000
+        },
+        'latency_histogram_us': histogram.to_list()
+    }
+
+
+def get_grpc_service_port(name: str, namespace: str) -> int:
+    service = get_k8s_api().read_namespaced_service(name=name, namespace=namespace)
+    grpc_ports = [port.port for port in service.spec.ports if port.name and 'grpc' in port.name]
+    if not grpc_ports:
+        raise RuntimeError(f'service {name} has no gRPC port')
+    return grpc_ports[0]
+
+
+@click.command(short_help=Texts.SHORT_HELP, help=Texts.HELP, cls=AliasCmd, alias='bm',
+               options_metavar='[options]')
+@click.option('-n', '--name', required=True, help=Texts.HELP_N)
+@click.option('-d', '--data', required=True, type=click.Path(exists=True), help=Texts.HELP_D)
+@click.option('-p', '--protocol', type=click.Choice([REST_PROTOCOL, GRPC_PROTOCOL]), default=REST_PROTOCOL,
+              help=Texts.HELP_P)
+@click.option('-nd', '--ndjson', is_flag=True, help=Texts.HELP_ND)
+@click.option('-c', '--concurrency', type=click.IntRange(min=1), help=Texts.HELP_C)
+@click.option('-q', '--qps', type=click.FloatRange(min=0, clamp=False), help=Texts.HELP_Q)
+@click.option('-t', '--duration', type=click.FloatRange(min=0), default=DEFAULT_DURATION, help=Texts.HELP_T)
+@click.option('-m', '--method-verb', default=InferenceVerb.PREDICT.value,
+              type=click.Choice([verb.value for verb in InferenceVerb]), help=Texts.HELP_M)
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help=Texts.HELP_O)
+@common_options(admin_command=False)
+@click.pass_context
+def benchmark(ctx: click.Context, name: str, data: str, protocol: str, ndjson: bool, concurrency: int, qps: float,
+              duration: float, method_verb: str, output: str):
+    """
+    Generates load of a prediction instance and measures its latency and throughput.
+    """
+    if concurrency and qps:
+        handle_error(user_msg=Texts.CONCURRENCY_AND_QPS_ERROR_MSG)
+        exit(2)
+    if qps is not None and qps <= 0:
+        handle_error(user_msg=Texts.INVALID_QPS_ERROR_MSG)
+        exit(2)
+    if not qps:
+        concurrency = concurrency or DEFAULT_CONCURRENCY
+
+    try:
+        namespace = get_kubectl_current_context_namespace()
+        inference_instance = Run.get(name=name, namespace=namespace)
+        if not inference_instance:
+            handle_error(user_msg=Texts.INSTANCE_NOT_EXISTS_ERROR_MSG.format(name=name))
+            exit(1)
+        if not inference_instance.state == RunStatus.RUNNING:
+            handle_error(user_msg=Texts.INSTANCE_NOT_RUNNING_ERROR_MSG
+                         .format(name=name, running_code=RunStatus.RUNNING.value))
+            exit(1)
+    except Exception:
+        handle_error(logger, Texts.INSTANCE_GET_FAIL_ERROR_MSG.format(name=name),
+                     Texts.INSTANCE_GET_FAIL_ERROR_MSG.format(name=name), add_verbosity_msg=ctx.obj.verbosity == 0)
+        exit(1)
+
+    try:
+        if protocol == GRPC_PROTOCOL:
+            corpus = read_grpc_corpus(data, model_name=inference_instance.metadata['annotations']['modelName'])
+        else:
+            corpus = read_rest_corpus(data, ndjson=ndjson)
+    except ImportError:
+        handle_error(logger, Texts.GRPC_MISSING_ERROR_MSG, Texts.GRPC_MISSING_ERROR_MSG)
+        exit(1)
+    except Exception:
+        handle_error(logger, Texts.DATA_LOAD_ERROR_MSG.format(data=data), Texts.DATA_LOAD_ERROR_MSG.format(data=data))
+        exit(1)
+    if not corpus:
+        handle_error(user_msg=Texts.DATA_LOAD_ERROR_MSG.format(data=data))
+        exit(1)
+
+    port_forwarding_process = None
+    sender = None
+    try:
+        if protocol == GRPC_PROTOCOL:
+            # gRPC requests can't pass through the API server proxy used for REST requests
+            port_forwarding_process, tunnel_port = start_service_port_forwarding(
+                service_name=name, namespace=namespace, service_port=get_grpc_service_port(name, namespace))
+            sender = GrpcSender(f'localhost:{tunnel_port}')
+        else:
+            url = f'{get_inference_instance_url(inference_instance=inference_instance)}:{method_verb}'
+            headers = {'Authorization': get_api_key(), 'Accept': 'application/json',
+                       'Content-Type': 'application/json'}
+            sender = RestSender(url=url, headers=headers, max_connections=concurrency or MAX_OPEN_LOOP_IN_FLIGHT)
+
+        click.echo(Texts.BENCHMARK_STARTED_MSG.format(name=name, duration=duration,
+                                                      load=f'{qps} qps' if qps else f'concurrency {concurrency}'))
+        recorder = BenchmarkRecorder()
+        start = perf_counter()
+        if qps:
+            run_open_loop(sender.send, corpus, recorder, qps=qps, duration=duration)
+        else:
+            run_closed_loop(sender.send, corpus, recorder, concurrency=concurrency, duration=duration)
+        elapsed = perf_counter() - start
+    except Exception:
+        handle_error(logger, Texts.BENCHMARK_ERROR_MSG, Texts.BENCHMARK_ERROR_MSG,
+                     add_verbosity_msg=ctx.obj.verbosity == 0)
+        exit(1)
+    finally:
+        if sender:
+            sender.close()
+        if port_forwarding_process:
+            port_forwarding_process.kill()
+
+    report = create_report(name=name, protocol=protocol, recorder=recorder, elapsed=elapsed, concurrency=concurrency,
+                           qps=qps)
+    click.echo(tabulate(format_report_rows(report), tablefmt=TBLT_TABLE_FORMAT))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        click.echo(Texts.REPORT_SAVED_MSG.format(output=output))
+
+
+def format_report_rows(report: dict) -> Iterator[Tuple[str, str]]:
+    yield Texts.REQUESTS_ROW, str(report['requests'])
+    yield Texts.ERRORS_ROW, f"{report['errors']} ({report['error_rate']:.2%})" + \
+        (f" - {', '.join(f'{error}: {count}' for error, count in report['errors_by_type'].items())}"
+         if report['errors_by_type'] else '')
+    yield Texts.OFFERED_QPS_ROW, f"{report['offered_qps']:.1f}"
+    yield Texts.THROUGHPUT_ROW, f"{report['throughput_qps']:.1f}"
+    for key, value in report['latency_ms'].items():
+        yield Texts.LATENCY_ROW.format(key=key), f'{value:.2f}'
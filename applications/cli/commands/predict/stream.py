@@ -14,11 +14,18 @@
 # limitations under the License.
 #
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import json
+import math
+import os
 from sys import exit
+from time import perf_counter
+from typing import Deque, Dict, Iterable, Iterator, List, NamedTuple, TextIO, Tuple
 
 import click
 import requests
+from requests.adapters import HTTPAdapter
 
 from util.cli_state import common_options
 from util.aliascmd import AliasCmd
@@ -32,15 +39,194 @@ from cli_text_consts import PredictStreamCmdTexts as Texts
 
 logger = initialize_logger(__name__)
 
+DEFAULT_CONCURRENCY = 8
+
+# keys of lists of inputs in requests in row format, with keys of lists of their outputs in responses
+BATCHED_KEYS = {'instances': 'predictions', 'examples': 'results'}
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+class StreamStats(NamedTuple):
+    requests: int
+    sent_requests: int
+    errors: int
+    elapsed: float
+    # latencies (in seconds) of requests sent to a prediction instance
+    latencies: List[float]
+
+
+def read_stream_requests(data: str) -> Iterator[dict]:
+    """
+    :param data: NDJSON file with a request in each line, or a directory of JSON files with a request in each file
+    """
+    if os.path.isdir(data):
+        for name in sorted(os.listdir(data)):
+            path = os.path.join(data, name)
+            if os.path.isfile(path):
+                with open(path, 'r', encoding='utf-8') as request_file:
+                    yield json.load(request_file)
+    else:
+        with open(data, 'r', encoding='utf-8') as data_file:
+            for line in data_file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def get_batched_key(request: dict) -> str:
+    """
+    :return: key of the list of inputs of a request in row format, None if it can't be batched
+    """
+    batched_keys = [key for key in BATCHED_KEYS if isinstance(request.get(key), list)]
+    return batched_keys[0] if len(batched_keys) == 1 else None
+
+
+def can_join(batch: List[dict], request: dict) -> bool:
+    key = get_batched_key(request)
+    if not key or get_batched_key(batch[0]) != key:
+        return False
+    # e.g. signature_name has to be the same in all requests of a batch
+    return {k: v for k, v in batch[0].items() if k != key} == {k: v for k, v in request.items() if k != key}
+
+
+def batch_stream_requests(stream_requests: Iterable[dict], batch_size: int) -> Iterator[List[dict]]:
+    """
+    :return: lists of up to batch_size consecutive requests which can be sent as one request
+    """
+    batch: List[dict] = []
+    for request in stream_requests:
+        if batch and (len(batch) >= batch_size or not can_join(batch, request)):
+            yield batch
+            batch = []
+        batch.append(request)
+    if batch:
+        yield batch
+
+
+def join_requests(batch: List[dict]) -> dict:
+    if len(batch) == 1:
+        return batch[0]
+    key = get_batched_key(batch[0])
+    return {**batch[0], key: [item for request in batch for item in request[key]]}
+
+
+def split_response(batch: List[dict], response: dict) -> List[dict]:
+    if len(batch) == 1:
+        return [response]
+    key = get_batched_key(batch[0])
+    outputs = response.get(BATCHED_KEYS[key])
+    sizes = [len(request[key]) for request in batch]
+    if not isinstance(outputs, list) or len(outputs) != sum(sizes):
+        raise ValueError(f'unexpected response to a batch of {sum(sizes)} inputs: {response}')
+
+    responses = []
+    offset = 0
+    for size in sizes:
+        responses.append({**response, BATCHED_KEYS[key]: outputs[offset:offset + size]})
+        offset += size
+    return responses
+
+
+def get_percentile(sorted_values: List[float], percentile: float) -> float:
+    # nearest-rank method
+    return sorted_values[max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)]
+
+
+class StreamClient:
+    """
+    Sends requests to a prediction instance from many threads, over a pool of kept-alive connections.
+    """
+
+    def __init__(self, url: str, headers: Dict[str, str], concurrency: int = DEFAULT_CONCURRENCY):
+        self.url = url
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self.session.verify = False  # nosec - request to k8s cluster
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=concurrency))
+
+    def predict(self, batch: List[dict]) -> Tuple[List[dict], float]:
+        """
+        :return: responses to requests of the batch and latency of the request sent for them
+        """
+        start = perf_counter()
+        response = self.session.post(self.url, data=json.dumps(join_requests(batch)))
+        latency = perf_counter() - start
+        response.raise_for_status()
+        return split_response(batch, response.json()), latency
+
+    def close(self):
+        self.session.close()
+
+
+def stream_requests_to_instance(client: StreamClient, batches: Iterable[List[dict]], output: TextIO,
+                                concurrency: int = DEFAULT_CONCURRENCY) -> StreamStats:
+    """
+    Sends up to concurrency requests at once. Responses are written to the output as NDJSON, in order of requests -
+    a response to a failed request is an object with an error key.
+    """
+    requests_count = 0
+    sent_requests_count = 0
+    errors = 0
+    latencies: List[float] = []
+    # requests sent after the oldest one waiting for a response are limited, so not all of input is kept in memory
+    pending: Deque[Tuple[List[dict], Future]] = deque()
+
+    def write_oldest():
+        nonlocal errors
+        batch, future = pending.popleft()
+        try:
+            responses, latency = future.result()
+            latencies.append(latency)
+        except Exception as e:
+            logger.debug(f'stream request failed: {e}')
+            errors += len(batch)
+            responses = [{'error': str(e)}] * len(batch)
+        for response in responses:
+            output.write(json.dumps(response) + '\n')
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for batch in batches:
+            pending.append((batch, executor.submit(client.predict, batch)))
+            requests_count += len(batch)
+            sent_requests_count += 1
+            while len(pending) > 2 * concurrency:
+                write_oldest()
+        while pending:
+            write_oldest()
+    output.flush()
+
+    return StreamStats(requests=requests_count, sent_requests=sent_requests_count, errors=errors,
+                       elapsed=perf_counter() - start, latencies=latencies)
+
+
+def format_stream_stats(stats: StreamStats) -> str:
+    throughput = stats.requests / stats.elapsed if stats.elapsed else 0
+    msg = Texts.STREAM_STATS_MSG.format(requests=stats.requests, sent_requests=stats.sent_requests,
+                                        errors=stats.errors, elapsed=stats.elapsed, throughput=throughput)
+    if stats.latencies:
+        sorted_latencies = sorted(stats.latencies)
+        msg += Texts.STREAM_LATENCY_MSG.format(
+            percentiles=', '.join(f'p{percentile}: {get_percentile(sorted_latencies, percentile) * 1000:.1f}'
+                                  for percentile in LATENCY_PERCENTILES),
+            max=sorted_latencies[-1] * 1000)
+    return msg
+
 
 @click.command(short_help=Texts.HELP, cls=AliasCmd, alias='s', options_metavar='[options]')
 @click.option('-n', '--name', required=True, help=Texts.HELP_N)
 @click.option('-d', '--data', required=True, type=click.Path(exists=True), help=Texts.HELP_D)
 @click.option('-m', '--method-verb', default=InferenceVerb.PREDICT.value,
               type=click.Choice([verb.value for verb in InferenceVerb]), help=Texts.HELP_M)
+@click.option('-nd', '--ndjson', is_flag=True, help=Texts.HELP_ND)
+@click.option('-c', '--concurrency', type=click.IntRange(min=1), default=DEFAULT_CONCURRENCY, help=Texts.HELP_C)
+@click.option('-b', '--batch-size', type=click.IntRange(min=1), default=1, help=Texts.HELP_B)
+@click.option('-o', '--output', type=click.Path(dir_okay=False, writable=True), help=Texts.HELP_O)
 @common_options(admin_command=False)
 @click.pass_context
-def stream(ctx: click.Context, name: str, data: str, method_verb: InferenceVerb):
+def stream(ctx: click.Context, name: str, data: str, method_verb: InferenceVerb, ndjson: bool, concurrency: int,
+           batch_size: int, output: str):
     """
     Perform stream inference task on launched prediction instance.
     """
@@ -66,6 +252,10 @@ def stream(ctx: click.Context, name: str, data: str, method_verb: InferenceVerb)
                      add_verbosity_msg=ctx.obj.verbosity == 0)
         exit(1)
 
+    if ndjson or os.path.isdir(data):
+        stream_many(url=stream_url, data=data, concurrency=concurrency, batch_size=batch_size, output_path=output)
+        return
+
     try:
         with open(data, 'r', encoding='utf-8') as data_file:
             stream_data = json.load(data_file)
@@ -88,3 +278,37 @@ def stream(ctx: click.Context, name: str, data: str, method_verb: InferenceVerb)
             error_msg += Texts.INFERENCE_ERROR_RESPONSE_MSG.format(response_text=e.response.text)  # type: ignore
         handle_error(logger, error_msg, error_msg)
         exit(1)
+
+
+def stream_many(url: str, data: str, concurrency: int, batch_size: int, output_path: str = None):
+    """
+    Sends requests of NDJSON file or directory concurrently and writes responses as NDJSON, to the output file or
+    to the standard output. Statistics of requests are displayed on the standard error output.
+    """
+    try:
+        api_key = get_api_key()
+        headers = {'Authorization': api_key, 'Accept': 'application/json', 'Content-Type': 'application/json'}
+        client = StreamClient(url=url, headers=headers, concurrency=concurrency)
+        output = open(output_path, 'w', encoding='utf-8') if output_path else click.get_text_stream('stdout')
+        try:
+            stats = stream_requests_to_instance(client=client, output=output, concurrency=concurrency,
+                                                batches=batch_stream_requests(read_stream_requests(data),
+                                                                              batch_size=batch_size))
+        finally:
+            client.close()
+            if output_path:
+                output.close()
+    except (json.JSONDecodeError, IOError):
+        handle_error(logger, Texts.JSON_LOAD_ERROR_MSG.format(data=data),
+                     Texts.JSON_LOAD_ERROR_MSG.format(data=data))
+        exit(1)
+    except Exception as e:
+        error_msg = Texts.INFERENCE_OTHER_ERROR_MSG.format(exception=e)
+        handle_error(logger, error_msg, error_msg)
+        exit(1)
+
+    click.echo(format_stream_stats(stats), err=True)
+    if stats.errors:
+        # standard output may contain only responses
+        click.echo(Texts.STREAM_ERRORS_MSG.format(errors=stats.errors), err=True)
+        exit(1)
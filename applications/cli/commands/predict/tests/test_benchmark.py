@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import json
+import random
+from threading import Event, Lock, Thread
+
+from click.testing import CliRunner
+import pytest
+
+from commands.predict import benchmark
+from platform_resources.run import RunStatus
+from cli_text_consts import PredictBenchmarkCmdTexts as Texts
+
+
+TEST_URL = 'https://nauta.com:8443/api/v1/namespaces/test/services/inf/proxy/v1/models/saved_model_half_plus_three'
+
+
+class BenchmarkMocks:
+    def __init__(self, mocker):
+        self.get_namespace_mock = mocker.patch.object(benchmark, 'get_kubectl_current_context_namespace')
+        self.get_run_mock = mocker.patch.object(benchmark.Run, 'get')
+        self.get_run_mock.return_value.state = RunStatus.RUNNING
+        mocker.patch.object(benchmark, 'get_inference_instance_url').return_value = TEST_URL
+        mocker.patch.object(benchmark, 'get_api_key').return_value = 'Bearer token'
+        self.session_mock = mocker.patch.object(benchmark.requests, 'Session').return_value
+        # calls of a mock are counted without a lock, so posts sent by many threads are counted here
+        self.posts_count = 0
+        posts_lock = Lock()
+
+        def post(url, data, timeout):
+            with posts_lock:
+                self.posts_count += 1
+            return mocker.MagicMock(ok='fail' not in data, status_code=503)
+
+        self.session_mock.post.side_effect = post
+
+
+@pytest.fixture
+def benchmark_mocks(mocker):
+    return BenchmarkMocks(mocker)
+
+
+def test_latency_histogram():
+    histogram = benchmark.LatencyHistogram()
+    latencies = [random.uniform(0.001, 2.0) for _ in range(10000)]
+    for latency in latencies:
+        histogram.record(latency)
+
+    latencies.sort()
+    for percentile in (50, 99, 99.9):
+        expected = latencies[int(percentile / 100 * len(latencies)) - 1] * 1_000_000
+        assert histogram.get_percentile(percentile) == pytest.approx(expected, rel=0.002)
+    assert histogram.total_count == sum(count for _, count in histogram.to_list()) == 10000
+    assert histogram.max == int(latencies[-1] * 1_000_000)
+
+
+def test_benchmark_concurrency(benchmark_mocks):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open('requests.ndjson', 'w') as data_file:
+            data_file.write('{"instances": [1.0]}\n{"instances": [2.0], "fail": true}\n')
+        result = runner.invoke(benchmark.benchmark, ['-n', 'inf', '-d', 'requests.ndjson', '-nd', '-c', '4',
+                                                     '-t', '0.2', '-o', 'report.json'])
+        with open('report.json') as report_file:
+            report = json.load(report_file)
+
+    assert result.exit_code == 0
+    assert benchmark_mocks.session_mock.post.call_args[0][0] == f'{TEST_URL}:predict'
+    assert report['load'] == {'concurrency': 4}
+    assert report['requests'] == benchmark_mocks.posts_count
+    # requests of the corpus are sent in turns
+    assert report['errors_by_type'] == {'503': report['errors']}
+    assert report['errors'] in (report['requests'] // 2, (report['requests'] + 1) // 2)
+    assert sum(count for _, count in report['latency_histogram_us']) == report['requests'] - report['errors']
+    assert Texts.REPORT_SAVED_MSG.format(output='report.json') in result.output
+
+
+def test_benchmark_qps(benchmark_mocks):
+    runner = CliRunner()
+    with runner.isolated_filesystem():
+        with open('request.json', 'w') as data_file:
+            data_file.write('{"instances": [1.0]}')
+        result = runner.invoke(benchmark.benchmark, ['-n', 'inf', '-d', 'request.json', '-q', '50', '-t', '0.5'])
+
+    assert result.exit_code == 0
+    assert benchmark_mocks.session_mock.post.call_count == 25
+    assert Texts.THROUGHPUT_ROW in result.output
+
+
+def test_run_open_loop_dropped_requests(mocker):
+    mocker.patch.object(benchmark, 'MAX_OPEN_LOOP_IN_FLIGHT', 2)
+    responses_sent = Event()
+    recorder = benchmark.BenchmarkRecorder()
+    # the instance doesn't respond until all requests are scheduled
+    open_loop = Thread(target=benchmark.run_open_loop,
+                       kwargs={'send': lambda request: responses_sent.wait() and None, 'corpus': ['request'],
+                               'recorder': recorder, 'qps': 100, 'duration': 0.1})
+    open_loop.start()
+    open_loop.join(timeout=0.5)
+    responses_sent.set()
+    open_loop.join()
+
+    assert recorder.sent == 10
+    assert recorder.errors == {benchmark.DROPPED_REQUEST_ERROR: 8}
+    assert recorder.histogram.total_count == 2
+
+
+def test_run_open_loop_send_exception():
+    recorder = benchmark.BenchmarkRecorder()
+
+    def send(request):
+        if request == 'fail':
+            raise ValueError('invalid request')
+        return None
+
+    benchmark.run_open_loop(send=send, corpus=['request', 'fail'], recorder=recorder, qps=100, duration=0.1)
+
+    assert recorder.sent == 10
+    assert recorder.errors == {'ValueError': 5}
+    assert recorder.histogram.total_count == 5
+
+
+def test_benchmark_concurrency_and_qps(benchmark_mocks):
+    result = CliRunner().invoke(benchmark.benchmark, ['-n', 'inf', '-d', '.', '-q', '50', '-c', '2'])
+
+    assert result.exit_code == 2
+    assert Texts.CONCURRENCY_AND_QPS_ERROR_MSG in result.output
+    assert benchmark_mocks.get_run_mock.call_count == 0
+
+
+def test_benchmark_instance_not_running(benchmark_mocks):
+    benchmark_mocks.get_run_mock.return_value.state = RunStatus.QUEUED
+
+    result = CliRunner().invoke(benchmark.benchmark, ['-n', 'inf', '-d', '.'])
+
+    assert result.exit_code == 1
+    assert benchmark_mocks.session_mock.post.call_count == 0
@@ -14,6 +14,9 @@
 # limitations under the License.
 #
 
+import json
+import os
+
 from click.testing import CliRunner
 import pytest
 
@@ -181,3 +184,66 @@ def test_stream_inference_fail(stream_mocks: StreamPredictMocks):
 
     assert Texts.INFERENCE_OTHER_ERROR_MSG.format(exception=request_error) in result.output
     assert result.exit_code == 1
+
+
+class FakeResponse:
+    def __init__(self, request_body: dict):
+        self.request_body = request_body
+
+    def raise_for_status(self):
+        if 'fail' in self.request_body:
+            raise RuntimeError('500')
+
+    def json(self):
+        return {'predictions': [value + 2.0 for value in self.request_body['instances']]}
+
+
+@pytest.fixture
+def session_mock(mocker):
+    session_mock = mocker.patch('commands.predict.stream.requests.Session').return_value
+    session_mock.post.side_effect = lambda url, data: FakeResponse(json.loads(data))
+    return session_mock
+
+
+def test_stream_ndjson(stream_mocks: StreamPredictMocks, session_mock):
+    stream_requests = [{'instances': [1.0, 2.0]}, {'instances': [3.0]}, {'instances': [4.0], 'fail': True},
+                       {'instances': [5.0]}]
+
+    runner = CliRunner(mix_stderr=False)
+    with runner.isolated_filesystem():
+        with open('data.ndjson', 'w') as data_file:
+            data_file.write('\n'.join(json.dumps(request) for request in stream_requests) + '\n\n')
+        result = runner.invoke(stream.stream, ['--data', 'data.ndjson', '--name', 'inf', '--ndjson', '-c', '2',
+                                               '-b', '2'])
+
+    # requests with the same keys are joined
+    assert session_mock.post.call_count == 3
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {'predictions': [3.0, 4.0]}, {'predictions': [5.0]}, {'error': '500'}, {'predictions': [7.0]}]
+    assert 'Requests: 4, sent requests: 3, errors: 1' in result.stderr
+    assert Texts.STREAM_ERRORS_MSG.format(errors=1) in result.stderr
+    assert result.exit_code == 1
+
+
+def test_stream_directory(stream_mocks: StreamPredictMocks, session_mock):
+    runner = CliRunner(mix_stderr=False)
+    with runner.isolated_filesystem():
+        os.mkdir('requests')
+        for i in range(10):
+            with open(f'requests/{i:02}.json', 'w') as request_file:
+                json.dump({'instances': [float(i)]}, request_file)
+        result = runner.invoke(stream.stream, ['--data', 'requests', '--name', 'inf', '-c', '3', '-o', 'out.ndjson'])
+
+        with open('out.ndjson') as output_file:
+            responses = [json.loads(line) for line in output_file]
+
+    assert result.exit_code == 0
+    assert session_mock.post.call_count == 10
+    # responses are in order of requests
+    assert responses == [{'predictions': [i + 2.0]} for i in range(10)]
+    assert 'p99' in result.stderr
+
+
+def test_split_response_unexpected():
+    with pytest.raises(ValueError):
+        stream.split_response([{'instances': [1]}, {'instances': [2]}], {'predictions': [1]})
@@ -14,6 +14,8 @@
 # limitations under the License.
 #
 
+import hashlib
+import json
 import os
 import shutil
 from http import HTTPStatus
@@ -26,7 +28,6 @@ from cli_text_consts import TemplateListCmdTexts as Texts
 from util.config import Config
 from util.logger import initialize_logger
 from util.exceptions import ExceptionWithMessage
-import commands.experiment.common
 
 
 MODEL_ZOO_ADDRESS_KEY = "model-zoo-address"
@@ -40,6 +41,12 @@ TEMPLATE_REMOTE_VERSION = "Remote version"
 
 TEMPLATE_LIST_HEADERS = [TEMPLATE_NAME, TEMPLATE_DESCRIPTION, TEMPLATE_LOCAL_VERSION, TEMPLATE_REMOTE_VERSION]
 
+# files with cached content of a remote repository's index and with descriptions of local templates
+TEMPLATE_INDEX_CACHE_FILE = "template-index-cache.json"
+LOCAL_TEMPLATES_MANIFEST_FILE = "local-templates-manifest.json"
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 logger = initialize_logger(__name__)
 
 
@@ -54,17 +61,20 @@ class Template:
     DESCRIPTION_MAX_WIDTH = 50
 
     def __init__(self, name: str, description: str, local_version: str = None, remote_version: str = None,
-                 url: str = None):
+                 url: str = None, sha256: str = None):
         self.name = name
         self.description = description
         self.local_version = local_version
         self.remote_version = remote_version
         self.url = url  # Url of remote template's package
+        self.sha256 = sha256  # Checksum of remote template's package, if it is given in repository's index
 
     def representation(self):
-        return str(self.name), commands.experiment.common.wrap_text(str(self.description),
-                                                                    width=Template.DESCRIPTION_MAX_WIDTH, spaces=0),\
-               str(self.local_version), str(self.remote_version)
+        # imported here to avoid circular import - commands.experiment.common imports this module
+        import commands.experiment.common
+        description = commands.experiment.common.wrap_text(str(self.description),
+                                                           width=Template.DESCRIPTION_MAX_WIDTH, spaces=0)
+        return str(self.name), description, str(self.local_version), str(self.remote_version)
 
     def update_chart_yaml(self, chart_yaml_path: str):
         with open(chart_yaml_path, mode='r', encoding='utf-8') as chart_yaml_file:
@@ -90,11 +100,72 @@ class Template:
             raise
 
 
+def _save_json_atomically(path: str, content: dict):
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, mode='w', encoding='utf-8') as file:
+            json.dump(content, file)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_template_index_cache(repository_address: str) -> Optional[dict]:
+    """
+    Returns cached index of a given repository together with its ETag and Last-Modified headers or None
+    if there is no valid cache of this repository.
+    """
+    try:
+        with open(os.path.join(Config().config_path, TEMPLATE_INDEX_CACHE_FILE), mode='r', encoding='utf-8') as file:
+            cache = json.load(file)
+        return cache if cache.get('repository_address') == repository_address else None
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception('Failed to load cached index of templates repository.')
+        return None
+
+
+def save_template_index_cache(repository_address: str, remote_manifest: requests.Response):
+    etag = remote_manifest.headers.get('ETag')
+    last_modified = remote_manifest.headers.get('Last-Modified')
+    if not etag and not last_modified:
+        return
+    try:
+        _save_json_atomically(os.path.join(Config().config_path, TEMPLATE_INDEX_CACHE_FILE),
+                              {'repository_address': repository_address, 'etag': etag,
+                               'last_modified': last_modified, 'index': remote_manifest.json()})
+    except Exception:
+        logger.exception('Failed to save cached index of templates repository.')
+
+
+def get_remote_index(repository_address: str) -> dict:
+    """
+    Returns index of a remote repository. Index is downloaded only if it was changed since it was cached
+    - a request is conditional on ETag and Last-Modified headers of the cached index.
+    """
+    cache = load_template_index_cache(repository_address)
+    headers = {}
+    if cache and cache.get('etag'):
+        headers['If-None-Match'] = cache['etag']
+    if cache and cache.get('last_modified'):
+        headers['If-Modified-Since'] = cache['last_modified']
+
+    remote_manifest = requests.get(f'{repository_address}/index.json', headers=headers)
+    if cache and remote_manifest.status_code == HTTPStatus.NOT_MODIFIED:
+        logger.debug(f'Index of repository {repository_address} not modified, using cached one.')
+        return cache['index']
+
+    remote_manifest.raise_for_status()
+    save_template_index_cache(repository_address, remote_manifest)
+    return remote_manifest.json()
+
+
 def get_remote_templates(repository_address: str) -> Dict[str, Template]:
     try:
-        remote_manifest = requests.get(f'{repository_address}/index.json')
-        remote_manifest.raise_for_status()
-        templates_metadata = remote_manifest.json()['templates']
+        templates_metadata = get_remote_index(repository_address)['templates']
     except requests.exceptions.HTTPError as exe:
         if exe.response.status_code == HTTPStatus.NOT_FOUND:
             logger.exception(ExceptionWithMessage(Texts.MISSING_REPOSITORY.format(
@@ -111,6 +182,7 @@ def get_remote_templates(repository_address: str) -> Dict[str, Template]:
                                                    remote_version=template['version'],
                                                    description=template['description'],
                                                    url=template['url'],
+                                                   sha256=template.get('sha256'),
                                                    local_version=None) for template in templates_metadata}
 
     return remote_templates
@@ -144,9 +216,17 @@ def load_remote_template(name: str, repository_address: str) -> Optional[Templat
 def download_remote_template(template: Template, repository_address: str, output_dir_path: str):
     pack_filename = f'{output_dir_path}/{template.name}-{template.remote_version}.tar.bz2'
 
-    template_pack_tar = requests.get(f'{repository_address}/{template.url}', stream=True)
-    with open(pack_filename, 'wb') as f:
-        f.write(template_pack_tar.raw.read())
+    checksum = hashlib.sha256()
+    with requests.get(f'{repository_address}/{template.url}', stream=True) as template_pack_tar:
+        template_pack_tar.raise_for_status()
+        with open(pack_filename, 'wb') as f:
+            for chunk in template_pack_tar.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                checksum.update(chunk)
+                f.write(chunk)
+
+    if template.sha256 and checksum.hexdigest() != template.sha256.lower():
+        os.remove(pack_filename)
+        raise ExceptionWithMessage(Texts.TEMPLATE_CHECKSUM_MISMATCH.format(template_name=template.name))
 
     shutil.unpack_archive(pack_filename, output_dir_path)
 
@@ -163,18 +243,55 @@ def get_template_version(template_name: str) -> Optional[str]:
     return None
 
 
+def _get_chart_fingerprint(chart_file_location: str) -> Optional[List[int]]:
+    try:
+        return [os.stat(os.path.dirname(chart_file_location)).st_mtime_ns, os.stat(chart_file_location).st_mtime_ns]
+    except OSError:
+        return None
+
+
 def get_local_templates() -> Dict[str, Template]:
+    """
+    Returns templates installed in the packs directory. Descriptions of templates are kept in a manifest file,
+    so only Chart.yaml files whose modification times (or modification times of their directories) changed
+    since the last call are parsed again.
+    """
     local_model_list = {}
     path = os.path.join(Config.get_config_path(), "packs")
+    manifest_path = os.path.join(Config.get_config_path(), LOCAL_TEMPLATES_MANIFEST_FILE)
+
+    try:
+        with open(manifest_path, mode='r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except Exception:
+        manifest = {}
 
-    for (dirpath, dirnames, filenames) in os.walk(path):
-        template_name = os.path.split(os.path.split(dirpath)[0])[1]
-        chart_file_location = os.path.join(path, template_name, Template.CHART_FILE_LOCATION, Template.CHART_FILE_NAME)
-        if os.path.isfile(chart_file_location):
+    new_manifest = {}
+    for template_dir in sorted(os.listdir(path)) if os.path.isdir(path) else []:
+        chart_file_location = os.path.join(path, template_dir, Template.CHART_FILE_LOCATION, Template.CHART_FILE_NAME)
+        fingerprint = _get_chart_fingerprint(chart_file_location)
+        if not fingerprint:
+            continue
+
+        manifest_entry = manifest.get(template_dir)
+        if not manifest_entry or manifest_entry.get('fingerprint') != fingerprint:
             with open(chart_file_location, "r") as file:
                 local_template = extract_chart_description(file.read(), local=True)
-                if local_template:
-                    local_model_list[local_template.name] = local_template
+            manifest_entry = {'fingerprint': fingerprint,
+                              'template': {'name': local_template.name, 'description': local_template.description,
+                                           'local_version': local_template.local_version}
+                              if local_template else None}
+
+        new_manifest[template_dir] = manifest_entry
+        if manifest_entry['template']:
+            local_template = Template(**manifest_entry['template'])
+            local_model_list[local_template.name] = local_template
+
+    if new_manifest != manifest:
+        try:
+            _save_json_atomically(manifest_path, new_manifest)
+        except Exception:
+            logger.exception('Failed to save manifest of local templates.')
 
     return local_model_list
 
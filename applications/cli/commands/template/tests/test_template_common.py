@@ -14,7 +14,7 @@
 # limitations under the License.
 #
 
-import os
+import hashlib
 from unittest import mock
 from unittest.mock import patch, mock_open
 
@@ -25,7 +25,7 @@ import yaml
 import util.config
 from util.exceptions import ExceptionWithMessage
 from commands.template.common import extract_chart_description, Template, get_remote_templates, get_local_templates, \
-    prepare_list_of_templates, get_repository_address
+    prepare_list_of_templates, get_repository_address, get_remote_index, download_remote_template
 from cli_text_consts import TemplateListCmdTexts as Texts
 
 CHART_NAME = "test"
@@ -115,23 +115,94 @@ def test_get_remote_templates_error(mocker):
         get_remote_templates(REPOSITORY_ADDRESS)
 
 
-def test_get_local_templates_success(mocker, monkeypatch):
-    def mockreturn(path):
-        return '/abc'
+def test_get_remote_index_not_modified(mocker, tmpdir):
+    mocker.patch("util.config.Config.get_config_path", return_value=tmpdir.strpath)
+    util.config.Config._Config__shared_state.clear()
+    index = {'templates': [{'name': CHART_NAME, 'version': '1.0.1', 'url': f'{CHART_NAME}.tar.gz',
+                            'description': CHART_DESCRIPTION}]}
+    get_mock = mocker.patch("commands.template.common.requests.get")
+    get_mock.return_value.status_code = 200
+    get_mock.return_value.headers = {'ETag': '"etag"'}
+    get_mock.return_value.json.return_value = index
 
-    monkeypatch.setattr(os.path, 'expanduser', mockreturn)
+    assert get_remote_index(REPOSITORY_ADDRESS) == index
 
-    mocker.patch("os.walk").return_value = [("template_name", "dirnames", "filenames")]
-    mocker.patch("os.path.split").return_value = CHART_NAME
-    mocker.patch("os.path.isfile").return_value = True
-    patch.object(util.config.Config, "get_config_path", return_value="")
+    get_mock.return_value.status_code = 304
+    get_mock.return_value.json.side_effect = ValueError
+
+    assert get_remote_index(REPOSITORY_ADDRESS) == index
+    assert get_mock.call_args[1]['headers'] == {'If-None-Match': '"etag"'}
+    util.config.Config._Config__shared_state.clear()
+
+
+def test_download_remote_template(mocker, tmpdir):
+    package_content = b'package content'
+    get_mock = mocker.patch("commands.template.common.requests.get")
+    response_mock = get_mock.return_value.__enter__.return_value
+    response_mock.iter_content.return_value = [package_content[:5], package_content[5:]]
+    unpack_mock = mocker.patch("commands.template.common.shutil.unpack_archive")
+    template = Template(name=CHART_NAME, description=CHART_DESCRIPTION, remote_version=CHART_VERSION,
+                        url='template.tar.bz2', sha256=hashlib.sha256(package_content).hexdigest())
+
+    download_remote_template(template, REPOSITORY_ADDRESS, tmpdir.strpath)
+
+    assert tmpdir.join(f'{CHART_NAME}-{CHART_VERSION}.tar.bz2').read_binary() == package_content
+    assert unpack_mock.call_count == 1
+
+
+def test_download_remote_template_checksum_mismatch(mocker, tmpdir):
+    get_mock = mocker.patch("commands.template.common.requests.get")
+    get_mock.return_value.__enter__.return_value.iter_content.return_value = [b'package content']
+    unpack_mock = mocker.patch("commands.template.common.shutil.unpack_archive")
+    template = Template(name=CHART_NAME, description=CHART_DESCRIPTION, remote_version=CHART_VERSION,
+                        url='template.tar.bz2', sha256=hashlib.sha256(b'other content').hexdigest())
+
+    with pytest.raises(ExceptionWithMessage):
+        download_remote_template(template, REPOSITORY_ADDRESS, tmpdir.strpath)
+
+    assert not tmpdir.join(f'{CHART_NAME}-{CHART_VERSION}.tar.bz2').check()
+    assert unpack_mock.call_count == 0
+
+
+def test_get_local_templates_success(mocker, tmpdir):
+    config_dir = tmpdir.mkdir('config')
+    mocker.patch("util.config.Config.get_config_path", return_value=config_dir.strpath)
+    config_dir.mkdir('packs').mkdir('template_name').mkdir('charts').join('Chart.yaml').write(CORRECT_CHART_FILE)
+
+    dict = get_local_templates()
+
+    assert len(dict) == 1
+    assert dict[CHART_NAME].name == CHART_NAME
+    assert dict[CHART_NAME].local_version == CHART_VERSION
+
+
+def test_get_local_templates_uses_manifest(mocker, tmpdir):
+    config_dir = tmpdir.mkdir('config')
+    mocker.patch("util.config.Config.get_config_path", return_value=config_dir.strpath)
+    packs_dir = config_dir.mkdir('packs')
+    packs_dir.mkdir('template_name').mkdir('charts').join('Chart.yaml').write(CORRECT_CHART_FILE)
+    packs_dir.mkdir('not_a_template').join('file.txt').write('content')
+
+    get_local_templates()
+    extract_chart_description_mock = mocker.patch('commands.template.common.extract_chart_description')
+    dict = get_local_templates()
+
+    assert extract_chart_description_mock.call_count == 0
+    assert dict[CHART_NAME].description == CHART_DESCRIPTION
+
+
+def test_get_local_templates_changed_chart(mocker, tmpdir):
+    config_dir = tmpdir.mkdir('config')
+    mocker.patch("util.config.Config.get_config_path", return_value=config_dir.strpath)
+    chart_file = config_dir.mkdir('packs').mkdir('template_name').mkdir('charts').join('Chart.yaml')
+    chart_file.write(CORRECT_CHART_FILE)
 
-    with patch("builtins.open", mock_open(read_data=CORRECT_CHART_FILE)), \
-         patch.object(util.config.Config, "get_config_path", return_value="config_path"): # noqa
-        dict = get_local_templates()
+    get_local_templates()
+    chart_file.write(CORRECT_CHART_FILE.replace(CHART_VERSION, LOCAL_CHART_VERSION))
+    chart_file.setmtime(chart_file.mtime() + 10)
+    dict = get_local_templates()
 
-        assert len(dict) == 1
-        assert dict[CHART_NAME].name == CHART_NAME
+    assert dict[CHART_NAME].local_version == LOCAL_CHART_VERSION
 
 
 def test_prepare_list_of_templates(mocker):
@@ -35,6 +35,13 @@ def mock_dependency_map(mocker):
     mocker.patch("commands.verify.verify.get_dependency_map")
 
 
+@pytest.fixture(autouse=True)
+def mock_dependency_cache(mocker):
+    mocker.patch("commands.verify.verify.load_dependency_versions", return_value=None)
+    mocker.patch("commands.verify.verify.load_dependency_fingerprints", return_value=None)
+    mocker.patch("commands.verify.verify.save_dependency_fingerprints")
+
+
 def test_verify_with_kubectl_connection_error(mocker):
     check_connection_mock = mocker.patch.object(verify, "check_connection_to_cluster")
     check_connection_mock.side_effect = KubectlConnectionError("Cannot connect to K8S cluster")
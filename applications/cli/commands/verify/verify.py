@@ -15,11 +15,14 @@
 #
 
 from sys import exit
+import time
 
 import click
 
 from util.cli_state import common_options
-from util.dependencies_checker import check_dependency, get_dependency_map, check_os, save_dependency_versions
+from util.dependencies_checker import check_dependency, get_dependency_map, check_os, save_dependency_versions, \
+    check_dependencies, get_dependency_fingerprints, save_dependency_fingerprints, load_dependency_versions, \
+    load_dependency_fingerprints, get_unchanged_saved_versions, SERVER_DEPENDENCIES
 from util.logger import initialize_logger
 from util.aliascmd import AliasCmd
 from util.k8s.kubectl import check_connection_to_cluster
@@ -35,6 +38,10 @@ from util.exceptions import KubectlConnectionError, InvalidOsError
 logger = initialize_logger(__name__)
 
 
+def format_check_time(duration: float, cached: bool) -> str:
+    return Texts.CACHED_CHECK_TIME_MSG if cached else Texts.CHECK_TIME_MSG.format(duration=duration)
+
+
 @click.command(short_help=Texts.HELP, help=Texts.HELP, cls=AliasCmd, alias='ver', options_metavar='[options]')
 @common_options(verify_dependencies=False, verify_config_path=True)
 @click.pass_context
@@ -50,10 +57,22 @@ def verify(ctx: click.Context):
     kubectl_dependency_name = 'kubectl'
     kubectl_dependency_spec = dependencies[kubectl_dependency_name]
 
+    # versions of local binaries are read from saved versions, as long as binaries were not changed since then
+    fingerprints = get_dependency_fingerprints(dependencies)
+    saved_versions = get_unchanged_saved_versions(saved_versions=load_dependency_versions(),
+                                                  saved_fingerprints=load_dependency_fingerprints(),
+                                                  fingerprints=fingerprints)
+    saved_versions = {dependency_name: version for dependency_name, version in saved_versions.items()
+                      if dependency_name not in SERVER_DEPENDENCIES}
+
     try:
         with spinner(text=Texts.VERIFYING_DEPENDENCY_MSG.format(dependency_name=kubectl_dependency_name)):
+            check_start = time.perf_counter()
             valid, installed_version = check_dependency(dependency_name=kubectl_dependency_name,
-                                                        dependency_spec=kubectl_dependency_spec)
+                                                        dependency_spec=kubectl_dependency_spec,
+                                                        saved_versions=saved_versions)
+            kubectl_check_time = format_check_time(duration=time.perf_counter() - check_start,
+                                                   cached=kubectl_dependency_name in saved_versions)
     except FileNotFoundError:
         handle_error(logger, Texts.KUBECTL_NOT_INSTALLED_ERROR_MSG, Texts.KUBECTL_NOT_INSTALLED_ERROR_MSG,
                      add_verbosity_msg=ctx.obj.verbosity == 0)
@@ -69,7 +88,8 @@ def verify(ctx: click.Context):
     )
 
     if valid:
-        click.echo(Texts.DEPENDENCY_VERIFICATION_SUCCESS_MSG.format(dependency_name=kubectl_dependency_name))
+        click.echo(Texts.DEPENDENCY_VERIFICATION_TIME_MSG.format(dependency_name=kubectl_dependency_name,
+                                                                 check_time=kubectl_check_time))
     else:
         handle_error(logger,
                      Texts.KUBECTL_INVALID_VERSION_ERROR_MSG.format(installed_version=installed_version,
@@ -84,6 +104,7 @@ def verify(ctx: click.Context):
         exit(1)
 
     del dependencies[kubectl_dependency_name]
+    dependency_versions = {kubectl_dependency_name: installed_version}
 
     try:
         with spinner(text=Texts.CHECKING_CONNECTION_TO_CLUSTER_MSG):
@@ -101,13 +122,14 @@ def verify(ctx: click.Context):
                      add_verbosity_msg=ctx.obj.verbosity == 0)
         exit(1)
 
-    dependency_versions = {}
+    with spinner(text=Texts.VERIFYING_DEPENDENCIES_MSG):
+        check_futures = check_dependencies(dependencies=dependencies, namespace=namespace,
+                                           saved_versions=saved_versions)
+
     for dependency_name, dependency_spec in dependencies.items():
         try:
             supported_versions_sign = '==' if dependency_spec.match_exact_version else '>='
-            with spinner(text=Texts.VERIFYING_DEPENDENCY_MSG.format(dependency_name=dependency_name)):
-                valid, installed_version = check_dependency(dependency_name=dependency_name,
-                                                            dependency_spec=dependency_spec, namespace=namespace)
+            valid, installed_version, duration, cached = check_futures[dependency_name].result()
             dependency_versions[dependency_name] = installed_version
             logger.info(
                 Texts.VERSION_CHECKING_MSG.format(
@@ -117,7 +139,8 @@ def verify(ctx: click.Context):
                 )
             )
             if valid:
-                click.echo(Texts.DEPENDENCY_VERIFICATION_SUCCESS_MSG.format(dependency_name=dependency_name))
+                click.echo(Texts.DEPENDENCY_VERIFICATION_TIME_MSG.format(
+                    dependency_name=dependency_name, check_time=format_check_time(duration=duration, cached=cached)))
             else:
                 click.echo(
                     Texts.INVALID_VERSION_WARNING_MSG.format(
@@ -144,8 +167,9 @@ def verify(ctx: click.Context):
             exit(1)
     else:
         # This block is entered if all dependencies were validated successfully
-        # Save dependency versions in a file
+        # Save dependency versions in a file, together with fingerprints of binaries they were read from
         save_dependency_versions(dependency_versions)
+        save_dependency_fingerprints(fingerprints)
 
     try:
         list_of_incorrect_packs = None
@@ -40,7 +40,7 @@ logger = initialize_logger(__name__)
 def workflow_list(ctx: click.Context):
     try:
         namespace = get_kubectl_current_context_namespace()
-        workflows: List[ArgoWorkflow] = ArgoWorkflow.list(namespace=namespace)
+        workflows: List[ArgoWorkflow] = ArgoWorkflow.list(namespace=namespace, brief=True)
         click.echo(tabulate([workflow.cli_representation for workflow in workflows], headers=HEADERS,
                             tablefmt=TBLT_TABLE_FORMAT))
     except Exception:
@@ -0,0 +1,27 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import pytest
+
+from util.k8s.k8s_info import KubernetesSession
+
+
+@pytest.fixture(autouse=True)
+def reset_kubernetes_session():
+    # tests mock kubernetes clients and configuration, so they can't be shared between tests
+    KubernetesSession.reset()
+    yield
+    KubernetesSession.reset()
@@ -14,16 +14,22 @@
 # limitations under the License.
 #
 
+import atexit
 try:
     from http import HTTPStatus  # python3.5+ import
 except ImportError:
     import httplib as HTTPStatus  # python2.7 import
+import json
 import logging
 import os
+import threading
+import time
 
 from kubernetes import config, client
 from kubernetes.client.rest import ApiException
 
+from .series import SERIES_DIR_NAME, SeriesRecorder, parse_value
+
 
 API_GROUP_NAME = 'aipg.intel.com'
 RUN_PLURAL = 'runs'
@@ -31,6 +37,17 @@ RUN_VERSION = 'v1'
 
 MAX_RETRIES_COUNT = 3
 
+NAMESPACE_FILE_PATH = '/var/run/secrets/kubernetes.io/serviceaccount/namespace'
+
+# how often (in seconds) metrics published in the meantime are saved in a Run
+DEFAULT_FLUSH_INTERVAL = 5.0
+FLUSH_INTERVAL_ENV_VAR = 'METRICS_FLUSH_INTERVAL'
+
+# all values of numeric metrics are kept in files on the experiment's output volume, a Run keeps only their summaries
+EXPERIMENT_OUTPUT_DIR = '/mnt/output/experiment'
+SERIES_DIR_ENV_VAR = 'METRICS_SERIES_DIR'
+DEFAULT_SERIES_DIR = os.path.join(EXPERIMENT_OUTPUT_DIR, SERIES_DIR_NAME)
+
 ch = logging.StreamHandler()
 ch.setLevel(logging.INFO)
 logger = logging.getLogger('metrics')
@@ -43,34 +60,232 @@ if run_k8s_name:
     config.load_incluster_config()
     api = client.CustomObjectsApi(client.ApiClient())
 
+_namespace = None
+
+
+def get_namespace():
+    global _namespace
+    if _namespace is None:
+        with open(NAMESPACE_FILE_PATH, 'r') as ns_file:
+            _namespace = ns_file.read()
+    return _namespace
+
 
-def publish(metrics, raise_exception=False):
+def _is_retriable(exception):
+    if isinstance(exception, ApiException):
+        return exception.status in (HTTPStatus.CONFLICT, HTTPStatus.TOO_MANY_REQUESTS) or exception.status >= 500
+    # e.g. a connection error
+    return True
+
+
+def is_chief():
     """
-    Update metrics in specific Run object
-    :param metrics Dict[str,str] of a data to apply
-    :param raise_exception raise exception if any error occurs during metrics publishing, e.g. key conflict
-    :return: with raise_exception=True in case of any problems during update it throws an exception
+    :return: False in processes of a multinode training other than its chief - a rank other than 0 of Horovod / MPI,
+     or a TensorFlow task other than the chief (the first worker, if there is no chief)
     """
-    if not run_k8s_name:
-        logger.info('[no-persist mode] Metrics: {}'.format(metrics))
-        return
+    rank = os.getenv('OMPI_COMM_WORLD_RANK') or os.getenv('PMI_RANK')
+    if rank is not None:
+        return rank == '0'
+    tf_config = json.loads(os.getenv('TF_CONFIG') or '{}')
+    task = tf_config.get('task')
+    if not task:
+        return True
+    cluster = tf_config.get('cluster', {})
+    chief_type = next((task_type for task_type in ('chief', 'master') if task_type in cluster), 'worker')
+    return task.get('type') == chief_type and task.get('index', 0) == 0
 
-    with open('/var/run/secrets/kubernetes.io/serviceaccount/namespace', 'r') as ns_file:
-        namespace = ns_file.read()
 
+def get_series_dir():
+    """
+    :return: directory of series of metrics, None if series aren't stored
+    """
+    series_dir = os.getenv(SERIES_DIR_ENV_VAR)
+    if series_dir:
+        return series_dir
+    # all pods of a multinode training share the output folder - a file of a series can't be appended by many of them,
+    # other processes sharing it (e.g. replicas of a batch inference) are kept out by a lock of the folder of series
+    if not is_chief():
+        return None
+    return DEFAULT_SERIES_DIR if os.path.isdir(EXPERIMENT_OUTPUT_DIR) else None
+
+
+def save_metrics(metrics, series_summaries=None):
+    """
+    Update metrics in specific Run object
+    :param metrics Dict[str,str] of a data to apply
+    :param series_summaries Dict[str,dict] of summaries of series of metrics to apply
+    :return: in case of any problems during update it throws an exception
+    """
     body = {
         "spec": {
             "metrics": metrics
         }
     }
+    if series_summaries:
+        body["spec"]["metrics-series"] = series_summaries
 
     for i in range(MAX_RETRIES_COUNT):
         try:
-            api.patch_namespaced_custom_object(group='aipg.intel.com', namespace=namespace, body=body,
+            api.patch_namespaced_custom_object(group=API_GROUP_NAME, namespace=get_namespace(), body=body,
                                                plural=RUN_PLURAL, version=RUN_VERSION, name=run_k8s_name)
-            break
+            return
         except ApiException as e:
             if e.status != HTTPStatus.CONFLICT or i == MAX_RETRIES_COUNT-1:
-                logger.exception("Exception during saving metrics. All {} retries failed!".format(MAX_RETRIES_COUNT), e)
-                if raise_exception:
-                    raise e
+                raise
+
+
+class MetricsPublisher(object):
+    """
+    Collects published metrics in memory and saves them in a Run by a background thread, at most once per
+    flush_interval seconds - if a metric is published many times in the meantime, only its last value is saved.
+    Metrics not saved yet are saved when the process exits.
+    """
+
+    def __init__(self, flush_interval=DEFAULT_FLUSH_INTERVAL, save=save_metrics, series_dir=None):
+        """
+        :param flush_interval how often (in seconds) collected metrics are saved
+        :param save function saving a Dict[str,str] of metrics and a Dict[str,dict] of summaries of their series
+        :param series_dir directory in which values of numeric metrics are stored, they aren't stored if it's None
+        """
+        self.flush_interval = flush_interval
+        self._save = save
+        self._series_recorder = SeriesRecorder(series_dir) if series_dir else None
+        self._pending = {}
+        self._pending_points = []
+        self._pending_summaries = {}
+        # error of a flush which dropped metrics, raised by the next flush which raises exceptions
+        self._dropped_error = None
+        self._pending_lock = threading.Lock()
+        # metrics are saved by one thread at once, so an older value can't overwrite a newer one
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def publish(self, metrics, step=None, series=True):
+        """
+        Doesn't block - metrics are saved later by the background thread.
+        :param metrics Dict[str,str] of a data to apply
+        :param step step of a training, in which metrics were computed - by default, the next step of each metric
+        :param series append values of numeric metrics to their series
+        """
+        wall_time = time.time()
+        with self._pending_lock:
+            self._pending.update(metrics)
+            if series and self._series_recorder:
+                for key, value in metrics.items():
+                    numeric_value = parse_value(value)
+                    if numeric_value is not None:
+                        self._pending_points.append((key, step, wall_time, numeric_value))
+            if self._thread is None and not self._closed.is_set():
+                self._thread = threading.Thread(target=self._flush_periodically, name='metrics-publisher')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def flush(self, raise_exception=False):
+        """
+        Saves metrics published since the last flush.
+        :param raise_exception raise exception if any error occurs during metrics publishing, e.g. key conflict - also
+         an error which made a previous flush drop metrics
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                metrics, self._pending = self._pending, {}
+                points, self._pending_points = self._pending_points, []
+            # summaries not saved by a failed flush are saved even if no metric has been published since then
+            summaries = self._record_series(points)
+            if metrics or summaries:
+                try:
+                    self._save(metrics, summaries)
+                except Exception as e:
+                    logger.exception("Exception during saving metrics. "
+                                     "All {} retries failed!".format(MAX_RETRIES_COUNT))
+                    if _is_retriable(e):
+                        # saved with the next flush, unless newer values are published in the meantime
+                        with self._pending_lock:
+                            for key, value in metrics.items():
+                                self._pending.setdefault(key, value)
+                        self._pending_summaries = summaries
+                    elif not raise_exception:
+                        # metrics are dropped, e.g. by the background thread - a caller waiting for them to be saved
+                        # learns about it from its next flush
+                        self._dropped_error = e
+                    if raise_exception:
+                        self._dropped_error = None
+                        raise
+            if raise_exception and self._dropped_error is not None:
+                dropped_error, self._dropped_error = self._dropped_error, None
+                raise dropped_error
+
+    def _record_series(self, points):
+        """
+        :return: summaries of series changed since they were saved last time
+        """
+        summaries, self._pending_summaries = self._pending_summaries, {}
+        if points:
+            try:
+                summaries.update(self._series_recorder.record(points))
+            except Exception:
+                # e.g. the output volume isn't writable - metrics are still saved in the Run
+                logger.exception("Exception during saving series of metrics, they won't be saved anymore.")
+                self._series_recorder = None
+        return summaries
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """
+        Stops the background thread and saves metrics which haven't been saved yet.
+        """
+        with self._pending_lock:
+            self._closed.set()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher():
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = MetricsPublisher(flush_interval=float(os.getenv(FLUSH_INTERVAL_ENV_VAR,
+                                                                         DEFAULT_FLUSH_INTERVAL)),
+                                          series_dir=get_series_dir())
+            atexit.register(_publisher.close)
+        return _publisher
+
+
+def publish(metrics, raise_exception=False, step=None, series=True):
+    """
+    Update metrics in specific Run object. Metrics are saved asynchronously, publish doesn't wait for the Kubernetes
+    API, unless raise_exception is set. All values of numeric metrics are appended to their series, unless series
+    is False.
+    :param metrics Dict[str,str] of a data to apply
+    :param raise_exception save metrics at once and raise exception if any error occurs during metrics publishing,
+     e.g. key conflict
+    :param step step of a training, in which metrics were computed - by default, the next step of each metric
+    :param series append values of numeric metrics to their series, e.g. not a progress of a job
+    :return: with raise_exception=True in case of any problems during update it throws an exception
+    """
+    if not run_k8s_name:
+        logger.info('[no-persist mode] Metrics: {}'.format(metrics))
+        return
+
+    publisher = get_publisher()
+    publisher.publish(metrics, step=step, series=series)
+    if raise_exception:
+        publisher.flush(raise_exception=True)
+
+
+def flush():
+    """
+    Saves metrics published so far at once, e.g. before a long operation which doesn't publish metrics.
+    """
+    if run_k8s_name:
+        get_publisher().flush()
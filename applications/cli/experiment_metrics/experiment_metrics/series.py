@@ -0,0 +1,184 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""
+Every published value of a numeric metric is appended to a file of the metric's series, in a directory on the
+experiment's output volume. A file of a series is a sequence of points - step (int64), wall time (float64, seconds
+since the epoch) and value (float64), little endian - so appending a point doesn't need to read the file.
+A Run keeps only a summary of each series, small enough for the Kubernetes API.
+"""
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # e.g. Windows, on which nctl only reads series
+import math
+import os
+import struct
+try:
+    from urllib.parse import quote, unquote  # python3 import
+except ImportError:
+    from urllib import quote, unquote  # python2.7 import
+
+POINT = struct.Struct('<qdd')
+SERIES_FILE_EXTENSION = '.series'
+# folder of series in the experiment's output folder - hidden, so it isn't mixed with files written by a training
+SERIES_DIR_NAME = os.path.join('.nauta', 'metrics-series')
+# a folder of series is locked by the process appending its series
+LOCK_FILE_NAME = '.lock'
+
+# number of points of a series kept in its summary
+MAX_SUMMARY_POINTS = 32
+
+
+def get_series_path(directory, key):
+    # key of a metric can contain any characters, e.g. '/'
+    return os.path.join(directory, quote(key, safe='') + SERIES_FILE_EXTENSION)
+
+
+def list_series_keys(directory):
+    return sorted(unquote(name[:-len(SERIES_FILE_EXTENSION)]) for name in os.listdir(directory)
+                  if name.endswith(SERIES_FILE_EXTENSION))
+
+
+def append_points(directory, key, points):
+    """
+    :param points list of (step, wall time, value) tuples
+    """
+    with open(get_series_path(directory, key), 'ab') as series_file:
+        series_file.write(b''.join(POINT.pack(*point) for point in points))
+
+
+def read_series(directory, key):
+    """
+    :return: list of (step, wall time, value) tuples, an empty list if the series doesn't exist
+    """
+    try:
+        with open(get_series_path(directory, key), 'rb') as series_file:
+            data = series_file.read()
+    except IOError:
+        return []
+    # the last point may be written partially, if a training was killed while writing it
+    return [POINT.unpack_from(data, offset) for offset in range(0, len(data) - POINT.size + 1, POINT.size)]
+
+
+def parse_value(value):
+    """
+    :return: value of a metric as float, None if it's not a number
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SeriesSummary(object):
+    """
+    Number of points of a series, its minimum, maximum and last value, and at most max_points of its points
+    evenly spaced in the series - every n-th point is kept, n is doubled when there are too many points.
+    """
+
+    def __init__(self, max_points=MAX_SUMMARY_POINTS):
+        self.max_points = max_points
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.last_step = None
+        self.points = []
+        self._stride = 1
+
+    def add(self, step, value):
+        # NaN and infinity can't be sent in JSON, they are counted only
+        if not math.isinf(value) and not math.isnan(value):
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+            self.last = value
+            self.last_step = step
+            if self.count % self._stride == 0:
+                self.points.append([step, value])
+                if len(self.points) > self.max_points:
+                    self.points = self.points[::2]
+                    self._stride *= 2
+        self.count += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'min': self.min,
+            'max': self.max,
+            'last': self.last,
+            'last-step': self.last_step,
+            'points': self.points
+        }
+
+
+class SeriesRecorder(object):
+    """
+    Keeps summaries of series of metrics and appends their new points to files in a directory. Not thread-safe.
+    The directory is locked while the recorder exists, so series aren't appended by many processes sharing it.
+    """
+
+    def __init__(self, directory, max_points=MAX_SUMMARY_POINTS):
+        self.directory = directory
+        self.max_points = max_points
+        self._summaries = {}
+        self._next_steps = {}
+        self._lock_file = None
+
+    def _lock_directory(self):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        lock_file = open(os.path.join(self.directory, LOCK_FILE_NAME), 'a')
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except IOError:
+                lock_file.close()
+                raise RuntimeError('series in {} are recorded by another process'.format(self.directory))
+        self._lock_file = lock_file
+
+    def _get_summary(self, key):
+        if key not in self._summaries:
+            # series of a restarted training is continued
+            summary = SeriesSummary(max_points=self.max_points)
+            points = read_series(self.directory, key)
+            for step, _, value in points:
+                summary.add(step, value)
+            self._summaries[key] = summary
+            self._next_steps[key] = points[-1][0] + 1 if points else 0
+        return self._summaries[key]
+
+    def record(self, points):
+        """
+        :param points list of (key, step, wall time, value) tuples, step is None if it wasn't given
+        :return: Dict[str,dict] of summaries of changed series
+        """
+        if self._lock_file is None:
+            self._lock_directory()
+
+        new_points = {}
+        for key, step, wall_time, value in points:
+            summary = self._get_summary(key)
+            step = self._next_steps[key] if step is None else step
+            self._next_steps[key] = step + 1
+            summary.add(step, value)
+            new_points.setdefault(key, []).append((step, wall_time, value))
+
+        for key, key_points in new_points.items():
+            append_points(self.directory, key, key_points)
+        return {key: self._summaries[key].to_dict() for key in new_points}
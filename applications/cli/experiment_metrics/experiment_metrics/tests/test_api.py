@@ -0,0 +1,220 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from http import HTTPStatus
+import multiprocessing
+import threading
+
+from kubernetes.client.rest import ApiException
+import pytest
+
+from experiment_metrics.experiment_metrics import api
+from experiment_metrics.experiment_metrics.api import MetricsPublisher
+from experiment_metrics.experiment_metrics import series
+from experiment_metrics.experiment_metrics.series import list_series_keys, read_series
+
+# the background thread doesn't save metrics during a test, unless the test waits for it
+LONG_FLUSH_INTERVAL = 3600
+
+
+@pytest.fixture
+def save_mock(mocker):
+    return mocker.MagicMock()
+
+
+@pytest.fixture
+def publisher(save_mock):
+    publisher = MetricsPublisher(flush_interval=LONG_FLUSH_INTERVAL, save=save_mock)
+    yield publisher
+    publisher._closed.set()
+
+
+def test_publish_coalesces_keys(publisher: MetricsPublisher, save_mock):
+    publisher.publish({'accuracy': '0.5'})
+    publisher.publish({'accuracy': '0.7', 'loss': '1.2'})
+
+    publisher.flush()
+
+    save_mock.assert_called_once_with({'accuracy': '0.7', 'loss': '1.2'}, {})
+
+
+def test_flush_nothing_published(publisher: MetricsPublisher, save_mock):
+    publisher.flush(raise_exception=True)
+
+    assert save_mock.call_count == 0
+
+
+def test_flush_periodically(mocker):
+    saved = threading.Event()
+    save_mock = mocker.MagicMock(side_effect=lambda metrics, summaries: saved.set())
+    publisher = MetricsPublisher(flush_interval=0.01, save=save_mock)
+
+    publisher.publish({'accuracy': '0.5'})
+
+    assert saved.wait(timeout=5)
+    publisher.close()
+    save_mock.assert_called_once_with({'accuracy': '0.5'}, {})
+
+
+def test_flush_retriable_error_requeued(publisher: MetricsPublisher, save_mock):
+    save_mock.side_effect = [ApiException(status=HTTPStatus.INTERNAL_SERVER_ERROR), None]
+    publisher.publish({'accuracy': '0.5', 'loss': '1.2'})
+    publisher.flush()
+
+    publisher.publish({'accuracy': '0.7'})
+    publisher.flush(raise_exception=True)
+
+    # a value published after the failure isn't overwritten by the failed one
+    save_mock.assert_called_with({'accuracy': '0.7', 'loss': '1.2'}, {})
+
+
+def test_flush_not_retriable_error_dropped(publisher: MetricsPublisher, save_mock):
+    save_mock.side_effect = ApiException(status=HTTPStatus.UNPROCESSABLE_ENTITY)
+    publisher.publish({'accuracy': '0.5'})
+    # e.g. metrics taken by the background thread
+    publisher.flush()
+
+    with pytest.raises(ApiException):
+        publisher.flush(raise_exception=True)
+
+    assert save_mock.call_count == 1
+    # the error is raised once
+    publisher.flush(raise_exception=True)
+
+
+def test_flush_raise_exception(publisher: MetricsPublisher, save_mock):
+    save_mock.side_effect = ApiException(status=HTTPStatus.UNPROCESSABLE_ENTITY)
+    publisher.publish({'accuracy': '0.5'})
+
+    with pytest.raises(ApiException):
+        publisher.flush(raise_exception=True)
+
+
+def test_flush_series_summaries(tmpdir, save_mock):
+    save_mock.side_effect = [ApiException(status=HTTPStatus.CONFLICT), None]
+    publisher = MetricsPublisher(flush_interval=LONG_FLUSH_INTERVAL, save=save_mock, series_dir=tmpdir.strpath)
+    publisher.publish({'loss': '1.5', 'model': 'resnet'})
+    publisher.flush()
+
+    publisher.publish({'loss': '0.5'})
+    publisher.close()
+
+    # summary of points of the failed flush is saved with the next one
+    metrics, summaries = save_mock.call_args[0]
+    assert metrics == {'loss': '0.5', 'model': 'resnet'}
+    assert summaries['loss']['count'] == 2
+    assert summaries['loss']['points'] == [[0, 1.5], [1, 0.5]]
+
+
+def test_publish_without_series(tmpdir, save_mock):
+    publisher = MetricsPublisher(flush_interval=LONG_FLUSH_INTERVAL, save=save_mock, series_dir=tmpdir.strpath)
+    publisher.publish({'progress': '50.0'}, series=False)
+    publisher.publish({'loss': '1.5'})
+    publisher.close()
+
+    metrics, summaries = save_mock.call_args[0]
+    assert metrics == {'progress': '50.0', 'loss': '1.5'}
+    assert list(summaries) == ['loss']
+    assert list_series_keys(tmpdir.strpath) == ['loss']
+
+
+def publish_in_other_process(series_dir, published, finished):
+    publisher = MetricsPublisher(flush_interval=LONG_FLUSH_INTERVAL, save=lambda metrics, summaries: None,
+                                 series_dir=series_dir)
+    publisher.publish({'loss': '1.5'})
+    publisher.flush()
+    published.set()
+    finished.wait()
+
+
+@pytest.mark.skipif(series.fcntl is None, reason='folders of series are locked with fcntl')
+def test_publishers_sharing_series_dir(tmpdir, save_mock):
+    # e.g. replicas of a batch inference, which aren't processes of a multinode training
+    context = multiprocessing.get_context('fork')
+    published, finished = context.Event(), context.Event()
+    other_process = context.Process(target=publish_in_other_process, args=(tmpdir.strpath, published, finished))
+    other_process.start()
+    try:
+        assert published.wait(timeout=10)
+        publisher = MetricsPublisher(flush_interval=LONG_FLUSH_INTERVAL, save=save_mock, series_dir=tmpdir.strpath)
+        publisher.publish({'loss': '0.5'})
+        publisher.close()
+    finally:
+        finished.set()
+        other_process.join()
+
+    # metrics are saved in the Run, but a series is appended only by the process which locked the folder
+    save_mock.assert_called_once_with({'loss': '0.5'}, {})
+    assert [value for _, _, value in read_series(tmpdir.strpath, 'loss')] == [1.5]
+
+
+def test_close(publisher: MetricsPublisher, save_mock):
+    publisher.publish({'accuracy': '0.5'})
+    thread = publisher._thread
+
+    publisher.close()
+
+    save_mock.assert_called_once_with({'accuracy': '0.5'}, {})
+    assert not thread.is_alive()
+    # metrics published after close are saved only by a flush
+    publisher.publish({'accuracy': '0.7'})
+    assert publisher._thread is thread
+
+
+def test_get_publisher_closed_at_exit(mocker):
+    mocker.patch.object(api, '_publisher', None)
+    register_mock = mocker.patch.object(api.atexit, 'register')
+
+    publisher = api.get_publisher()
+
+    assert api.get_publisher() is publisher
+    register_mock.assert_called_once_with(publisher.close)
+
+
+@pytest.mark.parametrize('environment,expected', [
+    ({}, True),
+    ({'OMPI_COMM_WORLD_RANK': '0'}, True),
+    ({'OMPI_COMM_WORLD_RANK': '2'}, False),
+    ({'PMI_RANK': '1'}, False),
+    ({'TF_CONFIG': '{"cluster": {"ps": ["ps-0"], "worker": ["w-0", "w-1"]}, "task": {"type": "worker", "index": 0}}'},
+     True),
+    ({'TF_CONFIG': '{"cluster": {"ps": ["ps-0"], "worker": ["w-0", "w-1"]}, "task": {"type": "worker", "index": 1}}'},
+     False),
+    ({'TF_CONFIG': '{"cluster": {"ps": ["ps-0"], "worker": ["w-0", "w-1"]}, "task": {"type": "ps", "index": 0}}'},
+     False),
+    ({'TF_CONFIG': '{"cluster": {"chief": ["c-0"], "worker": ["w-0"]}, "task": {"type": "worker", "index": 0}}'},
+     False),
+    ({'TF_CONFIG': '{"cluster": {"chief": ["c-0"], "worker": ["w-0"]}, "task": {"type": "chief", "index": 0}}'},
+     True),
+])
+def test_is_chief(monkeypatch, environment, expected):
+    for variable in ('OMPI_COMM_WORLD_RANK', 'PMI_RANK', 'TF_CONFIG'):
+        monkeypatch.delenv(variable, raising=False)
+    for variable, value in environment.items():
+        monkeypatch.setenv(variable, value)
+
+    assert api.is_chief() == expected
+
+
+def test_get_series_dir_not_chief(mocker, monkeypatch):
+    monkeypatch.delenv(api.SERIES_DIR_ENV_VAR, raising=False)
+    mocker.patch.object(api.os.path, 'isdir', return_value=True)
+    mocker.patch.object(api, 'is_chief', return_value=False)
+
+    assert api.get_series_dir() is None
+
+    monkeypatch.setenv(api.SERIES_DIR_ENV_VAR, '/mnt/output/experiment/metrics-worker-1')
+    assert api.get_series_dir() == '/mnt/output/experiment/metrics-worker-1'
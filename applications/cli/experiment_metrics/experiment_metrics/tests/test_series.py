@@ -0,0 +1,91 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+
+import pytest
+
+from experiment_metrics.experiment_metrics.series import SeriesRecorder, SeriesSummary, append_points, \
+    get_series_path, list_series_keys, parse_value, read_series
+
+
+def test_append_points(tmpdir):
+    append_points(tmpdir.strpath, 'acc/top1', [(0, 10.0, 0.5)])
+    append_points(tmpdir.strpath, 'acc/top1', [(1, 11.0, 0.6), (2, 12.0, 0.7)])
+
+    assert read_series(tmpdir.strpath, 'acc/top1') == [(0, 10.0, 0.5), (1, 11.0, 0.6), (2, 12.0, 0.7)]
+    assert os.path.basename(get_series_path(tmpdir.strpath, 'acc/top1')) == 'acc%2Ftop1.series'
+    assert list_series_keys(tmpdir.strpath) == ['acc/top1']
+
+
+def test_read_series_partial_point(tmpdir):
+    append_points(tmpdir.strpath, 'loss', [(0, 10.0, 1.5), (1, 11.0, 1.2)])
+    with open(get_series_path(tmpdir.strpath, 'loss'), 'ab') as series_file:
+        series_file.write(b'\x01' * 7)
+
+    assert read_series(tmpdir.strpath, 'loss') == [(0, 10.0, 1.5), (1, 11.0, 1.2)]
+
+
+def test_read_series_missing(tmpdir):
+    assert read_series(tmpdir.strpath, 'loss') == []
+
+
+@pytest.mark.parametrize('value,expected', [('0.5', 0.5), ('3', 3.0), ('resnet', None), (None, None)])
+def test_parse_value(value, expected):
+    assert parse_value(value) == expected
+
+
+def test_summary():
+    summary = SeriesSummary()
+    for step, value in enumerate([3.0, 1.0, float('nan'), 4.0, 2.0]):
+        summary.add(step, value)
+
+    assert summary.to_dict() == {'count': 5, 'min': 1.0, 'max': 4.0, 'last': 2.0, 'last-step': 4,
+                                 'points': [[0, 3.0], [1, 1.0], [3, 4.0], [4, 2.0]]}
+
+
+def test_summary_downsampled():
+    summary = SeriesSummary(max_points=4)
+    for step in range(10):
+        summary.add(step, float(step))
+
+    # every second point is kept after the fifth one, every fourth after the ninth one
+    assert summary.points == [[0, 0.0], [4, 4.0], [8, 8.0]]
+    assert (summary.count, summary.min, summary.max, summary.last) == (10, 0.0, 9.0, 9.0)
+
+
+def test_recorder(tmpdir):
+    recorder = SeriesRecorder(tmpdir.join('metrics').strpath)
+
+    recorder.record([('loss', None, 10.0, 1.5), ('loss', None, 11.0, 1.2), ('acc', 100, 11.0, 0.5)])
+    summaries = recorder.record([('loss', None, 12.0, 0.9)])
+
+    assert read_series(recorder.directory, 'loss') == [(0, 10.0, 1.5), (1, 11.0, 1.2), (2, 12.0, 0.9)]
+    assert read_series(recorder.directory, 'acc') == [(100, 11.0, 0.5)]
+    # only changed series are summarized
+    assert list(summaries) == ['loss']
+    assert summaries['loss']['last-step'] == 2
+    assert summaries['loss']['min'] == 0.9
+
+
+def test_recorder_continues_series(tmpdir):
+    append_points(tmpdir.strpath, 'loss', [(0, 10.0, 1.5), (1, 11.0, 1.2)])
+
+    summaries = SeriesRecorder(tmpdir.strpath).record([('loss', None, 12.0, 0.9)])
+
+    assert summaries['loss']['count'] == 3
+    assert summaries['loss']['max'] == 1.5
+    assert read_series(tmpdir.strpath, 'loss')[-1] == (2, 12.0, 0.9)
@@ -21,25 +21,28 @@ import sys
 import traceback
 import click
 import logging
-
-import psutil
-
-from commands.experiment import experiment
-from commands.launch import launch
-from commands.predict import predict
-from commands.user import user
-from commands.verify import verify
-from commands.mount import mount
-from commands.version import version
-from commands.config import config
-from commands.workflow import workflow
-from commands.template import template
-from commands.model import model
+from typing import TYPE_CHECKING
 
 from util.aliascmd import AliasGroup
 from util.logger import initialize_logger, setup_log_file, configure_logger_for_external_packages
 from util.config import Config
-from util.cli_state import verify_cli_config_path
+from cli_text_consts import ExperimentCmdTexts, WorkflowCmdTexts, LaunchCmdTexts, PredictCmdTexts, UserCmdTexts, \
+    VerifyCmdTexts, VersionCmdTexts, MountCmdTexts, ConfigCmdTexts, TemplateCmdTexts, ModelCmdTexts
+
+if TYPE_CHECKING:
+    # Commands are imported lazily by their import paths (see COMMANDS below). These imports are never executed,
+    # they are here only so that static tools (mypy, PyInstaller's dependency analysis) still follow all commands.
+    import commands.experiment.experiment  # noqa: F401
+    import commands.workflow.workflow  # noqa: F401
+    import commands.launch.launch  # noqa: F401
+    import commands.predict.predict  # noqa: F401
+    import commands.user.user  # noqa: F401
+    import commands.verify.verify  # noqa: F401
+    import commands.version  # noqa: F401
+    import commands.mount  # noqa: F401
+    import commands.config  # noqa: F401
+    import commands.template.template  # noqa: F401
+    import commands.model.model  # noqa: F401
 
 logger = initialize_logger(__name__)
 
@@ -63,6 +66,22 @@ On Windows, run following command in order to enable UTF-8 encoding:
 chcp 65001
 """
 
+# name, import path, alias and short help of each command - commands are imported only when they are invoked,
+# so aliases and short helps have to be the same as those given in commands' decorators
+COMMANDS = [
+    ('experiment', 'commands.experiment.experiment:experiment', 'exp', ExperimentCmdTexts.SHORT_HELP),
+    ('workflow', 'commands.workflow.workflow:workflow', 'wf', WorkflowCmdTexts.HELP),
+    ('launch', 'commands.launch.launch:launch', 'l', LaunchCmdTexts.HELP),
+    ('predict', 'commands.predict.predict:predict', 'p', PredictCmdTexts.HELP),
+    ('user', 'commands.user.user:user', 'u', UserCmdTexts.HELP),
+    ('verify', 'commands.verify.verify:verify', 'ver', VerifyCmdTexts.HELP),
+    ('version', 'commands.version:version', 'v', VersionCmdTexts.HELP),
+    ('mount', 'commands.mount:mount', 'm', MountCmdTexts.HELP),
+    ('config', 'commands.config:config', 'cfg', ConfigCmdTexts.HELP),
+    ('template', 'commands.template.template:template', 'tmp', TemplateCmdTexts.HELP),
+    ('model', 'commands.model.model:model', 'mo', ModelCmdTexts.HELP),
+]
+
 
 def signal_handler(sig, frame):
     """
@@ -70,6 +89,8 @@ def signal_handler(sig, frame):
     :param sig: received signal
     :param frame: stack frame
     """
+    import psutil
+
     logger.debug(f'Received signal {sig}.')
     for proc in psutil.Process(os.getpid()).children(recursive=True):
         logger.debug(f'Terminating {proc.pid} child process.')
@@ -88,6 +109,7 @@ def configure_cli_logs():
 
     log_file_directory = os.environ.get('NAUTA_CTL_LOG_DIRECTORY')
     if not log_file_directory:
+        from util.cli_state import verify_cli_config_path
         verify_cli_config_path()
         log_file_directory = '{}/logs'.format(Config().config_path)
 
@@ -118,17 +140,9 @@ def entry_point():
     configure_cli_logs()
 
 
-entry_point.add_command(experiment.experiment)
-entry_point.add_command(workflow.workflow)
-entry_point.add_command(launch.launch)
-entry_point.add_command(predict.predict)
-entry_point.add_command(user.user)
-entry_point.add_command(verify.verify)
-entry_point.add_command(version)
-entry_point.add_command(mount)
-entry_point.add_command(config)
-entry_point.add_command(template.template)
-entry_point.add_command(model.model)
+for command_name, command_import_path, command_alias, command_short_help in COMMANDS:
+    entry_point.add_lazy_command(name=command_name, import_path=command_import_path, alias=command_alias,
+                                 short_help=command_short_help)
 
 if __name__ == '__main__':
     # Register signal handler
@@ -20,7 +20,7 @@ import sre_constants
 from collections import namedtuple
 from enum import Enum
 from functools import partial
-from typing import List, Dict
+from typing import Dict, Iterator, List
 
 from kubernetes import client
 from kubernetes.client import CustomObjectsApi
@@ -30,9 +30,9 @@ from marshmallow_enum import EnumField
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
 from platform_resources.custom_object_meta_model import validate_kubernetes_name
 from platform_resources.platform_resource import PlatformResource, KubernetesObjectSchema, KubernetesObject, \
-    PlatformResourceApiClient
+    join_selectors
 from platform_resources.resource_filters import filter_by_name_regex, filter_by_state
-from platform_resources.run import Run, filter_by_run_kinds
+from platform_resources.run import Run, run_kinds_selector
 from util.exceptions import InvalidRegularExpressionError
 from util.logger import initialize_logger
 from util.system import format_timestamp_for_cli
@@ -167,12 +167,20 @@ class Experiment(PlatformResource):
         :return: List of Experiment objects
         """
         logger.debug('Listing experiments.')
+        return list(cls.iterate(namespace=namespace, custom_objects_api=custom_objects_api, **kwargs))
+
+    @classmethod
+    def iterate(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                **kwargs) -> Iterator['Experiment']:
+        """
+        Yield experiments, takes the same parameters as list(). Run kinds and label selector are passed to
+        Kubernetes API, so only matching experiments are transferred, page by page.
+        """
         state = kwargs.pop('state', None)
         run_kinds_filter = kwargs.pop('run_kinds_filter', None)
         name_filter = kwargs.pop('name_filter', None)
         label_selector = kwargs.pop('label_selector', None)
 
-        raw_experiments = cls.list_raw_experiments(namespace=namespace, label_selector=label_selector)
         try:
             name_regex = re.compile(name_filter) if name_filter else None
         except sre_constants.error as e:
@@ -180,15 +188,16 @@ class Experiment(PlatformResource):
             logger.exception(error_msg)
             raise InvalidRegularExpressionError(error_msg) from e
 
+        # a state is kept only in a spec of an experiment, so experiments are filtered by it on the client side
         experiment_filters = [partial(filter_by_name_regex, name_regex=name_regex),
-                              partial(filter_by_state, state=state),
-                              partial(filter_by_run_kinds, run_kinds=run_kinds_filter)]
-
-        experiments = [Experiment.from_k8s_response_dict(experiment_dict)
-                       for experiment_dict in raw_experiments['items']
-                       if all(f(experiment_dict) for f in experiment_filters)]
+                              partial(filter_by_state, state=state)]
 
-        return experiments
+        raw_experiments = cls.iterate_raw(namespace=namespace, custom_objects_api=custom_objects_api,
+                                          label_selector=join_selectors(label_selector,
+                                                                        run_kinds_selector(run_kinds_filter)))
+        for experiment_dict in raw_experiments:
+            if all(f(experiment_dict) for f in experiment_filters):
+                yield Experiment.from_k8s_response_dict(experiment_dict)
 
     @classmethod
     def list_raw_experiments(cls, namespace: str = None, label_selector: str = "",
@@ -199,16 +208,5 @@ class Experiment(PlatformResource):
         :param str label_selector: A selector to restrict the list of returned objects by their labels.
          Defaults to everything.
         """
-        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
-            raw_experiments = k8s_custom_object_api.list_namespaced_custom_object(group=Experiment.api_group_name,
-                                                                                  namespace=namespace,
-                                                                                  plural=Experiment.crd_plural_name,
-                                                                                  version=Experiment.crd_version,
-                                                                                  label_selector=label_selector)
-        else:
-            raw_experiments = k8s_custom_object_api.list_cluster_custom_object(group=Experiment.api_group_name,
-                                                                               plural=Experiment.crd_plural_name,
-                                                                               version=Experiment.crd_version,
-                                                                               label_selector=label_selector)
-        return raw_experiments
+        return {'items': list(cls.iterate_raw(namespace=namespace, label_selector=label_selector,
+                                              custom_objects_api=custom_objects_api))}
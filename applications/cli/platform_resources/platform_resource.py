@@ -15,19 +15,37 @@
 #
 
 import http
-from typing import Dict, List, Optional, NamedTuple, TypeVar
+from typing import Any, Dict, Iterator, List, Optional, NamedTuple, Tuple, TypeVar
 
 import yaml
-from kubernetes import client, config
+from kubernetes import client
 
 from kubernetes.client import CustomObjectsApi
 from kubernetes.client.rest import ApiException
 from marshmallow import Schema, fields, post_load
 from platform_resources.custom_object_meta_model import V1ObjectMetaSchema
+from util.k8s.k8s_info import KubernetesSession
 from util.logger import initialize_logger
 
 logger = initialize_logger(__name__)
 
+# number of objects returned by Kubernetes API in one response of a paged list request
+LIST_PAGE_SIZE = 500
+
+# full objects are returned by servers which don't support these representations of lists
+TABLE_ACCEPT_HEADER = 'application/json;as=Table;v=v1;g=meta.k8s.io,' \
+                      'application/json;as=Table;v=v1beta1;g=meta.k8s.io,application/json'
+PARTIAL_OBJECT_METADATA_ACCEPT_HEADER = 'application/json;as=PartialObjectMetadataList;v=v1;g=meta.k8s.io,' \
+                                        'application/json;as=PartialObjectMetadataList;v=v1beta1;g=meta.k8s.io,' \
+                                        'application/json'
+
+
+def join_selectors(*selectors: Optional[str]) -> str:
+    """
+    Joins label or field selectors, so objects matching all of them are selected. Empty selectors are skipped.
+    """
+    return ','.join(selector for selector in selectors if selector)
+
 
 class KubernetesObject(object):
     def __init__(self, spec, metadata: client.V1ObjectMeta, apiVersion: str='aipg.intel.com/v1',
@@ -62,8 +80,7 @@ class PlatformResourceApiClient:
             return cls.k8s_custom_object_api
         else:
             try:
-                config.load_kube_config()
-                k8s_custom_object_api = client.CustomObjectsApi(client.ApiClient())
+                k8s_custom_object_api = client.CustomObjectsApi(KubernetesSession.get_api_client())
                 cls.k8s_custom_object_api = k8s_custom_object_api
                 return cls.k8s_custom_object_api
             except Exception:
@@ -79,6 +96,8 @@ class PlatformResource:
     api_group_name: str
     crd_plural_name: str
     crd_version: str
+    # names of printer columns of a CRD mapped to paths of fields whose values they show
+    table_columns: Dict[str, Tuple[str, ...]] = {}
 
     def __init__(self, body: dict = None, name: str = None, namespace: str = None,
                  creation_timestamp: str = None, k8s_custom_object_api: CustomObjectsApi = None):
@@ -133,6 +152,103 @@ class PlatformResource:
 
         return [cls.from_k8s_response_dict(raw_resource) for raw_resource in raw_resources['items']]
 
+    @classmethod
+    def _list_pages(cls, namespace: str = None, label_selector: str = None, field_selector: str = None,
+                    custom_objects_api: CustomObjectsApi = None, page_size: int = LIST_PAGE_SIZE,
+                    accept: str = 'application/json') -> Iterator[dict]:
+        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
+        path_params = {'group': cls.api_group_name, 'version': cls.crd_version, 'plural': cls.crd_plural_name}
+        if namespace:
+            path = '/apis/{group}/{version}/namespaces/{namespace}/{plural}'
+            path_params['namespace'] = namespace
+        else:
+            path = '/apis/{group}/{version}/{plural}'
+
+        continue_token = None
+        while True:
+            query_params = [('limit', page_size)]
+            if label_selector:
+                query_params.append(('labelSelector', label_selector))
+            if field_selector:
+                query_params.append(('fieldSelector', field_selector))
+            if continue_token:
+                query_params.append(('continue', continue_token))
+
+            # generated list methods of CustomObjectsApi don't accept limit and continue parameters
+            page = k8s_custom_object_api.api_client.call_api(path, 'GET', path_params, query_params,
+                                                             {'Accept': accept}, response_type='object',
+                                                             auth_settings=['BearerToken'],
+                                                             _return_http_data_only=True)
+            yield page
+
+            continue_token = page.get('metadata', {}).get('continue')
+            if not continue_token:
+                return
+
+    @classmethod
+    def iterate_raw(cls, namespace: str = None, label_selector: str = None, field_selector: str = None,
+                    custom_objects_api: CustomObjectsApi = None, page_size: int = LIST_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Yields raw objects matching given selectors. Objects are requested in pages of page_size objects, so
+        selection is done by Kubernetes API and a next page is requested only when objects of a previous one
+        were consumed.
+        :param namespace: If provided, only objects from this namespace will be returned
+        :param label_selector: A selector to restrict the list of returned objects by their labels
+        :param field_selector: A selector to restrict the list of returned objects by their fields
+        """
+        logger.debug(f'Iterating over {cls.__name__}s.')
+        for page in cls._list_pages(namespace=namespace, label_selector=label_selector, field_selector=field_selector,
+                                    custom_objects_api=custom_objects_api, page_size=page_size):
+            yield from page['items']
+
+    @classmethod
+    def iterate_metadata(cls, namespace: str = None, label_selector: str = None, field_selector: str = None,
+                         custom_objects_api: CustomObjectsApi = None,
+                         page_size: int = LIST_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Works like iterate_raw(), but only metadata of objects is requested (as PartialObjectMetadataList), so
+        yielded objects contain only apiVersion, kind and metadata fields.
+        """
+        logger.debug(f'Iterating over metadata of {cls.__name__}s.')
+        for page in cls._list_pages(namespace=namespace, label_selector=label_selector, field_selector=field_selector,
+                                    custom_objects_api=custom_objects_api, page_size=page_size,
+                                    accept=PARTIAL_OBJECT_METADATA_ACCEPT_HEADER):
+            yield from page['items']
+
+    @classmethod
+    def iterate_table(cls, namespace: str = None, label_selector: str = None, field_selector: str = None,
+                      custom_objects_api: CustomObjectsApi = None, page_size: int = LIST_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Works like iterate_raw(), but objects are requested as a Table, so only metadata and values of printer
+        columns of a CRD are transferred. Yielded objects contain metadata and fields given by table_columns,
+        so they can be passed to from_k8s_response_dict().
+        """
+        logger.debug(f'Iterating over table of {cls.__name__}s.')
+        column_names: List[str] = []
+        for page in cls._list_pages(namespace=namespace, label_selector=label_selector, field_selector=field_selector,
+                                    custom_objects_api=custom_objects_api, page_size=page_size,
+                                    accept=TABLE_ACCEPT_HEADER):
+            if page.get('kind') != 'Table':
+                yield from page['items']
+                continue
+            if page.get('columnDefinitions'):
+                column_names = [column['name'] for column in page['columnDefinitions']]
+            for row in page['rows']:
+                yield cls.object_from_table_row(dict(zip(column_names, row['cells'])), row.get('object', {}))
+
+    @classmethod
+    def object_from_table_row(cls, cells: Dict[str, Any], row_object: dict) -> dict:
+        object_dict: Dict[str, Any] = {'metadata': row_object.get('metadata', {})}
+        for column_name, field_path in cls.table_columns.items():
+            value = cells.get(column_name)
+            if value is None or value == '':
+                continue
+            parent = object_dict
+            for key in field_path[:-1]:
+                parent = parent.setdefault(key, {})
+            parent[field_path[-1]] = value
+        return object_dict
+
     @classmethod
     def get(cls, name: str, namespace: str = None,
             custom_objects_api: CustomObjectsApi = None) -> Optional[PlatformResourceTypeVar]:
@@ -22,7 +22,7 @@ import re
 import sre_constants
 import textwrap
 from functools import partial
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Set
 
 from kubernetes.client import CustomObjectsApi
 from marshmallow import Schema, fields, post_load
@@ -63,6 +63,11 @@ class Run(PlatformResource):
     api_group_name = 'aipg.intel.com'
     crd_plural_name = 'runs'
     crd_version = 'v1'
+    table_columns = {'State': ('spec', 'state'),
+                     'Experiment': ('spec', 'experiment-name'),
+                     'Template': ('spec', 'pod-selector', 'matchLabels', 'app'),
+                     'Start': ('spec', 'start-time'),
+                     'End': ('spec', 'end-time')}
 
     RunCliModel = namedtuple('RunCliModel', ['name', 'parameters', 'metrics',
                                              'submission_date', 'start_date', 'duration', 'submitter', 'status',
@@ -72,12 +77,15 @@ class Run(PlatformResource):
                  pod_count: int = None, pod_selector: dict = None,
                  state: RunStatus = None, namespace: str = None,
                  creation_timestamp: str = None, template_name: str = None, metadata: dict = None,
-                 start_timestamp: str = None, end_timestamp: str = None, template_version: str = None):
+                 start_timestamp: str = None, end_timestamp: str = None, template_version: str = None,
+                 metrics_series: dict = None):
         super().__init__()
         self.name = name
         self.parameters = parameters
         self.state = state
         self.metrics = metrics
+        # summaries of all values of numeric metrics - count, min, max, last value and some of their points
+        self.metrics_series = metrics_series
         self.experiment_name = experiment_name
         self.pod_count = pod_count
         self.pod_selector = pod_selector
@@ -107,6 +115,7 @@ class Run(PlatformResource):
                    pod_selector=object_dict.get('spec', {}).get('pod-selector'),
                    experiment_name=object_dict.get('spec', {}).get('experiment-name'),
                    metrics=object_dict.get('spec', {}).get('metrics', {}),
+                   metrics_series=object_dict.get('spec', {}).get('metrics-series'),
                    template_name=object_dict.get('spec', {}).get('pod-selector', {}).get('matchLabels', {}).get('app'),
                    metadata=object_dict.get('metadata'),
                    start_timestamp=object_dict.get('spec', {}).get('start-time'),
@@ -123,6 +132,8 @@ class Run(PlatformResource):
         :param excl_state: If provided, only runs with a state other than given will be returned
         :param run_kinds_filter: If provided, only runs with a kind that matches to any of the run kinds from given
             filtering list will be returned
+        :param brief: If True, runs are requested as a table, so returned runs have only metadata, state, experiment
+            name, template name and start and end times set
         :return: List of Run objects
         In case of problems during getting a list of runs - throws an error
         """
@@ -131,9 +142,13 @@ class Run(PlatformResource):
         exp_name_filter = kwargs.pop('exp_name_filter', None)
         excl_state = kwargs.pop('excl_state', None)
         run_kinds_filter = kwargs.pop('run_kinds_filter', None)
+        brief = kwargs.pop('brief', False)
         
         k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
+        if brief:
+            raw_runs = {'items': list(cls.iterate_table(namespace=namespace, custom_objects_api=k8s_custom_object_api,
+                                                        label_selector=run_kinds_selector(run_kinds_filter)))}
+        elif namespace:
             raw_runs = k8s_custom_object_api.list_namespaced_custom_object(group=Run.api_group_name,
                                                                            namespace=namespace,
                                                                            plural=Run.crd_plural_name,
@@ -258,3 +273,24 @@ def filter_run_by_excl_state(resource_object_dict: dict, state: Enum = None):
 def filter_by_run_kinds(resource_object_dict: dict, run_kinds: List[Enum] = None):
     return any([resource_object_dict.get('metadata', {}).get('labels', {}).get('runKind')
                 == run_kind.value for run_kind in run_kinds]) if run_kinds else True
+
+
+def run_kinds_selector(run_kinds: List[Enum] = None) -> Optional[str]:
+    """
+    Returns a label selector matching objects of any of given run kinds, the same objects as filter_by_run_kinds.
+    """
+    return f'runKind in ({",".join(run_kind.value for run_kind in run_kinds)})' if run_kinds else None
+
+
+def get_names_of_experiments_with_runs(experiment_names: List[str], namespace: str = None,
+                                       custom_objects_api: CustomObjectsApi = None) -> Set[str]:
+    """
+    Returns names of those of given experiments which have runs. Runs are selected by the experimentName label,
+    so only runs of given experiments are requested, instead of all runs of a namespace.
+    """
+    if not experiment_names:
+        return set()
+    label_selector = f'experimentName in ({",".join(experiment_names)})'
+    return {raw_run['metadata']['labels']['experimentName']
+            for raw_run in Run.iterate_metadata(namespace=namespace, label_selector=label_selector,
+                                                custom_objects_api=custom_objects_api)}
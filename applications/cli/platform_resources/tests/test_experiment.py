@@ -19,6 +19,7 @@ import pytest
 from kubernetes.client import CustomObjectsApi
 
 from platform_resources.experiment import ExperimentStatus, Experiment
+from platform_resources.run import RunKinds
 from platform_resources.experiment_utils import generate_exp_name_and_labels
 from util.exceptions import SubmitExperimentError, InvalidRegularExpressionError
 
@@ -101,7 +102,7 @@ def test_create_experiment(mock_platform_resources_api_client: CustomObjectsApi)
     assert result.metadata.namespace == NAMESPACE
 
 def test_list_experiments(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     experiments = Experiment.list()
     assert TEST_EXPERIMENTS == experiments
 
@@ -109,7 +110,7 @@ def test_list_experiments(mock_platform_resources_api_client: CustomObjectsApi):
 def test_list_experiments_from_namespace(mock_platform_resources_api_client: CustomObjectsApi):
     raw_experiments_single_namespace = dict(LIST_EXPERIMENTS_RESPONSE_RAW)
     raw_experiments_single_namespace['items'] = [raw_experiments_single_namespace['items'][0]]
-    mock_platform_resources_api_client.list_namespaced_custom_object.return_value = raw_experiments_single_namespace
+    mock_platform_resources_api_client.api_client.call_api.return_value = raw_experiments_single_namespace
 
     experiments = Experiment.list(namespace='namespace-1')
 
@@ -117,19 +118,45 @@ def test_list_experiments_from_namespace(mock_platform_resources_api_client: Cus
 
 
 def test_list_experiments_filter_status(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     experiments = Experiment.list(state=ExperimentStatus.CREATING)
     assert [TEST_EXPERIMENTS[0]] == experiments
 
 
 def test_list_experiments_name_filter(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     experiments = Experiment.list(name_filter='test-experiment-new')
     assert [TEST_EXPERIMENTS[1]] == experiments
 
 
+def test_list_experiments_run_kinds_filter(mock_platform_resources_api_client: CustomObjectsApi):
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    Experiment.list(namespace='namespace-1', run_kinds_filter=[RunKinds.TRAINING, RunKinds.JUPYTER],
+                    label_selector='script_name=train.py')
+
+    path, _, path_params, query_params, _ = mock_platform_resources_api_client.api_client.call_api.call_args[0]
+    assert path_params['namespace'] == 'namespace-1'
+    assert ('labelSelector', 'script_name=train.py,runKind in (training,jupyter)') in query_params
+
+
+def test_iterate_experiments_pages(mock_platform_resources_api_client: CustomObjectsApi):
+    first_page = dict(LIST_EXPERIMENTS_RESPONSE_RAW, items=LIST_EXPERIMENTS_RESPONSE_RAW['items'][:1],
+                      metadata={'continue': 'next-page'})
+    second_page = dict(LIST_EXPERIMENTS_RESPONSE_RAW, items=LIST_EXPERIMENTS_RESPONSE_RAW['items'][1:],
+                       metadata={})
+    call_api_mock = mock_platform_resources_api_client.api_client.call_api
+    call_api_mock.side_effect = [first_page, second_page]
+
+    experiments = Experiment.iterate()
+
+    assert next(experiments) == TEST_EXPERIMENTS[0]
+    assert call_api_mock.call_count == 1
+    assert list(experiments) == TEST_EXPERIMENTS[1:]
+    assert ('continue', 'next-page') in call_api_mock.call_args[0][3]
+
+
 def test_list_experiments_invalid_name_filter(mock_platform_resources_api_client: CustomObjectsApi):
-    mock_platform_resources_api_client.list_cluster_custom_object.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
+    mock_platform_resources_api_client.api_client.call_api.return_value = LIST_EXPERIMENTS_RESPONSE_RAW
     with pytest.raises(InvalidRegularExpressionError):
         Experiment.list(name_filter='*')
 
@@ -20,7 +20,7 @@ from kubernetes.client import CustomObjectsApi
 from kubernetes.client.rest import ApiException
 
 from platform_resources.platform_resource import KubernetesObject
-from platform_resources.run import Run, RunStatus
+from platform_resources.run import Run, RunStatus, get_names_of_experiments_with_runs
 from util.exceptions import InvalidRegularExpressionError
 
 TEST_RUNS = [Run(name="exp-mnist-single-node.py-18.05.17-16.05.45-1-tf-training",
@@ -268,3 +268,63 @@ def test_add_run_failure(mock_k8s_run_api_client: CustomObjectsApi):
     run = Run(name=RUN_NAME, experiment_name='fake')
     with pytest.raises(ApiException):
         run.create(namespace=NAMESPACE)
+
+
+def test_get_names_of_experiments_with_runs(mock_k8s_api_client):
+    mock_k8s_api_client.api_client.call_api.return_value = {
+        'items': [{'metadata': {'name': 'exp-1-1', 'labels': {'experimentName': 'exp-1'}}},
+                  {'metadata': {'name': 'exp-1-2', 'labels': {'experimentName': 'exp-1'}}}],
+        'metadata': {}}
+
+    names = get_names_of_experiments_with_runs(['exp-1', 'exp-2'], namespace='namespace-1')
+
+    assert names == {'exp-1'}
+    query_params = mock_k8s_api_client.api_client.call_api.call_args[0][3]
+    assert ('labelSelector', 'experimentName in (exp-1,exp-2)') in query_params
+
+
+def test_get_names_of_experiments_with_runs_no_experiments(mock_k8s_api_client):
+    assert get_names_of_experiments_with_runs([], namespace='namespace-1') == set()
+    assert mock_k8s_api_client.api_client.call_api.call_count == 0
+
+
+RUNS_TABLE_RESPONSE_RAW = {
+    'kind': 'Table', 'apiVersion': 'meta.k8s.io/v1beta1', 'metadata': {'continue': ''},
+    'columnDefinitions': [{'name': 'Name', 'type': 'string'}, {'name': 'State', 'type': 'string'},
+                          {'name': 'Experiment', 'type': 'string'}, {'name': 'Template', 'type': 'string'},
+                          {'name': 'Start', 'type': 'string'}, {'name': 'End', 'type': 'string'}],
+    'rows': [{'cells': ['exp-1', 'RUNNING', 'exp', 'tf-training', '2018-04-26T13:43:01Z', None],
+              'object': {'kind': 'PartialObjectMetadata',
+                         'metadata': {'name': 'exp-1', 'namespace': 'namespace-1',
+                                      'creationTimestamp': '2018-04-26T13:43:01Z',
+                                      'labels': {'runKind': 'training'}}}},
+             {'cells': ['exp-2', 'QUEUED', 'exp', 'tf-training', None, None],
+              'object': {'kind': 'PartialObjectMetadata',
+                         'metadata': {'name': 'exp-2', 'namespace': 'namespace-1',
+                                      'creationTimestamp': '2018-04-26T13:45:01Z',
+                                      'labels': {'runKind': 'jupyter'}}}}]}
+
+
+def test_list_runs_brief(mock_k8s_api_client):
+    mock_k8s_api_client.api_client.call_api.return_value = RUNS_TABLE_RESPONSE_RAW
+
+    runs = Run.list(namespace='namespace-1', brief=True, state_list=[RunStatus.RUNNING])
+
+    assert len(runs) == 1
+    assert runs[0].name == 'exp-1'
+    assert runs[0].namespace == 'namespace-1'
+    assert runs[0].creation_timestamp == '2018-04-26T13:43:01Z'
+    assert runs[0].experiment_name == 'exp'
+    assert runs[0].template_name == 'tf-training'
+    assert runs[0].start_timestamp == '2018-04-26T13:43:01Z'
+    assert runs[0].end_timestamp is None
+    assert 'as=Table' in mock_k8s_api_client.api_client.call_api.call_args[0][4]['Accept']
+    assert mock_k8s_api_client.list_namespaced_custom_object.call_count == 0
+
+
+def test_list_runs_brief_without_table_support(mock_k8s_api_client):
+    mock_k8s_api_client.api_client.call_api.return_value = LIST_RUNS_RESPONSE_RAW
+
+    runs = Run.list(brief=True)
+
+    assert [(run.name, run.state) for run in runs] == [(run.name, run.state) for run in TEST_RUNS]
@@ -346,3 +346,36 @@ def test_add_process_with_steps_in_process(mocker):
             assert pwt
 
     assert flow_template_exists
+
+
+def test_iterate_workflows(mocker):
+    api_mock = MagicMock()
+    api_mock.api_client.call_api.return_value = {'items': [{'metadata': {'name': 'model-export-1', 'namespace': 'ns'}},
+                                                           {'metadata': {'name': 'other-1', 'namespace': 'ns'}}],
+                                                 'metadata': {'continue': ''}}
+
+    workflows = list(ArgoWorkflow.iterate(namespace='ns', custom_objects_api=api_mock, name_filter='model',
+                                          label_selector='experimentName=exp-1'))
+
+    assert [workflow.name for workflow in workflows] == ['model-export-1']
+    path, _, path_params, query_params, _ = api_mock.api_client.call_api.call_args[0]
+    assert path_params['namespace'] == 'ns'
+    assert ('labelSelector', 'experimentName=exp-1') in query_params
+
+
+def test_iterate_workflows_brief():
+    api_mock = MagicMock()
+    api_mock.api_client.call_api.return_value = {
+        'kind': 'Table', 'metadata': {},
+        'columnDefinitions': [{'name': 'Name'}, {'name': 'Phase'}, {'name': 'Finished'}],
+        'rows': [{'cells': ['model-export-1', 'Succeeded', '2019-05-05T10:00:00Z'],
+                  'object': {'metadata': {'name': 'model-export-1', 'namespace': 'ns',
+                                          'creationTimestamp': '2019-05-05T09:00:00Z'}}}]}
+
+    workflows = list(ArgoWorkflow.iterate(namespace='ns', custom_objects_api=api_mock, brief=True))
+
+    assert len(workflows) == 1
+    assert workflows[0].name == 'model-export-1'
+    assert workflows[0].phase == 'Succeeded'
+    assert workflows[0].started_at == '2019-05-05T09:00:00Z'
+    assert workflows[0].finished_at == '2019-05-05T10:00:00Z'
@@ -94,7 +94,8 @@ class User(PlatformResource):
 
         # Get experiment runs for each user
         # TODO: CHANGE IMPLEMENTATION TO USE AGGREGATED USER DATA AFTER CAN-366
-        runs = Run.list(custom_objects_api=k8s_custom_object_api)
+        # only states and creation times of runs are used, so they are requested as a table
+        runs = Run.list(custom_objects_api=k8s_custom_object_api, brief=True)
         user_map = {user.name: user for user in users}
 
         for run in runs:
@@ -15,17 +15,16 @@
 #
 
 from collections import namedtuple
-from functools import partial
 import re
 import sre_constants
 import time
-from typing import List
+from typing import Iterator, List
 
 from kubernetes.client import CustomObjectsApi
 from typing import Optional
 
 from cli_text_consts import PlatformResourcesExperimentsTexts as Texts
-from platform_resources.platform_resource import PlatformResource, PlatformResourceApiClient
+from platform_resources.platform_resource import PlatformResource
 from platform_resources.resource_filters import filter_by_name_regex
 from util.config import NAUTA_NAMESPACE, NAUTAConfigMap
 from util.exceptions import InvalidRegularExpressionError
@@ -59,6 +58,8 @@ class ArgoWorkflow(PlatformResource):
     api_group_name = 'argoproj.io'
     crd_plural_name = 'workflows'
     crd_version = 'v1alpha1'
+    table_columns = {'Phase': ('status', 'phase'),
+                     'Finished': ('status', 'finishedAt')}
 
     ArgoWorkflowCliModel = namedtuple('ArgoWorkflowModel', ['name', 'started_at', 'finished_at', 'submitter', 'phase'])
 
@@ -210,41 +211,37 @@ class ArgoWorkflow(PlatformResource):
         Return list of experiment runs.
         :param namespace: If provided, only workflows from this namespace will be returned
         :param label_selector: If provided, only workflows matching label_selector expression will be returned
+        :param name_filter: If provided, only workflows matching name_filter regular expression will be returned
+        :param brief: If True, workflows are requested as a table, so returned workflows have only metadata, phase
+            and finish time set
         :return: List of AgroWorkflow objects
         In case of problems during getting a list of workflows - throws an error
         """
+        return list(cls.iterate(namespace=namespace, custom_objects_api=custom_objects_api, **kwargs))
+
+    @classmethod
+    def iterate(cls, namespace: str = None, custom_objects_api: CustomObjectsApi = None,
+                **kwargs) -> Iterator['ArgoWorkflow']:
+        """
+        Yield workflows, takes the same parameters as list(). Workflows are selected by Kubernetes API
+        and transferred page by page.
+        """
         label_selector = kwargs.pop('label_selector', '')
         name_filter = kwargs.pop('name_filter', None)
-
-        k8s_custom_object_api = custom_objects_api if custom_objects_api else PlatformResourceApiClient.get()
-        if namespace:
-            raw_runs = k8s_custom_object_api.list_namespaced_custom_object(group=ArgoWorkflow.api_group_name,
-                                                                           namespace=namespace,
-                                                                           plural=ArgoWorkflow.crd_plural_name,
-                                                                           version=ArgoWorkflow.crd_version,
-                                                                           label_selector=label_selector)
-        else:
-            raw_runs = k8s_custom_object_api.list_cluster_custom_object(group=ArgoWorkflow.api_group_name,
-                                                                        plural=ArgoWorkflow.crd_plural_name,
-                                                                        version=ArgoWorkflow.crd_version,
-                                                                        label_selector=label_selector)
-
-        if name_filter:
-            try:
-                name_regex = re.compile(name_filter) if name_filter else None
-            except sre_constants.error as e:
-                error_msg = Texts.REGEX_COMPILATION_FAIL_MSG.format(name_filter=name_filter)
-                logger.exception(error_msg)
-                raise InvalidRegularExpressionError(error_msg) from e
-
-            run_filters = [partial(filter_by_name_regex, name_regex=name_regex, spec_location=False)]
-
-            runs = [ArgoWorkflow.from_k8s_response_dict(run_dict)
-                    for run_dict in raw_runs['items']
-                    if all(f(run_dict) for f in run_filters)]
-        else:
-            runs = [ArgoWorkflow.from_k8s_response_dict(run_dict) for run_dict in raw_runs['items']]
-        return runs
+        brief = kwargs.pop('brief', False)
+
+        try:
+            name_regex = re.compile(name_filter) if name_filter else None
+        except sre_constants.error as e:
+            error_msg = Texts.REGEX_COMPILATION_FAIL_MSG.format(name_filter=name_filter)
+            logger.exception(error_msg)
+            raise InvalidRegularExpressionError(error_msg) from e
+
+        iterate_workflow_dicts = cls.iterate_table if brief else cls.iterate_raw
+        for workflow_dict in iterate_workflow_dicts(namespace=namespace, custom_objects_api=custom_objects_api,
+                                                    label_selector=label_selector):
+            if filter_by_name_regex(workflow_dict, name_regex=name_regex, spec_location=False):
+                yield ArgoWorkflow.from_k8s_response_dict(workflow_dict)
 
 
 class ExperimentImageBuildWorkflow(ArgoWorkflow):
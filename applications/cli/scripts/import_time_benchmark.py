@@ -0,0 +1,120 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Measures start time of nctl for each of its commands. Every command is run with --help in a separate
+python process started with -X importtime, so results contain both the total time spent on importing
+modules and the wall clock time of the whole run.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+CLI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, CLI_DIR)
+
+from main import COMMANDS, ERROR_MESSAGE  # noqa: E402
+
+
+IMPORT_TIME_PREFIX = 'import time:'
+
+
+def parse_import_times(importtime_output: str) -> List[Tuple[str, int, int]]:
+    """
+    Parses output of python -X importtime.
+    :return: list of (module name, self time in us, cumulative time in us) of top level imports
+    """
+    top_level_imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        try:
+            self_time, cumulative_time, module = line[len(IMPORT_TIME_PREFIX):].split('|')
+            self_us, cumulative_us = int(self_time), int(cumulative_time)
+        except ValueError:
+            # header line
+            continue
+        # nested imports are indented by two spaces per level, module's name is preceded by one space
+        if module.startswith('  '):
+            continue
+        top_level_imports.append((module.strip(), self_us, cumulative_us))
+    return top_level_imports
+
+
+def measure_command(command: List[str]) -> Dict:
+    env = dict(os.environ, NAUTA_CTL_LOG_DISABLE='1')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', 'main.py'] + command + ['--help'], cwd=CLI_DIR,
+                            env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    wall_time_ms = (time.perf_counter() - start) * 1000
+    imports = parse_import_times(result.stderr.decode('utf-8'))
+    return {
+        'command': ' '.join(command) or '(none)',
+        'wall_time_ms': round(wall_time_ms, 1),
+        'import_time_ms': round(sum(cumulative for _, _, cumulative in imports) / 1000, 1),
+        'top_imports': [{'module': module, 'time_ms': round(cumulative / 1000, 1)}
+                        for module, _, cumulative in sorted(imports, key=lambda i: i[2], reverse=True)[:5]],
+        # nctl catches all exceptions, so a failure of a command is detected also by its output
+        'failed': result.returncode != 0 or ERROR_MESSAGE in result.stdout.decode('utf-8')
+    }
+
+
+def measure_commands(repeat: int) -> List[Dict]:
+    results = []
+    for command in [[]] + [[name] for name, *_ in COMMANDS]:
+        # the fastest of runs is the least affected by other processes
+        measurements = [measure_command(command) for _ in range(repeat)]
+        results.append(min(measurements, key=lambda m: m['wall_time_ms']))
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measures import time and start latency of nctl commands.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each command.')
+    parser.add_argument('--output', help='Path to a JSON file where results should be saved.')
+    parser.add_argument('--max-import-time-ms', type=float,
+                        help='Fail if import time of any of commands exceeds the given value.')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    benchmark_results = measure_commands(repeat=args.repeat)
+
+    print(f'{"command":<12} {"wall time [ms]":>15} {"import time [ms]":>17}  slowest imports')
+    for r in benchmark_results:
+        slowest = ', '.join(f'{i["module"]} ({i["time_ms"]})' for i in r['top_imports'][:3])
+        print(f'{r["command"]:<12} {r["wall_time_ms"]:>15} {r["import_time_ms"]:>17}  {slowest}')
+
+    failed_commands = [r['command'] for r in benchmark_results if r['failed']]
+    if failed_commands:
+        print(f'Following commands failed: {", ".join(failed_commands)}')
+        exit(1)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(benchmark_results, output_file, indent=2)
+
+    if args.max_import_time_ms and any(r['import_time_ms'] > args.max_import_time_ms for r in benchmark_results):
+        print(f'Import time of some of commands exceeds {args.max_import_time_ms} ms.')
+        exit(1)
+    exit(0)
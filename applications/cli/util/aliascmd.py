@@ -14,6 +14,9 @@
 # limitations under the License.
 #
 
+from importlib import import_module
+from typing import Dict, NamedTuple
+
 import click
 
 
@@ -26,35 +29,79 @@ class AliasCmd(click.Command):
         return self._alias
 
 
+class LazyCommand(NamedTuple):
+    """
+    Subcommand registered in AliasGroup by its import path. Module of the command is imported only when
+    the command is resolved, alias and short_help are kept here so that help can be displayed without
+    importing it.
+    """
+    import_path: str  # in a form of 'package.module:attribute'
+    alias: str = ''
+    short_help: str = ''
+
+    def load(self) -> click.Command:
+        module_name, attribute_name = self.import_path.split(':')
+        return getattr(import_module(module_name), attribute_name)
+
+
 class AliasGroup(click.Group):
     def __init__(self, *args, **kwargs):
         self._alias = kwargs.pop('alias', '')
+        self.lazy_commands: Dict[str, LazyCommand] = {}
         super(AliasGroup, self).__init__(*args, **kwargs)
 
     def alias(self):
         return self._alias
 
-    def get_command(self, ctx, cmd_name):
+    def add_lazy_command(self, name: str, import_path: str, alias: str = '', short_help: str = ''):
+        """
+        Registers a subcommand which is imported on first use instead of at the start of the application.
+        :param name: name of a subcommand
+        :param import_path: location of a subcommand in a form of 'package.module:attribute'
+        :param alias: alias of a subcommand, it has to be the same as the one given in the subcommand's decorator
+        :param short_help: short help of a subcommand displayed in a list of commands
+        """
+        self.lazy_commands[name] = LazyCommand(import_path=import_path, alias=alias, short_help=short_help)
+
+    def list_commands(self, ctx):
+        return sorted(set(self.commands) | set(self.lazy_commands))
+
+    def _resolve_command(self, ctx, cmd_name):
         rv = click.Group.get_command(self, ctx, cmd_name)
+        if rv is None and cmd_name in self.lazy_commands:
+            rv = self.lazy_commands.pop(cmd_name).load()
+            self.add_command(rv, cmd_name)
+        return rv
+
+    def _get_alias(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands:
+            return self.lazy_commands[cmd_name].alias
+        cmd = click.Group.get_command(self, ctx, cmd_name)
+        return cmd.alias() if hasattr(cmd, 'alias') else None
+
+    def get_command(self, ctx, cmd_name):
+        rv = self._resolve_command(ctx, cmd_name)
         if rv is not None:
             return rv
-        matches = [x for x in self.list_commands(ctx)
-                   if hasattr(click.Group.get_command(self, ctx, x), 'alias')
-                   and click.Group.get_command(self, ctx, x).alias() == cmd_name]
+        matches = [x for x in self.list_commands(ctx) if self._get_alias(ctx, x) == cmd_name]
         if not matches:
             return None
 
-        return click.Group.get_command(self, ctx, matches[0])
+        return self._resolve_command(ctx, matches[0])
 
     def format_commands(self, ctx, formatter):
         helper = []
         for cmd in self.list_commands(ctx):
             if cmd is None:
                 continue
-            c = self.get_command(ctx, cmd)
-            alias = c.alias() if hasattr(c, 'alias') else ''
+            if cmd in self.lazy_commands:
+                alias = self.lazy_commands[cmd].alias
+                cmd_help = self.lazy_commands[cmd].short_help
+            else:
+                c = self.get_command(ctx, cmd)
+                alias = c.alias() if hasattr(c, 'alias') else ''
+                cmd_help = c.short_help or ''
             cmd_name = '{0}, {1}'.format(cmd, alias)
-            cmd_help = c.short_help or ''
             helper.append((cmd_name, cmd_help))
         if helper:
             with formatter.section('Commands'):
@@ -17,7 +17,6 @@
 import os
 import sys
 
-from util.k8s.k8s_info import get_config_map_data
 from util.logger import initialize_logger
 from cli_text_consts import UtilConfigTexts as Texts
 
@@ -118,6 +117,8 @@ class NAUTAConfigMap:
     def __init__(self, config_map_request_timeout: int = None):
         self.__dict__ = self.__shared_state
         if not self.__dict__:
+            # imported here, as importing of the kubernetes client takes a significant part of nctl's start time
+            from util.k8s.k8s_info import get_config_map_data
             config_map_data = get_config_map_data(name=NAUTA_CONFIGURATION_CM, namespace=NAUTA_NAMESPACE,
                                                   request_timeout=config_map_request_timeout)
             self.registry = config_map_data[self.REGISTRY_FIELD]
@@ -15,9 +15,12 @@
 #
 
 from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
 from distutils.version import LooseVersion
 import re
 import os
+import shutil
+import time
 from typing import Optional, Dict, Tuple
 
 import yaml
@@ -46,6 +49,14 @@ HELM_SERVER_CONNECTION_TIMEOUT = 30
 NAMESPACE_PLACEHOLDER = '<namespace>'
 
 DEPENDENCY_VERSIONS_FILE_SUFFIX = '-dependency-versions.yaml'
+DEPENDENCY_FINGERPRINTS_FILE_SUFFIX = '-dependency-fingerprints.yaml'
+# fingerprint of a binary which cannot be found - a version of its dependency is saved anyway, so it isn't checked
+# again by each command, until the binary is found
+MISSING_BINARY_FINGERPRINT = 'missing'
+
+# versions of these dependencies are read from the cluster, so the state of a local binary doesn't tell whether they
+# changed
+SERVER_DEPENDENCIES = {'kubectl server', 'helm server'}
 """
 namedtuple for holding binary dependency specification.
 expected_version: expected dependency version
@@ -59,6 +70,14 @@ DependencySpec = namedtuple('DependencySpec', [
     'expected_version', 'version_command', 'version_command_args',
     'version_field', 'match_exact_version'
 ])
+"""
+namedtuple for holding a result of a timed dependency check.
+valid: validation status
+installed_version: installed version of dependency
+duration: time of the check in seconds
+cached: if True, version was taken from saved versions instead of running the version command
+"""
+DependencyCheckResult = namedtuple('DependencyCheckResult', ['valid', 'installed_version', 'duration', 'cached'])
 
 
 def get_dependency_map() -> Dict[str, DependencySpec]:
@@ -212,29 +231,102 @@ def check_dependency(dependency_name: str,
     ), installed_version
 
 
+def timed_check_dependency(dependency_name: str,
+                           dependency_spec: DependencySpec,
+                           namespace: str = None,
+                           saved_versions: Dict[str, LooseVersion] = None) -> DependencyCheckResult:
+    """
+    Calls check_dependency with given parameters and measures how long the check took.
+    """
+    start = time.perf_counter()
+    valid, installed_version = check_dependency(dependency_name=dependency_name, dependency_spec=dependency_spec,
+                                                namespace=namespace, saved_versions=saved_versions)
+    return DependencyCheckResult(valid=valid, installed_version=installed_version,
+                                 duration=time.perf_counter() - start,
+                                 cached=bool(saved_versions and saved_versions.get(dependency_name)))
+
+
+def check_dependencies(dependencies: Dict[str, DependencySpec],
+                       namespace: str = None,
+                       saved_versions: Dict[str, LooseVersion] = None) -> Dict[str, Future]:
+    """
+    Checks all given dependencies in parallel, so version commands of different binaries are run at the same time.
+    :param dependencies: dict containing dependency names as keys and their specifications as values
+    :param namespace: k8s namespace where server components of checked dependencies are located
+    :param saved_versions: dict containing saved versions, passed to check_dependency
+    :return: dict containing dependency names as keys and futures of DependencyCheckResult as values, exceptions
+    raised by check_dependency are reraised when a result of a future is read
+    """
+    with ThreadPoolExecutor(max_workers=max(len(dependencies), 1)) as executor:
+        return {dependency_name: executor.submit(timed_check_dependency, dependency_name=dependency_name,
+                                                 dependency_spec=dependency_spec, namespace=namespace,
+                                                 saved_versions=saved_versions)
+                for dependency_name, dependency_spec in dependencies.items()}
+
+
+def get_binary_fingerprint(dependency_spec: DependencySpec) -> str:
+    """
+    Returns fingerprint of a binary used by a version command of a dependency - its resolved path, inode and
+    modification time. Returns MISSING_BINARY_FINGERPRINT if the binary cannot be found.
+    """
+    binary_path = shutil.which(dependency_spec.version_command_args[0])
+    if not binary_path:
+        return MISSING_BINARY_FINGERPRINT
+    binary_path = os.path.realpath(binary_path)
+    try:
+        binary_stat = os.stat(binary_path)
+    except OSError:
+        return MISSING_BINARY_FINGERPRINT
+    return f'{binary_path}:{binary_stat.st_ino}:{binary_stat.st_mtime_ns}'
+
+
+def get_dependency_fingerprints(dependencies: Dict[str, DependencySpec]) -> Dict[str, str]:
+    return {dependency_name: get_binary_fingerprint(dependency_spec)
+            for dependency_name, dependency_spec in dependencies.items()}
+
+
+def get_unchanged_saved_versions(saved_versions: Optional[Dict[str, LooseVersion]],
+                                 saved_fingerprints: Optional[Dict[str, str]],
+                                 fingerprints: Dict[str, str]) -> Dict[str, LooseVersion]:
+    """
+    Returns only those saved versions, whose binaries were not changed since versions were saved.
+    """
+    if not saved_versions or not saved_fingerprints:
+        return {}
+    return {dependency_name: version for dependency_name, version in saved_versions.items()
+            if fingerprints.get(dependency_name) and fingerprints[dependency_name] == saved_fingerprints.get(
+                dependency_name)}
+
+
 def check_all_binary_dependencies(namespace: str):
     """
     Check versions for all dependencies of carbon CLI. In case of version validation failure,
      an InvalidDependencyError is raised. This function is intended to be called before most of CLI commands.
      Behaviour of this function is similar to verify CLI command.
+     Version commands are run only for dependencies whose binaries changed since the last check (or which were
+     never checked), all of them in parallel.
     :param namespace: k8s namespace where server components of checked dependencies are located
     """
-    saved_versions = load_dependency_versions()
+    dependency_map = get_dependency_map()
+    fingerprints = get_dependency_fingerprints(dependency_map)
+    saved_versions = get_unchanged_saved_versions(saved_versions=load_dependency_versions(),
+                                                  saved_fingerprints=load_dependency_fingerprints(),
+                                                  fingerprints=fingerprints)
     dependency_versions = {}
 
-    for dependency_name, dependency_spec in get_dependency_map().items():
+    check_futures = check_dependencies(dependencies=dependency_map, namespace=namespace,
+                                       saved_versions=saved_versions)
+
+    for dependency_name, dependency_spec in dependency_map.items():
         try:
             supported_versions_sign = '==' if dependency_spec.match_exact_version else '>='
-            valid, installed_version = check_dependency(
-                dependency_name=dependency_name,
-                dependency_spec=dependency_spec,
-                namespace=namespace,
-                saved_versions=saved_versions)
+            valid, installed_version, duration, cached = check_futures[dependency_name].result()
             dependency_versions[dependency_name] = installed_version
             log.info(
                 f'Checking version of {dependency_name}. '
                 f'Installed version: ({installed_version}). '
-                f'Supported version {supported_versions_sign} {dependency_spec.expected_version}.'
+                f'Supported version {supported_versions_sign} {dependency_spec.expected_version}. '
+                f'Check time: {duration:.3f} s{" (cached)" if cached else ""}.'
             )
             if not valid:
                 raise InvalidDependencyError(
@@ -254,9 +346,10 @@ def check_all_binary_dependencies(namespace: str):
             raise InvalidDependencyError(error_msg) from e
     else:
         # This block is entered if all dependencies were validated successfully
-        # Save dependency versions in a file, if there were no saved versions
-        if not saved_versions:
+        # Save dependency versions in a file, if any of them had to be checked by running its version command
+        if set(saved_versions) != set(dependency_map):
             save_dependency_versions(dependency_versions)
+            save_dependency_fingerprints(fingerprints)
 
 
 def get_dependency_versions_file_path() -> str:
@@ -268,6 +361,10 @@ def get_dependency_versions_file_path() -> str:
     return dependency_versions_file_path
 
 
+def get_dependency_fingerprints_file_path() -> str:
+    return os.path.join(Config().config_path, f'{VERSION}{DEPENDENCY_FINGERPRINTS_FILE_SUFFIX}')
+
+
 def save_dependency_versions(dependency_versions: Dict[str, LooseVersion]):
     """
     Saves a YAML file containing versions of nctl dependencies under $(NCTL_CONFIG)/$(nctl_version) path.
@@ -304,3 +401,27 @@ def load_dependency_versions() -> Optional[Dict[str, LooseVersion]]:
             f'{dependency_versions_file_path} dependency versions file not found'
         )
         return None
+
+
+def save_dependency_fingerprints(fingerprints: Dict[str, Optional[str]]):
+    """
+    Saves a YAML file containing fingerprints of binaries of nctl dependencies, saved versions of dependencies are
+    used only as long as fingerprints of their binaries don't change.
+    :param fingerprints: a dictionary containing dependency names as keys and their fingerprints as values
+    """
+    dependency_fingerprints_file_path = get_dependency_fingerprints_file_path()
+    log.info(f'Saving dependency fingerprints to {dependency_fingerprints_file_path}')
+    with open(dependency_fingerprints_file_path, 'w', encoding='utf-8') as dependency_fingerprints_file:
+        yaml.safe_dump({k: v for k, v in fingerprints.items() if v}, dependency_fingerprints_file)
+
+
+def load_dependency_fingerprints() -> Optional[Dict[str, str]]:
+    """
+    Loads saved fingerprints of dependencies' binaries. Returns None if fingerprints file is not present.
+    """
+    dependency_fingerprints_file_path = get_dependency_fingerprints_file_path()
+    if not os.path.exists(dependency_fingerprints_file_path):
+        log.info(f'{dependency_fingerprints_file_path} dependency fingerprints file not found')
+        return None
+    with open(dependency_fingerprints_file_path, 'r', encoding='utf-8') as dependency_fingerprints_file:
+        return yaml.safe_load(dependency_fingerprints_file) or {}
@@ -14,9 +14,26 @@
 # limitations under the License.
 #
 
+from fnmatch import fnmatch
 import os
 import shutil
-from typing import List
+from typing import List, NamedTuple, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows - files are copied there without cloning their content
+    fcntl = None  # type: ignore
+
+from util.logger import initialize_logger
+
+logger = initialize_logger(__name__)
+
+# name of a file with patterns of files that should not be copied from a script folder to an experiment
+NCTL_IGNORE_FILE_NAME = '.nctlignore'
+
+# ioctl request cloning content of a file (copy-on-write), defined in linux/fs.h
+FICLONE = 0x40049409
 
 
 def copytree_content(src: str, dst: str, ignored_objects: List[str] = None, symlinks=False, ignore=None):
@@ -34,15 +51,168 @@ def copytree_content(src: str, dst: str, ignored_objects: List[str] = None, syml
             s = os.path.join(src, item)
             d = os.path.join(dst, item)
             if os.path.isdir(s):
-                shutil.copytree(s, d, symlinks, ignore)
+                shutil.copytree(s, d, symlinks, ignore, copy_function=copy_file)
             else:
-                shutil.copy2(s, d)
+                copy_file(s, d)
+
+
+class DirectoryContent(NamedTuple):
+    directories: List[str]
+    # relative path, size and modification time (in ns) of each file
+    files: List[Tuple[str, int, int]]
+
+    @property
+    def total_size(self) -> int:
+        return sum(size for _, size, _ in self.files)
+
+
+def read_ignore_patterns(directory: str) -> List[str]:
+    """
+    Reads patterns of ignored files from .nctlignore file placed in a given directory. Each not empty line of the
+    file that doesn't start with # is a shell-style pattern (like *.ckpt or data/*) matched against a path of a file
+    relative to the directory or against a name of the file. Directories matching any of patterns are skipped
+    with their whole content.
+    :param directory: directory with .nctlignore file
+    :return: list of patterns, empty if there is no .nctlignore file
+    """
+    try:
+        with open(os.path.join(directory, NCTL_IGNORE_FILE_NAME), mode='r', encoding='utf-8') as ignore_file:
+            lines = [line.strip() for line in ignore_file]
+    except FileNotFoundError:
+        return []
+    return [line.rstrip('/') for line in lines if line and not line.startswith('#')]
+
+
+def is_ignored(relative_path: str, ignore_patterns: List[str]) -> bool:
+    relative_path = relative_path.replace(os.sep, '/')
+    name = os.path.basename(relative_path)
+    return any(fnmatch(relative_path, pattern) or fnmatch(name, pattern) for pattern in ignore_patterns)
+
+
+def _get_directory_id(directory: str) -> Tuple[int, int]:
+    stat = os.stat(directory)
+    return stat.st_dev, stat.st_ino
+
+
+def scan_directory(directory: str, ignore_patterns: List[str] = None) -> DirectoryContent:
+    """
+    Collects all directories and files placed in a given directory together with their sizes in one pass
+    over the directory tree.
+    :param directory: directory to scan
+    :param ignore_patterns: patterns of files and directories that should be skipped, see read_ignore_patterns
+    :return: content of the directory, paths are relative to the directory
+    """
+    ignore_patterns = ignore_patterns or []
+    directories: List[str] = []
+    files: List[Tuple[str, int, int]] = []
+    # content of symlinked directories is scanned too, like shutil.copytree does - directories are identified by
+    # (device, inode), so a symlink to a directory containing it isn't followed in a loop
+    directories_to_scan = [('', frozenset([_get_directory_id(directory)]))]
+    while directories_to_scan:
+        current_directory, parent_ids = directories_to_scan.pop()
+        with os.scandir(os.path.join(directory, current_directory)) as entries:
+            for entry in entries:
+                relative_path = os.path.join(current_directory, entry.name)
+                if is_ignored(relative_path, ignore_patterns):
+                    continue
+                if entry.is_dir():
+                    directory_id = _get_directory_id(entry.path)
+                    if directory_id in parent_ids:
+                        logger.debug(f'Symlink {entry.path} to its parent directory is skipped.')
+                        continue
+                    directories.append(relative_path)
+                    directories_to_scan.append((relative_path, parent_ids | {directory_id}))
+                else:
+                    stat = entry.stat()
+                    files.append((relative_path, stat.st_size, stat.st_mtime_ns))
+    return DirectoryContent(directories=sorted(directories), files=files)
+
+
+def _clone_file_content(src_file, dst_file) -> bool:
+    if not fcntl:
+        return False
+    try:
+        fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        return True
+    except OSError:
+        # filesystem doesn't support cloning or files are placed on different filesystems
+        return False
+
+
+def _send_file_content(src_file, dst_file) -> bool:
+    if not hasattr(os, 'sendfile'):
+        return False
+    offset = 0
+    try:
+        while True:
+            sent = os.sendfile(dst_file.fileno(), src_file.fileno(), offset, 1024 * 1024 * 1024)
+            if sent == 0:
+                return True
+            offset += sent
+    except OSError:
+        # on some systems (e.g. macOS) os.sendfile accepts only sockets as a destination
+        if offset:
+            dst_file.seek(0)
+            dst_file.truncate()
+        return False
+
+
+def copy_file(src: str, dst: str, clone: bool = True) -> bool:
+    """
+    Copies a file together with its metadata, like shutil.copy2, but avoids copying its content in user space
+    if possible. Content of a file is cloned (copy-on-write, so it is not copied at all) if a filesystem supports it,
+    otherwise it is copied inside of kernel with os.sendfile. shutil.copyfile is used only if none of these methods
+    is available.
+    :param src: file to copy
+    :param dst: destination file or directory
+    :param clone: if False, cloning of content isn't tried - it is used when it is known that it won't succeed
+    :return: True if content of the file was cloned
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    cloned = False
+    with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+        cloned = clone and _clone_file_content(src_file, dst_file)
+        copied = cloned or _send_file_content(src_file, dst_file)
+        if not copied:
+            shutil.copyfileobj(src_file, dst_file)
+    shutil.copystat(src, dst)
+    return cloned
+
+
+def copy_directory_content(src: str, dst: str, content: DirectoryContent = None,
+                           ignore_patterns: List[str] = None) -> DirectoryContent:
+    """
+    Copies content of 'src' directory to 'dst' directory with copy_file. Files that already exist in 'dst' directory
+    and have the same size and modification time as their sources are left untouched.
+    :param src: source directory
+    :param dst: destination directory, it is created if it doesn't exist
+    :param content: content of 'src' directory returned by scan_directory - if given, 'src' directory isn't scanned
+    again
+    :param ignore_patterns: patterns of files that shouldn't be copied, used only if content is not given
+    :return: copied content of 'src' directory
+    """
+    if content is None:
+        content = scan_directory(src, ignore_patterns=ignore_patterns)
 
+    os.makedirs(dst, exist_ok=True)
+    for directory in content.directories:
+        os.makedirs(os.path.join(dst, directory), exist_ok=True)
 
-def get_total_directory_size_in_bytes(directory: str) -> int:
-    size = 0
-    for path, dirs, files in os.walk(directory):
-        for file in files:
-            full_filename = os.path.join(path, file)
-            size += os.path.getsize(full_filename)
-    return size
+    # if cloning of one file fails, it will fail also for other files from the same directory, so it isn't tried
+    # for them
+    not_cloned_directories = set()
+    for relative_path, size, mtime_ns in content.files:
+        dst_path = os.path.join(dst, relative_path)
+        try:
+            dst_stat = os.stat(dst_path)
+            if dst_stat.st_size == size and dst_stat.st_mtime_ns == mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+        file_directory = os.path.dirname(relative_path)
+        if not copy_file(os.path.join(src, relative_path), dst_path,
+                         clone=file_directory not in not_cloned_directories):
+            not_cloned_directories.add(file_directory)
+    logger.debug(f'Copied {len(content.files)} files ({content.total_size} bytes) from {src} to {dst}.')
+    return content
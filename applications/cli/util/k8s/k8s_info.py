@@ -14,10 +14,13 @@
 # limitations under the License.
 #
 
+import atexit
 import base64
+from collections import defaultdict
 from enum import Enum
 from http import HTTPStatus
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Iterable, Optional, Tuple
 from urllib.parse import urlparse
 
 from kubernetes.client.rest import ApiException
@@ -53,9 +56,83 @@ class NamespaceStatus(Enum):
     NOT_EXISTS = 'Not_Exists'
 
 
+class KubernetesSession:
+    """
+    Kubernetes client state shared by a whole process - kubeconfig is parsed once and all APIs use one ApiClient,
+    so connections from its pool are reused by all requests sent by a command.
+    """
+    _lock = threading.RLock()
+    _config_loaded = False
+    _contexts: Optional[Tuple[List[dict], dict]] = None
+    _api_client: Optional[client.ApiClient] = None
+    _statistics_logged_at_exit = False
+
+    @classmethod
+    def load_config(cls):
+        with cls._lock:
+            if not cls._config_loaded:
+                config.load_kube_config()
+                cls._config_loaded = True
+
+    @classmethod
+    def get_configuration(cls) -> configuration.Configuration:
+        cls.load_config()
+        return configuration.Configuration()
+
+    @classmethod
+    def get_contexts(cls) -> Tuple[List[dict], dict]:
+        """
+        :return: list of contexts from kubeconfig and a current context
+        """
+        with cls._lock:
+            if cls._contexts is None:
+                cls._contexts = config.list_kube_config_contexts()
+            return cls._contexts
+
+    @classmethod
+    def get_api_client(cls) -> client.ApiClient:
+        with cls._lock:
+            if cls._api_client is None:
+                cls.load_config()
+                cls._api_client = client.ApiClient()
+                if not cls._statistics_logged_at_exit:
+                    atexit.register(cls.log_statistics)
+                    cls._statistics_logged_at_exit = True
+            return cls._api_client
+
+    @classmethod
+    def get_statistics(cls) -> Tuple[int, int]:
+        """
+        :return: number of requests sent and number of connections opened by the shared ApiClient
+        """
+        with cls._lock:
+            if cls._api_client is None:
+                return 0, 0
+            pools = cls._api_client.rest_client.pool_manager.pools
+            connection_pools = [pools[key] for key in pools.keys()]
+        return sum(pool.num_requests for pool in connection_pools), \
+            sum(pool.num_connections for pool in connection_pools)
+
+    @classmethod
+    def log_statistics(cls):
+        if cls._api_client is None:
+            return
+        requests, connections = cls.get_statistics()
+        logger.debug(f'Kubernetes API requests: {requests}, connections: {connections}')
+
+    @classmethod
+    def reset(cls):
+        """
+        Drops loaded kubeconfig and the shared ApiClient, so they are created again when needed.
+        """
+        with cls._lock:
+            cls._config_loaded = False
+            cls._contexts = None
+            cls._api_client = None
+
+
 def get_kubectl_host(replace_https=True, with_port=True) -> str:
-    config.load_kube_config()
-    kubectl_host = configuration.Configuration().host
+    kubectl_host = KubernetesSession.get_configuration().host
     parsed_kubectl_host = urlparse(kubectl_host)
     scheme = parsed_kubectl_host.scheme
     hostname = parsed_kubectl_host.hostname
@@ -79,19 +156,16 @@ def get_kubectl_host(replace_https=True, with_port=True) -> str:
 
 
 def get_api_key() -> str:
-    config.load_kube_config()
-    return configuration.Configuration().api_key.get('authorization')
+    return KubernetesSession.get_configuration().api_key.get('authorization')
 
 
 def get_kubectl_current_context_namespace() -> Optional[str]:
-    config.load_kube_config()
-    context_list, current_context = config.list_kube_config_contexts()
+    context_list, current_context = KubernetesSession.get_contexts()
     return current_context['context'].get('namespace')
 
 
 def get_k8s_api() -> client.CoreV1Api:
-    config.load_kube_config()
-    return client.CoreV1Api(client.ApiClient())
+    return client.CoreV1Api(KubernetesSession.get_api_client())
 
 
 def get_service_account(service_account_name: str, namespace: str) -> V1ServiceAccount:
@@ -344,7 +418,7 @@ def get_current_user() -> str:
     :return: name of a user
     In case of any problems - it raises an exception
     """
-    return config.list_kube_config_contexts()[1]["context"]["user"]
+    return KubernetesSession.get_contexts()[1]["context"]["user"]
 
 
 def get_current_namespace() -> str:
@@ -353,7 +427,7 @@ def get_current_namespace() -> str:
     :return: namespace
     In case of any problems - it raises an exception
     """
-    return config.list_kube_config_contexts()[1]["context"]["namespace"]
+    return KubernetesSession.get_contexts()[1]["context"]["namespace"]
 
 
 def get_users_samba_password(username: str) -> str:
@@ -390,8 +464,7 @@ def get_users_samba_password(username: str) -> str:
 
 
 def get_cluster_roles(request_timeout: int = None) -> client.V1ClusterRoleList:
-    config.load_kube_config()
-    api = client.RbacAuthorizationV1Api(client.ApiClient())
+    api = client.RbacAuthorizationV1Api(KubernetesSession.get_api_client())
     return api.list_cluster_role(_request_timeout=request_timeout)
 
 
@@ -512,6 +585,36 @@ def get_pod_events(namespace: str, name: str = None) -> List[client.V1Event]:
         raise KubernetesError(error_message) from exe
 
 
+def get_pods_events(namespace: str, pod_names: Iterable[str] = None) -> Dict[str, List[client.V1Event]]:
+    """
+    Gets events of all pods of a namespace in one request and groups them by names of pods.
+    :param pod_names: if given, only events of these pods are returned
+    :return: dictionary with names of pods as keys and lists of their events as values
+    """
+    try:
+        api = get_k8s_api()
+
+        events: Dict[str, List[client.V1Event]] = defaultdict(list)
+        pod_names = set(pod_names) if pod_names is not None else None
+
+        try:
+            event_list: client.V1EventList = api.list_namespaced_event(namespace=namespace,
+                                                                       field_selector="involvedObject.kind=Pod")
+            for event in event_list.items:
+                if pod_names is None or event.involved_object.name in pod_names:
+                    events[event.involved_object.name].append(event)
+        except ApiException as ex:
+            if ex.status != HTTPStatus.NOT_FOUND:
+                logger.exception('Exception when getting pod events')
+                raise
+
+        return events
+    except Exception as exe:
+        error_message = Texts.GATHERING_EVENTS_ERROR_MSG
+        logger.exception(error_message)
+        raise KubernetesError(error_message) from exe
+
+
 def add_bytes_to_unit(value: str) -> str:
     """
     Method adds 'B' suffix to memory values represented in format like Gi, Mi, etc
@@ -134,6 +134,23 @@ def start_port_forwarding(k8s_app_name: NAUTAAppNames, port: int = None, app_nam
     return process, tunnel_port, service_container_port
 
 
+def start_service_port_forwarding(service_name: str, namespace: str, service_port: int,
+                                  port: int = None) -> Tuple[subprocess.Popen, int]:
+    """
+    Forwards a local port to a port of a service. When the proxy is no longer needed - it should be closed by calling
+    kill() function on a process returned by this function.
+
+    :param port: if given - the system will try to use it as a local port. Random port will be used
+     if that port is not available
+    :return: instance of a process with proxy and tunneled port
+    """
+    tunnel_port = port if port and check_port_availability(port) else find_random_available_port()
+    port_forward_command = ['kubectl', 'port-forward', f'--namespace={namespace}', f'service/{service_name}',
+                            f'{tunnel_port}:{service_port}', '-v=4']
+    logger.debug(port_forward_command)
+    return system.execute_subprocess_command(port_forward_command), tunnel_port
+
+
 def delete_k8s_object(kind: str, name: str):
     delete_command = ['kubectl', 'delete', kind, name]
     logger.debug(delete_command)
@@ -27,7 +27,8 @@ from util.k8s.k8s_info import get_kubectl_host, get_app_services, \
                               find_namespace, delete_namespace, get_config_map_data, get_users_token, \
                               get_cluster_roles, is_current_user_administrator, check_pods_status, \
                               PodStatus, get_app_service_node_port, get_pods, NamespaceStatus, get_pod_events, \
-                              get_namespaced_pods, add_bytes_to_unit
+                              get_namespaced_pods, add_bytes_to_unit, get_pods_events, \
+                              KubernetesSession, get_api_key, get_kubectl_current_context_namespace
 from util.config import NAUTAConfigMap
 from util.app_names import NAUTAAppNames
 from util.exceptions import KubernetesError
@@ -196,6 +197,20 @@ def test_get_pod_events(mocked_k8s_config, mocked_k8s_CoreV1Api):
     assert events
 
 
+def test_get_pods_events(mocked_k8s_config, mocked_k8s_CoreV1Api):
+    events = get_pods_events(namespace=test_namespace, pod_names=["pod_name", "other_pod_name"])
+
+    assert list(events) == ["pod_name"]
+    assert events["pod_name"][0].message == "Insufficient cpu"
+    assert mocked_k8s_CoreV1Api.list_namespaced_event.call_count == 1
+
+
+def test_get_pods_events_other_pods(mocked_k8s_config, mocked_k8s_CoreV1Api):
+    events = get_pods_events(namespace=test_namespace, pod_names=["other_pod_name"])
+
+    assert not events["other_pod_name"]
+
+
 def test_find_namespace_success(mocker, mocked_k8s_CoreV1Api, mocked_kubeconfig):
     assert find_namespace(test_namespace) == NamespaceStatus.ACTIVE
 
@@ -342,3 +357,35 @@ def test_add_bytes_to_unit():
     for test in negatives:
         assert add_bytes_to_unit(test) == test
     assert add_bytes_to_unit("5Ti") == "5TiB"
+
+
+def test_kubernetes_session_shared(mocker, mocked_k8s_config, mocked_k8s_CoreV1Api,
+                                   mocked_k8s_RbacAuthorizationV1Api):
+    load_kube_config_mock = mocker.patch('kubernetes.config.load_kube_config')
+    list_contexts_mock = mocker.patch('kubernetes.config.list_kube_config_contexts',
+                                      return_value=([], {'context': {'namespace': test_namespace}}))
+    api_client_mock = mocker.patch('kubernetes.client.ApiClient')
+
+    get_kubectl_host()
+    get_api_key()
+    get_pods()
+    get_namespaced_pods(namespace=test_namespace)
+    get_cluster_roles()
+
+    assert get_kubectl_current_context_namespace() == test_namespace
+    assert get_kubectl_current_context_namespace() == test_namespace
+    assert load_kube_config_mock.call_count == 1
+    assert list_contexts_mock.call_count == 1
+    assert api_client_mock.call_count == 1
+
+
+def test_kubernetes_session_statistics(mocker, mocked_kubeconfig):
+    pool = mocker.MagicMock(num_requests=5, num_connections=1)
+    api_client_mock = mocker.patch('kubernetes.client.ApiClient')
+    api_client_mock.return_value.rest_client.pool_manager.pools = {'https://127.0.0.1:8443': pool}
+
+    assert KubernetesSession.get_statistics() == (0, 0)
+
+    KubernetesSession.get_api_client()
+
+    assert KubernetesSession.get_statistics() == (5, 1)
@@ -17,14 +17,13 @@
 import webbrowser
 
 import click
-from kubernetes import config
-from kubernetes.client import configuration
 
 from util.spinner import spinner
 from util.network import wait_for_connection
 from util.logger import initialize_logger
 from util.system import wait_for_ctrl_c
 from util.app_names import NAUTAAppNames
+from util.k8s.k8s_info import get_api_key
 from util.k8s.k8s_proxy_context_manager import K8sProxy
 from util.exceptions import K8sProxyOpenError, K8sProxyCloseError, LocalPortOccupiedError, LaunchError, \
     ProxyClosingError
@@ -54,8 +53,7 @@ def launch_app(k8s_app_name: NAUTAAppNames, no_launch: bool = False, port: int =
             url = FORWARDED_URL.format(proxy.tunnel_port, url_end)
 
             if k8s_app_name == NAUTAAppNames.INGRESS:
-                config.load_kube_config()
-                user_token = configuration.Configuration().api_key.get('authorization')
+                user_token = get_api_key()
                 prepared_user_token = user_token.replace('Bearer ', '')
                 url = f'{url}?token={prepared_user_token}'
 
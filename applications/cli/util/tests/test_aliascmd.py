@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import subprocess
+import sys
+
+import click
+from click.testing import CliRunner
+import pytest
+
+from util.aliascmd import AliasGroup, AliasCmd
+
+
+@click.command(short_help='Lazy command help.', cls=AliasCmd, alias='lz')
+def lazy():
+    click.echo('lazy command output')
+
+
+LAZY_IMPORT_PATH = f'{__name__}:lazy'
+
+
+def create_group():
+    @click.group(cls=AliasGroup)
+    def group():
+        pass
+
+    group.add_lazy_command(name='lazy', import_path=LAZY_IMPORT_PATH, alias='lz', short_help='Lazy command help.')
+    return group
+
+
+def test_lazy_command_not_loaded_for_help(mocker):
+    load_mock = mocker.patch('util.aliascmd.LazyCommand.load')
+    group = create_group()
+
+    result = CliRunner().invoke(group, ['--help'])
+
+    assert result.exit_code == 0
+    assert 'lazy, lz' in result.output
+    assert 'Lazy command help.' in result.output
+    assert load_mock.call_count == 0
+
+
+def test_lazy_command_invoked_by_name():
+    group = create_group()
+
+    result = CliRunner().invoke(group, ['lazy'])
+
+    assert result.exit_code == 0
+    assert 'lazy command output' in result.output
+    assert group.commands['lazy'] is lazy
+    assert not group.lazy_commands
+
+
+def test_lazy_command_invoked_by_alias():
+    group = create_group()
+
+    result = CliRunner().invoke(group, ['lz'])
+
+    assert result.exit_code == 0
+    assert 'lazy command output' in result.output
+
+
+def test_lazy_command_unknown_command(mocker):
+    load_mock = mocker.patch('util.aliascmd.LazyCommand.load')
+    group = create_group()
+
+    result = CliRunner().invoke(group, ['unknown'])
+
+    assert result.exit_code != 0
+    assert load_mock.call_count == 0
+
+
+def get_main_commands():
+    from main import COMMANDS
+    return COMMANDS
+
+
+def test_main_commands_metadata_matches_commands():
+    for name, import_path, alias, short_help in get_main_commands():
+        group = AliasGroup()
+        group.add_lazy_command(name=name, import_path=import_path, alias=alias, short_help=short_help)
+        command = group.get_command(None, name)
+
+        assert command.alias() == alias
+        assert command.short_help == short_help
+
+
+@pytest.mark.parametrize('import_path', [import_path for _, import_path, _, _ in get_main_commands()])
+def test_main_command_imports_on_its_own(import_path):
+    # each command is imported first in a fresh process when it is invoked, so it cannot rely on modules
+    # imported by other commands (e.g. to break import cycles)
+    module_name = import_path.split(':')[0]
+    cli_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    result = subprocess.run([sys.executable, '-c', f'import {module_name}'], cwd=cli_dir, stderr=subprocess.PIPE)
+
+    assert result.returncode == 0, result.stderr.decode('utf-8')
@@ -24,7 +24,9 @@ from util.dependencies_checker import _is_version_valid, LooseVersion, \
     DependencySpec, check_all_binary_dependencies, get_dependency_map, \
     NAMESPACE_PLACEHOLDER, check_os, SUPPORTED_OS_MAP, \
     get_dependency_versions_file_path, save_dependency_versions, \
-    load_dependency_versions, DEPENDENCY_VERSIONS_FILE_SUFFIX
+    load_dependency_versions, DEPENDENCY_VERSIONS_FILE_SUFFIX, get_binary_fingerprint, \
+    get_unchanged_saved_versions, save_dependency_fingerprints, load_dependency_fingerprints, \
+    timed_check_dependency, check_dependencies, MISSING_BINARY_FINGERPRINT
 from util.exceptions import InvalidDependencyError, InvalidOsError
 from cli_text_consts import UtilDependenciesCheckerTexts as Texts
 
@@ -169,11 +171,14 @@ def test_check_all_binary_dependencies(mocker):
     save_dependency_versions_mock = mocker.patch(
         'util.dependencies_checker.save_dependency_versions',
         return_value=None)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=None)
+    save_dependency_fingerprints_mock = mocker.patch('util.dependencies_checker.save_dependency_fingerprints')
 
     check_all_binary_dependencies(namespace='fake')
 
     assert load_dependency_versions_mock.call_count == 1, 'Saved dependency versions were not loaded.'
     assert save_dependency_versions_mock.call_count == 1, 'Dependency versions were not saved.'
+    assert save_dependency_fingerprints_mock.call_count == 1, 'Dependency fingerprints were not saved.'
     assert check_dependency_mock.call_count == len(
         get_dependency_map()), 'Not all dependencies were checked.'
 
@@ -192,6 +197,10 @@ def test_check_all_binary_dependencies_saved_versions(mocker):
         dependency_name: fake_version
         for dependency_name in get_dependency_map().keys()
     }
+    fingerprints = {
+        dependency_name: f'/usr/bin/{dependency_name}:1:1'
+        for dependency_name in get_dependency_map().keys()
+    }
 
     load_dependency_versions_mock = mocker.patch(
         'util.dependencies_checker.load_dependency_versions',
@@ -199,6 +208,8 @@ def test_check_all_binary_dependencies_saved_versions(mocker):
     save_dependency_versions_mock = mocker.patch(
         'util.dependencies_checker.save_dependency_versions',
         return_value=None)
+    mocker.patch('util.dependencies_checker.get_dependency_fingerprints', return_value=fingerprints)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=fingerprints)
 
     check_all_binary_dependencies(namespace=fake_namespace)
 
@@ -228,6 +239,7 @@ def test_check_all_binary_dependencies_invalid_version(mocker):
     mocker.patch(
         'util.dependencies_checker.save_dependency_versions',
         return_value=None)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=None)
     fake_config_path = '/usr/ogorek/nctl_config'
     fake_config = mocker.patch('util.dependencies_checker.Config')
     fake_config.return_value.config_path = fake_config_path
@@ -246,6 +258,7 @@ def test_check_all_binary_dependencies_parsing_error(mocker):
     mocker.patch(
         'util.dependencies_checker.save_dependency_versions',
         return_value=None)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=None)
     fake_config_path = '/usr/ogorek/nctl_config'
     fake_config = mocker.patch('util.dependencies_checker.Config')
     fake_config.return_value.config_path = fake_config_path
@@ -263,6 +276,7 @@ def test_check_all_binary_dependencies_version_check_error(mocker):
     mocker.patch(
         'util.dependencies_checker.save_dependency_versions',
         return_value=None)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=None)
     fake_config_path = '/usr/ogorek/nctl_config'
     fake_config = mocker.patch('util.dependencies_checker.Config')
     fake_config.return_value.config_path = fake_config_path
@@ -377,3 +391,125 @@ def test_load_dependency_versions(mocker, tmpdir):
         return_value=fake_dependency_versions_file)
 
     assert fake_dependency_versions == load_dependency_versions()
+
+
+def test_check_all_binary_dependencies_changed_binary(mocker):
+    fake_version = LooseVersion('0.0.0')
+    fake_config = mocker.patch('util.dependencies_checker.Config')
+    fake_config.return_value.config_path = '/usr/ogorek/nctl_config'
+    check_dependency_mock = mocker.patch('util.dependencies_checker.check_dependency')
+    check_dependency_mock.return_value = True, fake_version
+    saved_versions = {dependency_name: fake_version for dependency_name in get_dependency_map().keys()}
+    saved_fingerprints = {dependency_name: f'/usr/bin/{dependency_name}:1:1'
+                          for dependency_name in get_dependency_map().keys()}
+    fingerprints = dict(saved_fingerprints, git='/usr/bin/git:1:2')
+
+    mocker.patch('util.dependencies_checker.load_dependency_versions', return_value=saved_versions)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=saved_fingerprints)
+    mocker.patch('util.dependencies_checker.get_dependency_fingerprints', return_value=fingerprints)
+    save_dependency_versions_mock = mocker.patch('util.dependencies_checker.save_dependency_versions')
+    save_dependency_fingerprints_mock = mocker.patch('util.dependencies_checker.save_dependency_fingerprints')
+
+    check_all_binary_dependencies(namespace='fake')
+
+    passed_saved_versions = check_dependency_mock.call_args[1]['saved_versions']
+    assert 'git' not in passed_saved_versions
+    assert len(passed_saved_versions) == len(saved_versions) - 1
+    save_dependency_versions_mock.assert_called_once()
+    save_dependency_fingerprints_mock.assert_called_once_with(fingerprints)
+
+
+def test_get_binary_fingerprint(tmpdir):
+    binary = tmpdir.join('binary')
+    binary.write('#!/bin/sh')
+    binary.chmod(0o755)
+    dependency_spec = DependencySpec(expected_version=TEST_VERSION, version_command=None,
+                                     version_command_args=[str(binary), 'version'], version_field=None,
+                                     match_exact_version=False)
+
+    fingerprint = get_binary_fingerprint(dependency_spec)
+    assert fingerprint.startswith(str(binary))
+
+    binary.setmtime(binary.mtime() + 10)
+    assert get_binary_fingerprint(dependency_spec) != fingerprint
+
+
+def test_get_binary_fingerprint_missing_binary():
+    dependency_spec = DependencySpec(expected_version=TEST_VERSION, version_command=None,
+                                     version_command_args=['non-existing-binary-123', 'version'],
+                                     version_field=None, match_exact_version=False)
+
+    assert get_binary_fingerprint(dependency_spec) == MISSING_BINARY_FINGERPRINT
+
+
+def test_check_all_binary_dependencies_missing_binary(mocker):
+    fake_version = LooseVersion('0.0.0')
+    fake_config = mocker.patch('util.dependencies_checker.Config')
+    fake_config.return_value.config_path = '/usr/ogorek/nctl_config'
+    check_dependency_mock = mocker.patch('util.dependencies_checker.check_dependency')
+    check_dependency_mock.return_value = True, fake_version
+    mocker.patch('util.dependencies_checker.shutil.which', return_value=None)
+    saved_versions = {dependency_name: fake_version for dependency_name in get_dependency_map().keys()}
+    saved_fingerprints = {dependency_name: MISSING_BINARY_FINGERPRINT for dependency_name in get_dependency_map()}
+
+    mocker.patch('util.dependencies_checker.load_dependency_versions', return_value=saved_versions)
+    mocker.patch('util.dependencies_checker.load_dependency_fingerprints', return_value=saved_fingerprints)
+    save_dependency_versions_mock = mocker.patch('util.dependencies_checker.save_dependency_versions')
+    save_dependency_fingerprints_mock = mocker.patch('util.dependencies_checker.save_dependency_fingerprints')
+
+    check_all_binary_dependencies(namespace='fake')
+
+    # versions saved while binaries couldn't be found are used until the binaries are found
+    assert check_dependency_mock.call_args[1]['saved_versions'] == saved_versions
+    assert save_dependency_versions_mock.call_count == 0
+    assert save_dependency_fingerprints_mock.call_count == 0
+
+
+def test_get_unchanged_saved_versions():
+    saved_versions = {'a': LooseVersion('1.0'), 'b': LooseVersion('2.0'), 'c': LooseVersion('3.0')}
+    saved_fingerprints = {'a': 'a:1:1', 'b': 'b:1:1', 'c': 'c:1:1'}
+    fingerprints = {'a': 'a:1:1', 'b': 'b:1:2', 'c': None}
+
+    assert get_unchanged_saved_versions(saved_versions, saved_fingerprints, fingerprints) == {'a': LooseVersion('1.0')}
+    assert get_unchanged_saved_versions(saved_versions, None, fingerprints) == {}
+    assert get_unchanged_saved_versions(None, saved_fingerprints, fingerprints) == {}
+
+
+def test_save_and_load_dependency_fingerprints(mocker, tmpdir):
+    mocker.patch('util.dependencies_checker.get_dependency_fingerprints_file_path',
+                 return_value=str(tmpdir.join('fingerprints.yaml')))
+
+    save_dependency_fingerprints({'git': '/usr/bin/git:1:1', 'helm client': None})
+
+    assert load_dependency_fingerprints() == {'git': '/usr/bin/git:1:1'}
+
+
+def test_load_dependency_fingerprints_missing_file(mocker, tmpdir):
+    mocker.patch('util.dependencies_checker.get_dependency_fingerprints_file_path',
+                 return_value=str(tmpdir.join('fingerprints.yaml')))
+
+    assert load_dependency_fingerprints() is None
+
+
+def test_timed_check_dependency_cached(mocker):
+    mocker.patch('util.dependencies_checker.check_dependency', return_value=(True, TEST_VERSION))
+
+    result = timed_check_dependency('test-dep', MagicMock(), saved_versions={'test-dep': TEST_VERSION})
+
+    assert result.valid and result.cached
+    assert result.installed_version == TEST_VERSION
+    assert result.duration >= 0
+
+
+def test_check_dependencies_exception(mocker):
+    mocker.patch('util.dependencies_checker.check_dependency', side_effect=[FileNotFoundError, (True, TEST_VERSION)])
+
+    futures = check_dependencies({'a': MagicMock(), 'b': MagicMock()})
+
+    results = []
+    for dependency_name in ['a', 'b']:
+        try:
+            results.append(futures[dependency_name].result().valid)
+        except FileNotFoundError:
+            results.append('not found')
+    assert sorted(results, key=str) == [True, 'not found']
@@ -16,7 +16,10 @@
 
 import os
 
-from util.filesystem import copytree_content, get_total_directory_size_in_bytes
+import pytest
+
+from util.filesystem import copytree_content, copy_directory_content, copy_file, read_ignore_patterns, \
+    scan_directory
 
 
 def test_copytree_content(mocker):
@@ -24,13 +27,13 @@ def test_copytree_content(mocker):
 
     mocker.patch('os.listdir', return_value=fake_src_dir_filelist)
     shutil_copytree = mocker.patch('shutil.copytree')
-    shutil_copy2 = mocker.patch('shutil.copy2')
+    copy_file_mock = mocker.patch('util.filesystem.copy_file')
     mocker.patch('os.path.isdir', new=lambda x: 'dir' in os.path.basename(x))
 
     copytree_content('/home/tomasz/fake_src_dir', '/home/tomasz/fake_dst_dir')
 
     assert shutil_copytree.call_count == 2
-    assert shutil_copy2.call_count == 1
+    assert copy_file_mock.call_count == 1
 
 
 def test_copytree_content_ignored_objects(mocker):
@@ -38,24 +41,127 @@ def test_copytree_content_ignored_objects(mocker):
 
     mocker.patch('os.listdir', return_value=fake_src_dir_filelist)
     shutil_copytree = mocker.patch('shutil.copytree')
-    shutil_copy2 = mocker.patch('shutil.copy2')
+    copy_file_mock = mocker.patch('util.filesystem.copy_file')
     mocker.patch('os.path.isdir', new=lambda x: 'dir' in os.path.basename(x))
 
     copytree_content('/home/tomasz/fake_src_dir', '/home/tomasz/fake_dst_dir', ignored_objects=['dir2'])
 
     assert shutil_copytree.call_count == 1
-    assert shutil_copy2.call_count == 1
+    assert copy_file_mock.call_count == 1
 
 
-def test_get_total_directory_size_in_bytes(tmpdir):
+@pytest.fixture
+def script_folder(tmpdir):
     test_dir = tmpdir.mkdir('test-dir')
-    test_subdir = test_dir.mkdir('test-subdir')
+    test_dir.join('file-1.bin').write_binary(os.urandom(1500))
+    test_dir.mkdir('test-subdir').join('file-1.bin').write_binary(os.urandom(10900))
+    test_dir.mkdir('empty-dir')
+    return test_dir
+
+
+def test_scan_directory(script_folder):
+    content = scan_directory(script_folder.strpath)
+
+    assert content.directories == ['empty-dir', 'test-subdir']
+    assert sorted(path for path, _, _ in content.files) == ['file-1.bin', os.path.join('test-subdir', 'file-1.bin')]
+    assert content.total_size == 1500 + 10900
+
+
+def test_scan_directory_ignore_patterns(script_folder):
+    script_folder.join('model.ckpt').write('checkpoint')
+
+    content = scan_directory(script_folder.strpath, ignore_patterns=['test-subdir', '*.ckpt'])
+
+    assert content.directories == ['empty-dir']
+    assert [path for path, _, _ in content.files] == ['file-1.bin']
+    assert content.total_size == 1500
+
+
+@pytest.mark.skipif(not hasattr(os, 'symlink') or os.name == 'nt', reason='symlinks require privileges on Windows')
+def test_scan_directory_symlinks(script_folder, tmpdir):
+    shared = tmpdir.mkdir('shared')
+    shared.join('file-2.bin').write('shared file')
+    script_folder.join('shared-link').mksymlinkto(shared)
+    # a symlink to its own parent directory would be scanned in a loop
+    script_folder.join('test-subdir', 'parent-link').mksymlinkto(script_folder)
+
+    content = scan_directory(script_folder.strpath)
+
+    assert content.directories == ['empty-dir', 'shared-link', 'test-subdir']
+    assert sorted(path for path, _, _ in content.files) == \
+        ['file-1.bin', os.path.join('shared-link', 'file-2.bin'), os.path.join('test-subdir', 'file-1.bin')]
+
+
+def test_read_ignore_patterns(tmpdir):
+    tmpdir.join('.nctlignore').write('# datasets\ndata/\n\n*.ckpt\n')
+
+    assert read_ignore_patterns(tmpdir.strpath) == ['data', '*.ckpt']
+
+
+def test_read_ignore_patterns_no_file(tmpdir):
+    assert read_ignore_patterns(tmpdir.strpath) == []
+
+
+@pytest.mark.parametrize('clone_result,send_result', [(True, False), (False, True), (False, False)])
+def test_copy_file(mocker, tmpdir, clone_result, send_result):
+    clone_mock = mocker.patch('util.filesystem._clone_file_content', return_value=clone_result)
+    send_mock = mocker.patch('util.filesystem._send_file_content', return_value=send_result)
+    src = tmpdir.join('src.bin')
+    src.write_binary(b'content')
+    dst = tmpdir.join('dst.bin')
+
+    cloned = copy_file(src.strpath, dst.strpath)
+
+    assert cloned == clone_result
+    assert clone_mock.call_count == 1
+    assert send_mock.call_count == (0 if clone_result else 1)
+    if not clone_result and not send_result:
+        assert dst.read_binary() == b'content'
+    assert os.stat(dst.strpath).st_mtime_ns == os.stat(src.strpath).st_mtime_ns
+
+
+def test_copy_file_real_copy(tmpdir):
+    src = tmpdir.join('src.bin')
+    content = os.urandom(3 * 1024 * 1024)
+    src.write_binary(content)
+
+    copy_file(src.strpath, tmpdir.mkdir('dst').strpath)
+
+    assert tmpdir.join('dst', 'src.bin').read_binary() == content
+
+
+def test_copy_directory_content(script_folder, tmpdir):
+    dst = tmpdir.join('dst')
+
+    copy_directory_content(script_folder.strpath, dst.strpath)
+
+    assert dst.join('file-1.bin').read_binary() == script_folder.join('file-1.bin').read_binary()
+    assert dst.join('test-subdir', 'file-1.bin').read_binary() == \
+        script_folder.join('test-subdir', 'file-1.bin').read_binary()
+    assert dst.join('empty-dir').isdir()
+
+
+def test_copy_directory_content_unchanged_files(mocker, script_folder, tmpdir):
+    dst = tmpdir.join('dst')
+    copy_directory_content(script_folder.strpath, dst.strpath)
+    script_folder.join('file-2.bin').write('new file')
+    copy_file_mock = mocker.patch('util.filesystem.copy_file')
+
+    copy_directory_content(script_folder.strpath, dst.strpath)
+
+    copy_file_mock.assert_called_once_with(script_folder.join('file-2.bin').strpath, dst.join('file-2.bin').strpath,
+                                           clone=True)
+
 
-    files = [{'path': test_dir.join('file-1.bin'), 'size': 1500},
-             {'path': test_subdir.join('file-1.bin'), 'size': 10900}]
+def test_copy_directory_content_clone_failed(mocker, script_folder, tmpdir):
+    script_folder.join('file-2.bin').write('second file')
+    copy_file_mock = mocker.patch('util.filesystem.copy_file', return_value=False)
+    dst = tmpdir.join('dst')
 
-    for file in files:
-        with open(file['path'], "wb") as f:
-            f.write(os.urandom(file['size']))
+    copy_directory_content(script_folder.strpath, dst.strpath)
 
-    assert get_total_directory_size_in_bytes(test_dir) == sum(file['size'] for file in files)
+    # cloning is tried again only for the first file of another directory
+    clone_by_file = {os.path.relpath(call[0][0], script_folder.strpath): call[1]['clone']
+                     for call in copy_file_mock.call_args_list}
+    assert sorted(clone_by_file.values()) == [False, True, True]
+    assert clone_by_file[os.path.join('test-subdir', 'file-1.bin')]
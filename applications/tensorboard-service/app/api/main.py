@@ -56,7 +56,7 @@ def create():
     except (KeyError, TypeError):
         return _generate_error_response(HTTPStatus.BAD_REQUEST, 'incorrect request body!')
 
-    tensb_mgr = TensorboardManager.incluster_init()
+    tensb_mgr = TensorboardManager.get_instance()
 
     valid_runs, invalid_runs = tensb_mgr.validate_runs(request_body.run_names)
 
@@ -66,7 +66,11 @@ def create():
 
         return json.dumps(response.to_dict()), HTTPStatus.UNPROCESSABLE_ENTITY, CONTENT_TYPE_SLUG
 
-    current_tensorboard_instance = tensb_mgr.get_by_runs(valid_runs)
+    # runs are attached to the shared tensorboard on each request - they stay shown while they are requested
+    current_tensorboard_instance = tensb_mgr.attach_runs(valid_runs) if tensb_mgr.shared else None
+
+    if not current_tensorboard_instance:
+        current_tensorboard_instance = tensb_mgr.get_by_runs(valid_runs)
 
     if current_tensorboard_instance:
         response = TensorboardResponse.from_tensorboard(current_tensorboard_instance)
@@ -76,7 +80,8 @@ def create():
 
         return json.dumps(response.to_dict()), HTTPStatus.CONFLICT, CONTENT_TYPE_SLUG
 
-    tensorboard = tensb_mgr.create(valid_runs)
+    tensorboard = (tensb_mgr.take_from_pool(valid_runs) if tensb_mgr.pool_size else None) or \
+        tensb_mgr.create(valid_runs)
 
     response = TensorboardResponse.from_tensorboard(tensorboard)
 
@@ -88,7 +93,7 @@ def create():
 
 @app.route('/tensorboard/<id>', methods=['GET'])
 def get(id: str):
-    tensb_mgr = TensorboardManager.incluster_init()
+    tensb_mgr = TensorboardManager.get_instance()
 
     current_tensorboard_instance = tensb_mgr.get_by_id(id)
 
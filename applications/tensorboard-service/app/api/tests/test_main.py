@@ -35,7 +35,9 @@ def flask_client():
 # noinspection PyShadowingNames
 def test_create(mocker: MockFixture, flask_client: FlaskClient):
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_instance=lambda *args, **kwargs: MagicMock(
+            shared=False,
+            pool_size=0,
             get_by_runs=lambda *args, **kwargs: None,
             create=lambda *args, **kwargs: Tensorboard(id='0c13c567-378e-4582-9ae3-3a40f2ca7e21',
                                                        url='/test/url/'),
@@ -92,12 +94,75 @@ def test_create_bad_request(flask_client: FlaskClient, request_body: dict):
     assert response.status_code == HTTPStatus.BAD_REQUEST
 
 
+# noinspection PyShadowingNames
+def test_create_shared(mocker: MockFixture, flask_client: FlaskClient):
+    fake_tensorboard_id = '3cf769b5-436e-42ca-9710-c0a61b6c075d'
+    manager = MagicMock(
+        shared=True,
+        get_by_runs=lambda *args, **kwargs: None,
+        attach_runs=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id, url='/test/url/',
+                                                        status=TensorboardStatus.RUNNING),
+        validate_runs=lambda runs: (runs, [])
+    )
+    tensorboard_mgr = MagicMock(get_instance=lambda *args, **kwargs: manager)
+    mocker.patch.object(api.main, 'TensorboardManager', new=tensorboard_mgr)
+
+    response = flask_client.post('/tensorboard', data=json.dumps({'runNames': [{'name': 'run', 'owner': 'carl'}]}))
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert json.loads(response.data.decode('utf-8'))['id'] == fake_tensorboard_id
+    assert manager.create.call_count == 0
+
+
+# noinspection PyShadowingNames
+def test_create_shared_not_created_yet(mocker: MockFixture, flask_client: FlaskClient):
+    fake_tensorboard_id = '3cf769b5-436e-42ca-9710-c0a61b6c075d'
+    manager = MagicMock(
+        shared=True,
+        pool_size=0,
+        get_by_runs=lambda *args, **kwargs: None,
+        attach_runs=lambda *args, **kwargs: None,
+        create=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id, url='/test/url/'),
+        validate_runs=lambda runs: (runs, [])
+    )
+    tensorboard_mgr = MagicMock(get_instance=lambda *args, **kwargs: manager)
+    mocker.patch.object(api.main, 'TensorboardManager', new=tensorboard_mgr)
+
+    response = flask_client.post('/tensorboard', data=json.dumps({'runNames': [{'name': 'run', 'owner': 'carl'}]}))
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert json.loads(response.data.decode('utf-8'))['id'] == fake_tensorboard_id
+
+
+# noinspection PyShadowingNames
+def test_create_from_pool(mocker: MockFixture, flask_client: FlaskClient):
+    fake_tensorboard_id = '3cf769b5-436e-42ca-9710-c0a61b6c075d'
+    manager = MagicMock(
+        shared=False,
+        pool_size=2,
+        get_by_runs=lambda *args, **kwargs: None,
+        take_from_pool=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id, url='/test/url/',
+                                                           status=TensorboardStatus.RUNNING),
+        validate_runs=lambda runs: (runs, [])
+    )
+    tensorboard_mgr = MagicMock(get_instance=lambda *args, **kwargs: manager)
+    mocker.patch.object(api.main, 'TensorboardManager', new=tensorboard_mgr)
+
+    response = flask_client.post('/tensorboard', data=json.dumps({'runNames': [{'name': 'run', 'owner': 'carl'}]}))
+
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert json.loads(response.data.decode('utf-8'))['id'] == fake_tensorboard_id
+    assert manager.create.call_count == 0
+
+
 # noinspection PyShadowingNames
 def test_create_conflict(mocker: MockFixture, flask_client: FlaskClient):
     fake_tensorboard_id = '3cf769b5-436e-42ca-9710-c0a61b6c075d'
     fake_tensorboard_url = '/test/url/'
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_instance=lambda *args, **kwargs: MagicMock(
+            shared=False,
+            pool_size=0,
             get_by_runs=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id,
                                                             url=fake_tensorboard_url,
                                                             status=TensorboardStatus.RUNNING),
@@ -142,7 +207,9 @@ def test_get(mocker: MockFixture, flask_client: FlaskClient):
                                    status=TensorboardStatus.RUNNING)
 
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_instance=lambda *args, **kwargs: MagicMock(
+            shared=False,
+            pool_size=0,
             get_by_id=lambda *args, **kwargs: fake_tensorboard
         )
     )
@@ -163,7 +230,9 @@ def test_get(mocker: MockFixture, flask_client: FlaskClient):
 # noinspection PyShadowingNames
 def test_get_not_found(mocker: MockFixture, flask_client: FlaskClient):
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_instance=lambda *args, **kwargs: MagicMock(
+            shared=False,
+            pool_size=0,
             get_by_id=lambda *args, **kwargs: None
         )
     )
@@ -177,7 +246,9 @@ def test_get_not_found(mocker: MockFixture, flask_client: FlaskClient):
 # noinspection PyShadowingNames
 def test_create_all_invalid_runs(mocker: MockFixture, flask_client: FlaskClient):
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_instance=lambda *args, **kwargs: MagicMock(
+            shared=False,
+            pool_size=0,
             validate_runs=lambda runs: ([], runs),
             get_by_runs=lambda *args, **kwargs: None
         )
@@ -217,7 +288,9 @@ def test_create_partial_invalid_runs(mocker: MockFixture, flask_client: FlaskCli
     fake_tensorboard_url = '/test/url/'
 
     tensorboard_mgr = MagicMock(
-        incluster_init=lambda *args, **kwargs: MagicMock(
+        get_instance=lambda *args, **kwargs: MagicMock(
+            shared=False,
+            pool_size=0,
             validate_runs=lambda runs: ([runs[0], runs[1]], [runs[2]]),
             create=lambda *args, **kwargs: Tensorboard(id=fake_tensorboard_id, url=fake_tensorboard_url),
             get_by_runs=lambda *args, **kwargs: None
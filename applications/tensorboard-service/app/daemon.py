@@ -14,9 +14,10 @@
 # limitations under the License.
 #
 
+import asyncio
 import logging as log
-from time import sleep
 
+from tensorboard.garbage_collector import GarbageCollector
 from tensorboard.tensorboard import TensorboardManager
 
 
@@ -26,7 +27,4 @@ log.debug('daemon started!')
 
 mgr = TensorboardManager.incluster_init()
 
-while True:
-    mgr.delete_garbage()
-    log.debug('sleeping for 5 seconds...')
-    sleep(5)
+asyncio.get_event_loop().run_until_complete(GarbageCollector(mgr).run_forever())
@@ -0,0 +1,133 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from collections import defaultdict
+import logging as log
+import threading
+from time import sleep
+from typing import Callable, Dict, List, Optional, Set
+
+from kubernetes import watch
+
+
+class K8SResourceCache:
+    """
+    Local copy of Kubernetes objects of one kind, kept up to date by watching them in a background thread
+    (like informers of client-go). Objects can be looked up by name or by values of indexed labels without
+    calling Kubernetes API.
+    """
+    # watch is restarted with a full list of objects after this time, so missed events can't make cache stale forever
+    WATCH_TIMEOUT_SECONDS = 300
+    ERROR_BACKOFF_SECONDS = 5
+
+    def __init__(self, list_function: Callable, namespace: str, label_selector: str, indexed_labels: List[str]):
+        """
+        :param list_function: function of Kubernetes API listing objects, e.g. CoreV1Api().list_namespaced_pod
+        :param namespace: namespace of objects
+        :param label_selector: selector of cached objects
+        :param indexed_labels: labels by which objects can be looked up with get_by_label
+        """
+        self._list_function = list_function
+        self._namespace = namespace
+        self._label_selector = label_selector
+        self._indexed_labels = indexed_labels
+
+        self._lock = threading.Lock()
+        self._objects: Dict[str, object] = {}
+        self._indices: Dict[str, Dict[str, Set[str]]] = {label: defaultdict(set) for label in indexed_labels}
+        self._synced = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def has_synced(self) -> bool:
+        return self._synced.is_set()
+
+    def get(self, name: str):
+        with self._lock:
+            return self._objects.get(name)
+
+    def get_by_label(self, label: str, value: str) -> List:
+        with self._lock:
+            return [self._objects[name] for name in sorted(self._indices[label].get(value, ()))]
+
+    def list(self) -> List:
+        with self._lock:
+            return list(self._objects.values())
+
+    def _add(self, obj):
+        name = obj.metadata.name
+        self._remove(name)
+        self._objects[name] = obj
+        labels = obj.metadata.labels or {}
+        for label in self._indexed_labels:
+            if label in labels:
+                self._indices[label][labels[label]].add(name)
+
+    def _remove(self, name: str):
+        obj = self._objects.pop(name, None)
+        if obj is None:
+            return
+        labels = obj.metadata.labels or {}
+        for label in self._indexed_labels:
+            names = self._indices[label].get(labels.get(label))
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self._indices[label][labels[label]]
+
+    def _list(self) -> str:
+        object_list = self._list_function(namespace=self._namespace, label_selector=self._label_selector)
+        with self._lock:
+            self._objects = {}
+            self._indices = {label: defaultdict(set) for label in self._indexed_labels}
+            for obj in object_list.items:
+                self._add(obj)
+        self._synced.set()
+        return object_list.metadata.resource_version
+
+    def _watch(self, resource_version: str):
+        for event in watch.Watch().stream(self._list_function, namespace=self._namespace,
+                                          label_selector=self._label_selector, resource_version=resource_version,
+                                          timeout_seconds=self.WATCH_TIMEOUT_SECONDS):
+            if self._stopped.is_set():
+                return
+            event_type = event['type']
+            if event_type == 'ERROR':
+                # usually resource version is too old - objects have to be listed again
+                log.debug(f'watch error: {event["raw_object"]}')
+                return
+            with self._lock:
+                if event_type == 'DELETED':
+                    self._remove(event['object'].metadata.name)
+                else:
+                    self._add(event['object'])
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                resource_version = self._list()
+                self._watch(resource_version)
+            except Exception:
+                log.exception('error during watching Kubernetes objects')
+                sleep(self.ERROR_BACKOFF_SECONDS)
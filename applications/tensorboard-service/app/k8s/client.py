@@ -64,8 +64,12 @@ class K8SAPIClient:
 
         return deployment
 
-    def delete_deployment(self, name: str, namespace: str, **kwargs):
-        self.apps_api_client.delete_namespaced_deployment(name=name, namespace=namespace, body=V1DeleteOptions(),
+    def patch_deployment(self, name: str, namespace: str, body: dict, **kwargs):
+        self.apps_api_client.patch_namespaced_deployment(name=name, namespace=namespace, body=body, **kwargs)
+
+    def delete_deployment(self, name: str, namespace: str, propagation_policy: str = None, **kwargs):
+        self.apps_api_client.delete_namespaced_deployment(name=name, namespace=namespace,
+                                                          body=V1DeleteOptions(propagation_policy=propagation_policy),
                                                           **kwargs)
 
     def create_service(self, namespace: str, body: V1Service, **kwargs):
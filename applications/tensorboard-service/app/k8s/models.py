@@ -15,6 +15,7 @@
 #
 
 from hashlib import sha1
+import json
 import os
 from typing import List
 
@@ -26,6 +27,15 @@ from tensorboard.models import Run
 class K8STensorboardInstance:
     EXPERIMENTS_OUTPUT_VOLUME_NAME = 'output-public'
     TENSORBOARD_CONTAINER_MOUNT_PATH_PREFIX = '/mnt/exp'
+    # used only by shared and pooled tensorboards - their logdir contains links to runs placed in output volume
+    RUNS_VOLUME_NAME = 'runs'
+    EXPERIMENTS_OUTPUT_MOUNT_PATH = '/mnt/output'
+    ACTIVITY_PROXY_RUNS_API_PORT = 8081
+    # runs attached by activity proxy of a shared tensorboard when it starts
+    SHARED_RUNS_ENV = 'TENSORBOARD_RUNS'
+    # values of 'pool' label of pooled tensorboards - an idle one waits in the pool for runs to show
+    POOL_IDLE = 'idle'
+    POOL_BOUND = 'bound'
 
     def __init__(self, deployment: k8s.V1Deployment, service: k8s.V1Service, ingress: k8s.V1beta1Ingress,
                  pod: k8s.V1Pod = None):
@@ -46,8 +56,19 @@ class K8STensorboardInstance:
         run_names_hash = sha1(run_names_str.encode('utf-8')).hexdigest()
         return run_names_hash
 
+    @staticmethod
+    def runs_to_json(runs: List[Run]) -> str:
+        return json.dumps([run.to_dict() for run in runs])
+
     @classmethod
-    def from_runs(cls, id: str, runs: List[Run]):
+    def from_runs(cls, id: str, runs: List[Run], nauta_config: NautaPlatformConfig = None, shared: bool = False,
+                  pooled: bool = False):
+        """
+        :param shared: if True, runs of the tensorboard can be changed without replacing its pod - they are
+         links in tensorboard's logdir managed by activity proxy, instead of separately mounted volumes
+        :param pooled: if True, the tensorboard is created as an idle member of the pool of tensorboards - runs
+         are attached to it the same way as to a shared one, when it is taken from the pool
+        """
         k8s_name = 'tensorboard-' + id
         run_names_hash = K8STensorboardInstance.generate_run_names_hash(runs)
 
@@ -68,6 +89,46 @@ class K8STensorboardInstance:
             'id': id,
             'runs-hash': run_names_hash
         }
+        pod_labels = deployment_labels
+
+        volumes = [
+            k8s.V1Volume(
+                name=cls.EXPERIMENTS_OUTPUT_VOLUME_NAME,
+                persistent_volume_claim=k8s.V1PersistentVolumeClaimVolumeSource(
+                    claim_name=cls.EXPERIMENTS_OUTPUT_VOLUME_NAME,
+                    read_only=True
+                )
+            )
+        ]
+        proxy_ports = [k8s.V1ContainerPort(container_port=80)]
+        proxy_volume_mounts = None
+        proxy_env = None
+
+        if shared:
+            deployment_labels['shared'] = 'true'
+        if pooled:
+            deployment_labels['pool'] = cls.POOL_IDLE
+
+        if shared or pooled:
+            # runs-hash and pool labels of such tensorboard change together with its runs, so they can't be a part
+            # of deployment's selector, which is immutable
+            pod_labels = {key: value for key, value in deployment_labels.items() if key not in ('runs-hash', 'pool')}
+            volume_mounts = [
+                k8s.V1VolumeMount(name=cls.EXPERIMENTS_OUTPUT_VOLUME_NAME, mount_path=cls.EXPERIMENTS_OUTPUT_MOUNT_PATH,
+                                  read_only=True),
+                k8s.V1VolumeMount(name=cls.RUNS_VOLUME_NAME, mount_path=cls.TENSORBOARD_CONTAINER_MOUNT_PATH_PREFIX,
+                                  read_only=True)
+            ]
+            volumes.append(k8s.V1Volume(name=cls.RUNS_VOLUME_NAME, empty_dir=k8s.V1EmptyDirVolumeSource()))
+            proxy_ports.append(k8s.V1ContainerPort(container_port=cls.ACTIVITY_PROXY_RUNS_API_PORT))
+            proxy_volume_mounts = [
+                k8s.V1VolumeMount(name=cls.RUNS_VOLUME_NAME, mount_path=cls.TENSORBOARD_CONTAINER_MOUNT_PATH_PREFIX)
+            ]
+            proxy_env = [
+                k8s.V1EnvVar(name='TENSORBOARD_RUNS_DIR', value=cls.TENSORBOARD_CONTAINER_MOUNT_PATH_PREFIX),
+                k8s.V1EnvVar(name='TENSORBOARD_OUTPUT_DIR', value=cls.EXPERIMENTS_OUTPUT_MOUNT_PATH),
+                k8s.V1EnvVar(name=cls.SHARED_RUNS_ENV, value=cls.runs_to_json(runs))
+            ]
 
         tensorboard_command = [
             "tensorboard",
@@ -76,7 +137,7 @@ class K8STensorboardInstance:
             "--host", "127.0.0.1"
         ]
 
-        nauta_config = NautaPlatformConfig.incluster_init()
+        nauta_config = nauta_config or NautaPlatformConfig.incluster_init()
 
         tensorboard_image = nauta_config.get_tensorboard_image()
         tensorboard_proxy_image = nauta_config.get_activity_proxy_image()
@@ -90,11 +151,11 @@ class K8STensorboardInstance:
                                       spec=k8s.V1DeploymentSpec(
                                           replicas=1,
                                           selector=k8s.V1LabelSelector(
-                                              match_labels=deployment_labels
+                                              match_labels=pod_labels
                                           ),
                                           template=k8s.V1PodTemplateSpec(
                                               metadata=k8s.V1ObjectMeta(
-                                                  labels=deployment_labels
+                                                  labels=pod_labels
                                               ),
                                               spec=k8s.V1PodSpec(
                                                   tolerations=[k8s.V1Toleration(
@@ -125,11 +186,9 @@ class K8STensorboardInstance:
                                                       k8s.V1Container(
                                                           name='proxy',
                                                           image=tensorboard_proxy_image,
-                                                          ports=[
-                                                              k8s.V1ContainerPort(
-                                                                  container_port=80
-                                                              )
-                                                          ],
+                                                          ports=proxy_ports,
+                                                          env=proxy_env,
+                                                          volume_mounts=proxy_volume_mounts,
                                                           readiness_probe=k8s.V1Probe(
                                                               period_seconds=5,
                                                               http_get=k8s.V1HTTPGetAction(
@@ -139,16 +198,7 @@ class K8STensorboardInstance:
                                                           )
                                                       )
                                                   ],
-                                                  volumes=[
-                                                      k8s.V1Volume(
-                                                          name=cls.EXPERIMENTS_OUTPUT_VOLUME_NAME,
-                                                          persistent_volume_claim=  # noqa
-                                                          k8s.V1PersistentVolumeClaimVolumeSource(
-                                                              claim_name=cls.EXPERIMENTS_OUTPUT_VOLUME_NAME,
-                                                              read_only=True
-                                                          )
-                                                      )
-                                                  ]
+                                                  volumes=volumes
                                               )
                                           )
                                       ))
@@ -0,0 +1,98 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+from unittest.mock import MagicMock
+
+from kubernetes.client import V1Pod, V1PodList, V1ObjectMeta, V1ListMeta
+
+from k8s.cache import K8SResourceCache
+
+FAKE_NAMESPACE = 'fake-namespace'
+
+
+def fake_pod(name: str, id: str) -> V1Pod:
+    return V1Pod(metadata=V1ObjectMeta(name=name, labels={'id': id, 'type': 'nauta-tensorboard'}))
+
+
+def create_cache(pods) -> K8SResourceCache:
+    list_function = MagicMock(return_value=V1PodList(items=pods, metadata=V1ListMeta(resource_version='10')))
+    return K8SResourceCache(list_function=list_function, namespace=FAKE_NAMESPACE,
+                            label_selector='type=nauta-tensorboard', indexed_labels=['id'])
+
+
+def test_list():
+    cache = create_cache([fake_pod('pod-1', 'id-1'), fake_pod('pod-2', 'id-2')])
+
+    assert not cache.has_synced()
+    resource_version = cache._list()
+
+    assert resource_version == '10'
+    assert cache.has_synced()
+    assert cache.get('pod-1').metadata.labels['id'] == 'id-1'
+    assert cache.get_by_label('id', 'id-2') == [cache.get('pod-2')]
+    assert cache.get_by_label('id', 'id-3') == []
+    assert len(cache.list()) == 2
+
+
+def test_watch(mocker):
+    cache = create_cache([fake_pod('pod-1', 'id-1'), fake_pod('pod-2', 'id-2')])
+    cache._list()
+    watch_mock = mocker.patch('kubernetes.watch.Watch')
+    watch_mock.return_value.stream.return_value = [
+        {'type': 'ADDED', 'object': fake_pod('pod-3', 'id-3')},
+        {'type': 'MODIFIED', 'object': fake_pod('pod-1', 'id-4')},
+        {'type': 'DELETED', 'object': fake_pod('pod-2', 'id-2')},
+    ]
+
+    cache._watch('10')
+
+    assert watch_mock.return_value.stream.call_args[1]['resource_version'] == '10'
+    assert cache.get_by_label('id', 'id-3') == [cache.get('pod-3')]
+    assert cache.get_by_label('id', 'id-1') == []
+    assert cache.get_by_label('id', 'id-4') == [cache.get('pod-1')]
+    assert cache.get('pod-2') is None
+    assert cache.get_by_label('id', 'id-2') == []
+
+
+def test_watch_error(mocker):
+    cache = create_cache([fake_pod('pod-1', 'id-1')])
+    cache._list()
+    watch_mock = mocker.patch('kubernetes.watch.Watch')
+    watch_mock.return_value.stream.return_value = [
+        {'type': 'ERROR', 'object': None, 'raw_object': {'code': 410}},
+        {'type': 'ADDED', 'object': fake_pod('pod-3', 'id-3')},
+    ]
+
+    cache._watch('10')
+
+    assert cache.get('pod-3') is None
+
+
+def test_run_relists_after_error(mocker):
+    cache = create_cache([fake_pod('pod-1', 'id-1')])
+    mocker.patch('k8s.cache.sleep')
+
+    def fake_watch(resource_version):
+        if cache._list_function.call_count == 1:
+            raise RuntimeError
+        cache.stop()
+
+    mocker.patch.object(cache, '_watch', new=fake_watch)
+
+    cache._run()
+
+    assert cache._list_function.call_count == 2
@@ -103,6 +103,17 @@ def test_delete_deployment(k8s_api_client_mock: K8SAPIClient):
                                 body=k8s_models.V1DeleteOptions())
 
 
+# noinspection PyShadowingNames
+def test_delete_deployment_foreground(k8s_api_client_mock: K8SAPIClient):
+    k8s_api_client_mock.delete_deployment(name='fake-name', namespace=MY_FAKE_NAMESPACE,
+                                          propagation_policy='Foreground')
+
+    k8s_api_client_mock.apps_api_client.delete_namespaced_deployment.\
+        assert_called_once_with(name='fake-name',
+                                namespace=MY_FAKE_NAMESPACE,
+                                body=k8s_models.V1DeleteOptions(propagation_policy='Foreground'))
+
+
 # noinspection PyShadowingNames
 def test_create_service(k8s_api_client_mock: K8SAPIClient):
     k8s_api_client_mock.create_service(namespace=MY_FAKE_NAMESPACE, body=k8s_models.V1Service())
@@ -14,6 +14,7 @@
 # limitations under the License.
 #
 
+import json
 import random
 from typing import List
 
@@ -49,6 +50,42 @@ def test_generate_tensorboard_deployment(mocker):
     assert len(volume_mounts) == len(fake_runs)
 
 
+def test_generate_shared_tensorboard_deployment(mocker):
+    mocker.patch('k8s.models.NautaPlatformConfig')
+    fake_runs = [Run(name="some-run-2", owner='alice'), Run(name="some-run-1", owner='bob')]
+
+    model_instance = K8STensorboardInstance.from_runs(id='a7db5449-6168-4010-9ce6-cbaefbbfa4a1', runs=fake_runs,
+                                                      shared=True)
+
+    deployment = model_instance.deployment
+    assert deployment.metadata.labels['shared'] == 'true'
+    assert deployment.metadata.labels['runs-hash'] == K8STensorboardInstance.generate_run_names_hash(fake_runs)
+    assert 'runs-hash' not in deployment.spec.selector.match_labels
+    assert 'runs-hash' not in deployment.spec.template.metadata.labels
+
+    app_container, proxy_container = deployment.spec.template.spec.containers
+    assert [mount.mount_path for mount in app_container.volume_mounts] == ['/mnt/output', '/mnt/exp']
+    assert [mount.mount_path for mount in proxy_container.volume_mounts] == ['/mnt/exp']
+    proxy_env = {env.name: env.value for env in proxy_container.env}
+    assert json.loads(proxy_env['TENSORBOARD_RUNS']) == [run.to_dict() for run in fake_runs]
+    assert any(port.container_port == K8STensorboardInstance.ACTIVITY_PROXY_RUNS_API_PORT
+               for port in proxy_container.ports)
+    assert any(volume.empty_dir for volume in deployment.spec.template.spec.volumes)
+
+
+def test_generate_pooled_tensorboard_deployment(mocker):
+    mocker.patch('k8s.models.NautaPlatformConfig')
+
+    model_instance = K8STensorboardInstance.from_runs(id='a7db5449-6168-4010-9ce6-cbaefbbfa4a1', runs=[], pooled=True)
+
+    deployment = model_instance.deployment
+    assert deployment.metadata.labels['pool'] == 'idle'
+    assert 'shared' not in deployment.metadata.labels
+    assert 'pool' not in deployment.spec.selector.match_labels
+    assert 'runs-hash' not in deployment.spec.template.metadata.labels
+    assert any(volume.empty_dir for volume in deployment.spec.template.spec.volumes)
+
+
 def test_generate_run_names_hash():
     fake_runs = [
         Run(
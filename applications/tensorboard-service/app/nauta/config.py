@@ -25,6 +25,9 @@ NAUTA_CONFIG_CONFIGMAP_NAMESPACE = 'nauta'
 NAUTA_CONFIG_TENSORBOARD_TIMEOUT = 'tensorboard.timeout'
 NAUTA_DEFAULT_TENSORBOARD_TIMEOUT = '1800'
 
+NAUTA_CONFIG_TENSORBOARD_SHARED = 'tensorboard.shared'
+NAUTA_CONFIG_TENSORBOARD_POOL_SIZE = 'tensorboard.pool.size'
+
 
 class NautaPlatformConfig:
     def __init__(self, k8s_api_client: client.CoreV1Api):
@@ -57,3 +60,14 @@ class NautaPlatformConfig:
         if data.get(NAUTA_CONFIG_TENSORBOARD_TIMEOUT):
             return data.get(NAUTA_CONFIG_TENSORBOARD_TIMEOUT)
         return NAUTA_CONFIG_TENSORBOARD_TIMEOUT
+
+    def get_tensorboard_shared(self) -> bool:
+        data = self._fetch_platform_configmap()
+        return data.get(NAUTA_CONFIG_TENSORBOARD_SHARED, 'false').lower() == 'true'
+
+    def get_tensorboard_pool_size(self) -> int:
+        data = self._fetch_platform_configmap()
+        try:
+            return max(int(data.get(NAUTA_CONFIG_TENSORBOARD_POOL_SIZE, 0)), 0)
+        except ValueError:
+            return 0
@@ -75,3 +75,23 @@ def test_get_activity_proxy_image(mocker, nauta_platform_config_mocked: NautaPla
     ap_image = nauta_platform_config_mocked.get_activity_proxy_image()
 
     assert ap_image == '127.0.0.1:30303/activity-proxy:dev'
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize('configmap_data,expected_shared', [({}, False), ({'tensorboard.shared': 'True'}, True),
+                                                            ({'tensorboard.shared': 'false'}, False)])
+def test_get_tensorboard_shared(mocker, nauta_platform_config_mocked: NautaPlatformConfig, configmap_data,
+                                expected_shared):
+    mocker.patch.object(nauta_platform_config_mocked, '_fetch_platform_configmap').return_value = configmap_data
+
+    assert nauta_platform_config_mocked.get_tensorboard_shared() == expected_shared
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize('configmap_data,expected_pool_size', [({}, 0), ({'tensorboard.pool.size': '3'}, 3),
+                                                               ({'tensorboard.pool.size': 'many'}, 0)])
+def test_get_tensorboard_pool_size(mocker, nauta_platform_config_mocked: NautaPlatformConfig, configmap_data,
+                                   expected_pool_size):
+    mocker.patch.object(nauta_platform_config_mocked, '_fetch_platform_configmap').return_value = configmap_data
+
+    assert nauta_platform_config_mocked.get_tensorboard_pool_size() == expected_pool_size
@@ -0,0 +1,150 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+import logging as log
+from time import monotonic
+from typing import List, NamedTuple, Optional
+
+from kubernetes.client import V1Deployment
+from kubernetes.client.rest import ApiException
+
+from tensorboard.proxy_client import MAX_CONCURRENT_REQUESTS, try_get_last_request_datetime
+from tensorboard.tensorboard import TensorboardManager
+
+
+class GarbageCollectionStats(NamedTuple):
+    instances: int
+    reclaimed: int
+    failed: int
+    # time of checking all proxies, in seconds
+    check_latency: float
+
+
+class GarbageCollector:
+    """
+    Deletes tensorboards which haven't been used for a time longer than the garbage collection timeout. Kubernetes
+    client and proxy client are blocking, so their calls are made in a pool of threads and awaited together.
+    """
+    MIN_INTERVAL_SECONDS = 5.0
+    MAX_INTERVAL_SECONDS = 60.0
+    # the interval grows with a number of tensorboards, so each of proxies is asked at most this many times
+    # per second in total - many tensorboards in a namespace don't flood its proxies and API server with requests
+    PROXY_CHECKS_PER_SECOND = 10.0
+    MAX_CONCURRENT_DELETIONS = 8
+    DELETE_PROPAGATION_POLICY = 'Foreground'
+
+    def __init__(self, manager: TensorboardManager, executor: Executor = None):
+        self.manager = manager
+        self._executor = executor or ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+        self.reclaimed_total = 0
+
+    async def _call(self, function, *args, **kwargs):
+        return await asyncio.get_event_loop().run_in_executor(self._executor, partial(function, *args, **kwargs))
+
+    async def _get_last_request_datetime(self, deployment: V1Deployment) -> Optional[datetime]:
+        try:
+            return await self._call(try_get_last_request_datetime, proxy_address=deployment.metadata.name,
+                                    timeout=self.manager.PROXY_REQUEST_TIMEOUT)
+        except Exception:
+            # a single broken proxy can't stop checking other proxies
+            log.exception(f'failed to get last request datetime from {deployment.metadata.name} proxy')
+            return None
+
+    async def _delete(self, deployment: V1Deployment, semaphore: asyncio.Semaphore) -> bool:
+        name = deployment.metadata.name
+        client = self.manager.client
+        namespace = self.manager.namespace
+
+        async with semaphore:
+            log.debug(f'garbage detected: {name} , removing...')
+            # deployment is removed after its pods, so a tensorboard being deleted is still listed until it stops
+            results = await asyncio.gather(
+                self._call(client.delete_service, name=name, namespace=namespace),
+                self._call(client.delete_ingress, name=name, namespace=namespace),
+                self._call(client.delete_deployment, name=name, namespace=namespace,
+                           propagation_policy=self.DELETE_PROPAGATION_POLICY),
+                return_exceptions=True
+            )
+
+        # objects left by a previous, partially failed deletion are deleted now, so missing ones aren't an error
+        errors = [result for result in results if isinstance(result, Exception) and
+                  not (isinstance(result, ApiException) and result.status == HTTPStatus.NOT_FOUND)]
+        for error in errors:
+            log.error(f'failed to remove garbage {name}: {error}')
+        if not errors:
+            log.debug(f'garbage removed: {name}')
+        return not errors
+
+    async def collect(self) -> GarbageCollectionStats:
+        log.debug("searching for garbage...")
+
+        tensorboards: List[V1Deployment] = await self._call(self.manager.list_garbage_candidates)
+        await self._call(self.manager.refresh_garbage_timeout)
+
+        check_start = monotonic()
+        last_request_datetimes = await asyncio.gather(*[self._get_last_request_datetime(deployment)
+                                                        for deployment in tensorboards])
+        check_latency = monotonic() - check_start
+
+        garbage = [deployment for deployment, last_request_datetime in zip(tensorboards, last_request_datetimes)
+                   if last_request_datetime is not None and self.manager.is_garbage(last_request_datetime)]
+
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DELETIONS)
+        deleted = await asyncio.gather(*[self._delete(deployment, semaphore) for deployment in garbage])
+
+        reclaimed = sum(deleted)
+        self.reclaimed_total += reclaimed
+        return GarbageCollectionStats(instances=len(tensorboards), reclaimed=reclaimed,
+                                      failed=len(garbage) - reclaimed, check_latency=check_latency)
+
+    def get_interval(self, instances: int) -> float:
+        """
+        :param instances: number of tensorboards checked during the last collection
+        :return: time in seconds to wait before the next collection
+        """
+        return min(max(instances / self.PROXY_CHECKS_PER_SECOND, self.MIN_INTERVAL_SECONDS),
+                   self.MAX_INTERVAL_SECONDS)
+
+    async def run_forever(self):
+        while True:
+            instances = 0
+            try:
+                stats = await self.collect()
+                instances = stats.instances
+                log.info(f'garbage collection: instances={stats.instances} reclaimed={stats.reclaimed} '
+                         f'failed={stats.failed} reclaimed_total={self.reclaimed_total} '
+                         f'check_latency={stats.check_latency:.3f}s')
+            except ApiException as ex:
+                if ex.status != HTTPStatus.GATEWAY_TIMEOUT:
+                    raise ex
+                log.exception("gateway timeout occurred when searching for garbage")
+
+            if self.manager.pool_size:
+                try:
+                    await self._call(self.manager.refill_pool)
+                except Exception:
+                    # the pool is refilled again after the next collection
+                    log.exception('failed to refill the pool of tensorboards')
+
+            interval = self.get_interval(instances)
+            log.debug(f'sleeping for {interval} seconds...')
+            await asyncio.sleep(interval)
@@ -14,22 +14,48 @@
 # limitations under the License.
 #
 
+
 from datetime import datetime
+from http import HTTPStatus
 import json
 import logging as log
-from typing import Optional
+from typing import Callable, List, Optional
 
 import dateutil.parser
 import requests
+import requests.adapters
 import requests.exceptions
 
+from tensorboard.models import Run
+
+# proxies are queried concurrently during each garbage collection, so this is also a number of kept-alive connections
+MAX_CONCURRENT_REQUESTS = 32
+
+PROXY_REQUEST_TIMEOUT = 5
+
+# formats of datetime.isoformat() used by activity proxy - with and without microseconds
+ISO_DATETIME_FORMATS = ('%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S')
+
+_session = requests.Session()
+_session.mount('http://', requests.adapters.HTTPAdapter(pool_connections=MAX_CONCURRENT_REQUESTS,
+                                                        pool_maxsize=MAX_CONCURRENT_REQUESTS))
 
-def try_get_last_request_datetime(proxy_address: str) -> Optional[datetime]:
+
+def _parse_datetime(datetime_str: str) -> datetime:
+    for datetime_format in ISO_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(datetime_str, datetime_format)
+        except ValueError:
+            pass
+    return dateutil.parser.parse(datetime_str)
+
+
+def try_get_last_request_datetime(proxy_address: str, timeout: float = PROXY_REQUEST_TIMEOUT) -> Optional[datetime]:
     # sometimes proxy times out with the response and that's okay - it might be too busy with getting the last request
     # timestamp. try again shortly - it should return proper response.
     try:
-        proxy_response = requests.get(f'http://{proxy_address}/inactivity', timeout=5)
-    except requests.exceptions.ConnectionError:
+        proxy_response = _session.get(f'http://{proxy_address}/inactivity', timeout=timeout)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
         log.exception('connection to proxy failed')
         return None
 
@@ -39,6 +65,45 @@ def try_get_last_request_datetime(proxy_address: str) -> Optional[datetime]:
 
     last_request_datetime_str = proxy_response_dict['lastRequestDatetime']
 
-    last_request_datetime: datetime = dateutil.parser.parse(last_request_datetime_str)
+    last_request_datetime: datetime = _parse_datetime(last_request_datetime_str)
 
     return last_request_datetime
+
+
+def _send_runs(send: Callable, proxy_address: str, body: dict, timeout: float) -> bool:
+    try:
+        proxy_response = send(f'http://{proxy_address}/runs', json=body, timeout=timeout)
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        log.exception('connection to proxy failed')
+        return False
+
+    if proxy_response.status_code != HTTPStatus.OK:
+        log.error(f'attaching runs failed: {proxy_response.status_code} {proxy_response.text}')
+        return False
+
+    return True
+
+
+def attach_runs(proxy_address: str, runs: List[Run], timeout: float = PROXY_REQUEST_TIMEOUT) -> bool:
+    """
+    Makes a tensorboard show given runs, instead of runs shown currently.
+    :param proxy_address: address (with port) of runs API of tensorboard's activity proxy
+    :param runs: runs to show
+    :param timeout: timeout of the request
+    :return: True if runs were attached
+    """
+    return _send_runs(_session.put, proxy_address, body={'runNames': [run.to_dict() for run in runs]},
+                      timeout=timeout)
+
+
+def add_runs(proxy_address: str, runs: List[Run], ttl_seconds: int, timeout: float = PROXY_REQUEST_TIMEOUT) -> bool:
+    """
+    Makes a shared tensorboard show given runs, in addition to runs shown currently.
+    :param proxy_address: address (with port) of runs API of tensorboard's activity proxy
+    :param runs: runs to show
+    :param ttl_seconds: time after which the proxy detaches a run which hasn't been added again
+    :param timeout: timeout of the request
+    :return: True if runs were added
+    """
+    return _send_runs(_session.post, proxy_address,
+                      body={'runNames': [run.to_dict() for run in runs], 'ttlSeconds': ttl_seconds}, timeout=timeout)
@@ -16,9 +16,12 @@
 
 from datetime import datetime, timedelta
 from http import HTTPStatus
+import json
 import logging as log
 from os import path
-from typing import List, Optional
+import threading
+from time import monotonic
+from typing import Dict, List, Optional
 from uuid import uuid4
 
 from kubernetes import config
@@ -26,24 +29,48 @@ from kubernetes.client import V1Deployment, V1ObjectMeta, V1Pod, V1ContainerStat
 from kubernetes.client.rest import ApiException
 import requests
 
+from k8s.cache import K8SResourceCache
 from k8s.client import K8SAPIClient, K8SPodPhase
 import k8s.models
 from tensorboard.models import Tensorboard, TensorboardStatus, Run
-from tensorboard.proxy_client import try_get_last_request_datetime
+from tensorboard.proxy_client import add_runs, attach_runs
 from nauta.config import NautaPlatformConfig
 
 
+_nginx_session = requests.Session()
+
+
 class TensorboardManager:
     OUTPUT_PUBLIC_MOUNT_PATH = '/mnt/output'
     NGINX_INGRESS_ADDRESS = 'nauta-ingress.nauta'
+    PROXY_REQUEST_TIMEOUT = 2.0
+    TENSORBOARD_LABEL_SELECTOR = 'type=nauta-tensorboard'
+    # GUI polls status of a tensorboard every few seconds, a running tensorboard isn't checked again for this time
+    REACHABILITY_CACHE_TTL_SECONDS = 10.0
+
+    _instance: Optional['TensorboardManager'] = None
+    _instance_lock = threading.Lock()
+    # url -> monotonic time until which the url is considered reachable
+    _reachable_urls: Dict[str, float] = {}
 
     def __init__(self, namespace: str, api_client: K8SAPIClient,
-                 config: NautaPlatformConfig):
+                 config: NautaPlatformConfig, shared: bool = False, pool_size: int = 0):
+        """
+        :param shared: if True, one tensorboard is shared by all requests - requested runs are attached to it
+         instead of creating a new tensorboard for each set of runs
+        :param pool_size: number of idle tensorboards kept running - requested runs are attached to one of them,
+         so they are shown without waiting for a new tensorboard to start
+        """
         self.client = api_client
+        self.shared = shared
+        self.pool_size = pool_size
         self.namespace = namespace
         self._config = config
         self._tb_timeout = self._config.get_tensorboard_timeout()
         self._last_tb_timeout_load = TensorboardManager._get_current_datetime()
+        self.deployments_cache: Optional[K8SResourceCache] = None
+        self.ingresses_cache: Optional[K8SResourceCache] = None
+        self.pods_cache: Optional[K8SResourceCache] = None
 
     @classmethod
     def incluster_init(cls):
@@ -54,16 +81,78 @@ class TensorboardManager:
         with open("/var/run/secrets/kubernetes.io/serviceaccount/namespace", mode='r') as file:
             my_current_namespace = file.read()
 
-        return cls(namespace=my_current_namespace, api_client=K8SAPIClient(), config=nauta_config)
+        return cls(namespace=my_current_namespace, api_client=K8SAPIClient(), config=nauta_config,
+                   shared=nauta_config.get_tensorboard_shared(),
+                   pool_size=nauta_config.get_tensorboard_pool_size())
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Returns a manager shared by the whole process. It is created on first use, together with caches
+        of tensorboards' deployments, ingresses and pods.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                manager = cls.incluster_init()
+                manager.start_caches()
+                cls._instance = manager
+            return cls._instance
+
+    def start_caches(self):
+        self.deployments_cache = K8SResourceCache(list_function=self.client.apps_api_client.list_namespaced_deployment,
+                                                  namespace=self.namespace,
+                                                  label_selector=self.TENSORBOARD_LABEL_SELECTOR,
+                                                  indexed_labels=['id', 'runs-hash', 'shared', 'pool'])
+        self.ingresses_cache = K8SResourceCache(
+            list_function=self.client.extensions_v1beta1_api_client.list_namespaced_ingress,
+            namespace=self.namespace, label_selector=self.TENSORBOARD_LABEL_SELECTOR, indexed_labels=['id']
+        )
+        self.pods_cache = K8SResourceCache(list_function=self.client.v1_api_client.list_namespaced_pod,
+                                           namespace=self.namespace, label_selector=self.TENSORBOARD_LABEL_SELECTOR,
+                                           indexed_labels=['id'])
+        for cache in (self.deployments_cache, self.ingresses_cache, self.pods_cache):
+            cache.start()
+
+    @staticmethod
+    def _synced(cache: Optional[K8SResourceCache]) -> Optional[K8SResourceCache]:
+        return cache if cache and cache.has_synced() else None
+
+    # objects missing in caches are read from Kubernetes API - they might have been created a moment ago
+    def _get_deployment(self, name: str) -> Optional[V1Deployment]:
+        cache = self._synced(self.deployments_cache)
+        deployment = cache.get(name) if cache else None
+        return deployment or self.client.get_deployment(name=name, namespace=self.namespace)
+
+    def _get_deployments_by_runs_hash(self, runs_hash: str) -> List[V1Deployment]:
+        cache = self._synced(self.deployments_cache)
+        deployments = cache.get_by_label('runs-hash', runs_hash) if cache else None
+        return deployments or self.client.list_deployments(namespace=self.namespace,
+                                                           label_selector=f'runs-hash={runs_hash}')
+
+    def _get_ingress(self, id: str):
+        cache = self._synced(self.ingresses_cache)
+        ingresses = cache.get_by_label('id', id) if cache else None
+        if ingresses:
+            return ingresses[0]
+        return self.client.list_ingresses(namespace=self.namespace, label_selector=f'id={id}')[0]
+
+    def _get_pod(self, id: str) -> Optional[V1Pod]:
+        cache = self._synced(self.pods_cache)
+        pods = cache.get_by_label('id', id) if cache else None
+        if pods:
+            return pods[0]
+        return self.client.get_pod(namespace=self.namespace, label_selector=f'id={id},type=nauta-tensorboard')
 
     @staticmethod
     def _get_current_datetime() -> datetime:
         return datetime.utcnow()
 
-    def create(self, runs: List[Run]) -> Tensorboard:
+    def create(self, runs: List[Run], pooled: bool = False) -> Tensorboard:
         new_tensorboard = Tensorboard(id=str(uuid4()))
 
-        k8s_tensorboard_model = k8s.models.K8STensorboardInstance.from_runs(runs=runs, id=new_tensorboard.id)
+        k8s_tensorboard_model = k8s.models.K8STensorboardInstance.from_runs(runs=runs, id=new_tensorboard.id,
+                                                                            nauta_config=self._config,
+                                                                            shared=self.shared, pooled=pooled)
 
         self.client.create_deployment(namespace=self.namespace, body=k8s_tensorboard_model.deployment)
         self.client.create_service(namespace=self.namespace, body=k8s_tensorboard_model.service)
@@ -74,21 +163,31 @@ class TensorboardManager:
         return new_tensorboard
 
     def list(self) -> List[V1Deployment]:
-        return self.client.list_deployments(namespace=self.namespace, label_selector='type=nauta-tensorboard')
+        return self.client.list_deployments(namespace=self.namespace, label_selector=self.TENSORBOARD_LABEL_SELECTOR)
 
     @staticmethod
     def _check_tensorboard_nginx_reachable(url) -> bool:
+        if TensorboardManager._reachable_urls.get(url, 0) > monotonic():
+            return True
+
         log.debug("Checking if Tensorboard is reachable from Nginx...")
         try:
-            response = requests.head(f"http://{TensorboardManager.NGINX_INGRESS_ADDRESS}{url}",
-                                     headers={'Host': 'localhost'},
-                                     timeout=5.0)
+            response = _nginx_session.head(f"http://{TensorboardManager.NGINX_INGRESS_ADDRESS}{url}",
+                                           headers={'Host': 'localhost'},
+                                           timeout=5.0)
         except Exception:
             log.exception("Checking Tensorboard reachability failed!")
             return False
 
         if response.status_code == HTTPStatus.OK:
             log.debug("Tensorboard is reachable")
+            # only positive results are cached - a tensorboard being created is checked on each request
+            now = monotonic()
+            # urls of deleted tensorboards aren't checked anymore, so expired urls are dropped here
+            for expired_url in [cached_url for cached_url, expiry in list(TensorboardManager._reachable_urls.items())
+                                if expiry <= now]:
+                TensorboardManager._reachable_urls.pop(expired_url, None)
+            TensorboardManager._reachable_urls[url] = now + TensorboardManager.REACHABILITY_CACHE_TTL_SECONDS
             return True
 
         log.debug(f"Tensorboard is unreachable. Got: {response.status_code} status code")
@@ -119,14 +218,15 @@ class TensorboardManager:
 
     def get_by_id(self, id: str) -> Optional[Tensorboard]:
         name = 'tensorboard-' + id
-        deployment = self.client.get_deployment(name=name, namespace=self.namespace)
+        deployment = self._get_deployment(name)
 
         if deployment is None:
             return None
 
-        ingress = self.client.get_ingress(name=name, namespace=self.namespace)
+        cache = self._synced(self.ingresses_cache)
+        ingress = (cache.get(name) if cache else None) or self.client.get_ingress(name=name, namespace=self.namespace)
 
-        pod = self.client.get_pod(namespace=self.namespace, label_selector=f'name={name},type=nauta-tensorboard')
+        pod = self._get_pod(id)
 
         # there might be some time when Kubernetes deployment has been created in cluster,
         # but pod is not present yet in cluster
@@ -141,8 +241,7 @@ class TensorboardManager:
     def get_by_runs(self, runs: List[Run]) -> Optional[Tensorboard]:
         runs_hash = k8s.models.K8STensorboardInstance.generate_run_names_hash(runs)
 
-        deployments = self.client.list_deployments(namespace=self.namespace,
-                                                   label_selector=f'runs-hash={runs_hash}')
+        deployments = self._get_deployments_by_runs_hash(runs_hash)
 
         if len(deployments) == 0:
             return None
@@ -151,11 +250,9 @@ class TensorboardManager:
         deployment_metadata: V1ObjectMeta = deployment.metadata
         id = deployment_metadata.labels['id']
 
-        ingresses = self.client.list_ingresses(namespace=self.namespace, label_selector=f'id={id}')
-
-        ingress = ingresses[0]
+        ingress = self._get_ingress(id)
 
-        pod = self.client.get_pod(namespace=self.namespace, label_selector=f'id={id},type=nauta-tensorboard')
+        pod = self._get_pod(id)
 
         if pod is None:
             return Tensorboard(id=id, status=TensorboardStatus.CREATING, url=ingress.spec.rules[0].http.paths[0].path)
@@ -165,6 +262,146 @@ class TensorboardManager:
 
         return Tensorboard(id=id, status=tensorboard_status, url=ingress.spec.rules[0].http.paths[0].path)
 
+    def _get_shared_deployment(self) -> Optional[V1Deployment]:
+        cache = self._synced(self.deployments_cache)
+        deployments = cache.get_by_label('shared', 'true') if cache else None
+        if not deployments:
+            deployments = self.client.list_deployments(namespace=self.namespace,
+                                                       label_selector=f'{self.TENSORBOARD_LABEL_SELECTOR},shared=true')
+        return deployments[0] if deployments else None
+
+    @staticmethod
+    def _is_pod_ready(pod: Optional[V1Pod]) -> bool:
+        if not pod or not pod.status or not pod.status.pod_ip:
+            return False
+        if (pod.status.phase or '').upper() != K8SPodPhase.RUNNING.value:
+            return False
+        return all(status.ready for status in pod.status.container_statuses or [])
+
+    @staticmethod
+    def _get_runs_api_address(pod: Optional[V1Pod]) -> Optional[str]:
+        if not pod or not pod.status or not pod.status.pod_ip:
+            return None
+        return f'{pod.status.pod_ip}:{k8s.models.K8STensorboardInstance.ACTIVITY_PROXY_RUNS_API_PORT}'
+
+    def _attach_runs_to_pod(self, pod: Optional[V1Pod], runs: List[Run]) -> bool:
+        proxy_address = self._get_runs_api_address(pod)
+        if not proxy_address:
+            return False
+        return attach_runs(proxy_address=proxy_address, runs=runs, timeout=self.PROXY_REQUEST_TIMEOUT)
+
+    def _add_runs_to_pod(self, pod: Optional[V1Pod], runs: List[Run]) -> bool:
+        proxy_address = self._get_runs_api_address(pod)
+        if not proxy_address:
+            return False
+        # a run stops being shown when nobody has requested it for as long as an unused tensorboard is kept
+        return add_runs(proxy_address=proxy_address, runs=runs, ttl_seconds=self.get_garbage_timeout(),
+                        timeout=self.PROXY_REQUEST_TIMEOUT)
+
+    @staticmethod
+    def _get_initial_runs(deployment: V1Deployment) -> List[Run]:
+        # runs attached by the proxy when it starts, taken from its environment
+        for container in deployment.spec.template.spec.containers:
+            for env in container.env or []:
+                if env.name == k8s.models.K8STensorboardInstance.SHARED_RUNS_ENV:
+                    return [Run(name=run['name'], owner=run['owner']) for run in json.loads(env.value)]
+        return []
+
+    @staticmethod
+    def _runs_env_patch(runs: List[Run]) -> dict:
+        # changes runs attached by the proxy when it starts, pod of the tensorboard is replaced by Kubernetes
+        instance_model = k8s.models.K8STensorboardInstance
+        return {'template': {'spec': {'containers': [{
+            'name': 'proxy',
+            'env': [{'name': instance_model.SHARED_RUNS_ENV, 'value': instance_model.runs_to_json(runs)}]
+        }]}}}
+
+    def attach_runs(self, runs: List[Run]) -> Optional[Tensorboard]:
+        """
+        Makes the shared tensorboard show given runs, in addition to runs requested by other users. Runs are added
+        by activity proxy of the running tensorboard, without restarting it, and each of them is detached when it
+        hasn't been requested for the garbage collection timeout. If tensorboard's pod isn't running yet (or its
+        proxy can't be reached), the pod is replaced with a pod started with given runs added to its initial runs.
+        :param runs: runs to attach
+        :return: shared tensorboard or None if it doesn't exist
+        """
+        deployment = self._get_shared_deployment()
+        if deployment is None:
+            return None
+
+        id = deployment.metadata.labels['id']
+        if not self._add_runs_to_pod(self._get_pod(id), runs):
+            initial_runs = self._get_initial_runs(deployment)
+            requested_runs = {(run.owner, run.name) for run in runs}
+            runs = [run for run in initial_runs if (run.owner, run.name) not in requested_runs] + runs
+            self.client.patch_deployment(name=deployment.metadata.name, namespace=self.namespace,
+                                         body={'spec': self._runs_env_patch(runs)})
+
+        return self.get_by_id(id)
+
+    def _list_idle_pool_deployments(self) -> List[V1Deployment]:
+        return self.client.list_deployments(
+            namespace=self.namespace,
+            label_selector=f'{self.TENSORBOARD_LABEL_SELECTOR},pool={k8s.models.K8STensorboardInstance.POOL_IDLE}'
+        )
+
+    def take_from_pool(self, runs: List[Run]) -> Optional[Tensorboard]:
+        """
+        Shows given runs in an idle tensorboard taken from the pool. Only tensorboards with a ready pod are taken,
+        others wouldn't show the runs sooner than a new tensorboard.
+        :param runs: runs to attach
+        :return: tensorboard taken from the pool or None if there is no ready tensorboard in the pool
+        """
+        instance_model = k8s.models.K8STensorboardInstance
+        cache = self._synced(self.deployments_cache)
+        # a tensorboard missing in the cache because it has just been created is taken by one of next requests
+        idle_deployments = cache.get_by_label('pool', instance_model.POOL_IDLE) if cache \
+            else self._list_idle_pool_deployments()
+
+        for deployment in idle_deployments:
+            id = deployment.metadata.labels['id']
+            pod = self._get_pod(id)
+            if not self._is_pod_ready(pod):
+                continue
+
+            # resourceVersion makes the patch fail if the tensorboard has been taken meanwhile by another request,
+            # possibly handled by another process
+            patch = {'metadata': {
+                'resourceVersion': deployment.metadata.resource_version,
+                'labels': {'pool': instance_model.POOL_BOUND, 'runs-hash': instance_model.generate_run_names_hash(runs)}
+            }}
+            try:
+                self.client.patch_deployment(name=deployment.metadata.name, namespace=self.namespace, body=patch)
+            except ApiException as ex:
+                if ex.status in (HTTPStatus.CONFLICT, HTTPStatus.NOT_FOUND):
+                    continue
+                raise ex
+
+            if not self._attach_runs_to_pod(pod, runs):
+                log.warning(f'Runs could not be attached to running tensorboard {id}, its pod will be replaced.')
+                self.client.patch_deployment(name=deployment.metadata.name, namespace=self.namespace,
+                                             body={'spec': self._runs_env_patch(runs)})
+
+            log.debug(f'Tensorboard {id} taken from the pool')
+            return self.get_by_id(id)
+
+        return None
+
+    def refill_pool(self):
+        """
+        Creates idle tensorboards missing in the pool. Tensorboards exceeding the size of the pool (e.g. after
+        the size has been decreased) are deleted.
+        """
+        idle_deployments = self._list_idle_pool_deployments()
+
+        for _ in range(self.pool_size - len(idle_deployments)):
+            tensorboard = self.create(runs=[], pooled=True)
+            log.debug(f'Tensorboard {tensorboard.id} added to the pool')
+
+        for deployment in idle_deployments[self.pool_size:]:
+            log.debug(f'Removing tensorboard {deployment.metadata.name} from the pool')
+            self.delete(deployment)
+
     def delete(self, tensorboard_deployment: V1Deployment):
         common_name = tensorboard_deployment.metadata.name
 
@@ -189,32 +426,18 @@ class TensorboardManager:
             log.exception('Error during getting garbage collection timeout value')
             return 1800
 
-    def delete_garbage(self):
-        log.debug("searching for garbage...")
-
-        try:
-            tensorboards = self.list()
-        except ApiException as ex:
-            if ex.status == HTTPStatus.GATEWAY_TIMEOUT:
-                log.exception("gateway timeout occurred when searching for garbage")
-                return
-            raise ex
-
-        self.refresh_garbage_timeout()
-
-        for deployment in tensorboards:
-            meta: V1ObjectMeta = deployment.metadata
-            deployment_name = meta.name
-
-            last_request_datetime = try_get_last_request_datetime(proxy_address=deployment_name)
-            if last_request_datetime is None:
-                continue
+    def list_garbage_candidates(self) -> List[V1Deployment]:
+        """
+        :return: tensorboards which might be deleted when they aren't used - all tensorboards except idle
+         tensorboards in the pool, which haven't been used yet and are removed only when the pool shrinks
+        """
+        pool_idle = k8s.models.K8STensorboardInstance.POOL_IDLE
+        return [deployment for deployment in self.list()
+                if (deployment.metadata.labels or {}).get('pool') != pool_idle]
 
-            delta = TensorboardManager._get_current_datetime() - last_request_datetime
-            if delta >= timedelta(seconds=self.get_garbage_timeout()):
-                log.debug(f'garbage detected: {meta.name} , removing...')
-                self.delete(deployment)
-                log.debug(f'garbage removed: {meta.name}')
+    def is_garbage(self, last_request_datetime: datetime) -> bool:
+        delta = TensorboardManager._get_current_datetime() - last_request_datetime
+        return delta >= timedelta(seconds=self.get_garbage_timeout())
 
     @staticmethod
     def validate_runs(runs: List[Run]) -> (List[Run], List[Run]):
@@ -0,0 +1,176 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+import asyncio
+from datetime import datetime
+from http import HTTPStatus
+from unittest import mock
+
+from kubernetes.client import V1Deployment, V1ObjectMeta
+from kubernetes.client.rest import ApiException
+import pytest
+from pytest_mock import MockFixture
+
+import tensorboard.garbage_collector
+from tensorboard.garbage_collector import GarbageCollector
+from tensorboard.tensorboard import TensorboardManager
+
+FAKE_NAMESPACE = 'fake-namespace'
+OLD_DATETIME = datetime(year=2018, month=6, day=19, hour=12, minute=0)
+NEW_DATETIME = datetime(year=2018, month=6, day=19, hour=12, minute=50)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def manager_mocked(mocker: MockFixture) -> TensorboardManager:
+    # noinspection PyTypeChecker
+    manager = TensorboardManager(api_client=mock.MagicMock(), namespace=FAKE_NAMESPACE, config=mock.MagicMock())
+    mocker.patch.object(TensorboardManager, '_get_current_datetime').return_value = \
+        datetime(year=2018, month=6, day=19, hour=13, minute=0)
+    mocker.patch.object(manager, 'get_garbage_timeout').return_value = 1800
+    mocker.patch.object(manager, 'refresh_garbage_timeout')
+    return manager
+
+
+def fake_deployments(*names: str):
+    return [V1Deployment(metadata=V1ObjectMeta(name=name)) for name in names]
+
+
+def mock_proxies(mocker: MockFixture, last_request_datetimes: dict):
+    def fake_try_get_last_request_datetime(proxy_address, timeout):
+        last_request_datetime = last_request_datetimes[proxy_address]
+        if isinstance(last_request_datetime, Exception):
+            raise last_request_datetime
+        return last_request_datetime
+
+    return mocker.patch.object(tensorboard.garbage_collector, 'try_get_last_request_datetime',
+                               side_effect=fake_try_get_last_request_datetime)
+
+
+# noinspection PyShadowingNames
+def test_collect(mocker: MockFixture, manager_mocked: TensorboardManager):
+    mocker.patch.object(manager_mocked, 'list_garbage_candidates').return_value = \
+        fake_deployments('old', 'new', 'unavailable', 'broken')
+    proxies_mock = mock_proxies(mocker, {'old': OLD_DATETIME, 'new': NEW_DATETIME, 'unavailable': None,
+                                         'broken': ValueError()})
+    collector = GarbageCollector(manager_mocked)
+
+    stats = run(collector.collect())
+
+    assert proxies_mock.call_count == 4
+    assert stats.instances == 4
+    assert stats.reclaimed == 1
+    assert stats.failed == 0
+    assert collector.reclaimed_total == 1
+    manager_mocked.client.delete_service.assert_called_once_with(name='old', namespace=FAKE_NAMESPACE)
+    manager_mocked.client.delete_ingress.assert_called_once_with(name='old', namespace=FAKE_NAMESPACE)
+    manager_mocked.client.delete_deployment.assert_called_once_with(name='old', namespace=FAKE_NAMESPACE,
+                                                                    propagation_policy='Foreground')
+
+
+# noinspection PyShadowingNames
+def test_collect_delete_failed(mocker: MockFixture, manager_mocked: TensorboardManager):
+    mocker.patch.object(manager_mocked, 'list_garbage_candidates').return_value = fake_deployments('old', 'old-2')
+    mock_proxies(mocker, {'old': OLD_DATETIME, 'old-2': OLD_DATETIME})
+
+    def fake_delete_service(name, namespace):
+        raise ApiException(status=HTTPStatus.NOT_FOUND if name == 'old' else HTTPStatus.INTERNAL_SERVER_ERROR)
+
+    manager_mocked.client.delete_service.side_effect = fake_delete_service
+
+    stats = run(GarbageCollector(manager_mocked).collect())
+
+    # a service removed during a previous collection doesn't make removal of a tensorboard fail
+    assert stats.reclaimed == 1
+    assert stats.failed == 1
+    assert manager_mocked.client.delete_deployment.call_count == 2
+
+
+# noinspection PyShadowingNames
+def test_collect_no_tensorboards(mocker: MockFixture, manager_mocked: TensorboardManager):
+    mocker.patch.object(manager_mocked, 'list_garbage_candidates').return_value = []
+    proxies_mock = mock_proxies(mocker, {})
+
+    stats = run(GarbageCollector(manager_mocked).collect())
+
+    assert stats.instances == 0
+    assert stats.reclaimed == 0
+    assert proxies_mock.call_count == 0
+
+
+@pytest.mark.parametrize('instances,expected_interval', [(0, 5.0), (10, 5.0), (200, 20.0), (10000, 60.0)])
+def test_get_interval(instances, expected_interval):
+    assert GarbageCollector(mock.MagicMock()).get_interval(instances) == expected_interval
+
+
+class StopCollector(Exception):
+    pass
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize('pool_size,refill_count', [(0, 0), (2, 1)])
+def test_run_forever_gateway_timeout(mocker: MockFixture, manager_mocked: TensorboardManager, pool_size,
+                                     refill_count):
+    manager_mocked.pool_size = pool_size
+    mocker.patch.object(manager_mocked, 'list_garbage_candidates').side_effect = \
+        ApiException(status=HTTPStatus.GATEWAY_TIMEOUT)
+    refill_pool_mock = mocker.patch.object(manager_mocked, 'refill_pool')
+    sleep_mock = mocker.patch.object(tensorboard.garbage_collector.asyncio, 'sleep', side_effect=StopCollector)
+
+    with pytest.raises(StopCollector):
+        run(GarbageCollector(manager_mocked).run_forever())
+
+    assert refill_pool_mock.call_count == refill_count
+    sleep_mock.assert_called_once_with(GarbageCollector.MIN_INTERVAL_SECONDS)
+
+
+# noinspection PyShadowingNames
+def test_run_forever_refill_pool_failed(mocker: MockFixture, manager_mocked: TensorboardManager):
+    manager_mocked.pool_size = 2
+    mocker.patch.object(manager_mocked, 'list_garbage_candidates').return_value = []
+    refill_pool_mock = mocker.patch.object(manager_mocked, 'refill_pool',
+                                           side_effect=ApiException(status=HTTPStatus.INTERNAL_SERVER_ERROR))
+    intervals = []
+
+    async def fake_sleep(interval):
+        intervals.append(interval)
+        if len(intervals) == 2:
+            raise StopCollector
+
+    mocker.patch.object(tensorboard.garbage_collector.asyncio, 'sleep', new=fake_sleep)
+
+    with pytest.raises(StopCollector):
+        run(GarbageCollector(manager_mocked).run_forever())
+
+    assert refill_pool_mock.call_count == 2
+    assert intervals == [GarbageCollector.MIN_INTERVAL_SECONDS] * 2
+
+
+# noinspection PyShadowingNames
+def test_run_forever_other_exception(mocker: MockFixture, manager_mocked: TensorboardManager):
+    mocker.patch.object(manager_mocked, 'list_garbage_candidates').side_effect = \
+        ApiException(status=HTTPStatus.NOT_FOUND)
+
+    with pytest.raises(ApiException):
+        run(GarbageCollector(manager_mocked).run_forever())
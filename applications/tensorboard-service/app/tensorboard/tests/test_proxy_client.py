@@ -15,18 +15,20 @@
 #
 
 from datetime import datetime
+from http import HTTPStatus
 from unittest.mock import MagicMock
 
 import pytest
 import requests.exceptions
 
 import tensorboard.proxy_client
+from tensorboard.models import Run
 
 
 def test_try_get_last_request_datetime(mocker):
     resp = b'{"lastRequestDatetime": "2018-07-25T15:39:47"}'
 
-    mocker.patch('requests.get').return_value = MagicMock(content=resp)
+    mocker.patch('tensorboard.proxy_client._session.get').return_value = MagicMock(content=resp)
 
     last_request_datetimestamp = tensorboard.proxy_client.try_get_last_request_datetime(proxy_address='fake')
 
@@ -34,7 +36,7 @@ def test_try_get_last_request_datetime(mocker):
 
 
 def test_try_get_last_request_datetime_raise_known_ex(mocker):
-    mocker.patch('requests.get').side_effect = requests.exceptions.ConnectionError
+    mocker.patch('tensorboard.proxy_client._session.get').side_effect = requests.exceptions.ConnectionError
 
     last_request_datetimestamp = tensorboard.proxy_client.try_get_last_request_datetime(proxy_address='fake')
 
@@ -42,7 +44,67 @@ def test_try_get_last_request_datetime_raise_known_ex(mocker):
 
 
 def test_try_get_last_request_datetime_raise_unknown_ex(mocker):
-    mocker.patch('requests.get').side_effect = TypeError
+    mocker.patch('tensorboard.proxy_client._session.get').side_effect = TypeError
 
     with pytest.raises(TypeError):
         tensorboard.proxy_client.try_get_last_request_datetime(proxy_address='fake')
+
+
+def test_try_get_last_request_datetime_microseconds(mocker):
+    resp = b'{"lastRequestDatetime": "2018-07-25T15:39:47.123456"}'
+
+    mocker.patch('tensorboard.proxy_client._session.get').return_value = MagicMock(content=resp)
+
+    last_request_datetimestamp = tensorboard.proxy_client.try_get_last_request_datetime(proxy_address='fake')
+
+    assert last_request_datetimestamp == datetime(year=2018, month=7, day=25, hour=15, minute=39, second=47,
+                                                  microsecond=123456)
+
+
+def test_try_get_last_request_datetime_timeout(mocker):
+    mocker.patch('tensorboard.proxy_client._session.get').side_effect = requests.exceptions.ReadTimeout
+
+    last_request_datetimestamp = tensorboard.proxy_client.try_get_last_request_datetime(proxy_address='fake')
+
+    assert last_request_datetimestamp is None
+
+
+def test_attach_runs(mocker):
+    put_mock = mocker.patch('tensorboard.proxy_client._session.put')
+    put_mock.return_value = MagicMock(status_code=HTTPStatus.OK)
+
+    attached = tensorboard.proxy_client.attach_runs(proxy_address='fake:8081', runs=[Run(name='run', owner='alice')])
+
+    assert attached
+    assert put_mock.call_args[1]['json'] == {'runNames': [{'name': 'run', 'owner': 'alice'}]}
+
+
+@pytest.mark.parametrize('put_result', [MagicMock(status_code=HTTPStatus.BAD_REQUEST),
+                                        requests.exceptions.ConnectionError()])
+def test_attach_runs_failure(mocker, put_result):
+    put_mock = mocker.patch('tensorboard.proxy_client._session.put')
+    if isinstance(put_result, Exception):
+        put_mock.side_effect = put_result
+    else:
+        put_mock.return_value = put_result
+
+    assert not tensorboard.proxy_client.attach_runs(proxy_address='fake:8081', runs=[Run(name='run', owner='alice')])
+
+
+def test_add_runs(mocker):
+    post_mock = mocker.patch('tensorboard.proxy_client._session.post')
+    post_mock.return_value = MagicMock(status_code=HTTPStatus.OK)
+
+    added = tensorboard.proxy_client.add_runs(proxy_address='fake:8081', runs=[Run(name='run', owner='alice')],
+                                              ttl_seconds=600)
+
+    assert added
+    assert post_mock.call_args[0][0] == 'http://fake:8081/runs'
+    assert post_mock.call_args[1]['json'] == {'runNames': [{'name': 'run', 'owner': 'alice'}], 'ttlSeconds': 600}
+
+
+def test_add_runs_failure(mocker):
+    mocker.patch('tensorboard.proxy_client._session.post').side_effect = requests.exceptions.Timeout
+
+    assert not tensorboard.proxy_client.add_runs(proxy_address='fake:8081', runs=[Run(name='run', owner='alice')],
+                                                 ttl_seconds=600)
@@ -16,11 +16,13 @@
 
 from datetime import datetime
 from http import HTTPStatus
+import json
+from typing import List
 from unittest import mock
 
 from kubernetes.client import V1Deployment, V1ObjectMeta, V1beta1Ingress, V1Pod, V1beta1IngressSpec, \
     V1beta1IngressRule, V1beta1HTTPIngressRuleValue, V1beta1HTTPIngressPath, V1PodStatus, V1beta1IngressBackend, \
-    V1ContainerStatus
+    V1ContainerStatus, V1Container, V1DeploymentSpec, V1EnvVar, V1LabelSelector, V1PodSpec, V1PodTemplateSpec
 from kubernetes.client.rest import ApiException
 import pytest
 from pytest_mock import MockFixture
@@ -58,6 +60,28 @@ def test_incluster_init(mocker: MockFixture):
     assert mgr.client
 
 
+def test_get_instance(mocker: MockFixture):
+    mocker.patch.object(TensorboardManager, '_instance', new=None)
+    incluster_init_mock = mocker.patch.object(TensorboardManager, 'incluster_init')
+    mocker.patch('tensorboard.tensorboard.K8SResourceCache')
+
+    mgr = TensorboardManager.get_instance()
+
+    assert TensorboardManager.get_instance() is mgr
+    assert incluster_init_mock.call_count == 1
+    # noinspection PyUnresolvedReferences
+    assert mgr.start_caches.call_count == 1
+
+
+def test_start_caches(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    cache_mock = mocker.patch('tensorboard.tensorboard.K8SResourceCache')
+
+    tensorboard_manager_mocked.start_caches()
+
+    assert cache_mock.call_count == 3
+    assert cache_mock.return_value.start.call_count == 3
+
+
 # noinspection PyShadowingNames
 def test_create(tensorboard_manager_mocked: TensorboardManager):
     fake_runs = [
@@ -157,6 +181,75 @@ def test_get_by_id(mocker: MockFixture,
     assert tensorboard.url == fake_tensorboard_path
 
 
+# noinspection PyShadowingNames
+def test_get_by_id_from_caches(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    fake_tensorboard_id = 'cda7ad77-c499-4ef7-8f73-be7ce254be6a'
+    fake_tensorboard_path = '/tb/' + fake_tensorboard_id
+    fake_ingress = V1beta1Ingress(spec=V1beta1IngressSpec(
+        rules=[V1beta1IngressRule(http=V1beta1HTTPIngressRuleValue(paths=[V1beta1HTTPIngressPath(
+            backend=V1beta1IngressBackend(service_name='fake-service', service_port=80),
+            path=fake_tensorboard_path)]))]
+    ))
+    fake_pod = V1Pod(status=V1PodStatus(phase='Running', container_statuses=[
+        V1ContainerStatus(ready=True, image='', image_id='', name='', restart_count=0)
+    ]))
+    tensorboard_manager_mocked.deployments_cache = mock.MagicMock(get=lambda name: V1Deployment())
+    tensorboard_manager_mocked.ingresses_cache = mock.MagicMock(get=lambda name: fake_ingress)
+    tensorboard_manager_mocked.pods_cache = mock.MagicMock(get_by_label=lambda label, value: [fake_pod])
+    mocker.patch('tensorboard.tensorboard.TensorboardManager._check_tensorboard_nginx_reachable').return_value = True
+
+    tensorboard = tensorboard_manager_mocked.get_by_id(id=fake_tensorboard_id)
+
+    assert tensorboard.status == TensorboardStatus.RUNNING
+    assert tensorboard.url == fake_tensorboard_path
+    assert tensorboard_manager_mocked.client.get_deployment.call_count == 0
+    assert tensorboard_manager_mocked.client.get_ingress.call_count == 0
+    assert tensorboard_manager_mocked.client.get_pod.call_count == 0
+
+
+# noinspection PyShadowingNames
+def test_get_by_id_missing_in_cache(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    tensorboard_manager_mocked.deployments_cache = mock.MagicMock(get=lambda name: None)
+    mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = None
+
+    tensorboard = tensorboard_manager_mocked.get_by_id(id='296ef39e-d4d8-48cd-bc6e-e27bc8fc1c2d')
+
+    assert tensorboard is None
+    assert tensorboard_manager_mocked.client.get_deployment.call_count == 1
+
+
+def test_check_tensorboard_nginx_reachable_cached(mocker: MockFixture):
+    mocker.patch.object(TensorboardManager, '_reachable_urls', new={})
+    head_mock = mocker.patch('tensorboard.tensorboard._nginx_session.head')
+    head_mock.return_value = mock.MagicMock(status_code=HTTPStatus.OK)
+
+    assert TensorboardManager._check_tensorboard_nginx_reachable('/tb/fake/')
+    assert TensorboardManager._check_tensorboard_nginx_reachable('/tb/fake/')
+    assert head_mock.call_count == 1
+
+
+def test_check_tensorboard_nginx_reachable_expired_urls_dropped(mocker: MockFixture):
+    reachable_urls = {'/tb/deleted/': 1.0, '/tb/other/': 1000.0}
+    mocker.patch.object(TensorboardManager, '_reachable_urls', new=reachable_urls)
+    mocker.patch('tensorboard.tensorboard.monotonic').return_value = 100.0
+    mocker.patch('tensorboard.tensorboard._nginx_session.head').return_value = \
+        mock.MagicMock(status_code=HTTPStatus.OK)
+
+    assert TensorboardManager._check_tensorboard_nginx_reachable('/tb/fake/')
+    assert reachable_urls == {'/tb/other/': 1000.0,
+                              '/tb/fake/': 100.0 + TensorboardManager.REACHABILITY_CACHE_TTL_SECONDS}
+
+
+def test_check_tensorboard_nginx_unreachable_not_cached(mocker: MockFixture):
+    mocker.patch.object(TensorboardManager, '_reachable_urls', new={})
+    head_mock = mocker.patch('tensorboard.tensorboard._nginx_session.head')
+    head_mock.return_value = mock.MagicMock(status_code=HTTPStatus.NOT_FOUND)
+
+    assert not TensorboardManager._check_tensorboard_nginx_reachable('/tb/fake/')
+    assert not TensorboardManager._check_tensorboard_nginx_reachable('/tb/fake/')
+    assert head_mock.call_count == 2
+
+
 # noinspection PyShadowingNames
 def test_get_by_id_not_found(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
     mocker.patch.object(tensorboard_manager_mocked.client, 'get_deployment').return_value = None
@@ -341,6 +434,154 @@ def test_get_by_runs_not_created_yet(mocker: MockFixture, tensorboard_manager_mo
     assert tensorboard.url == fake_tensorboard_path
 
 
+def fake_shared_deployment(initial_runs: List[Run] = ()) -> V1Deployment:
+    proxy_env = [V1EnvVar(name=K8STensorboardInstance.SHARED_RUNS_ENV,
+                          value=K8STensorboardInstance.runs_to_json(list(initial_runs)))]
+    return V1Deployment(metadata=V1ObjectMeta(name='tensorboard-fake-id', labels={'id': 'fake-id', 'shared': 'true'}),
+                        spec=V1DeploymentSpec(selector=V1LabelSelector(), template=V1PodTemplateSpec(
+                            spec=V1PodSpec(containers=[V1Container(name='tensorboard'),
+                                                       V1Container(name='proxy', env=proxy_env)]))))
+
+
+# noinspection PyShadowingNames
+def test_attach_runs(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    fake_runs = [Run(name='run-1', owner='alice')]
+    tensorboard_manager_mocked.client.list_deployments.return_value = [fake_shared_deployment()]
+    tensorboard_manager_mocked.client.get_pod.return_value = V1Pod(status=V1PodStatus(pod_ip='10.0.0.1'))
+    add_runs_mock = mocker.patch.object(tensorboard.tensorboard, 'add_runs', return_value=True)
+    mocker.patch.object(tensorboard_manager_mocked, 'get_garbage_timeout', return_value=1800)
+    get_by_id_mock = mocker.patch.object(tensorboard_manager_mocked, 'get_by_id')
+
+    shared_tensorboard = tensorboard_manager_mocked.attach_runs(fake_runs)
+
+    assert shared_tensorboard == get_by_id_mock.return_value
+    get_by_id_mock.assert_called_once_with('fake-id')
+    assert add_runs_mock.call_args[1]['proxy_address'] == '10.0.0.1:8081'
+    assert add_runs_mock.call_args[1]['runs'] == fake_runs
+    assert add_runs_mock.call_args[1]['ttl_seconds'] == 1800
+    # runs requested by other users aren't replaced, so the deployment isn't changed
+    assert tensorboard_manager_mocked.client.patch_deployment.call_count == 0
+
+
+# noinspection PyShadowingNames
+def test_attach_runs_pod_not_running(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    initial_runs = [Run(name='run-1', owner='alice'), Run(name='run-2', owner='bob')]
+    fake_runs = [Run(name='run-2', owner='bob'), Run(name='run-3', owner='carl')]
+    tensorboard_manager_mocked.client.list_deployments.return_value = [fake_shared_deployment(initial_runs)]
+    tensorboard_manager_mocked.client.get_pod.return_value = None
+    add_runs_mock = mocker.patch.object(tensorboard.tensorboard, 'add_runs')
+    mocker.patch.object(tensorboard_manager_mocked, 'get_by_id')
+
+    tensorboard_manager_mocked.attach_runs(fake_runs)
+
+    assert add_runs_mock.call_count == 0
+    patch = tensorboard_manager_mocked.client.patch_deployment.call_args[1]['body']
+    proxy_container = patch['spec']['template']['spec']['containers'][0]
+    assert proxy_container['name'] == 'proxy'
+    assert json.loads(proxy_container['env'][0]['value']) == [{'name': 'run-1', 'owner': 'alice'},
+                                                              {'name': 'run-2', 'owner': 'bob'},
+                                                              {'name': 'run-3', 'owner': 'carl'}]
+
+
+# noinspection PyShadowingNames
+def test_attach_runs_no_shared_tensorboard(tensorboard_manager_mocked: TensorboardManager):
+    tensorboard_manager_mocked.client.list_deployments.return_value = []
+
+    assert tensorboard_manager_mocked.attach_runs([Run(name='run-1', owner='alice')]) is None
+    assert tensorboard_manager_mocked.client.patch_deployment.call_count == 0
+
+
+def fake_pool_deployment(id: str) -> V1Deployment:
+    return V1Deployment(metadata=V1ObjectMeta(name=f'tensorboard-{id}', resource_version='100',
+                                              labels={'id': id, 'pool': 'idle'}))
+
+
+def fake_ready_pod(pod_ip: str = '10.0.0.1') -> V1Pod:
+    return V1Pod(status=V1PodStatus(phase='Running', pod_ip=pod_ip,
+                                    container_statuses=[V1ContainerStatus(ready=True, name='app', image='',
+                                                                          image_id='', restart_count=0)]))
+
+
+# noinspection PyShadowingNames
+def test_take_from_pool(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    fake_runs = [Run(name='run-1', owner='alice')]
+    tensorboard_manager_mocked.client.list_deployments.return_value = [fake_pool_deployment('fake-id')]
+    tensorboard_manager_mocked.client.get_pod.return_value = fake_ready_pod()
+    attach_runs_mock = mocker.patch.object(tensorboard.tensorboard, 'attach_runs', return_value=True)
+    get_by_id_mock = mocker.patch.object(tensorboard_manager_mocked, 'get_by_id')
+
+    pooled_tensorboard = tensorboard_manager_mocked.take_from_pool(fake_runs)
+
+    assert pooled_tensorboard == get_by_id_mock.return_value
+    get_by_id_mock.assert_called_once_with('fake-id')
+    assert attach_runs_mock.call_args[1]['proxy_address'] == '10.0.0.1:8081'
+    tensorboard_manager_mocked.client.patch_deployment.assert_called_once_with(
+        name='tensorboard-fake-id', namespace=FAKE_NAMESPACE,
+        body={'metadata': {'resourceVersion': '100', 'labels': {
+            'pool': 'bound', 'runs-hash': K8STensorboardInstance.generate_run_names_hash(fake_runs)
+        }}}
+    )
+
+
+# noinspection PyShadowingNames
+def test_take_from_pool_taken_meanwhile(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    tensorboard_manager_mocked.client.list_deployments.return_value = [fake_pool_deployment('fake-id'),
+                                                                       fake_pool_deployment('fake-id-2')]
+    tensorboard_manager_mocked.client.get_pod.return_value = fake_ready_pod()
+    tensorboard_manager_mocked.client.patch_deployment.side_effect = [ApiException(status=HTTPStatus.CONFLICT), None]
+    mocker.patch.object(tensorboard.tensorboard, 'attach_runs', return_value=True)
+    get_by_id_mock = mocker.patch.object(tensorboard_manager_mocked, 'get_by_id')
+
+    tensorboard_manager_mocked.take_from_pool([Run(name='run-1', owner='alice')])
+
+    get_by_id_mock.assert_called_once_with('fake-id-2')
+
+
+# noinspection PyShadowingNames
+def test_take_from_pool_not_ready(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    tensorboard_manager_mocked.client.list_deployments.return_value = [fake_pool_deployment('fake-id')]
+    tensorboard_manager_mocked.client.get_pod.return_value = V1Pod(status=V1PodStatus(phase='Pending'))
+    attach_runs_mock = mocker.patch.object(tensorboard.tensorboard, 'attach_runs')
+
+    assert tensorboard_manager_mocked.take_from_pool([Run(name='run-1', owner='alice')]) is None
+    assert attach_runs_mock.call_count == 0
+    assert tensorboard_manager_mocked.client.patch_deployment.call_count == 0
+
+
+# noinspection PyShadowingNames
+def test_take_from_pool_attach_failed(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager):
+    fake_runs = [Run(name='run-1', owner='alice')]
+    tensorboard_manager_mocked.client.list_deployments.return_value = [fake_pool_deployment('fake-id')]
+    tensorboard_manager_mocked.client.get_pod.return_value = fake_ready_pod()
+    mocker.patch.object(tensorboard.tensorboard, 'attach_runs', return_value=False)
+    mocker.patch.object(tensorboard_manager_mocked, 'get_by_id')
+
+    tensorboard_manager_mocked.take_from_pool(fake_runs)
+
+    assert tensorboard_manager_mocked.client.patch_deployment.call_count == 2
+    env_patch = tensorboard_manager_mocked.client.patch_deployment.call_args[1]['body']
+    assert env_patch['spec']['template']['spec']['containers'][0]['env'][0]['value'] == \
+        K8STensorboardInstance.runs_to_json(fake_runs)
+
+
+# noinspection PyShadowingNames
+@pytest.mark.parametrize('pool_size,idle_count,create_count,delete_count', [(3, 1, 2, 0), (1, 1, 0, 0),
+                                                                            (1, 3, 0, 2)])
+def test_refill_pool(mocker: MockFixture, tensorboard_manager_mocked: TensorboardManager, pool_size, idle_count,
+                     create_count, delete_count):
+    tensorboard_manager_mocked.pool_size = pool_size
+    tensorboard_manager_mocked.client.list_deployments.return_value = \
+        [fake_pool_deployment(f'fake-id-{i}') for i in range(idle_count)]
+    create_mock = mocker.patch.object(tensorboard_manager_mocked, 'create')
+    delete_mock = mocker.patch.object(tensorboard_manager_mocked, 'delete')
+
+    tensorboard_manager_mocked.refill_pool()
+
+    assert create_mock.call_count == create_count
+    assert all(call[1] == {'runs': [], 'pooled': True} for call in create_mock.call_args_list)
+    assert delete_mock.call_count == delete_count
+
+
 # noinspection PyShadowingNames
 def test_delete(tensorboard_manager_mocked: TensorboardManager):
     fake_deployment = mock.MagicMock()
@@ -359,48 +600,32 @@ def test_delete(tensorboard_manager_mocked: TensorboardManager):
 
 
 # noinspection PyShadowingNames
-@pytest.mark.parametrize("current_datetime,delete_count", [
-    (datetime(year=2018, month=6, day=19, hour=12, minute=0), 0),
-    (datetime(year=2018, month=6, day=19, hour=12, minute=29, second=59), 0),
-    (datetime(year=2018, month=6, day=19, hour=12, minute=30, second=0), 1),
-    (datetime(year=2018, month=6, day=19, hour=13, minute=0), 1)
+@pytest.mark.parametrize("current_datetime,expected_garbage", [
+    (datetime(year=2018, month=6, day=19, hour=12, minute=0), False),
+    (datetime(year=2018, month=6, day=19, hour=12, minute=29, second=59), False),
+    (datetime(year=2018, month=6, day=19, hour=12, minute=30, second=0), True),
+    (datetime(year=2018, month=6, day=19, hour=13, minute=0), True)
 ])
-def test_delete_garbage(mocker, tensorboard_manager_mocked: TensorboardManager,
-                        current_datetime: datetime, delete_count: int):
+def test_is_garbage(mocker, tensorboard_manager_mocked: TensorboardManager,
+                    current_datetime: datetime, expected_garbage: bool):
     mocker.patch.object(TensorboardManager, '_get_current_datetime').return_value = current_datetime
-    mocker.patch.object(tensorboard_manager_mocked, 'list').return_value = [
-        V1Deployment(metadata=V1ObjectMeta(name='fake-name'))
-    ]
-    mocker.patch.object(tensorboard_manager_mocked, 'delete')
-    mocker.patch.object(tensorboard.tensorboard, 'try_get_last_request_datetime').\
-        return_value = datetime(year=2018, month=6, day=19, hour=12, minute=0)
-    mocker.patch.object(tensorboard_manager_mocked, 'refresh_garbage_timeout')
     mocker.patch.object(tensorboard_manager_mocked, 'get_garbage_timeout').return_value = 1800
-    tensorboard_manager_mocked.delete_garbage()
-
-    # noinspection PyUnresolvedReferences
-    assert tensorboard_manager_mocked.delete.call_count == delete_count
 
+    assert tensorboard_manager_mocked.is_garbage(datetime(year=2018, month=6, day=19, hour=12, minute=0)) == \
+        expected_garbage
 
-def test_delete_garbage_gateway_timeout(mocker, tensorboard_manager_mocked: TensorboardManager):
-    mocker.patch.object(tensorboard_manager_mocked, 'list').side_effect = ApiException(
-        status=HTTPStatus.GATEWAY_TIMEOUT.value
-    )
-    mocker.spy(tensorboard_manager_mocked, 'refresh_garbage_timeout')
-
-    tensorboard_manager_mocked.delete_garbage()
-
-    # noinspection PyUnresolvedReferences
-    assert tensorboard_manager_mocked.refresh_garbage_timeout.call_count == 0
 
+# noinspection PyShadowingNames
+def test_list_garbage_candidates_skips_idle_pool(mocker, tensorboard_manager_mocked: TensorboardManager):
+    mocker.patch.object(tensorboard_manager_mocked, 'list').return_value = [
+        V1Deployment(metadata=V1ObjectMeta(name='fake-name', labels={'pool': 'idle'})),
+        V1Deployment(metadata=V1ObjectMeta(name='fake-name-2', labels={'pool': 'bound'})),
+        V1Deployment(metadata=V1ObjectMeta(name='fake-name-3'))
+    ]
 
-def test_delete_garbage_other_exception(mocker, tensorboard_manager_mocked: TensorboardManager):
-    mocker.patch.object(tensorboard_manager_mocked, 'list').side_effect = ApiException(
-        status=HTTPStatus.NOT_FOUND.value
-    )
+    candidates = tensorboard_manager_mocked.list_garbage_candidates()
 
-    with pytest.raises(ApiException):
-        tensorboard_manager_mocked.delete_garbage()
+    assert [deployment.metadata.name for deployment in candidates] == ['fake-name-2', 'fake-name-3']
 
 
 # noinspection PyShadowingNames
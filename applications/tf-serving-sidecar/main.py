@@ -17,13 +17,20 @@
 import logging as log
 # noinspection PyProtectedMember
 from os import getenv, _exit, path
+import random
 from time import sleep
 
-from kubernetes import client, config
-from kubernetes.client import V1Job, V1JobStatus
+from kubernetes import client, config, watch
+from kubernetes.client import V1Job, V1JobList, V1JobStatus
 
 END_HOOK_FILEPATH = "/pod-data/END"
 
+# a watch request is closed by the API server after this time (in seconds) and sent again
+WATCH_TIMEOUT = 300
+
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
 log.basicConfig(level=log.DEBUG)
 
 # CAN-1237 - by setting level of logs for k8s rest client to INFO I'm removing displaying content of
@@ -32,6 +39,74 @@ k8s_rest_logger = log.getLogger('kubernetes.client.rest')
 k8s_rest_logger.setLevel(log.INFO)
 
 
+def get_retry_delay(attempt: int) -> float:
+    # exponential backoff with full jitter, so sidecars of many pods don't retry at the same time
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def is_job_finished(job: V1Job) -> bool:
+    batch_wrapper_job_status: V1JobStatus = job.status
+    if batch_wrapper_job_status is None:
+        return False
+
+    active_pods = batch_wrapper_job_status.active if batch_wrapper_job_status.active is not None else 0
+    succeeded_pods = batch_wrapper_job_status.succeeded if batch_wrapper_job_status.succeeded is not None else 0
+
+    # model server should also be closed when there is failure in batch wrapper job
+    if hasattr(batch_wrapper_job_status, 'failed') and batch_wrapper_job_status.failed is not None:
+        failed_pods = batch_wrapper_job_status.failed
+    else:
+        failed_pods = 0
+
+    if active_pods == 0 and (succeeded_pods > 0 or failed_pods > 0):
+        log.info(f"active_pods == {active_pods}, succeeded_pods == {succeeded_pods}, failed_pods == {failed_pods}")
+        return True
+
+    return False
+
+
+def wait_for_job_end(v1: client.BatchV1Api, job_name: str, namespace: str):
+    """
+    Watches only the given job, so the API server sends an event only when the job changes. The job is listed only
+    when watching starts and when the watch can't be resumed from the last seen version of the job.
+    """
+    field_selector = f"metadata.name={job_name}"
+    resource_version = None
+    attempt = 0
+
+    while True:
+        try:
+            if resource_version is None:
+                jobs: V1JobList = v1.list_namespaced_job(namespace=namespace, field_selector=field_selector)
+                if any(is_job_finished(job) for job in jobs.items):
+                    return
+                resource_version = jobs.metadata.resource_version
+
+            for event in watch.Watch().stream(v1.list_namespaced_job, namespace=namespace,
+                                              field_selector=field_selector, resource_version=resource_version,
+                                              timeout_seconds=WATCH_TIMEOUT):
+                if event['type'] == 'ERROR':
+                    # e.g. 410 Gone - the version is too old to resume from it, the job is listed again
+                    log.info(f"watch of {job_name} job failed: {event['raw_object'].get('message')}")
+                    resource_version = None
+                    break
+
+                job: V1Job = event['object']
+                resource_version = job.metadata.resource_version
+                if event['type'] == 'DELETED':
+                    # the job won't finish anymore, the model server would wait for it forever
+                    log.info(f"{job_name} job was deleted")
+                    return
+                if is_job_finished(job):
+                    return
+            attempt = 0
+        except Exception:
+            delay = get_retry_delay(attempt)
+            log.exception(f"failed to watch {job_name} job, retrying in {delay:.1f} s")
+            sleep(delay)
+            attempt += 1
+
+
 def main():
     if path.isfile(END_HOOK_FILEPATH):
         log.info("END hook file already created, exiting...")
@@ -52,28 +127,11 @@ def main():
 
     v1 = client.BatchV1Api()
 
-    while True:
-        batch_wrapper_job: V1Job = v1.read_namespaced_job(name=batch_wrapper_job_name, namespace=my_current_namespace)
-
-        batch_wrapper_job_status: V1JobStatus = batch_wrapper_job.status
-
-        active_pods = batch_wrapper_job_status.active if batch_wrapper_job_status.active is not None else 0
-        succeeded_pods = batch_wrapper_job_status.succeeded if batch_wrapper_job_status.succeeded is not None else 0
-
-        # model server should also be closed when there is failure in batch wrapper job
-        if hasattr(batch_wrapper_job_status, 'failed') and batch_wrapper_job_status.failed is not None:
-            failed_pods = batch_wrapper_job_status.failed
-        else:
-            failed_pods = 0
-
-        if active_pods == 0 and (succeeded_pods > 0 or failed_pods > 0):
-            log.info(f"active_pods == {active_pods}, succeeded_pods == {succeeded_pods}, failed_pods == {failed_pods}, "
-                     f"creating END hook")
-            open(END_HOOK_FILEPATH, 'a').close()
-            log.info("exiting...")
-            return
+    wait_for_job_end(v1, job_name=batch_wrapper_job_name, namespace=my_current_namespace)
 
-        sleep(1)
+    log.info("creating END hook")
+    open(END_HOOK_FILEPATH, 'a').close()
+    log.info("exiting...")
 
 
 if __name__ == '__main__':
@@ -14,12 +14,25 @@
 # limitations under the License.
 #
 
-from kubernetes.client import V1Job, V1JobStatus
+from kubernetes.client import V1Job, V1JobList, V1JobStatus, V1ListMeta, V1ObjectMeta
 from pytest import fixture, raises
 
 from main import main
 
 
+def create_job(resource_version='1', **status):
+    return V1Job(metadata=V1ObjectMeta(name='fake_job_name', resource_version=resource_version),
+                 status=V1JobStatus(**status))
+
+
+def create_job_list(job, resource_version='1'):
+    return V1JobList(items=[job], metadata=V1ListMeta(resource_version=resource_version))
+
+
+def create_event(job, event_type='MODIFIED'):
+    return {'type': event_type, 'object': job, 'raw_object': {}}
+
+
 @fixture
 def main_mock(mocker):
     mocker.patch('os.path.isfile').return_value = False
@@ -33,48 +46,89 @@ def main_mock(mocker):
 
     fake_k8s_client = mocker.MagicMock()
     mocker.patch('kubernetes.client.BatchV1Api').return_value = fake_k8s_client
-    mocker.patch.object(fake_k8s_client, 'read_namespaced_job').return_value = V1Job(
-        status=V1JobStatus(active=0, succeeded=1))
+    mocker.patch.object(fake_k8s_client, 'list_namespaced_job').return_value = create_job_list(create_job(active=1))
+    watch_mock = mocker.patch('main.watch.Watch').return_value
 
     class MainMock:
         kubernetes_config_load_mock = kubernetes_config_load
         builtins_open_mock = builtins_open
         kubernetes_client_mock = fake_k8s_client
         time_sleep_mock = main_sleep
+        kubernetes_watch_mock = watch_mock
 
     return MainMock
 
 
-def test_main(mocker, main_mock):
-    job_status_history = [
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=0, succeeded=2))
-    ]
-
-    mocker.patch.object(main_mock.kubernetes_client_mock, 'read_namespaced_job').side_effect = job_status_history
+def test_main(main_mock):
+    main_mock.kubernetes_watch_mock.stream.return_value = iter([
+        create_event(create_job(resource_version='2', active=1, succeeded=1)),
+        create_event(create_job(resource_version='3', active=0, succeeded=2))
+    ])
 
     main()
 
     assert main_mock.kubernetes_config_load_mock.call_count == 1
     assert main_mock.builtins_open_mock.call_count == 2
-    assert main_mock.time_sleep_mock.call_count == len(job_status_history) - 1
+    assert main_mock.time_sleep_mock.call_count == 0
+    assert main_mock.kubernetes_client_mock.list_namespaced_job.call_count == 1
+    assert main_mock.kubernetes_watch_mock.stream.call_args[1]['field_selector'] == 'metadata.name=fake_job_name'
+    assert main_mock.kubernetes_watch_mock.stream.call_args[1]['resource_version'] == '1'
 
 
-def test_main_failed_pods(mocker, main_mock):
-    job_status_history = [
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=1, succeeded=1)),
-        V1Job(status=V1JobStatus(active=0, succeeded=1, failed=1))
-    ]
+def test_main_failed_pods(main_mock):
+    main_mock.kubernetes_watch_mock.stream.return_value = iter([
+        create_event(create_job(resource_version='2', active=1, succeeded=1)),
+        create_event(create_job(resource_version='3', active=0, succeeded=1, failed=1))
+    ])
+
+    main()
 
-    mocker.patch.object(main_mock.kubernetes_client_mock, 'read_namespaced_job').side_effect = job_status_history
+    assert main_mock.builtins_open_mock.call_count == 2
+    assert main_mock.time_sleep_mock.call_count == 0
+
+
+def test_main_job_deleted(main_mock):
+    main_mock.kubernetes_watch_mock.stream.return_value = iter([
+        create_event(create_job(resource_version='2', active=1)),
+        create_event(create_job(resource_version='3', active=1), event_type='DELETED')
+    ])
+
+    main()
+
+    assert main_mock.builtins_open_mock.call_count == 2
+    assert main_mock.time_sleep_mock.call_count == 0
+
+
+def test_main_job_already_finished(main_mock):
+    main_mock.kubernetes_client_mock.list_namespaced_job.return_value = \
+        create_job_list(create_job(active=0, succeeded=1))
+
+    main()
+
+    assert main_mock.builtins_open_mock.call_count == 2
+    assert main_mock.kubernetes_watch_mock.stream.call_count == 0
+
+
+def test_main_watch_resumed(main_mock):
+    main_mock.kubernetes_watch_mock.stream.side_effect = [
+        # the server closes a watch after a timeout, it's resumed from the last seen version
+        iter([create_event(create_job(resource_version='2', active=1))]),
+        RuntimeError('connection error'),
+        # the last seen version is too old, so the job is listed again
+        iter([{'type': 'ERROR', 'object': None, 'raw_object': {'code': 410, 'message': 'too old resource version'}}]),
+        iter([create_event(create_job(resource_version='5', active=0, succeeded=1))])
+    ]
+    main_mock.kubernetes_client_mock.list_namespaced_job.side_effect = [
+        create_job_list(create_job(active=1)),
+        create_job_list(create_job(resource_version='4', active=1), resource_version='4')
+    ]
 
     main()
 
-    assert main_mock.kubernetes_config_load_mock.call_count == 1
     assert main_mock.builtins_open_mock.call_count == 2
-    assert main_mock.time_sleep_mock.call_count == len(job_status_history) - 1
+    assert main_mock.time_sleep_mock.call_count == 1
+    assert [call[1]['resource_version'] for call in main_mock.kubernetes_watch_mock.stream.call_args_list] == \
+        ['1', '2', '2', '4']
 
 
 def test_main_end_hook_already_created(mocker, main_mock):
@@ -17,15 +17,22 @@
 import logging as log
 # noinspection PyProtectedMember
 from os import getenv, _exit
+import random
 from time import sleep
-from typing import List
+from typing import List, Optional
 
-from kubernetes import client, config
+from kubernetes import client, config, watch
 from kubernetes.client import V1Pod, V1ObjectMeta, V1PodList, V1PodStatus, V1ContainerStatus, V1ContainerState, V1ContainerStateTerminated
 
 
 JOB_SUCCESS_CONDITION = "Succeeded"
 
+# a watch request is closed by the API server after this time (in seconds) and sent again
+WATCH_TIMEOUT = 300
+
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
 LOGGING_LEVEL_MAPPING = {"DEBUG": log.DEBUG,
                          "INFO": log.INFO,
                          "WARNING": log.WARNING,
@@ -70,6 +77,74 @@ def get_my_namespace() -> str:
     return my_current_namespace
 
 
+def get_retry_delay(attempt: int) -> float:
+    # exponential backoff with full jitter, so sidecars of all pods of a run don't retry at the same time
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+def get_tensorflow_exit_code(pod: V1Pod) -> Optional[int]:
+    """
+    :return: exit code of tensorflow container of the pod, None if it hasn't terminated
+    """
+    pod_status: V1PodStatus = pod.status
+    container_statuses: List[V1ContainerStatus] = pod_status.container_statuses if pod_status else None
+    for status in container_statuses or []:
+        container_name: str = status.name
+        if container_name != "tensorflow":
+            continue
+
+        container_state: V1ContainerState = status.state
+        container_state_terminated: V1ContainerStateTerminated = container_state.terminated
+        if container_state_terminated:
+            return container_state_terminated.exit_code
+    return None
+
+
+def wait_for_tensorflow_exit(v1: client.CoreV1Api, run_name: str, namespace: str) -> int:
+    """
+    Watches pods of the run, so the API server sends an event only when one of them changes. Pods are listed only
+    when watching starts and when the watch can't be resumed from the last seen version of pods.
+    :return: exit code of the first terminated tensorflow container
+    """
+    label_selector = f"runName={run_name}"
+    resource_version = None
+    attempt = 0
+
+    while True:
+        try:
+            if resource_version is None:
+                my_run_pods: V1PodList = v1.list_namespaced_pod(namespace=namespace, label_selector=label_selector)
+                for pod in my_run_pods.items:
+                    exit_code = get_tensorflow_exit_code(pod)
+                    if exit_code is not None:
+                        log.info(f"Tensorflow container of pod: {pod.metadata.name} exited with code: {exit_code}")
+                        return exit_code
+                log.info("No exited tensorflow container found")
+                resource_version = my_run_pods.metadata.resource_version
+
+            for event in watch.Watch().stream(v1.list_namespaced_pod, namespace=namespace,
+                                              label_selector=label_selector, resource_version=resource_version,
+                                              timeout_seconds=WATCH_TIMEOUT):
+                if event['type'] == 'ERROR':
+                    # e.g. 410 Gone - the version is too old to resume from it, pods are listed again
+                    log.info(f"watch of pods failed: {event['raw_object'].get('message')}")
+                    resource_version = None
+                    break
+
+                pod: V1Pod = event['object']
+                resource_version = pod.metadata.resource_version
+                exit_code = get_tensorflow_exit_code(pod)
+                if exit_code is not None:
+                    log.info(f"Tensorflow container of pod: {pod.metadata.name} exited with code: {exit_code}")
+                    return exit_code
+            attempt = 0
+        except Exception:
+            delay = get_retry_delay(attempt)
+            log.exception(f"failed to watch pods of {run_name} run, retrying in {delay:.1f} s")
+            sleep(delay)
+            attempt += 1
+
+
 def main():
     init_logging_level()
     init_kubernetes_config()
@@ -86,28 +161,12 @@ def main():
 
     log.info("initialization succeeded")
 
-    while True:
-        my_run_pods: V1PodList = v1.list_namespaced_pod(namespace=my_namespace, label_selector=f"runName={my_run_name}")
-
-        for pod in my_run_pods.items:
-            pod_typed: V1Pod = pod
-            pod_status: V1PodStatus = pod_typed.status
-            container_statuses: List[V1ContainerStatus] = pod_status.container_statuses
-            for status in container_statuses:
-                container_name: str = status.name
-                if container_name != "tensorflow":
-                    continue
-
-                container_state: V1ContainerState = status.state
-                container_state_terminated: V1ContainerStateTerminated = container_state.terminated
-                if container_state_terminated:
-                    exit_code = container_state_terminated.exit_code
-                    log.info(f"Tensorflow container of pod: {pod_typed.metadata.name} exited with code: {exit_code}, creating END hook")
-                    open("/pod-data/END", 'a').close()
-                    log.info("exiting...")
-                    _exit(exit_code)
-        log.info("No exited tensorflow container found")
-        sleep(1)
+    exit_code = wait_for_tensorflow_exit(v1, run_name=my_run_name, namespace=my_namespace)
+
+    log.info("creating END hook")
+    open("/pod-data/END", 'a').close()
+    log.info("exiting...")
+    _exit(exit_code)
 
 
 if __name__ == '__main__':
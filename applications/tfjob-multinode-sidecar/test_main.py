@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from kubernetes.client import V1ContainerState, V1ContainerStateRunning, V1ContainerStateTerminated, \
+    V1ContainerStatus, V1ListMeta, V1ObjectMeta, V1Pod, V1PodList, V1PodStatus
+from pytest import fixture
+
+from main import main
+
+
+def create_pod(name='fake-pod-0', resource_version='1', exit_code=None):
+    if exit_code is None:
+        state = V1ContainerState(running=V1ContainerStateRunning())
+    else:
+        state = V1ContainerState(terminated=V1ContainerStateTerminated(exit_code=exit_code))
+    container_statuses = [
+        V1ContainerStatus(name='tensorflow', state=state, image='', image_id='', ready=True, restart_count=0),
+        V1ContainerStatus(name='sidecar', state=V1ContainerState(running=V1ContainerStateRunning()), image='',
+                          image_id='', ready=True, restart_count=0)
+    ]
+    return V1Pod(metadata=V1ObjectMeta(name=name, resource_version=resource_version, labels={'runName': 'fake-run'}),
+                 status=V1PodStatus(container_statuses=container_statuses))
+
+
+def create_pod_list(*pods, resource_version='1'):
+    return V1PodList(items=list(pods), metadata=V1ListMeta(resource_version=resource_version))
+
+
+def create_event(pod, event_type='MODIFIED'):
+    return {'type': event_type, 'object': pod, 'raw_object': {}}
+
+
+@fixture
+def main_mock(mocker):
+    mocker.patch('main.getenv').return_value = 'INFO'
+    kubernetes_config_load = mocker.patch('kubernetes.config.load_incluster_config')
+    file_mock = mocker.MagicMock(read=lambda: 'fake-namespace')
+    open_mock = mocker.MagicMock(__enter__=lambda x: file_mock)
+    builtins_open = mocker.patch('builtins.open')
+    builtins_open.return_value = open_mock
+    main_sleep = mocker.patch('main.sleep')
+    main_exit = mocker.patch('main._exit')
+
+    fake_k8s_client = mocker.MagicMock()
+    mocker.patch('kubernetes.client.CoreV1Api').return_value = fake_k8s_client
+    fake_k8s_client.read_namespaced_pod.return_value = create_pod()
+    fake_k8s_client.list_namespaced_pod.return_value = create_pod_list(create_pod(), create_pod(name='fake-pod-1'))
+    watch_mock = mocker.patch('main.watch.Watch').return_value
+
+    class MainMock:
+        kubernetes_config_load_mock = kubernetes_config_load
+        builtins_open_mock = builtins_open
+        kubernetes_client_mock = fake_k8s_client
+        time_sleep_mock = main_sleep
+        exit_mock = main_exit
+        kubernetes_watch_mock = watch_mock
+
+    return MainMock
+
+
+def test_main(main_mock):
+    main_mock.kubernetes_watch_mock.stream.return_value = iter([
+        create_event(create_pod(resource_version='2')),
+        create_event(create_pod(name='fake-pod-1', resource_version='3', exit_code=0))
+    ])
+
+    main()
+
+    # namespace is read and END hook is created
+    assert main_mock.builtins_open_mock.call_count == 2
+    assert main_mock.exit_mock.call_args[0][0] == 0
+    assert main_mock.time_sleep_mock.call_count == 0
+    assert main_mock.kubernetes_client_mock.list_namespaced_pod.call_count == 1
+    assert main_mock.kubernetes_watch_mock.stream.call_args[1]['label_selector'] == 'runName=fake-run'
+    assert main_mock.kubernetes_watch_mock.stream.call_args[1]['resource_version'] == '1'
+
+
+def test_main_tensorflow_already_exited(main_mock):
+    main_mock.kubernetes_client_mock.list_namespaced_pod.return_value = \
+        create_pod_list(create_pod(), create_pod(name='fake-pod-1', exit_code=1))
+
+    main()
+
+    assert main_mock.builtins_open_mock.call_count == 2
+    assert main_mock.exit_mock.call_args[0][0] == 1
+    assert main_mock.kubernetes_watch_mock.stream.call_count == 0
+
+
+def test_main_watch_resumed(main_mock):
+    main_mock.kubernetes_watch_mock.stream.side_effect = [
+        # the server closes a watch after a timeout, it's resumed from the last seen version
+        iter([create_event(create_pod(resource_version='2'))]),
+        # the last seen version is too old, so pods are listed again
+        iter([{'type': 'ERROR', 'object': None, 'raw_object': {'code': 410, 'message': 'too old resource version'}}]),
+        iter([create_event(create_pod(resource_version='5', exit_code=2))])
+    ]
+    main_mock.kubernetes_client_mock.list_namespaced_pod.side_effect = [
+        create_pod_list(create_pod()),
+        create_pod_list(create_pod(resource_version='4'), resource_version='4')
+    ]
+
+    main()
+
+    assert main_mock.exit_mock.call_args[0][0] == 2
+    assert main_mock.time_sleep_mock.call_count == 0
+    assert main_mock.kubernetes_client_mock.list_namespaced_pod.call_count == 2
+    assert [call[1]['resource_version'] for call in main_mock.kubernetes_watch_mock.stream.call_args_list] == \
+        ['1', '2', '4']
+
+
+def test_main_watch_retried(main_mock):
+    main_mock.kubernetes_client_mock.list_namespaced_pod.side_effect = [
+        RuntimeError('connection error'),
+        create_pod_list(create_pod())
+    ]
+    main_mock.kubernetes_watch_mock.stream.side_effect = [
+        RuntimeError('connection error'),
+        iter([create_event(create_pod(resource_version='2', exit_code=0))])
+    ]
+
+    main()
+
+    assert main_mock.exit_mock.call_args[0][0] == 0
+    assert main_mock.time_sleep_mock.call_count == 2
+    # delay of a retry grows with the number of failed attempts
+    assert main_mock.time_sleep_mock.call_args_list[0][0][0] <= 1.0
+    assert main_mock.time_sleep_mock.call_args_list[1][0][0] <= 2.0
+    assert [call[1]['resource_version'] for call in main_mock.kubernetes_watch_mock.stream.call_args_list] == \
+        ['1', '1']
@@ -14,66 +14,112 @@
 # limitations under the License.
 #
 
-from flask import Flask
-from flask import Response
-from flask import request
-
-import requests
 
 import base64
+import logging
 from subprocess import check_output
 
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector, hdrs, web
+from yarl import URL
 
-app = Flask(__name__)
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 ELASTICSEARCH_PORT = 9200
-ip = check_output(['hostname', '--all-ip-addresses']).decode("ascii").split('\n')[0].strip()
-REDIRECT_TO = f'http://{ip}:{ELASTICSEARCH_PORT}/'
-ADMIN_KEY = base64.b64encode(
-    open("/var/es-proxy-auth/token").read().encode("ascii")).decode("ascii")
+PROXY_PORT = 9201
+ADMIN_TOKEN_PATH = '/var/es-proxy-auth/token'
+
+# requests of GUI and nctl share a pool of kept-alive connections to Elasticsearch
+UPSTREAM_CONNECTIONS_LIMIT = 64
+
+# size of chunks of response bodies passed from Elasticsearch to a client, scroll pages can have many megabytes
+CHUNK_SIZE = 64 * 1024
+
+# headers describing a single connection, they can't be forwarded
+HOP_BY_HOP_HEADERS = {hdrs.CONNECTION, hdrs.KEEP_ALIVE, hdrs.PROXY_AUTHENTICATE, hdrs.PROXY_AUTHORIZATION, hdrs.TE,
+                      hdrs.TRAILER, hdrs.TRANSFER_ENCODING, hdrs.UPGRADE}
+
+METHODS = ('GET', 'POST', 'DELETE', 'PUT', 'HEAD')
+
+GUI_SEARCH_SCROLL_PATHS = {'/_all/_search', '/_all/scroll', '/_search/scroll'}
+
+
+def get_elasticsearch_address() -> str:
+    ip = check_output(['hostname', '--all-ip-addresses']).decode("ascii").split('\n')[0].strip()
+    return f'http://{ip}:{ELASTICSEARCH_PORT}/'
+
+
+def read_admin_key(token_path: str = ADMIN_TOKEN_PATH) -> str:
+    with open(token_path) as token_file:
+        return base64.b64encode(token_file.read().encode("ascii")).decode("ascii")
+
+
+def _filter_headers(headers, excluded_headers=()) -> dict:
+    excluded_headers = {header.lower() for header in HOP_BY_HOP_HEADERS.union(excluded_headers)}
+    return {key: value for key, value in headers.items() if key.lower() not in excluded_headers}
+
+
+def is_gui_search_scroll_request(request: web.Request) -> bool:
+    return request.method == "POST" and request.path in GUI_SEARCH_SCROLL_PATHS
+
+
+def is_authorized(request: web.Request) -> bool:
+    # headers are read directly from the request, they are copied only when a request is passed to Elasticsearch
+    admin_authorization = request.app['admin_authorization']
+    return request.headers.get("ES-Authorization") == admin_authorization \
+        or request.headers.get(hdrs.AUTHORIZATION) == admin_authorization
 
 
-def create_flask_response(original_response):
-    flask_response = Response(
-        response=original_response.content,
-        content_type=original_response.headers['content-type'])
+async def redirect(request: web.Request) -> web.StreamResponse:
+    if not is_gui_search_scroll_request(request) and request.method != "GET" and not is_authorized(request):
+        raise web.HTTPForbidden()
 
-    flask_response.status_code = original_response.status_code
+    # path and query are passed to Elasticsearch exactly as they were received
+    url = URL(request.app['elasticsearch_address'].rstrip('/') + request.raw_path, encoded=True)
+    headers = _filter_headers(request.headers, excluded_headers={hdrs.HOST})
+    data = request.content if request.body_exists else None
 
-    for cookie_key, cookie_value in original_response.cookies.items():
-        flask_response.set_cookie(cookie_key, value=cookie_value)
+    try:
+        upstream = await request.app['upstream_session'].request(request.method, url, data=data, headers=headers,
+                                                                 allow_redirects=False)
+    except ClientError:
+        logger.exception(f'Failed to pass request to {url}.')
+        raise web.HTTPBadGateway()
 
-    return flask_response
+    try:
+        response = web.StreamResponse(status=upstream.status, reason=upstream.reason,
+                                      headers=_filter_headers(upstream.headers))
+        await response.prepare(request)
+        # body is passed to a client chunk by chunk, so a scroll page is never held in memory as a whole
+        async for chunk in upstream.content.iter_chunked(CHUNK_SIZE):
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+    finally:
+        upstream.release()
 
 
-def is_gui_search_scroll_request(url, request):
-    return request.method == "POST" \
-           and (url == "_all/_search" or url == "_all/scroll"
-                or url == "_search/scroll")
+async def start_upstream_session(app: web.Application):
+    # responses of Elasticsearch are passed to clients as they are, so they aren't decompressed
+    app['upstream_session'] = ClientSession(connector=TCPConnector(limit=UPSTREAM_CONNECTIONS_LIMIT),
+                                            timeout=ClientTimeout(total=None), auto_decompress=False)
 
 
-@app.route('/', methods=['GET', 'POST', 'DELETE', 'PUT', 'HEAD'])
-@app.route('/<path:url>', methods=['GET', 'POST', 'DELETE', 'PUT', 'HEAD'])
-def redirect(url=""):
-    new_url = url
-    if request.query_string:
-        new_url = new_url + '?' + request.query_string.decode("ascii")
+async def close_upstream_session(app: web.Application):
+    await app['upstream_session'].close()
 
-    headers = dict(request.headers)
 
-    if (
-        not is_gui_search_scroll_request(url, request)
-        and request.method != "GET"
-        and (headers.get("ES-Authorization") != f"Basic {ADMIN_KEY}"
-             and headers.get("Authorization") != f"Basic {ADMIN_KEY}")
-    ):
-        return "", 403
+def create_app(elasticsearch_address: str, admin_key: str) -> web.Application:
+    app = web.Application()
+    app['elasticsearch_address'] = elasticsearch_address
+    app['admin_authorization'] = f"Basic {admin_key}"
+    app.on_startup.append(start_upstream_session)
+    app.on_cleanup.append(close_upstream_session)
+    for method in METHODS:
+        app.router.add_route(method, '/{url:.*}', redirect)
+    return app
 
-    response = requests.request(
-        request.method,
-        str(REDIRECT_TO + new_url),
-        data=request.get_data(),
-        headers=headers,
-        cookies=request.cookies)
 
-    return create_flask_response(response)
+if __name__ == '__main__':
+    web.run_app(create_app(elasticsearch_address=get_elasticsearch_address(), admin_key=read_admin_key()),
+                port=PROXY_PORT, access_log=None)
@@ -0,0 +1,205 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+"""
+Benchmark of scroll-page throughput of Elasticsearch proxy. It starts a fake Elasticsearch returning scroll pages
+of a given size, the proxy from this directory in front of it and fetches pages through the proxy from many
+concurrent clients, like GUI and nctl do. Throughput, latency percentiles and peak memory of the proxy are printed.
+
+Other proxies (e.g. a previous version of the proxy) can be benchmarked with --target option. They should forward
+requests to the fake Elasticsearch, which listens on port 9200 by default.
+"""
+
+import argparse
+import asyncio
+from http import HTTPStatus
+import json
+from multiprocessing import Process
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiohttp.test_utils import unused_port
+
+PROXY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCROLL_PATH = '/_search/scroll'
+
+
+def run_fake_elasticsearch(port: int, page_size: int, hit_size: int):
+    hits = [{'_index': 'executions', '_id': str(i), '_source': {'log': 'x' * hit_size}} for i in range(page_size)]
+    page = json.dumps({'_scroll_id': 'fake-scroll-id', 'hits': {'total': page_size, 'hits': hits}}).encode('utf-8')
+
+    async def scroll(request: web.Request) -> web.Response:
+        await request.read()
+        return web.Response(body=page, content_type='application/json')
+
+    async def root(request: web.Request) -> web.Response:
+        return web.Response(text='{}', content_type='application/json')
+
+    app = web.Application()
+    app.router.add_post(SCROLL_PATH, scroll)
+    app.router.add_get('/', root)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, access_log=None)
+
+
+def start_proxy(elasticsearch_port: int) -> (subprocess.Popen, str):
+    port = unused_port()
+    code = ('from aiohttp import web; import elasticsearch_proxy as p; '
+            f'web.run_app(p.create_app(elasticsearch_address="http://127.0.0.1:{elasticsearch_port}/", '
+            f'admin_key="benchmark"), host="127.0.0.1", port={port}, print=None, access_log=None)')
+    process = subprocess.Popen([sys.executable, '-c', code], env=dict(os.environ, PYTHONPATH=PROXY_DIR))
+    return process, f'http://127.0.0.1:{port}'
+
+
+def get_peak_memory_mb(pid: int) -> Optional[float]:
+    try:
+        with open(f'/proc/{pid}/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+async def wait_until_available(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with ClientSession() as session:
+        while True:
+            try:
+                async with session.get(url) as response:
+                    if response.status == HTTPStatus.OK:
+                        return
+            except OSError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'{url} is not available.')
+            await asyncio.sleep(0.1)
+
+
+async def fetch_pages(url: str, pages_count: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    transferred_bytes = 0
+    errors = 0
+    next_page = iter(range(pages_count))
+    body = json.dumps({'scroll': '1m', 'scroll_id': 'fake-scroll-id'})
+
+    async def client(session: ClientSession):
+        nonlocal transferred_bytes, errors
+        for _ in next_page:
+            start = time.perf_counter()
+            try:
+                async with session.post(url + SCROLL_PATH, data=body,
+                                        headers={'Content-Type': 'application/json'}) as response:
+                    page = await response.read()
+                    if response.status != HTTPStatus.OK:
+                        errors += 1
+                        continue
+            except OSError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            transferred_bytes += len(page)
+
+    async with ClientSession(connector=TCPConnector(limit=concurrency)) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*[client(session) for _ in range(concurrency)])
+        duration = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return round(latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+    return {
+        'pages': pages_count,
+        'errors': errors,
+        'duration_s': round(duration, 2),
+        'throughput_pages_per_s': round(len(latencies) / duration, 1),
+        'throughput_mbps': round(transferred_bytes / duration / 1024 / 1024, 1),
+        'latency_mean_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        'latency_p50_ms': percentile(0.5),
+        'latency_p95_ms': percentile(0.95),
+        'latency_p99_ms': percentile(0.99),
+    }
+
+
+async def benchmark(targets: Dict[str, str], pages_count: int, concurrency: int) -> Dict:
+    results = {}
+    for name, url in targets.items():
+        await wait_until_available(url + '/')
+        # warm up connections of a proxy
+        await fetch_pages(url, pages_count=concurrency, concurrency=concurrency)
+        results[name] = await fetch_pages(url, pages_count=pages_count, concurrency=concurrency)
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark of scroll-page throughput of Elasticsearch proxy.')
+    parser.add_argument('--pages', type=int, default=500, help='Number of scroll pages fetched through each proxy.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Number of concurrent clients.')
+    parser.add_argument('--page-size', type=int, default=1000, help='Number of hits in a scroll page.')
+    parser.add_argument('--hit-size', type=int, default=1024, help='Size of a single hit in bytes.')
+    parser.add_argument('--elasticsearch-port', type=int, default=9200, help='Port of fake Elasticsearch.')
+    parser.add_argument('--target', action='append', default=[], metavar='NAME=URL',
+                        help='Additional proxy to benchmark, it can be given many times.')
+    parser.add_argument('--target-pid', action='append', default=[], metavar='NAME=PID',
+                        help='Process of an additional proxy, its peak memory is reported.')
+    parser.add_argument('--output', help='Path to a JSON file where results should be saved.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    elasticsearch = Process(target=run_fake_elasticsearch, daemon=True,
+                            args=(args.elasticsearch_port, args.page_size, args.hit_size))
+    elasticsearch.start()
+    proxy, proxy_url = start_proxy(args.elasticsearch_port)
+    try:
+        targets = {'elasticsearch-proxy': proxy_url}
+        targets.update(target.split('=', 1) for target in args.target)
+        pids = {'elasticsearch-proxy': proxy.pid}
+        pids.update((name, int(pid)) for name, pid in (target.split('=', 1) for target in args.target_pid))
+
+        results = asyncio.get_event_loop().run_until_complete(benchmark(targets, args.pages, args.concurrency))
+        for name, result in results.items():
+            result['peak_memory_mb'] = get_peak_memory_mb(pids[name]) if name in pids else None
+    finally:
+        proxy.terminate()
+        proxy.wait()
+        elasticsearch.terminate()
+
+    print(f'{"proxy":<20} {"pages/s":>8} {"MB/s":>8} {"mean [ms]":>10} {"p50 [ms]":>9} {"p95 [ms]":>9} '
+          f'{"p99 [ms]":>9} {"peak RSS [MB]":>14} {"errors":>7}')
+    for name, r in results.items():
+        print(f'{name:<20} {r["throughput_pages_per_s"]:>8} {r["throughput_mbps"]:>8} {r["latency_mean_ms"]:>10} '
+              f'{r["latency_p50_ms"]:>9} {r["latency_p95_ms"]:>9} {r["latency_p99_ms"]:>9} '
+              f'{str(r["peak_memory_mb"]):>14} {r["errors"]:>7}')
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2019 Intel Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from http import HTTPStatus
+
+from aiohttp import web
+from aiohttp.test_utils import unused_port
+import pytest
+
+from elasticsearch_proxy import create_app
+
+FAKE_ADMIN_KEY = 'ZmFrZS1rZXk='
+
+LARGE_BODY = b'x' * (4 * 1024 * 1024)
+
+
+async def fake_elasticsearch_handler(request: web.Request) -> web.Response:
+    request.app['requests'].append((request.method, request.raw_path))
+    if request.path == '/_all/_search' and request.method == 'GET':
+        return web.Response(body=LARGE_BODY, content_type='application/json')
+    if request.path == '/missing-index/_search':
+        return web.Response(status=HTTPStatus.NOT_FOUND, text='{"error": "index_not_found_exception"}',
+                            content_type='application/json')
+    return web.Response(body=await request.read(), headers={'X-Raw-Path': request.raw_path})
+
+
+@pytest.fixture
+async def elasticsearch_server(aiohttp_server):
+    # requests passed by the proxy are larger than the default limit of a body read at once
+    app = web.Application(client_max_size=2 * len(LARGE_BODY))
+    app['requests'] = []
+    app.router.add_route('*', '/{url:.*}', fake_elasticsearch_handler)
+    return await aiohttp_server(app)
+
+
+@pytest.fixture
+async def proxy_client(aiohttp_client, elasticsearch_server):
+    return await aiohttp_client(create_app(elasticsearch_address=str(elasticsearch_server.make_url('/')),
+                                           admin_key=FAKE_ADMIN_KEY))
+
+
+@pytest.mark.parametrize('method,path', [('PUT', '/experiments'), ('DELETE', '/experiments'),
+                                         ('POST', '/experiments/_doc')])
+async def test_unauthorized_request_forbidden(proxy_client, elasticsearch_server, method, path):
+    response = await proxy_client.request(method, path, data=b'{}', headers={'Authorization': 'Basic wrong'})
+
+    assert response.status == HTTPStatus.FORBIDDEN
+    assert elasticsearch_server.app['requests'] == []
+
+
+@pytest.mark.parametrize('header', ['Authorization', 'ES-Authorization'])
+async def test_authorized_request(proxy_client, elasticsearch_server, header):
+    response = await proxy_client.put('/experiments', data=b'{"settings": {}}',
+                                      headers={header: f'Basic {FAKE_ADMIN_KEY}'})
+
+    assert response.status == HTTPStatus.OK
+    assert await response.read() == b'{"settings": {}}'
+    assert elasticsearch_server.app['requests'] == [('PUT', '/experiments')]
+
+
+async def test_gui_search_scroll_request_not_authorized(proxy_client):
+    response = await proxy_client.post('/_search/scroll', data=b'{"scroll_id": "abc"}')
+
+    assert response.status == HTTPStatus.OK
+    assert await response.read() == b'{"scroll_id": "abc"}'
+
+
+async def test_large_response_streamed(proxy_client):
+    response = await proxy_client.get('/_all/_search')
+
+    assert response.status == HTTPStatus.OK
+    assert response.headers['Content-Type'] == 'application/json'
+    assert await response.read() == LARGE_BODY
+
+
+async def test_large_request_body_and_query(proxy_client):
+    response = await proxy_client.post('/_all/_search?scroll=1m&q=a%26b', data=LARGE_BODY)
+
+    assert response.status == HTTPStatus.OK
+    # query is passed without being decoded and encoded again
+    assert response.headers['X-Raw-Path'] == '/_all/_search?scroll=1m&q=a%26b'
+    assert await response.read() == LARGE_BODY
+
+
+async def test_elasticsearch_error_passed(proxy_client):
+    response = await proxy_client.get('/missing-index/_search')
+
+    assert response.status == HTTPStatus.NOT_FOUND
+    assert await response.text() == '{"error": "index_not_found_exception"}'
+
+
+async def test_elasticsearch_not_available(aiohttp_client):
+    client = await aiohttp_client(create_app(elasticsearch_address=f'http://127.0.0.1:{unused_port()}/',
+                                             admin_key=FAKE_ADMIN_KEY))
+
+    response = await client.get('/_all/_search')
+
+    assert response.status == HTTPStatus.BAD_GATEWAY